@@ -0,0 +1,87 @@
+"""
+Бенчмарк пакетного режима: одни и те же команды выполняются сценарием (run_script, как main.py -c)
+и подачей строк на стандартный ввод интерактивного цикла (run). Время замеряется целиком,
+от запуска интерпретатора до завершения. История (с уже накопленными записями) и корзина
+создаются во временном каталоге.
+
+Запуск: python benchmarks/bench_batch.py [количество команд] [записей в истории]
+"""
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+# Пакет импортируется как Lab_2_Consoleapp_Python, поэтому в путь добавляется каталог над репозиторием
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PACKAGE_PARENT)
+
+from Lab_2_Consoleapp_Python.src.storage.journal import HistoryJournal  # noqa: E402
+
+# Запускается в отдельном интерпретаторе: mode - 'batch' (сценарий из stdin) или 'interactive'
+CHILD = """
+import sys
+from Lab_2_Consoleapp_Python.src.ruletka_shell import RuletkaShell
+mode, data_dir = sys.argv[1], sys.argv[2]
+shell = RuletkaShell()
+shell.history_file = data_dir + '/.history.jsonl'
+shell.legacy_history_file = data_dir + '/.history.json'
+shell.history_index_file = data_dir + '/.history.db'
+shell.undo_stack_file = data_dir + '/.history.undo.json'
+shell.trash_dir = data_dir + '/.trash'
+shell.trash_manifest_file = data_dir + '/.trash.db'
+if mode == 'batch':
+    shell._opers_init(interactive=False)
+    status = shell.run_script(sys.stdin.read())
+    shell.close()
+    sys.exit(status)
+shell._opers_init()
+shell.run()
+"""
+
+
+def _make_tree(root: str) -> None:
+    for i in range(20):
+        with open(os.path.join(root, f"file_{i}.txt"), 'w', encoding='utf-8') as file:
+            file.write("".join(f"line {j} TODO item {i}\n" for j in range(50)))
+
+
+def _script(root: str, count: int) -> str:
+    commands = [f"cd {root}", "ls", "ls -l", "cat file_3.txt", "grep TODO file_7.txt", "cd .", "history 5"]
+    return "\n".join(commands[i % len(commands)] for i in range(count)) + "\n"
+
+
+def _fill_history(data_dir: str, entries: int) -> None:
+    journal = HistoryJournal(os.path.join(data_dir, '.history.jsonl'))
+    now = time.time() - entries
+    journal.append_many([{'ts': now + i, 'command': 'ls', 'args': [f'dir_{i % 1000}'], 'success': True,
+                          'cwd': data_dir} for i in range(entries)])
+
+
+def _run(mode: str, data_dir: str, script: str) -> float:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [PACKAGE_PARENT, env.get('PYTHONPATH')]))
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', CHILD, mode, data_dir], input=script, env=env, cwd=data_dir,
+                   capture_output=True, text=True)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    entries = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    with tempfile.TemporaryDirectory() as root:
+        _make_tree(root)
+        script = _script(root, count)
+        results = {}
+        for mode in ('interactive', 'batch'):
+            with tempfile.TemporaryDirectory() as data_dir:
+                _fill_history(data_dir, entries)
+                results[mode] = _run(mode, data_dir, script)
+            print(f"  {mode:<12} {count} commands, {entries} history entries: {results[mode]:.2f} s "
+                  f"({results[mode] / count * 1000:.3f} ms per command)")
+        print(f"Batch mode speedup: {results['interactive'] / results['batch']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
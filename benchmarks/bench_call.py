@@ -0,0 +1,81 @@
+"""
+Бенчмарк API для вызова команд из Python: получение результатов grep и ls через RuletkaShell.call
+против прежнего способа - выполнение команды с перехватом stdout и разбором раскрашенного вывода.
+Файлы, история и корзина создаются во временном каталоге.
+
+Запуск: python benchmarks/bench_call.py [строк в файле] [файлов в каталоге]
+"""
+import io
+import os
+import re
+import sys
+import time
+import tempfile
+import contextlib
+
+# Пакет импортируется как Lab_2_Consoleapp_Python, поэтому в путь добавляется каталог над репозиторием
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PACKAGE_PARENT)
+
+from Lab_2_Consoleapp_Python.src.ruletka_shell import RuletkaShell  # noqa: E402
+
+ANSI = re.compile(r'\033\[\d+m')
+
+
+def _shell(data_dir: str) -> RuletkaShell:
+    shell = RuletkaShell()
+    shell.history_file = os.path.join(data_dir, '.history.jsonl')
+    shell.legacy_history_file = os.path.join(data_dir, '.history.json')
+    shell.history_index_file = os.path.join(data_dir, '.history.db')
+    shell.undo_stack_file = os.path.join(data_dir, '.history.undo.json')
+    shell.trash_dir = os.path.join(data_dir, '.trash')
+    shell.trash_manifest_file = os.path.join(data_dir, '.trash.db')
+    shell._opers_init(interactive=False)
+    shell.current_dir = data_dir
+    return shell
+
+
+def _parsed_output(shell: RuletkaShell, command: str, args: list[str]) -> list[list[str]]:
+    """
+    Прежний способ: перехват вывода, удаление цветов и разбор строк path:n:line.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        shell.execute_command(command, args)
+    return [ANSI.sub('', line).split(':', 2) for line in output.getvalue().splitlines()]
+
+
+def _measure(run, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    with tempfile.TemporaryDirectory() as data_dir:
+        with open(os.path.join(data_dir, 'big.txt'), 'w') as file:
+            file.writelines(f"line {i} {'match' if i % 4 == 0 else 'other'} text\n" for i in range(lines))
+        tree = os.path.join(data_dir, 'tree')
+        os.mkdir(tree)
+        for i in range(files):
+            open(os.path.join(tree, f"file_{i}.txt"), 'w').close()
+
+        shell = _shell(data_dir)
+        try:
+            print(f"ms per call (best of 5), grep over {lines} lines, ls of {files} files:")
+            for command, args in (('grep', ['match', 'big.txt']), ('ls', ['tree'])):
+                parsed = _measure(lambda command=command, args=args: _parsed_output(shell, command, args))
+                structured = _measure(lambda command=command, args=args: shell.call(command, *args))
+                print(f"  {command:4}  stdout + parsing {parsed:9.2f}   call() {structured:9.2f}"
+                      f"  ({parsed / structured:.1f}x faster)")
+        finally:
+            shell.close()
+
+
+if __name__ == "__main__":
+    main()
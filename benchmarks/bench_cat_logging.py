@@ -0,0 +1,80 @@
+"""
+Бенчмарк построчной отладки cat: пропускная способность cat (вывод в /dev/null) при уровне
+логгера RuletkaShell.cat INFO (по умолчанию), DEBUG с выборкой каждой 1000-й строки и DEBUG
+для каждой строки (как раньше, когда каждая строка форматировалась и писалась в shell.log).
+Лог, история и корзина создаются во временном каталоге.
+
+Запуск: python benchmarks/bench_cat_logging.py [размер файла, MB]
+"""
+import os
+import sys
+import time
+import logging
+import tempfile
+
+# Пакет импортируется как Lab_2_Consoleapp_Python, поэтому в путь добавляется каталог над репозиторием
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PACKAGE_PARENT)
+
+from Lab_2_Consoleapp_Python.src.ruletka_shell import RuletkaShell  # noqa: E402
+from Lab_2_Consoleapp_Python.src.source.config import LINE_LOG_SAMPLING  # noqa: E402
+
+
+def _shell(data_dir: str) -> RuletkaShell:
+    shell = RuletkaShell()
+    shell.history_file = os.path.join(data_dir, '.history.jsonl')
+    shell.legacy_history_file = os.path.join(data_dir, '.history.json')
+    shell.history_index_file = os.path.join(data_dir, '.history.db')
+    shell.undo_stack_file = os.path.join(data_dir, '.history.undo.json')
+    shell.trash_dir = os.path.join(data_dir, '.trash')
+    shell.trash_manifest_file = os.path.join(data_dir, '.trash.db')
+    shell._opers_init(interactive=False)
+    shell.current_dir = data_dir
+    return shell
+
+
+def _throughput(shell: RuletkaShell, path: str, size_mb: float) -> float:
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            started = time.perf_counter()
+            shell.commands['cat']([path])
+            elapsed = time.perf_counter() - started
+        finally:
+            sys.stdout = stdout
+    return size_mb / elapsed
+
+
+def main() -> None:
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    line = "2024-11-14 20:55:01 INFO request handled in 12 ms by worker 7\n"
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, 'big.log')
+        with open(path, 'w') as file:
+            file.write(line * int(size_mb * 1024 * 1024 / len(line)))
+        # shell.log создается в текущем каталоге
+        os.chdir(data_dir)
+        shell = _shell(data_dir)
+        cat_logger = logging.getLogger("RuletkaShell.cat")
+        try:
+            results = []
+            for title, level, every in (("INFO (default)", logging.INFO, 1000),
+                                        ("DEBUG, every 1000th line", logging.DEBUG, 1000),
+                                        ("DEBUG, every line", logging.DEBUG, 1)):
+                cat_logger.setLevel(level)
+                LINE_LOG_SAMPLING['cat'] = every
+                results.append((title, _throughput(shell, path, size_mb)))
+        finally:
+            shell.close()
+            logging.shutdown()
+            log_size = os.path.getsize(os.path.join(data_dir, 'shell.log')) / 1024 / 1024
+
+    print(f"cat of a {size_mb:.0f} MB file to /dev/null, MB/s:")
+    for title, throughput in results:
+        print(f"  {title:26} {throughput:8.1f}")
+    print(f"shell.log after the runs: {log_size:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
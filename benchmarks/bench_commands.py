@@ -0,0 +1,310 @@
+"""
+Набор бенчмарков всех файловых команд на сгенерированных деревьях файлов: ls, cat, grep, cp, mv, rm,
+zip, unzip, tar, untar, history и undo выполняются через RuletkaShell.execute_command (как в консоли,
+с записью в историю) во временном каталоге. Подготовка каждого замера (копия дерева для rm и mv,
+удаление результата прошлого cp и т.п.) не входит в измеренное время.
+
+Результаты (медиана и минимум по повторам, мс) можно сохранить в JSON и сравнить с сохраненным
+базовым прогоном: замедление медианы больше порога считается регрессией, и код завершения равен 1.
+
+Запуск:
+  python benchmarks/bench_commands.py                                 # только вывод таблицы
+  python benchmarks/bench_commands.py --save benchmarks/baseline.json # записать базовый прогон
+  python benchmarks/bench_commands.py --compare benchmarks/baseline.json [--threshold 0.25]
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+
+# Пакет импортируется как Lab_2_Consoleapp_Python, поэтому в путь добавляется каталог над репозиторием
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PACKAGE_PARENT)
+
+from Lab_2_Consoleapp_Python.src.ruletka_shell import RuletkaShell  # noqa: E402
+from Lab_2_Consoleapp_Python.src.source.config import TRASH_CONFIG  # noqa: E402
+from Lab_2_Consoleapp_Python.src.storage.journal import HistoryJournal  # noqa: E402
+from Lab_2_Consoleapp_Python.src.trash.devices import TrashLocator  # noqa: E402
+
+# Размер дерева при --scale 1: каталогов, файлов в каталоге, строк в файле; строк в большом файле
+TREE_DIRS = 20
+TREE_FILES = 50
+FILE_LINES = 200
+BIG_FILE_LINES = 200_000
+HISTORY_ENTRIES = 100_000
+# Замедление меньше этого (мс) не считается регрессией: у быстрых команд оно в пределах шума
+MIN_REGRESSION_MS = 1.0
+
+
+class Case:
+    """
+    Один замер: команда с аргументами и необязательная подготовка/очистка вокруг каждого повтора.
+    """
+
+    def __init__(self, name: str, command: str, args: list[str], setup=None, teardown=None) -> None:
+        self.name = name
+        self.command = command
+        self.args = args
+        self.setup = setup
+        self.teardown = teardown
+
+
+def _make_tree(root: str, scale: float) -> None:
+    """
+    Создает дерево каталогов с текстовыми файлами (в каждой 10-й строке есть слово ERROR).
+    """
+    for d in range(max(int(TREE_DIRS * scale), 1)):
+        directory = os.path.join(root, f"dir_{d}")
+        os.makedirs(directory)
+        for f in range(TREE_FILES):
+            with open(os.path.join(directory, f"file_{f}.txt"), 'w') as file:
+                file.writelines(f"{'ERROR' if i % 10 == 0 else 'INFO'} line {i} of file {f} in dir {d}\n"
+                                for i in range(FILE_LINES))
+
+
+def _make_big_file(path: str, scale: float) -> None:
+    with open(path, 'w') as file:
+        file.writelines(f"2024-11-14 20:55:{i % 60:02d} {'ERROR' if i % 100 == 0 else 'INFO'} request {i}\n"
+                        for i in range(int(BIG_FILE_LINES * scale)))
+
+
+def _fill_history(path: str, entries: int, cwd: str) -> None:
+    journal = HistoryJournal(path)
+    now = time.time() - entries
+    journal.append_many([{'ts': now + i, 'command': ('ls', 'cp', 'rm', 'grep')[i % 4], 'args': [f'dir_{i % 1000}'],
+                          'success': i % 50 != 0, 'cwd': cwd} for i in range(entries)])
+
+
+def _shell(data_dir: str) -> RuletkaShell:
+    shell = RuletkaShell()
+    shell.history_file = os.path.join(data_dir, '.history.jsonl')
+    shell.legacy_history_file = os.path.join(data_dir, '.history.json')
+    shell.history_index_file = os.path.join(data_dir, '.history.db')
+    shell.undo_stack_file = os.path.join(data_dir, '.history.undo.json')
+    shell.trash_dir = os.path.join(data_dir, '.trash')
+    # Корзина временного каталога вместо корзины рядом с исходниками оболочки
+    shell.trash_locator = TrashLocator(shell.trash_dir, dir_name=TRASH_CONFIG["dir_name"])
+    shell.trash_manifest_file = os.path.join(data_dir, '.trash.db')
+    shell._opers_init(interactive=False)
+    return shell
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _cases(shell: RuletkaShell, work: str) -> list[Case]:
+    """
+    Замеры для всех команд. Пути относительные: команды выполняются в каталоге work.
+    """
+    tree = os.path.join(work, 'tree')
+
+    def fresh_copy(name):
+        def setup():
+            _remove(os.path.join(work, name))
+            shutil.copytree(tree, os.path.join(work, name))
+        return setup
+
+    def removed(*names):
+        return lambda: [_remove(os.path.join(work, name)) for name in names]
+
+    def extract_into(name):
+        # unzip и untar распаковывают архив в текущий каталог оболочки
+        def setup():
+            _remove(os.path.join(work, name))
+            os.mkdir(os.path.join(work, name))
+            shell.current_dir = os.path.join(work, name)
+
+        def teardown():
+            shell.current_dir = work
+        return setup, teardown
+
+    def removed_for_undo():
+        fresh_copy('undo_target')()
+        if shell.execute_command('rm', ['-r', 'undo_target']):
+            raise RuntimeError("undo: setup 'rm -r undo_target' failed")
+
+    unzip_setup, unzip_teardown = extract_into('unzip_out')
+    untar_setup, untar_teardown = extract_into('untar_out')
+    return [
+        Case('ls', 'ls', ['tree/dir_0']),
+        Case('ls -l', 'ls', ['-l', 'tree/dir_0']),
+        Case('cat big file', 'cat', ['big.log']),
+        Case('grep big file', 'grep', ['ERROR', 'big.log']),
+        Case('grep -r tree', 'grep', ['-r', 'ERROR', 'tree']),
+        Case('grep -ri tree', 'grep', ['-r', '-i', 'error line 1[0-9]', 'tree']),
+        Case('cp file', 'cp', ['big.log', 'big_copy.log'], setup=removed('big_copy.log')),
+        Case('cp -r tree', 'cp', ['-r', 'tree', 'tree_copy'], setup=removed('tree_copy')),
+        Case('mv tree', 'mv', ['mv_source', 'mv_target'], setup=fresh_copy('mv_source'), teardown=removed('mv_target')),
+        Case('rm -r tree', 'rm', ['-r', 'rm_target'], setup=fresh_copy('rm_target')),
+        Case('undo rm -r', 'undo', [], setup=removed_for_undo, teardown=removed('undo_target')),
+        Case('zip tree', 'zip', ['tree', 'tree.zip'], setup=removed('tree.zip')),
+        Case('unzip tree', 'unzip', [os.path.join(work, 'archive.zip')], setup=unzip_setup, teardown=unzip_teardown),
+        Case('tar tree', 'tar', ['tree', 'tree.tar'], setup=removed('tree.tar')),
+        Case('untar tree', 'untar', [os.path.join(work, 'archive.tar')], setup=untar_setup, teardown=untar_teardown),
+        Case('history 100', 'history', ['100']),
+        Case('history --cmd --failed', 'history', ['--cmd', 'rm', '--failed']),
+    ]
+
+
+def _run_case(shell: RuletkaShell, case: Case, repeat: int) -> list[float]:
+    """
+    Первый прогон не замеряется: в нем импортируется модуль команды, собирается парсер
+    аргументов и заполняются кэши файловой системы, что не относится к самой команде.
+    :return: время каждого повтора (без прогревочного), мс
+    """
+    timings = []
+    for run_index in range(repeat + 1):
+        # Вывод команд не нужен; подтверждения (rm -r каталога) получают "y"
+        with contextlib.redirect_stdout(io.StringIO()), _stdin("y\n" * 100):
+            if case.setup:
+                case.setup()
+            started = time.perf_counter()
+            status = shell.execute_command(case.command, case.args)
+            elapsed = time.perf_counter() - started
+        if case.teardown:
+            case.teardown()
+        if status:
+            raise RuntimeError(f"{case.name}: '{case.command} {' '.join(case.args)}' exited with status {status}")
+        if run_index:
+            timings.append(elapsed * 1000)
+    return timings
+
+
+@contextlib.contextmanager
+def _stdin(text: str):
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(text)
+    try:
+        yield
+    finally:
+        sys.stdin = stdin
+
+
+def run(scale: float, repeat: int, only: list[str] | None = None) -> dict:
+    """
+    Функция для прогона набора.
+    :param scale: множитель размера дерева, большого файла и истории
+    :param repeat: повторов каждого замера
+    :param only: имена замеров, которые нужно выполнить (None - все)
+    :return: результаты для сохранения в JSON
+    """
+    with tempfile.TemporaryDirectory() as data_dir:
+        work = os.path.join(data_dir, 'work')
+        os.makedirs(work)
+        _make_tree(os.path.join(work, 'tree'), scale)
+        _make_big_file(os.path.join(work, 'big.log'), scale)
+        _fill_history(os.path.join(data_dir, '.history.jsonl'), int(HISTORY_ENTRIES * scale), work)
+        shutil.make_archive(os.path.join(work, 'archive'), 'zip', work, 'tree')
+        shutil.make_archive(os.path.join(work, 'archive'), 'tar', work, 'tree')
+
+        # Лог оболочки (shell.log) пишется в текущий каталог процесса
+        previous_cwd = os.getcwd()
+        os.chdir(data_dir)
+        shell = _shell(data_dir)
+        shell.current_dir = work
+        results = {}
+        try:
+            for case in _cases(shell, work):
+                if only and case.name not in only:
+                    continue
+                timings = _run_case(shell, case, repeat)
+                results[case.name] = {'median_ms': round(statistics.median(timings), 3),
+                                      'min_ms': round(min(timings), 3),
+                                      'runs': [round(t, 3) for t in timings]}
+                print(f"  {case.name:<24} {results[case.name]['median_ms']:10.2f} ms", file=sys.stderr)
+        finally:
+            shell.close()
+            os.chdir(previous_cwd)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'scale': scale,
+            'repeat': repeat,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Функция для сравнения с базовым прогоном.
+    :param current: результаты текущего прогона
+    :param baseline: результаты базового прогона
+    :param threshold: допустимое относительное замедление медианы (0.25 - на 25%)
+    :return: имена замеров с регрессией
+    """
+    regressions = []
+    print(f"{'benchmark':<24} {'median ms':>10} {'baseline':>10} {'change':>8}")
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:<24} {result['median_ms']:>10.2f} {'-':>10} {'new':>8}")
+            continue
+        change = result['median_ms'] / base['median_ms'] - 1 if base['median_ms'] else 0.0
+        regressed = change > threshold and result['median_ms'] - base['median_ms'] > MIN_REGRESSION_MS
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<24} {result['median_ms']:>10.2f} {base['median_ms']:>10.2f} {change:>+8.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    if baseline['meta'].get('scale') != current['meta']['scale']:
+        print(f"warning: baseline was recorded with --scale {baseline['meta'].get('scale')}", file=sys.stderr)
+    # Время на другом интерпретаторе или другом числе ядер несопоставимо: порог сравнения ничего не значит
+    for key, label in (('python', 'Python'), ('cpus', 'CPUs')):
+        if baseline['meta'].get(key) != current['meta'][key]:
+            print(f"warning: baseline was recorded with {label} {baseline['meta'].get(key)}, "
+                  f"this run uses {current['meta'][key]}; timings are not comparable", file=sys.stderr)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of the shell commands on generated file trees")
+    parser.add_argument('--scale', type=float, default=1.0, help="size multiplier of the generated data")
+    parser.add_argument('--repeat', type=int, default=5, help="runs of every benchmark")
+    parser.add_argument('--only', help="comma-separated benchmark names to run")
+    parser.add_argument('--save', metavar='FILE', help="write results as JSON")
+    parser.add_argument('--compare', metavar='FILE', help="compare with a baseline JSON file")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed slowdown of the median (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    print(f"Running command benchmarks (scale {args.scale}, {args.repeat} runs each):", file=sys.stderr)
+    current = run(args.scale, args.repeat, args.only.split(',') if args.only else None)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump(current, file, indent=2)
+            file.write('\n')
+        print(f"Results saved to {args.save}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print("No regressions")
+        return 0
+
+    print(f"{'benchmark':<24} {'median ms':>10} {'min ms':>10}")
+    for name, result in current['results'].items():
+        print(f"{name:<24} {result['median_ms']:>10.2f} {result['min_ms']:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
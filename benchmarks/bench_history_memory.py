@@ -0,0 +1,71 @@
+"""
+Бенчмарк памяти: сколько байт в среднем занимает одна запись истории
+в старом представлении (словарь) и в HistoryEntry.
+
+Запуск: python benchmarks/bench_history_memory.py [количество записей]
+"""
+import os
+import sys
+import datetime
+import tracemalloc
+
+# Пакет импортируется как Lab_2_Consoleapp_Python, поэтому в путь добавляется каталог над репозиторием
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Lab_2_Consoleapp_Python.src.storage.entry import HistoryEntry
+
+COMMANDS = [('ls', ['-l']), ('cd', ['..']), ('cat', ['notes.txt']), ('grep', ['-r', 'TODO', 'src']),
+            ('cp', ['-r', 'data', 'backup']), ('rm', ['old.log'])]
+
+
+def _make_dict(i: int) -> dict:
+    """
+    Запись в том виде, в каком ее хранила оболочка до HistoryEntry.
+    """
+    command, args = COMMANDS[i % len(COMMANDS)]
+    return {
+        'timestamp': datetime.datetime.now().isoformat(),
+        # Имя команды приходит из shlex.split, то есть каждый раз это новая строка
+        'command': ''.join(command),
+        'args': [''.join(arg) for arg in args],
+        'success': True,
+        'undo_data': None,
+        'cwd': ''.join('/home/user/projects')
+    }
+
+
+def _make_entry(i: int) -> HistoryEntry:
+    command, args = COMMANDS[i % len(COMMANDS)]
+    return HistoryEntry(''.join(command), [''.join(arg) for arg in args], cwd=''.join('/home/user/projects'))
+
+
+def measure(factory, count: int) -> float:
+    """
+    Измеряет через tracemalloc, сколько памяти удерживают count записей.
+    :param factory: функция, создающая запись по номеру
+    :param count: количество записей
+    :return: среднее количество байт на запись
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    entries = [factory(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    # Сам список записей в обоих случаях одинаковый, его размер вычитается
+    total -= sys.getsizeof(entries)
+    return total / count
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    dict_bytes = measure(_make_dict, count)
+    entry_bytes = measure(_make_entry, count)
+    print(f"History entries: {count}")
+    print(f"  dict entry:    {dict_bytes:8.1f} bytes/entry")
+    print(f"  HistoryEntry:  {entry_bytes:8.1f} bytes/entry")
+    print(f"  saved:         {100 * (1 - entry_bytes / dict_bytes):8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Бенчмарк поиска по истории (Ctrl-R): время ответа индекса на каждое нажатие клавиши
+при наборе запросов на большой истории.
+
+Запуск: python benchmarks/bench_history_search.py [количество записей]
+"""
+import os
+import sys
+import time
+import random
+
+# Пакет импортируется как Lab_2_Consoleapp_Python, поэтому в путь добавляется каталог над репозиторием
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Lab_2_Consoleapp_Python.src.storage.search import HistorySearchIndex, command_line
+
+COMMANDS = ['ls', 'cd', 'cat', 'grep', 'zip', 'tar', 'cp', 'mv', 'rm']
+WORDS = ['data', 'logs', 'backup', 'reports', 'src', 'notes', 'archive', 'photos', 'build', 'release']
+QUERIES = ['zip', 'tar release_4', 'grep -r TODO', 'backup_123', 'l', 'cd ..', 'nothing-like-this']
+
+
+def _make_line(rng: random.Random) -> str:
+    command = rng.choice(COMMANDS)
+    args = [f"{rng.choice(WORDS)}_{rng.randrange(5000)}" for _ in range(rng.randrange(1, 4))]
+    if command == 'grep':
+        args = ['-r', rng.choice(['TODO', 'FIXME', 'error']), *args]
+    return command_line(command, args)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    rng = random.Random(42)
+    lines = [_make_line(rng) for _ in range(count)]
+    index = HistorySearchIndex()
+    started = time.perf_counter()
+    for line in lines:
+        index.add(line)
+    print(f"History entries: {count} ({len(index)} distinct), index built in "
+          f"{time.perf_counter() - started:.2f} s")
+
+    worst = 0.0
+    for query in QUERIES:
+        # Каждое нажатие клавиши - новый запрос с первым (самым новым) совпадением
+        for length in range(1, len(query) + 1):
+            started = time.perf_counter()
+            next(index.matches(query[:length]), None)
+            elapsed = time.perf_counter() - started
+            worst = max(worst, elapsed)
+        print(f"  {query!r:22} last keystroke: {elapsed * 1000:7.3f} ms")
+    print(f"  worst keystroke: {worst * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
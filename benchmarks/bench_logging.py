@@ -0,0 +1,54 @@
+"""
+Бенчмарк логирования: время вызова logger.debug в потоке команды с синхронным RotatingFileHandler
+(как было в LOGGING_CONFIG) и с QueueRotatingFileHandler, который только кладет запись в очередь.
+Для очереди отдельно показано время до полной дозаписи файла (закрытие обработчика).
+
+Запуск: python benchmarks/bench_logging.py [количество записей]
+"""
+import os
+import sys
+import time
+import logging
+import logging.handlers
+import tempfile
+
+# Пакет импортируется как Lab_2_Consoleapp_Python, поэтому в путь добавляется каталог над репозиторием
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PACKAGE_PARENT)
+
+from Lab_2_Consoleapp_Python.src.source.log_queue import QueueRotatingFileHandler  # noqa: E402
+
+FORMAT = logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+
+
+def _run(handler: logging.Handler, records: int) -> tuple[float, float]:
+    handler.setFormatter(FORMAT)
+    logger = logging.getLogger(f"bench.{type(handler).__name__}")
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+
+    started = time.perf_counter()
+    for i in range(records):
+        logger.debug("Writing line: %r", f"line {i} of the file\n")
+    emitted = time.perf_counter()
+    handler.close()
+    return (emitted - started) * 1e6 / records, (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as log_dir:
+        sync_call, sync_total = _run(logging.handlers.RotatingFileHandler(
+            os.path.join(log_dir, 'sync.log'), maxBytes=5 * 1024 * 1024, backupCount=5), records)
+        queue_call, queue_total = _run(QueueRotatingFileHandler(
+            os.path.join(log_dir, 'queue.log'), maxBytes=5 * 1024 * 1024, backupCount=5), records)
+
+    print(f"{records} debug records:")
+    print(f"  RotatingFileHandler       {sync_call:6.2f} us per call, {sync_total:8.1f} ms total")
+    print(f"  QueueRotatingFileHandler  {queue_call:6.2f} us per call, {queue_total:8.1f} ms until written"
+          f"  ({sync_call / queue_call:.1f}x less time in the command)")
+
+
+if __name__ == "__main__":
+    main()
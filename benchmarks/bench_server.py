@@ -0,0 +1,107 @@
+"""
+Бенчмарк режима serve: задержка одной операции при запуске нового интерпретатора на каждую команду
+(main.py -c, как в cron) против запроса к "теплой" оболочке через client.py и через client.request
+из уже запущенного процесса. История (с уже накопленными записями) и корзина создаются во временном каталоге.
+
+Запуск: python benchmarks/bench_server.py [количество операций] [записей в истории]
+"""
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+# Пакет импортируется как Lab_2_Consoleapp_Python, поэтому в путь добавляется каталог над репозиторием
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PACKAGE_PARENT)
+
+from Lab_2_Consoleapp_Python.src.storage.journal import HistoryJournal  # noqa: E402
+from Lab_2_Consoleapp_Python.src.client import request  # noqa: E402
+
+# Оболочка с историей и корзиной в data_dir: mode - 'cold' (одна команда и выход) или 'serve'
+CHILD = """
+import sys
+from Lab_2_Consoleapp_Python.src.ruletka_shell import RuletkaShell
+mode, data_dir = sys.argv[1], sys.argv[2]
+shell = RuletkaShell()
+shell.history_file = data_dir + '/.history.jsonl'
+shell.legacy_history_file = data_dir + '/.history.json'
+shell.history_index_file = data_dir + '/.history.db'
+shell.undo_stack_file = data_dir + '/.history.undo.json'
+shell.trash_dir = data_dir + '/.trash'
+shell.trash_manifest_file = data_dir + '/.trash.db'
+if mode == 'cold':
+    shell._opers_init(interactive=False)
+    status = shell.run_script(sys.argv[3])
+    shell.close()
+    sys.exit(status)
+from Lab_2_Consoleapp_Python.src.server import ShellServer
+shell._opers_init(interactive=False, long_running=True)
+server = ShellServer(shell, data_dir + '/shell.sock')
+print('ready', flush=True)
+try:
+    server.serve_forever(poll_interval=0.05)
+finally:
+    server.server_close()
+    shell.close()
+"""
+
+
+def _fill_history(data_dir: str, entries: int) -> None:
+    journal = HistoryJournal(os.path.join(data_dir, '.history.jsonl'))
+    now = time.time() - entries
+    journal.append_many([{'ts': now + i, 'command': 'ls', 'args': [f'dir_{i % 1000}'], 'success': True,
+                          'cwd': data_dir} for i in range(entries)])
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [PACKAGE_PARENT, env.get('PYTHONPATH')]))
+    return env
+
+
+def _per_operation(run, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        run()
+    return (time.perf_counter() - started) / count * 1000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    entries = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    command = "ls"
+    env = _env()
+    with tempfile.TemporaryDirectory() as work_dir, tempfile.TemporaryDirectory() as data_dir:
+        for i in range(20):
+            open(os.path.join(work_dir, f"file_{i}.txt"), 'w').close()
+        _fill_history(data_dir, entries)
+
+        cold = _per_operation(lambda: subprocess.run(
+            [sys.executable, '-c', CHILD, 'cold', data_dir, command], env=env, cwd=work_dir,
+            capture_output=True, check=True), count)
+
+        server = subprocess.Popen([sys.executable, '-c', CHILD, 'serve', data_dir], env=env, cwd=data_dir,
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        assert server.stdout is not None
+        try:
+            server.stdout.readline()
+            socket_path = os.path.join(data_dir, 'shell.sock')
+            client = _per_operation(lambda: subprocess.run(
+                [sys.executable, '-m', 'Lab_2_Consoleapp_Python.src.client', '-s', socket_path, command],
+                env=env, cwd=work_dir, capture_output=True, check=True), count)
+            with open(os.devnull, 'wb') as devnull:
+                in_process = _per_operation(
+                    lambda: request(command, socket_path, cwd=work_dir, output=devnull), count * 10)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"'{command}' with {entries} history entries, ms per operation:")
+    print(f"  new interpreter (main.py -c)  {cold:8.2f}")
+    print(f"  client.py -> serve            {client:8.2f}  ({cold / client:.1f}x faster)")
+    print(f"  client.request() -> serve     {in_process:8.2f}  ({cold / in_process:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
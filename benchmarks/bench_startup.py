@@ -0,0 +1,97 @@
+"""
+Бенчмарк запуска оболочки: время до первого приглашения (запуск интерпретатора, импорт
+оболочки и ее инициализация) и самые дорогие импорты по данным python -X importtime.
+История, корзина и опись корзин создаются во временном каталоге.
+
+Запуск: python benchmarks/bench_startup.py [количество запусков]
+"""
+import os
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+
+# Пакет импортируется как Lab_2_Consoleapp_Python, поэтому в путь добавляется каталог над репозиторием
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Модули, которые не должны загружаться до первого приглашения
+HEAVY_MODULES = ['argparse', 'shutil', 'tarfile', 'zipfile', 'bz2', 'lzma', 'sqlite3', 'glob']
+
+# Запускается в отдельном интерпретаторе: инициализирует оболочку и сообщает о готовности
+# к первому приглашению (вместе со списком уже загруженных тяжелых модулей)
+CHILD = """
+import sys
+from Lab_2_Consoleapp_Python.src.ruletka_shell import RuletkaShell
+data_dir = sys.argv[1]
+shell = RuletkaShell()
+shell.history_file = data_dir + '/.history.jsonl'
+shell.legacy_history_file = data_dir + '/.history.json'
+shell.history_index_file = data_dir + '/.history.db'
+shell.undo_stack_file = data_dir + '/.history.undo.json'
+shell.trash_dir = data_dir + '/.trash'
+shell.trash_manifest_file = data_dir + '/.trash.db'
+shell._opers_init()
+shell.get_prompt()
+print('heavy:' + ','.join(name for name in {heavy!r} if name in sys.modules))
+shell._close_history()
+shell._close_trash()
+""".format(heavy=HEAVY_MODULES)
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [PACKAGE_PARENT, env.get('PYTHONPATH')]))
+    return env
+
+
+def time_to_prompt(data_dir: str) -> tuple[float, str]:
+    """
+    :return: время от запуска интерпретатора до готовности к первому приглашению (с) и
+    загруженные к этому моменту тяжелые модули
+    """
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD, data_dir], env=_env(), cwd=data_dir,
+                            capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - started
+    heavy = [line for line in result.stdout.splitlines() if line.startswith('heavy:')][-1]
+    return elapsed, heavy[len('heavy:'):]
+
+
+def import_times(data_dir: str, top: int = 10) -> list[tuple[int, str]]:
+    """
+    :return: самые дорогие импорты оболочки: (суммарное время в мкс, модуль)
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                             'import Lab_2_Consoleapp_Python.src.ruletka_shell'],
+                            env=_env(), cwd=data_dir, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Первый запуск создает журнал и базы, он в замер не входит
+        time_to_prompt(data_dir)
+        timings = []
+        for _ in range(runs):
+            elapsed, heavy = time_to_prompt(data_dir)
+            timings.append(elapsed)
+        print(f"Time to first prompt over {runs} runs: median {statistics.median(timings) * 1000:.1f} ms, "
+              f"min {min(timings) * 1000:.1f} ms")
+        print(f"Heavy modules loaded before the prompt: {heavy or 'none'}")
+
+        print("Slowest imports (cumulative):")
+        for cumulative, name in import_times(data_dir):
+            print(f"  {cumulative / 1000:8.2f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from Lab_2_Consoleapp_Python.src.main import main
+
+# python -m Lab_2_Consoleapp_Python.src [-e] [-c commands | script.rsh]
+sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Легкий клиент для оболочки, запущенной в режиме serve (main.py --serve): отправляет строку команд
+на Unix-сокет и выводит ответ по мере получения. Модуль не импортирует оболочку, логирование и
+конфигурацию, поэтому запуск клиента стоит столько же, сколько запуск интерпретатора.
+
+Протокол: обмен кадрами - 1 байт типа, 4 байта длины (big-endian) и данные. Клиент отправляет
+кадр REQUEST (каталог, флаг -e и команды через \0), сервер отвечает кадрами OUTPUT (вывод в UTF-8)
+и одним кадром EXIT (код завершения).
+"""
+import os
+import sys
+import shlex
+import socket
+import struct
+
+USAGE = """usage: client.py [-s socket] [-e] commands
+
+Runs commands in a warm shell started with 'main.py --serve' and exits with their status.
+  -s socket  server socket (default: $RULETKA_SOCKET or a socket in a private per-user directory)
+  -e         stop at the first failed command
+A single argument is a command string as in 'main.py -c'; several arguments form one command
+and keep their quoting (client.py grep "two words" notes.txt)."""
+
+FRAME_HEADER = struct.Struct('>cI')
+REQUEST = b'r'
+OUTPUT = b'o'
+EXIT = b'x'
+
+
+def socket_directory() -> str:
+    """
+    :return: личный каталог (0700) для сокета пользователя в $XDG_RUNTIME_DIR (или /tmp);
+    его создает и проверяет сервер
+    """
+    directory = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(directory, f"ruletka-shell-{os.getuid()}")
+
+
+def default_socket_path() -> str:
+    """
+    :return: путь до сокета сервера: $RULETKA_SOCKET или сокет в socket_directory()
+    """
+    path = os.environ.get('RULETKA_SOCKET')
+    if path:
+        return path
+    return os.path.join(socket_directory(), 'shell.sock')
+
+
+def check_server_owner(sock: socket.socket, socket_path: str) -> None:
+    """
+    Проверяет, что сервер на сокете запущен тем же пользователем: иначе команды и каталог клиента
+    получил бы чужой процесс (например, занявший путь сокета в общем /tmp).
+    :param sock: подключенный сокет
+    :param socket_path: путь до сокета
+    :raises OSError: сокет или процесс сервера принадлежит другому пользователю
+    """
+    if os.stat(socket_path).st_uid != os.getuid():
+        raise OSError(f"{socket_path} is owned by another user")
+    if hasattr(socket, 'SO_PEERCRED'):
+        _, uid, _ = struct.unpack('3i', sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i')))
+        if uid != os.getuid():
+            raise OSError(f"the server on {socket_path} runs as another user")
+
+
+def encode_request(command: str, cwd: str, stop_on_error: bool) -> bytes:
+    """
+    :return: данные кадра REQUEST (без json, чтобы не замедлять запуск клиента)
+    """
+    return "\0".join([cwd, '1' if stop_on_error else '0', command]).encode('utf-8', errors='surrogateescape')
+
+
+def command_string(args: list[str]) -> str:
+    """
+    :param args: команды из командной строки клиента
+    :return: строка команд для сервера: единственный аргумент передается как есть (как main.py -c),
+    несколько аргументов - одна команда, аргументы которой заключаются в кавычки при необходимости
+    """
+    return args[0] if len(args) == 1 else shlex.join(args)
+
+
+def decode_request(data: bytes) -> tuple[str, str, bool]:
+    """
+    :param data: данные кадра REQUEST
+    :return: (команды, каталог, stop_on_error)
+    :raises ValueError: некорректный запрос
+    """
+    cwd, stop_on_error, command = data.decode('utf-8', errors='surrogateescape').split("\0", 2)
+    return command, cwd, stop_on_error == '1'
+
+
+def recv_frame(sock: socket.socket, max_size: int | None = None) -> tuple[bytes, bytes]:
+    """
+    :param sock: сокет
+    :param max_size: наибольший допустимый размер данных кадра (None - без ограничения)
+    :return: (тип кадра, данные)
+    :raises ConnectionError: соединение закрыто посреди кадра
+    :raises ValueError: кадр больше max_size
+    """
+    kind, size = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))
+    if max_size is not None and size > max_size:
+        raise ValueError(f"frame of {size} bytes is too large")
+    return kind, _recv_exact(sock, size)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """
+    Вспомогательная функция. Читает из сокета ровно size байт.
+    :param sock: сокет
+    :param size: сколько байт прочитать
+    :return: прочитанные данные
+    :raises ConnectionError: сервер закрыл соединение раньше
+    """
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 16))
+        if not chunk:
+            raise ConnectionError("server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def request(command: str, socket_path: str | None = None, cwd: str | None = None,
+            stop_on_error: bool = False, output=None) -> int:
+    """
+    Функция для выполнения строки команд на сервере.
+    :param command: команды (как в main.py -c: разделяются ';' и переводами строк)
+    :param socket_path: путь до сокета сервера (по умолчанию default_socket_path())
+    :param cwd: каталог, в котором выполнять команды (по умолчанию текущий каталог клиента)
+    :param stop_on_error: прекратить выполнение после первой неуспешной команды
+    :param output: двоичный поток для вывода (по умолчанию sys.stdout.buffer)
+    :return: код завершения команд
+    :raises OSError: сервер недоступен или запущен другим пользователем
+    """
+    output = output if output is not None else sys.stdout.buffer
+    message = encode_request(command, cwd or os.getcwd(), stop_on_error)
+    socket_path = socket_path or default_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        check_server_owner(sock, socket_path)
+        sock.sendall(FRAME_HEADER.pack(REQUEST, len(message)) + message)
+        while True:
+            kind, data = recv_frame(sock)
+            if kind == EXIT:
+                output.flush()
+                return int(data)
+            output.write(data)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Стартовая точка клиента.
+    :param argv: аргументы командной строки (по умолчанию sys.argv[1:])
+    :return: код завершения команд (2 - ошибка аргументов, 3 - сервер недоступен)
+    """
+    args = list(sys.argv[1:] if argv is None else argv)
+    socket_path = None
+    stop_on_error = False
+    while args and args[0].startswith('-'):
+        arg = args.pop(0)
+        if arg in ('-h', '--help'):
+            print(USAGE)
+            return 0
+        elif arg == '-e':
+            stop_on_error = True
+        elif arg == '-s' and args:
+            socket_path = args.pop(0)
+        else:
+            print(f"client.py: unexpected argument '{arg}'\n{USAGE}", file=sys.stderr)
+            return 2
+    if not args:
+        print(USAGE, file=sys.stderr)
+        return 2
+
+    try:
+        return request(command_string(args), socket_path, stop_on_error=stop_on_error)
+    except OSError as e:
+        print(f"client.py: cannot reach the shell server at {socket_path or default_socket_path()}: {e}\n"
+              f"Start it with 'main.py --serve'.", file=sys.stderr)
+        return 3
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,89 @@
-from .cd import execute as cd
-from .ls import execute as ls
-from .cat import execute as cat
-from .cp import execute as cp
-from .mv import execute as mv
-from .rm import execute as rm
-from .zip import execute as zip
-from .unzip import execute as unzip
-from .tar import execute as tar
-from .untar import execute as untar
-from .grep import execute as grep
-from .history import execute as history
-from .undo import execute as undo
-from .help import execute as help
-
-__all__ = ['cd', 'ls', 'cat', 'cp', 'mv', 'rm', 'zip', 'unzip', 'tar', 'untar', 'grep', 'history', 'undo', 'help']
\ No newline at end of file
+import importlib
+from types import ModuleType
+from collections.abc import Callable
+
+# Имя команды -> модуль пакета commands с функцией execute. Модули импортируются
+# при первом вызове команды, чтобы tarfile, zipfile, shutil, argparse и т.п. не
+# загружались до первого приглашения, если пользователь ими не пользуется
+COMMAND_MODULES = {
+    'cd': 'cd',
+    'ls': 'ls',
+    'cat': 'cat',
+    'cp': 'cp',
+    'mv': 'mv',
+    'rm': 'rm',
+    'zip': 'zip',
+    'unzip': 'unzip',
+    'tar': 'tar',
+    'untar': 'untar',
+    'grep': 'grep',
+    'history': 'history',
+    'undo': 'undo',
+    'trash': 'trash',
+    'jobs': 'jobs',
+    'wait': 'wait',
+    'fg': 'fg',
+    'stats': 'stats',
+    'profile': 'profile',
+    'help': 'help',
+}
+
+# Уже загруженные функции execute по именам команд
+_loaded: dict[str, Callable] = {}
+# Уже загруженные модули команд по именам команд
+_modules: dict[str, ModuleType] = {}
+
+
+def get_command(name: str):
+    """
+    Функция для получения команды по имени. Модуль команды импортируется при первом обращении.
+    :param name: имя команды
+    :return: функция execute(shell, args) команды
+    """
+    execute = _loaded.get(name)
+    if execute is None:
+        if name not in COMMAND_MODULES:
+            raise KeyError(name)
+        module = _modules[name] = importlib.import_module(f"{__name__}.{COMMAND_MODULES[name]}")
+        execute = _loaded[name] = module.execute
+        # Импорт подмодуля делает его атрибутом пакета: имя команды снова указывает на execute
+        globals()[name] = execute
+    return execute
+
+
+def get_stream(name: str):
+    """
+    Функция для получения потокового вывода команды (для конвейеров cmd | cmd).
+    :param name: имя команды
+    :return: функция stream(shell, args, stdin, color) команды или None, если команда не выводит поток строк
+    """
+    get_command(name)
+    return getattr(_modules[name], 'stream', None)
+
+
+def get_results(name: str):
+    """
+    Функция для получения результатов команды в виде объектов (для RuletkaShell.call).
+    :param name: имя команды
+    :return: функция results(shell, args, stdin) команды или None, если команда не возвращает результатов
+    """
+    get_command(name)
+    return getattr(_modules[name], 'results', None)
+
+
+def loaded_commands() -> list[str]:
+    """
+    :return: имена команд, модули которых уже импортированы
+    """
+    return list(_loaded)
+
+
+def __getattr__(name: str):
+    # from commands import cd по-прежнему работает, но модуль импортируется только сейчас
+    if name in COMMAND_MODULES:
+        return get_command(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Имен команд здесь нет: from commands import * импортировал бы модули всех команд сразу
+__all__ = ['get_command', 'get_stream', 'get_results', 'loaded_commands', 'COMMAND_MODULES']
@@ -1,5 +1,6 @@
 import os
 import sys
+from Lab_2_Consoleapp_Python.src.source.line_logging import line_tracer
 
 def execute(self, args: list[str]) -> None:
     """
@@ -7,6 +8,55 @@ def execute(self, args: list[str]) -> None:
     путь до файла, который нужно прочитать)
     :return: Данная функция ничего не возвращает
     """
+    chunks = _open(self, args)
+    if chunks is None:
+        return None
+
+    trace = line_tracer(self.logger.getChild('cat'), 'cat')
+    try:
+        if trace is None:
+            sys.stdout.writelines(chunks)
+        else:
+            for line_number, line in enumerate(chunks, 1):
+                trace(line_number, line)
+                sys.stdout.write(line)
+    except Exception as e:
+        self.handle_error(f"cat: {args[0]}: unexpected error: {e}")
+
+
+def stream(self, args: list[str], stdin=None, color: bool = False):
+    """
+    Функция для потокового вывода команды (в конвейере cat file | grep pattern).
+    Ошибки в аргументах сообщаются сразу, сами строки читаются по мере запроса.
+    :param args: Аргументы (путь до файла; без него передаются строки stdin)
+    :param stdin: строки вывода предыдущей команды конвейера (или None)
+    :param color: не используется (вывод без подсветки)
+    :return: итератор строк файла (без символов перевода строки) или None в случае ошибки
+    """
+    if not args and stdin is not None:
+        return iter(stdin)
+    chunks = _open(self, args)
+    if chunks is None:
+        return None
+    return (line for chunk in chunks for line in chunk.splitlines())
+
+
+def results(self, args: list[str], stdin=None):
+    """
+    Функция для вызова команды из Python (RuletkaShell.call('cat', ...)).
+    :param args: Аргументы те же, что у stream
+    :param stdin: строки, передаваемые дальше, если путь не задан
+    :return: итератор строк файла (без символов перевода строки) или None в случае ошибки
+    """
+    return stream(self, args, stdin)
+
+
+def _open(self, args: list[str]):
+    """
+    Вспомогательная функция. Проверяет аргументы и открывает файл для чтения.
+    :param args: Аргументы (путь до файла)
+    :return: итератор фрагментов файла в исходном виде (с символами перевода строки) или None в случае ошибки
+    """
     if not args:
         self.handle_error(f"cat: no file operands were given")
         return None
@@ -26,20 +76,16 @@ def execute(self, args: list[str]) -> None:
             self.handle_error(f"cat: {filename}: can't read content - given file is a directory")
             return None
 
-        # Чтение файла и вывод его содержимого в кодировке UTF-8.
-        # В случае ошибки - попытка чтения и вывода в кодировке latin-1.
+        # Чтение файла в кодировке UTF-8.
+        # В случае ошибки - попытка чтения в кодировке latin-1.
         if os.path.isfile(file_path):
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                    for line in file:
-                        self.logger.debug(f"DEBUG: Writing line: {repr(line)}")
-                        sys.stdout.write(line)
+                return _read_lines(open(file_path, 'r', encoding='utf-8', errors='ignore'))
 
             except UnicodeDecodeError:
                 try:
                     with open(file_path, 'r', encoding='latin-1') as file:
-                        content = file.read()
-                        sys.stdout.write(content)
+                        return iter([file.read()])
 
                 except (UnicodeDecodeError, LookupError):
                     self.handle_error(f"cat: {filename}: Cannot read file (binary or unsupported encoding)")
@@ -48,4 +94,16 @@ def execute(self, args: list[str]) -> None:
                 self.handle_error(f"cat: {filename}: Permission denied")
 
     except Exception as e:
-        self.handle_error(f"cat: {filename}: unexpected error: {e}")
\ No newline at end of file
+        self.handle_error(f"cat: {filename}: unexpected error: {e}")
+    return None
+
+
+def _read_lines(file):
+    """
+    Вспомогательная функция. Построчно читает открытый файл и закрывает его по окончании
+    (или когда конвейер перестает запрашивать строки).
+    :param file: открытый текстовый файл
+    :return: генератор строк файла
+    """
+    with file:
+        yield from file
@@ -8,7 +8,7 @@ def execute(self, args: list[str]) -> dict | None:
     source - что копировать; destination - куда копировать.
     :return: Данная функция ничего не возвращает
     """
-    parsed_args = parse_cp_args(args)
+    parsed_args = parse_cp_args(args, self)
     if parsed_args is None:
         return None
 
@@ -36,7 +36,7 @@ def execute(self, args: list[str]) -> dict | None:
 
             # Копирование директории (ниже - файла)
             shutil.copytree(source_path, dest_dir, dirs_exist_ok=True)
-            self.logger.debug(f"Copied directory '{source_path}' to '{dest_dir}'")
+            self.logger.getChild('cp').debug("Copied directory '%s' to '%s'", source_path, dest_dir)
 
         else:
             if os.path.isdir(dest_path):
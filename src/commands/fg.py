@@ -0,0 +1,33 @@
+from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_fg_args
+from Lab_2_Consoleapp_Python.src.commands.wait import report_job
+
+
+def execute(self, args: list[str]) -> None:
+    """
+    Функция для ожидания фонового задания на переднем плане. Задание выполняется в потоке,
+    поэтому Ctrl-C прекращает ожидание, а не само задание.
+    :param args: Аргументы: номер задания (1 или %1); без него - последнее запущенное задание
+    :return: Данная функция ничего не возвращает
+    """
+    parsed_args = parse_fg_args(args, self)
+    if parsed_args is None:
+        return None
+
+    if parsed_args.job is None:
+        job = self.jobs.latest()
+        if job is None:
+            self.handle_error("fg: no current job")
+            return None
+    else:
+        job = self.jobs.find(parsed_args.job)
+        if job is None:
+            self.handle_error(f"fg: {parsed_args.job}: no such job")
+            return None
+
+    print(job.command_line)
+    try:
+        job.wait()
+    except KeyboardInterrupt:
+        print(f"\nfg: job [{job.id}] keeps running in the background")
+        return None
+    report_job(self, job)
@@ -0,0 +1,14 @@
+def format_size(size: int) -> str:
+    """
+    Функция для вывода размеров (trash, stats, profile).
+    :param size: размер в байтах
+    :return: размер в удобном для чтения виде (512B, 4.0K, 1.5G)
+    """
+    if size < 1024:
+        return f"{size}B"
+    value = size / 1024
+    for unit in ('K', 'M', 'G'):
+        if value < 1024:
+            return f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}T"
@@ -1,6 +1,8 @@
 import os
 import re
+from collections.abc import Iterator
 from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_grep_args
+from Lab_2_Consoleapp_Python.src.commands.results import Match
 
 def execute(self, args: list[str]) -> None:
     """
@@ -8,14 +10,93 @@ def execute(self, args: list[str]) -> None:
     что нужно искать; path - где искать.
     :return: Данная функция ничего не возвращает
     """
-    parsed_args = parse_grep_args(args)
+    parsed_args = parse_grep_args(args, self)
     if parsed_args is None:
         return None
 
-    search_path = self.resolve_user_path(parsed_args.path)
+    matches = _search(self, parsed_args)
+    if matches is None:
+        return None
+
+    try:
+        # Выводим результат, если что-то нашли, или же сообщение,
+        # что ничего не найдено/ошибку
+        logger = self.logger.getChild('grep')
+        count = 0
+        for line in _format_matches(matches, color=True):
+            print(line)
+            count += 1
+        if count:
+            logger.debug("Found %d matches for pattern '%s' in '%s'", count, parsed_args.pattern, parsed_args.path)
+        else:
+            print(f"No matches found for pattern '{parsed_args.pattern}' in '{parsed_args.path}'")
+            logger.debug("No matches found for pattern '%s' in '%s'", parsed_args.pattern, parsed_args.path)
+
+    except Exception as e:
+        self.handle_error(f"grep: unexpected error: {e}")
+
+
+def stream(self, args: list[str], stdin=None, color: bool = False):
+    """
+    Функция для потокового вывода команды (в конвейере cat file | grep pattern).
+    :param args: Аргументы те же, что у execute; без path поиск выполняется в строках stdin
+    :param stdin: строки вывода предыдущей команды конвейера (или None)
+    :param color: подсвечивать совпадения (только для вывода в консоль: следующая команда конвейера
+    получает строки без escape-последовательностей)
+    :return: итератор найденных строк или None в случае ошибки
+    """
+    parsed_args = parse_grep_args(args, self)
+    if parsed_args is None:
+        return None
+    matches = _search(self, parsed_args, stdin)
+    return None if matches is None else _format_matches(matches, color)
+
+
+def results(self, args: list[str], stdin=None):
+    """
+    Функция для вызова команды из Python (RuletkaShell.call('grep', ...)): найденные строки без подсветки.
+    :param args: Аргументы те же, что у execute; без path поиск выполняется в строках stdin
+    :param stdin: строки, в которых искать (или None)
+    :return: итератор Match (файлы читаются по мере запроса) или None в случае ошибки
+    """
+    parsed_args = parse_grep_args(args, self)
+    if parsed_args is None:
+        return None
+    return _search(self, parsed_args, stdin)
+
+
+def _format_matches(matches, color: bool = False):
+    """
+    Вспомогательная функция. Форматирует найденные строки для вывода: путь:номер:строка
+    (для строк предыдущей команды конвейера - только строка).
+    :param matches: итератор Match
+    :param color: подсвечивать совпадения
+    :return: генератор строк вывода
+    """
+    for match in matches:
+        line = _highlight_match(match.line, match.pattern) if color else match.line
+        if match.path is None:
+            yield line
+        else:
+            yield f"{match.path}:{match.line_number}:{line}"
+
+
+def _search(self, parsed_args, stdin=None):
+    """
+    Вспомогательная функция. Проверяет аргументы и готовит поиск; сами файлы читаются
+    по мере запроса найденных строк.
+    :param parsed_args: разобранные аргументы команды
+    :param stdin: строки, в которых искать, если путь не задан
+    :return: итератор Match или None в случае ошибки
+    """
+    if parsed_args.path is None and stdin is None:
+        self.handle_error("grep: no file or directory to search in")
+        return None
+
+    search_path = self.resolve_user_path(parsed_args.path) if parsed_args.path is not None else None
 
     # Ошибка, если путь не существует
-    if not os.path.exists(search_path):
+    if search_path is not None and not os.path.exists(search_path):
         self.handle_error(f"grep: cannot access '{parsed_args.path}': No such file or directory")
         return None
 
@@ -24,92 +105,81 @@ def execute(self, args: list[str]) -> None:
         # Игнорирование регистра, если есть флаг -i
         flags = re.IGNORECASE if parsed_args.i else 0
         pattern = re.compile(parsed_args.pattern, flags)
+    except re.error as e:
+        self.handle_error(f"grep: invalid pattern '{parsed_args.pattern}': {e}")
+        return None
 
-        results = []
+    # Поиск в строках предыдущей команды конвейера
+    if search_path is None:
+        return _search_in_lines(stdin, pattern)
 
-        # Поиск в директории. Рекурсивно во всех директориях внутри, если есть флаг -r
-        if os.path.isfile(search_path):
-            results = _search_in_file(search_path, pattern, parsed_args.path)
-        elif os.path.isdir(search_path):
-            if parsed_args.r:
-                results = _search_in_directory_recursive(search_path, pattern, parsed_args.path)
-            else:
-                results = _search_in_directory(search_path, pattern, parsed_args.path)
+    # Поиск в директории. Рекурсивно во всех директориях внутри, если есть флаг -r
+    if os.path.isfile(search_path):
+        return _search_in_file(search_path, pattern, parsed_args.path)
+    if os.path.isdir(search_path):
+        if parsed_args.r:
+            return _search_in_directory_recursive(search_path, pattern, parsed_args.path)
+        return _search_in_directory(search_path, pattern, parsed_args.path)
+    return iter(())
 
-        # Выводим результат, если что-то нашли, или же сообщение,
-        # что ничего не найдено/ошибку
-        if results:
-            for result in results:
-                print(result)
-            self.logger.debug(
-                f"Found {len(results)} matches for pattern '{parsed_args.pattern}' in '{parsed_args.path}'")
-        else:
-            print(f"No matches found for pattern '{parsed_args.pattern}' in '{parsed_args.path}'")
-            self.logger.debug(f"No matches found for pattern '{parsed_args.pattern}' in '{parsed_args.path}'")
 
-    except re.error as e:
-        self.handle_error(f"grep: invalid pattern '{parsed_args.pattern}': {e}")
-    except Exception as e:
-        self.handle_error(f"grep: unexpected error: {e}")
+def _search_in_lines(lines, pattern: re.Pattern):
+    """
+    Вспомогательная функция для поиска в строках вывода предыдущей команды.
+    Аргументы: lines - итератор строк; pattern - что искать.
+    Возвращаемое значение: генератор Match (без пути).
+    """
+    for line_num, line in enumerate(lines, 1):
+        if pattern.search(line):
+            yield Match(None, line_num, line, pattern)
 
 
-def _search_in_file(file_path: str, pattern: re.Pattern, display_path: str) -> list:
+def _search_in_file(file_path: str, pattern: re.Pattern, display_path: str):
     """
     Вспомогательная функция для поиска в файле.
     Аргументы: file_path - абсолютный путь до файла; pattern - что искать,
     display_path - путь для вывода пользователю.
-    Возвращаемое значение: results - найденные результаты.
+    Возвращаемое значение: генератор Match.
     """
-    results = []
     try:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
             for line_num, line in enumerate(file, 1):
                 if pattern.search(line):
-                    clean_line = line.rstrip('\n\r')
-                    highlighted_line = _highlight_match(clean_line, pattern)
-                    results.append(f"{display_path}:{line_num}:{highlighted_line}")
+                    yield Match(display_path, line_num, line.rstrip('\n\r'), pattern)
     except (PermissionError, UnicodeDecodeError, OSError):
         pass
-    return results
 
 
-def _search_in_directory(dir_path: str, pattern: re.Pattern, display_path: str) -> list:
+def _search_in_directory(dir_path: str, pattern: re.Pattern, display_path: str):
     """
     Вспомогательная функция для поиска в директории.
     Аргументы: dir_path - абсолютный путь до директории, pattern - что искать;
     display_path - путь для вывода пользователю.
     """
-    results = []
     try:
-        for item in os.listdir(dir_path):
-            item_path = os.path.join(dir_path, item)
-            if os.path.isfile(item_path):
-                file_results = _search_in_file(item_path, pattern, os.path.join(display_path, item))
-                results.extend(file_results)
+        items = os.listdir(dir_path)
     except (PermissionError, OSError):
-        pass
-    return results
+        return
+    for item in items:
+        item_path = os.path.join(dir_path, item)
+        if os.path.isfile(item_path):
+            yield from _search_in_file(item_path, pattern, os.path.join(display_path, item))
 
 
-def _search_in_directory_recursive(dir_path: str, pattern: re.Pattern, display_path: str) -> list:
+def _search_in_directory_recursive(dir_path: str, pattern: re.Pattern, display_path: str) -> Iterator[Match]:
     """
     Вспомогательная функция для рекурсивного поиска внутри директорий.
     Аргументы и возвращаемое значение те же, как в прошлых двух.
     """
-    results = []
-    try:
-        for root, dirs, files in os.walk(dir_path):
-            rel_root = os.path.relpath(root, os.path.dirname(dir_path)) if dir_path != root else os.path.basename(root)
-            display_root = os.path.join(display_path, rel_root) if rel_root != '.' else display_path
-
-            for file in files:
-                file_path = os.path.join(root, file)
-                display_file_path = os.path.join(display_root, file)
-                file_results = _search_in_file(file_path, pattern, display_file_path)
-                results.extend(file_results)
-    except (PermissionError, OSError):
-        pass
-    return results
+    # os.walk сам пропускает каталоги, которые не удалось прочитать
+    for root, dirs, files in os.walk(dir_path):
+        rel_root = os.path.relpath(root, os.path.dirname(dir_path)) if dir_path != root else os.path.basename(root)
+        display_root = os.path.join(display_path, rel_root) if rel_root != '.' else display_path
+
+        for file in files:
+            file_path = os.path.join(root, file)
+            display_file_path = os.path.join(display_root, file)
+            yield from _search_in_file(file_path, pattern, display_file_path)
 
 
 def _highlight_match(line: str, pattern: str) -> str:
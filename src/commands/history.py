@@ -1,14 +1,78 @@
+from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_history_args
+from Lab_2_Consoleapp_Python.src.commands.parsing.values import parse_since
+
+
 def execute(self, args: list) -> None:
     """
     Функция для вывода команды history для показа пользователю истории команд.
-    :param args: Аргументы (обрабатывает только первый в списке -
-    число последних команд для вывода)
+    :param args: Аргументы: n - число последних команд для вывода; --cmd, --since,
+    --path, --failed - фильтры, которые выполняются как запросы к индексу истории
     :return: Данная функция ничего не возвращает
     """
+    parsed_args = parse_history_args(args, self)
+    if parsed_args is None:
+        return None
+
+    entries = _select_entries(self, parsed_args)
+    if entries is None:
+        return None
+
+    count = 0
+    for line in _format_entries(entries):
+        print(line)
+        count += 1
+
+    filtered = _is_filtered(parsed_args)
+    if not count:
+        print("No matching commands in history" if filtered else "No command history")
+        return None
+
+    self.logger.getChild('history').debug("Displayed %d %shistory entries", count, 'filtered ' if filtered else '')
+    return None
+
+
+def stream(self, args: list, stdin=None, color: bool = False):
+    """
+    Функция для потокового вывода команды (в конвейере history | grep pattern).
+    :param args: Аргументы те же, что у execute
+    :param stdin: не используется (history не читает вывод предыдущей команды)
+    :param color: не используется (вывод без подсветки)
+    :return: итератор строк вывода или None в случае ошибки
+    """
+    parsed_args = parse_history_args(args, self)
+    if parsed_args is None:
+        return None
+    entries = _select_entries(self, parsed_args)
+    return None if entries is None else _format_entries(entries)
+
+
+def results(self, args: list, stdin=None):
+    """
+    Функция для вызова команды из Python (RuletkaShell.call('history', ...)): записи истории без форматирования.
+    :param args: Аргументы те же, что у execute
+    :param stdin: не используется
+    :return: итератор пар (порядковый номер, HistoryEntry) или None в случае ошибки
+    """
+    parsed_args = parse_history_args(args, self)
+    if parsed_args is None:
+        return None
+    return _select_entries(self, parsed_args)
+
+
+def _is_filtered(parsed_args) -> bool:
+    return bool(parsed_args.cmd or parsed_args.since or parsed_args.path or parsed_args.failed)
+
+
+def _select_entries(self, parsed_args):
+    """
+    Вспомогательная функция для выбора записей истории, которые нужно вывести.
+    :param parsed_args: разобранные аргументы команды
+    :return: пары (порядковый номер, запись истории) или None в случае ошибки
+    """
     n = None
-    if args:
+    if parsed_args.n is not None:
         try:
-            n = int(args[0])
+            n = int(parsed_args.n)
             if n <= 0:
                 self.handle_error("history: argument must be a positive number")
                 return None
@@ -16,6 +80,10 @@ def execute(self, args: list) -> None:
             self.handle_error("history: argument must be a number")
             return None
 
+    # Если заданы фильтры - запрос к индексу вместо прохода по всей истории в памяти
+    if _is_filtered(parsed_args):
+        return _query_filtered(self, parsed_args, n)
+
     # Если был введен номер, показать столько последних команд,
     # если нет - всю историю
     if n is not None:
@@ -25,17 +93,43 @@ def execute(self, args: list) -> None:
         history_to_show = self.command_history
         n = len(history_to_show)
 
-    if not history_to_show:
-        print("No command history")
+    start_index = len(self.command_history) - n + 1
+    return enumerate(history_to_show, start=start_index)
+
+
+def _query_filtered(self, parsed_args, n: int | None):
+    """
+    Вспомогательная функция для выборки истории, отфильтрованной через индекс.
+    :param parsed_args: разобранные аргументы команды
+    :param n: число последних подходящих команд (или None - все)
+    :return: пары (порядковый номер, запись истории) или None в случае ошибки
+    """
+    since = None
+    if parsed_args.since:
+        try:
+            since = parse_since(parsed_args.since)
+        except ValueError:
+            self.handle_error(f"history: invalid --since value '{parsed_args.since}' "
+                              f"(expected ISO date/time or 30m, 12h, 7d, 2w)")
+            return None
+
+    path = self.resolve_user_path(parsed_args.path) if parsed_args.path else None
+    try:
+        return self.query_history(command=parsed_args.cmd, since=since, path=path,
+                                  failed=parsed_args.failed, limit=n)
+    except Exception as e:
+        self.handle_error(f"history: cannot query history index: {e}")
         return None
 
-    # Форматирование вывода для более удобного чтения его пользователем.
-    # Эмодзи, чтобы пользователь знал, если команда выполнена успешно/неуспешно.
-    start_index = len(self.command_history) - n + 1
-    for i, entry in enumerate(history_to_show, start=start_index):
-        status = "✓" if entry['success'] else "✗"
-        command_str = f"{entry['command']} {' '.join(entry['args'])}" if entry['args'] else entry['command']
-        print(f"{i:4} {status} {entry['timestamp']} {command_str}")
 
-    self.logger.debug(f"Displayed {len(history_to_show)} history entries")
-    return None
\ No newline at end of file
+def _format_entries(entries):
+    """
+    Форматирование вывода для более удобного чтения его пользователем.
+    Эмодзи, чтобы пользователь знал, если команда выполнена успешно/неуспешно.
+    :param entries: пары (порядковый номер, запись истории)
+    :return: генератор строк вывода
+    """
+    for i, entry in entries:
+        status = "✓" if entry.success else "✗"
+        command_str = f"{entry.command} {' '.join(entry.args)}" if entry.args else entry.command
+        yield f"{i:4} {status} {entry.timestamp} {command_str}"
@@ -0,0 +1,59 @@
+from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_jobs_args
+
+
+def execute(self, args: list[str]) -> None:
+    """
+    Функция для вывода таблицы фоновых заданий (команд, запущенных с &).
+    :param args: Аргументы (команда не принимает аргументов)
+    :return: Данная функция ничего не возвращает
+    """
+    lines = stream(self, args)
+    if lines is None:
+        return None
+
+    printed = 0
+    for line in lines:
+        print(line)
+        printed += 1
+    if not printed:
+        print("No background jobs")
+
+
+def stream(self, args: list[str], stdin=None, color: bool = False):
+    """
+    Функция для потокового вывода команды (в конвейере jobs | grep Running).
+    :param args: Аргументы (команда не принимает аргументов)
+    :param stdin: не используется
+    :param color: не используется (вывод без подсветки)
+    :return: итератор строк таблицы заданий или None в случае ошибки
+    """
+    if parse_jobs_args(args, self) is None:
+        return None
+    return _describe_jobs(self, self.jobs.all())
+
+
+def results(self, args: list[str], stdin=None):
+    """
+    Функция для вызова команды из Python (RuletkaShell.call('jobs')). В отличие от вывода таблицы,
+    завершенные задания остаются в ней: вызывающий код сам решает, когда вызвать jobs.forget.
+    :param args: Аргументы (команда не принимает аргументов)
+    :param stdin: не используется
+    :return: список заданий (Job) в порядке запуска или None в случае ошибки
+    """
+    if parse_jobs_args(args, self) is None:
+        return None
+    return self.jobs.all()
+
+
+def _describe_jobs(self, jobs):
+    """
+    Вспомогательная функция. Завершенные задания показываются один раз и убираются из таблицы.
+    :param jobs: задания в порядке запуска
+    :return: генератор строк таблицы
+    """
+    for job in jobs:
+        # Состояние читается до вывода, чтобы задание, завершившееся между проверкой и выводом, не потерялось
+        running = job.running
+        yield job.describe()
+        if not running:
+            self.jobs.forget(job)
@@ -1,6 +1,7 @@
 import os
 import datetime
 from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_ls_args
+from Lab_2_Consoleapp_Python.src.commands.results import FileInfo
 
 def execute(self, args: list) -> None:
     """
@@ -8,10 +9,53 @@ def execute(self, args: list) -> None:
     о какой выводить информацию (если надо конкретную, а не текущую)
     :return: Данная функция ничего не возвращает
     """
-    parsed_args = parse_ls_args(args)
+    lines = stream(self, args, color=True)
+    if lines is None:
+        return None
+
+    for line in lines:
+        print(line)
+
+    return None
+
+def stream(self, args: list, stdin=None, color: bool = False):
+    """
+    Функция для потокового вывода команды (в конвейере ls | grep pattern).
+    :param args: Аргументы те же, что у execute
+    :param stdin: не используется (ls не читает вывод предыдущей команды)
+    :param color: выделять каталоги цветом (только для вывода в консоль, не для следующей команды конвейера)
+    :return: итератор строк вывода или None в случае ошибки
+    """
+    parsed_args = parse_ls_args(args, self)
+    if parsed_args is None:
+        return None
+
+    infos = _list(self, parsed_args)
+    if infos is None:
+        return None
+
+    if parsed_args.l:
+        return _ls_detailed(self, infos, color)
+    return _ls_simple(infos, color)
+
+def results(self, args: list, stdin=None):
+    """
+    Функция для вызова команды из Python (RuletkaShell.call('ls', ...)): содержимое каталога без форматирования.
+    :param args: Аргументы те же, что у execute (флаг -l не влияет на результат)
+    :param stdin: не используется
+    :return: список FileInfo (сначала каталоги, затем файлы, по имени) или None в случае ошибки
+    """
+    parsed_args = parse_ls_args(args, self)
     if parsed_args is None:
         return None
+    return _list(self, parsed_args)
 
+def _list(self, parsed_args):
+    """
+    Вспомогательная функция. Читает содержимое каталога из аргументов.
+    :param parsed_args: разобранные аргументы команды
+    :return: отсортированный список FileInfo или None в случае ошибки
+    """
     # Определение абсолютных/относительных путей для корректного выполнения команды
     if parsed_args.path:
         if os.path.isabs(parsed_args.path):
@@ -47,51 +91,46 @@ def execute(self, args: list) -> None:
             f"ls: cannot access '{parsed_args.path if parsed_args.path else target_dir}': No such file or directory")
         return None
 
-    items.sort(key=lambda x: (not os.path.isdir(os.path.join(target_dir, x)), x.lower()))
-
-    if parsed_args.l:
-        _ls_detailed(items, target_dir)
-    else:
-        _ls_simple(items, target_dir)
-
-    return None
+    # Тип каждого объекта проверяется один раз: для сортировки и для вывода
+    infos = []
+    for item in items:
+        full_path = os.path.join(target_dir, item)
+        infos.append(FileInfo(item, full_path, os.path.isdir(full_path)))
+    infos.sort(key=lambda info: (not info.is_dir, info.name.lower()))
+    return infos
 
-def _ls_simple(items, target_dir):
+def _ls_simple(infos, color: bool = False):
     """
     Вспомогательная функция для простого вывода.
-    Аргументы: items - файлы внутри; target_dir - директория, в которой лежат эти файлы.
-    Возвращаемое значение: None (информация выводится через print)
+    Аргументы: infos - объекты каталога (FileInfo); color - выделять каталоги цветом.
+    Возвращаемое значение: генератор строк вывода
     """
-    for item in items:
-        if os.path.isdir(os.path.join(target_dir, item)):
-            print(f"\033[94m{item}\033[0m")
+    for info in infos:
+        if info.is_dir and color:
+            yield f"\033[94m{info.name}\033[0m"
         else:
-            print(item)
+            yield info.name
 
-def _ls_detailed(self, items, target_dir):
+def _ls_detailed(self, infos, color: bool = False):
     """
     Вспомогательная функция для детального вывода.
     """
-    for item in items:
-        full_path = os.path.join(target_dir, item)
+    for info in infos:
         try:
-            stat = os.stat(full_path)
-
             # Считывание типа файла, разрешений для трех групп пользователей,
             # последнего времени изменения и развера
-            file_type = 'd' if os.path.isdir(full_path) else '-'
+            file_type = 'd' if info.is_dir else '-'
             permissions = file_type + 'rw-r--r--'
-            size = stat.st_size
-            mod_time = datetime.datetime.fromtimestamp(stat.st_mtime)
+            size = info.size
+            mod_time = datetime.datetime.fromtimestamp(info.mtime)
             mod_time_str = mod_time.strftime('%Y-%m-%d %H:%M:%S')
 
-            if os.path.isdir(full_path):
-                item_display = f"\033[94m{item}\033[0m"
+            if info.is_dir and color:
+                item_display = f"\033[94m{info.name}\033[0m"
             else:
-                item_display = item
+                item_display = info.name
 
-            print(f"{permissions} {size:8} {mod_time_str} {item_display}")
+            yield f"{permissions} {size:8} {mod_time_str} {item_display}"
 
         except (OSError, PermissionError) as e:
-            self.handle_error(f"ls: cannot access '{item}': {e}")
-
+            self.handle_error(f"ls: cannot access '{info.name}': {e}")
@@ -7,7 +7,7 @@ def execute(self, args: list) -> dict | None:
     :param args: Аргументы: source - что копировать; destination - куда копировать.
     :return: Данная функция ничего не возвращает
     """
-    parsed_args = parse_mv_args(args)
+    parsed_args = parse_mv_args(args, self)
     if parsed_args is None:
         return None
 
@@ -40,7 +40,7 @@ def execute(self, args: list) -> dict | None:
 
         # Копирование с записью в логи и возврат словаря значений для undo
         shutil.move(source_path, final_dest)
-        self.logger.debug(f"Moved '{source_path}' to '{final_dest}'")
+        self.logger.getChild('mv').debug("Moved '%s' to '%s'", source_path, final_dest)
         print(f"Moved '{parsed_args.source}' to '{parsed_args.destination}'")
         return {
             'source': source_path,
@@ -1,102 +1,154 @@
-import argparse
-
-def parse_grep_args(args):
-    parser = argparse.ArgumentParser(prog='grep', add_help=False)
-    parser.add_argument('-r', action='store_true', help='search recursively in subdirectories')
-    parser.add_argument('-i', action='store_true', help='case-insensitive search')
-    parser.add_argument('pattern', help='pattern to search for')
-    parser.add_argument('path', help='file or directory to search in')
+import sys
+from types import SimpleNamespace
+from Lab_2_Consoleapp_Python.src.commands.parsing.specs import COMMAND_SPECS, Argument
+
+# Собранные парсеры argparse по именам команд: каждый строится один раз, при первом разборе
+_parsers: dict = {}
+
+
+class UsageError(Exception):
+    """
+    Ошибка разбора аргументов команды. Парсеры выбрасывают ее вместо завершения процесса,
+    чтобы ошибка попадала в handle_error оболочки, как и остальные ошибки команд.
+    """
+
+
+def _build_parser(spec):
+    """
+    Вспомогательная функция. Собирает парсер argparse по описанию команды.
+    :param spec: описание команды (CommandSpec)
+    :return: argparse.ArgumentParser
+    """
+    # argparse подгружается только при первом разборе, чтобы не замедлять запуск оболочки
+    import argparse
+
+    class ArgumentParser(argparse.ArgumentParser):
+        def error(self, message):
+            raise UsageError(f"{self.prog}: {message}")
+
+    def add_arguments(parser, arguments):
+        for argument in arguments:
+            if argument.kind == Argument.FLAG:
+                parser.add_argument(argument.name, action='store_true', help=argument.help)
+            elif argument.kind == Argument.OPTION:
+                parser.add_argument(argument.name, help=argument.help)
+            else:
+                parser.add_argument(argument.name, nargs=argument.nargs, default=argument.default,
+                                    help=argument.help)
+
+    parser = ArgumentParser(prog=spec.name, add_help=False)
+    add_arguments(parser, spec.arguments)
+    if spec.subcommands:
+        subparsers = parser.add_subparsers(dest='action', required=True)
+        for action, arguments in spec.subcommands.items():
+            add_arguments(subparsers.add_parser(action, add_help=False), arguments)
+    return parser
+
+
+def _fast_parse(spec, args):
+    """
+    Вспомогательная функция. Разбор без argparse для команд, принимающих только позиционные аргументы
+    (обязательные и необязательные). Необязательные заполняются слева направо, как в argparse.
+    :param spec: описание команды (CommandSpec)
+    :param args: аргументы команды
+    :return: разобранные аргументы или None, если ввод нужно разобрать argparse (ошибка или опции)
+    """
+    required = sum(1 for argument in spec.arguments if argument.nargs is None)
+    if not required <= len(args) <= len(spec.arguments) or any(arg.startswith('-') for arg in args):
+        return None
 
+    values = {}
+    optional_left = len(args) - required
+    position = 0
+    for argument in spec.arguments:
+        if argument.nargs == '?':
+            if not optional_left:
+                values[argument.dest] = argument.default
+                continue
+            optional_left -= 1
+        values[argument.dest] = args[position]
+        position += 1
+    return SimpleNamespace(**values)
+
+
+def parse_command_args(command: str, args, shell=None):
+    """
+    Функция для разбора аргументов команды по ее описанию в COMMAND_SPECS.
+    :param command: имя команды
+    :param args: аргументы команды
+    :param shell: оболочка, через handle_error которой сообщается об ошибке (None - вывод в stderr)
+    :return: разобранные аргументы или None, если они некорректны
+    """
+    spec = COMMAND_SPECS[command]
+    if spec.positional_only:
+        parsed = _fast_parse(spec, args)
+        if parsed is not None:
+            return parsed
+
+    parser = _parsers.get(command)
+    if parser is None:
+        parser = _parsers[command] = _build_parser(spec)
     try:
         return parser.parse_args(args)
-    except SystemExit:
+    except UsageError as e:
+        if shell is None:
+            print(e, file=sys.stderr)
+        else:
+            shell.handle_error(str(e))
         return None
 
-def parse_cp_args(args):
-    parser = argparse.ArgumentParser(prog='cp', add_help=False)
-    parser.add_argument('-r', action='store_true', help='copy directories recursively')
-    parser.add_argument('source', help='source file or directory')
-    parser.add_argument('destination', help='destination path')
 
-    try:
-        return parser.parse_args(args)
-    except SystemExit:
-        return None
+def parse_grep_args(args, shell=None):
+    return parse_command_args('grep', args, shell)
 
-def parse_ls_args(args):
-    parser = argparse.ArgumentParser(prog='ls', add_help=False)
-    parser.add_argument('-l', action='store_true', help='detailed listing')
-    parser.add_argument('path', nargs='?', help='path to list')
+def parse_cp_args(args, shell=None):
+    return parse_command_args('cp', args, shell)
 
-    try:
-        return parser.parse_args(args)
-    except SystemExit:
-        return None
+def parse_ls_args(args, shell=None):
+    return parse_command_args('ls', args, shell)
 
-def parse_mv_args(args):
-    parser = argparse.ArgumentParser(prog='mv', add_help=False)
-    parser.add_argument('source', help='source file or directory')
-    parser.add_argument('destination', help='destination path or new name')
+def parse_mv_args(args, shell=None):
+    return parse_command_args('mv', args, shell)
 
-    try:
-        return parser.parse_args(args)
-    except SystemExit:
-        return None
+def parse_rm_args(args, shell=None):
+    return parse_command_args('rm', args, shell)
 
-def parse_rm_args(args):
-    parser = argparse.ArgumentParser(prog='rm', add_help=False)
-    parser.add_argument('-r', action='store_true', help='remove directories recursively')
-    parser.add_argument('path', help='file or directory path to remove')
+def parse_tar_args(args, shell=None):
+    return parse_command_args('tar', args, shell)
 
-    try:
-        return parser.parse_args(args)
-    except SystemExit:
-        return None
+def parse_untar_args(args, shell=None):
+    return parse_command_args('untar', args, shell)
 
-def parse_tar_args(args):
-    parser = argparse.ArgumentParser(prog='tar', add_help=False)
-    parser.add_argument('folder', help='directory to archive')
-    parser.add_argument('name', help='name of the tar archive')
+def parse_unzip_args(args, shell=None):
+    return parse_command_args('unzip', args, shell)
 
-    try:
-        return parser.parse_args(args)
-    except SystemExit:
-        return None
+def parse_zip_args(args, shell=None):
+    return parse_command_args('zip', args, shell)
 
-def parse_untar_args(args):
-    parser = argparse.ArgumentParser(prog='untar', add_help=False)
-    parser.add_argument('archive', help='path to tar archive')
 
-    try:
-        return parser.parse_args(args)
-    except SystemExit:
-        return None
+def parse_help_args(args, shell=None):
+    return parse_command_args('help', args, shell)
 
-def parse_unzip_args(args):
-    parser = argparse.ArgumentParser(prog='unzip', add_help=False)
-    parser.add_argument('archive', help='path to zip archive')
+def parse_history_args(args, shell=None):
+    return parse_command_args('history', args, shell)
 
-    try:
-        return parser.parse_args(args)
-    except SystemExit:
-        return None
+def parse_undo_args(args, shell=None):
+    return parse_command_args('undo', args, shell)
 
-def parse_zip_args(args):
-    parser = argparse.ArgumentParser(prog='zip', add_help=False)
-    parser.add_argument('folder', help='directory to zip')
-    parser.add_argument('name', help='name of the zip archive')
+def parse_trash_args(args, shell=None):
+    return parse_command_args('trash', args, shell)
 
-    try:
-        return parser.parse_args(args)
-    except SystemExit:
-        return None
+def parse_jobs_args(args, shell=None):
+    return parse_command_args('jobs', args, shell)
 
+def parse_wait_args(args, shell=None):
+    return parse_command_args('wait', args, shell)
 
-def parse_help_args(args):
-    parser = argparse.ArgumentParser(prog='help', add_help=False)
-    parser.add_argument('command', nargs='?', help='command to get help for')
+def parse_fg_args(args, shell=None):
+    return parse_command_args('fg', args, shell)
 
-    try:
-        return parser.parse_args(args)
-    except SystemExit:
-        return None
\ No newline at end of file
+def parse_stats_args(args, shell=None):
+    return parse_command_args('stats', args, shell)
+
+def parse_profile_args(args, shell=None):
+    return parse_command_args('profile', args, shell)
@@ -0,0 +1,394 @@
+"""
+Декларативное описание команд оболочки: аргументы, краткое описание и примеры.
+По одному и тому же описанию собираются парсеры аргументов (command_parsers.py)
+и справка (команда help).
+"""
+from Lab_2_Consoleapp_Python.src.source.config import HISTORY_CONFIG
+
+
+class Argument:
+    """
+    Один аргумент команды: позиционный, флаг (-r) или опция со значением (--cmd <name>).
+    """
+    __slots__ = ('name', 'help', 'kind', 'nargs', 'default', 'metavar')
+
+    POSITIONAL = 'positional'
+    FLAG = 'flag'
+    OPTION = 'option'
+
+    def __init__(self, name: str, help: str, kind: str = POSITIONAL, nargs: str | None = None,
+                 default=None, metavar: str | None = None) -> None:
+        """
+        :param name: имя позиционного аргумента или флаг/опция с дефисами (-r, --older-than)
+        :param help: описание для справки (продолжение с новой строки выводится с отступом)
+        :param kind: POSITIONAL, FLAG или OPTION
+        :param nargs: None - ровно одно значение, '?' - необязательный, '+' - одно или больше,
+        '...' - все оставшиеся аргументы, включая похожие на флаги (команда с ее аргументами)
+        :param default: значение по умолчанию
+        :param metavar: как показывать значение в справке
+        :return: Данная функция ничего не возвращает
+        """
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.nargs = nargs
+        self.default = default
+        self.metavar = metavar or name.lstrip('-')
+
+    @property
+    def dest(self) -> str:
+        """
+        :return: имя атрибута в разобранных аргументах
+        """
+        return self.name.lstrip('-').replace('-', '_')
+
+    def usage(self) -> str:
+        """
+        :return: аргумент в строке Usage (<path>, [n], <path>..., [-r], [--cmd <name>])
+        """
+        if self.kind == self.FLAG:
+            return f"[{self.name}]"
+        if self.kind == self.OPTION:
+            return f"[{self.name} <{self.metavar}>]"
+        if self.nargs == '?':
+            return f"[{self.metavar}]"
+        if self.nargs == '+':
+            return f"<{self.metavar}>..."
+        if self.nargs == '...':
+            return f"<{self.metavar}> [args...]"
+        return f"<{self.metavar}>"
+
+    def label(self) -> str:
+        """
+        :return: аргумент в разделе Arguments справки
+        """
+        if self.kind == self.OPTION:
+            return f"{self.name} <{self.metavar}>"
+        return self.name if self.kind == self.FLAG else self.metavar
+
+
+def positional(name: str, help: str, nargs: str | None = None, default=None, metavar: str | None = None) -> Argument:
+    return Argument(name, help, Argument.POSITIONAL, nargs=nargs, default=default, metavar=metavar)
+
+
+def flag(name: str, help: str) -> Argument:
+    return Argument(name, help, Argument.FLAG, default=False)
+
+
+def option(name: str, help: str, metavar: str | None = None) -> Argument:
+    return Argument(name, help, Argument.OPTION, metavar=metavar)
+
+
+class CommandSpec:
+    """
+    Описание команды: аргументы (или подкоманды со своими аргументами), краткое описание
+    для общего списка команд, подробное описание и примеры для help <command>.
+    """
+    __slots__ = ('name', 'summary', 'arguments', 'subcommands', 'description', 'examples')
+
+    def __init__(self, name: str, summary: str, arguments=(), subcommands=None,
+                 description: str = '', examples=()) -> None:
+        """
+        :param name: имя команды
+        :param summary: одна строка для общего списка команд
+        :param arguments: аргументы команды (Argument)
+        :param subcommands: подкоманда -> ее аргументы (выбранная подкоманда попадает в action)
+        :param description: подробное описание для help <command>
+        :param examples: пары (пример, пояснение)
+        :return: Данная функция ничего не возвращает
+        """
+        self.name = name
+        self.summary = summary
+        self.arguments = tuple(arguments)
+        self.subcommands = dict(subcommands or {})
+        self.description = description
+        self.examples = tuple(examples)
+
+    @property
+    def positional_only(self) -> bool:
+        """
+        :return: команда принимает только позиционные аргументы (для нее есть быстрый разбор без argparse)
+        """
+        return not self.subcommands and all(arg.kind == Argument.POSITIONAL and arg.nargs in (None, '?')
+                                            for arg in self.arguments)
+
+    def all_arguments(self) -> list[Argument]:
+        """
+        :return: аргументы команды и всех ее подкоманд (без повторов по имени)
+        """
+        seen, result = set(), []
+        for argument in [*self.arguments, *(arg for args in self.subcommands.values() for arg in args)]:
+            if argument.name not in seen:
+                seen.add(argument.name)
+                result.append(argument)
+        return result
+
+    def usages(self) -> list[str]:
+        """
+        :return: строки Usage: по одной на подкоманду (позиционные аргументы, затем флаги и опции,
+        затем аргумент '...')
+        """
+        def render(prefix, arguments):
+            positionals = [arg.usage() for arg in arguments if arg.kind == Argument.POSITIONAL and arg.nargs != '...']
+            others = [arg.usage() for arg in arguments if arg.kind != Argument.POSITIONAL]
+            # Все после команды с '...' относится к ней, поэтому флаги показываются перед ней
+            rest = [arg.usage() for arg in arguments if arg.nargs == '...']
+            return " ".join([prefix, *positionals, *others, *rest])
+
+        if self.subcommands:
+            return [render(f"{self.name} {action}", [*self.arguments, *arguments])
+                    for action, arguments in self.subcommands.items()]
+        return [render(self.name, self.arguments)]
+
+    def summary_line(self) -> str:
+        """
+        :return: строка общего списка команд (длинная строка Usage - с описанием на следующей строке)
+        """
+        usage = f"{self.name} {'|'.join(self.subcommands)} [pattern]" if self.subcommands else self.usages()[0]
+        if len(usage) <= 18:
+            return f"  {usage:<18} - {self.summary}"
+        if len(usage) + len(self.summary) <= 80:
+            return f"  {usage} - {self.summary}"
+        return f"  {usage}\n{'':<21}- {self.summary}"
+
+    def help_text(self) -> str:
+        """
+        :return: подробная справка для help <command>
+        """
+        usages = self.usages()
+        lines = ["", f"Usage: {usages[0]}", *(f"       {usage}" for usage in usages[1:])]
+        if self.description:
+            lines += ["", self.description]
+
+        arguments = self.all_arguments()
+        if arguments:
+            width = max(len(arg.label()) for arg in arguments)
+            lines += ["", "Arguments:"]
+            for argument in arguments:
+                first, *rest = argument.help.split("\n")
+                lines.append(f"  {argument.label():<{width}}  - {first}")
+                lines += [f"  {'':<{width}}    {line}" for line in rest]
+
+        if self.examples:
+            width = max(len(example) for example, _ in self.examples)
+            lines += ["", "Examples:"]
+            lines += [f"  {example:<{max(width, 30)}}  - {comment}" for example, comment in self.examples]
+        return "\n".join(lines) + "\n"
+
+
+COMMAND_SPECS = {spec.name: spec for spec in [
+    CommandSpec(
+        'cd', "Change current directory",
+        arguments=[
+            positional('directory', "Target directory (optional)\n"
+                                    "If no directory specified, changes to home directory\n"
+                                    "~  - Home directory\n"
+                                    ".. - Parent directory", nargs='?'),
+        ],
+        description="Changes the current working directory.",
+        examples=[("cd Documents", "Change to Documents directory"),
+                  ("cd ..", "Go to parent directory"),
+                  ("cd ~", "Go to home directory")]),
+    CommandSpec(
+        'ls', "List directory contents (-l for detailed view)",
+        arguments=[
+            positional('path', "Directory or file path (optional, defaults to current directory)", nargs='?'),
+            flag('-l', "Detailed listing with file information"),
+        ],
+        description="Lists files and directories in the specified path.",
+        examples=[("ls", "List current directory"),
+                  ("ls -l", "Detailed list of current directory"),
+                  ("ls Documents", "List Documents directory"),
+                  ("ls -l /var/log", "Detailed list of /var/log")]),
+    CommandSpec(
+        'cat', "Display file content",
+        arguments=[positional('file', "Path to the file to display")],
+        description="Displays the contents of a file.",
+        examples=[("cat file.txt", "Display file.txt contents"),
+                  ("cat /etc/hosts.txt", "Display system hosts file")]),
+    CommandSpec(
+        'cp', "Copy files/directories (-r for recursive)",
+        arguments=[
+            positional('source', "Source file or directory"),
+            positional('destination', "Destination path or directory", metavar='dest'),
+            flag('-r', "Recursive copy (for directories)"),
+        ],
+        description="Copies files and directories.",
+        examples=[("cp file.txt backup.txt", "Copy file to backup"),
+                  ("cp -r dir1 dir2", "Copy directory recursively")]),
+    CommandSpec(
+        'mv', "Move or rename files/directories",
+        arguments=[
+            positional('source', "Source file or directory"),
+            positional('destination', "Destination path or new name", metavar='dest'),
+        ],
+        description="Moves or renames files and directories.",
+        examples=[("mv old.txt new.txt", "Rename file"),
+                  ("mv file.txt Documents/", "Move file to Documents"),
+                  ("mv dir1/ dir2/", "Rename directory")]),
+    CommandSpec(
+        'rm', "Remove files/directories (-r for recursive, moves to trash)",
+        arguments=[
+            positional('paths', "Files, directories or glob patterns (*, ?, [...]) to remove",
+                       nargs='+', metavar='path'),
+            flag('-r', "Recursive removal (for directories)"),
+            flag('-f', "Remove directories without confirmation (for --serve and batch mode)"),
+        ],
+        description="Removes files and directories (moves to trash for undo capability).\n"
+                    "Trash lives on the same filesystem as the removed path (.ruletka-trash at its\n"
+                    "mount point), so removal is a rename and never copies data.\n"
+                    "All paths of one command are removed in a single batch: directories are\n"
+                    "confirmed once and a single undo restores the whole batch.",
+        examples=[("rm file.txt", "Remove file (moves to trash)"),
+                  ("rm -r old_directory", "Remove directory recursively"),
+                  ("rm -r -f old_directory", "Remove directory without asking (scripts, --serve)"),
+                  ("rm *.log old/*.tmp", "Remove all matching files at once")]),
+    CommandSpec(
+        'zip', "Create zip archive from directory",
+        arguments=[
+            positional('folder', "Source directory to compress", metavar='dir'),
+            positional('name', "Name of the zip archive (automatically adds .zip if not specified)"),
+        ],
+        description="Creates a zip archive from a directory.",
+        examples=[("zip Documents docs_backup", "Create docs_backup.zip from Documents"),
+                  ("zip /var/log logs_archive.zip", "Create logs_archive.zip from /var/log"),
+                  ('zip "My Files" backup', 'Create backup.zip from "My Files" directory')]),
+    CommandSpec(
+        'unzip', "Extract zip archive to current directory",
+        arguments=[positional('archive', "Path to the zip archive to extract")],
+        description="Extracts a zip archive to the current directory.\n"
+                    "Password-protected archives are supported (the password is prompted for);\n"
+                    "the directory structure is preserved.",
+        examples=[("unzip archive.zip", "Extract archive.zip to current directory"),
+                  ("unzip /downloads/backup.zip", "Extract backup.zip from downloads"),
+                  ("unzip encrypted.zip", "Will prompt for password if encrypted")]),
+    CommandSpec(
+        'tar', "Create tar archive from directory",
+        arguments=[
+            positional('folder', "Source directory to archive", metavar='dir'),
+            positional('name', "Name of the tar archive"),
+        ],
+        description="Creates a tar archive from a directory. Supports various compression formats.",
+        examples=[("tar Documents docs_backup", "Create docs_backup.tar"),
+                  ("tar Projects projects.tar.gz", "Create gzip compressed archive")]),
+    CommandSpec(
+        'untar', "Extract tar archive to current directory",
+        arguments=[positional('archive', "Path to the tar archive to extract")],
+        description="Extracts a tar archive to the current directory.\n"
+                    "Supports .tar, .tar.gz and .tar.bz2 (the compression type is detected\n"
+                    "automatically); file permissions and directory structure are preserved.",
+        examples=[("untar archive.tar", "Extract uncompressed tar archive"),
+                  ("untar backup.tar.gz", "Extract gzip compressed archive"),
+                  ("untar data.tar.bz2", "Extract bzip2 compressed archive")]),
+    CommandSpec(
+        'grep', "Search for pattern in files",
+        arguments=[
+            positional('pattern', "Search pattern (regular expression)"),
+            positional('path', "File or directory to search in\n"
+                               "(without it - output of the previous command in a pipeline)", nargs='?'),
+            flag('-r', "Recursive search in subdirectories"),
+            flag('-i', "Case-insensitive search"),
+        ],
+        description="Searches for patterns in files or in the output of another command.",
+        examples=[('grep "error" log.txt', 'Search for "error" in log.txt'),
+                  ('cat log.txt | grep -i "warning"', "Search in the output of cat"),
+                  ('grep -r "function" src/', 'Recursively search for "function" in src/'),
+                  ('grep -i "warning" err.log', "Case-insensitive search in err.log file")]),
+    CommandSpec(
+        'history', "Show command history (last n entries, optionally filtered)",
+        arguments=[
+            positional('n', "Number of recent commands to show (optional)", nargs='?'),
+            option('--cmd', "Only invocations of this command", metavar='name'),
+            option('--since', "Only commands since ISO date/time or relative time (30m, 12h, 7d, 2w)",
+                   metavar='when'),
+            option('--path', "Only commands that touched this path or anything inside it", metavar='path'),
+            flag('--failed', "Only failed commands"),
+        ],
+        description="Shows command execution history. Filters are answered by the indexed\n"
+                    "history store (.history.db) instead of scanning the whole history.",
+        examples=[("history", "Show all command history"),
+                  ("history 10", "Show last 10 commands"),
+                  ("history --cmd rm --path /srv/data --since 7d",
+                   "rm commands that touched /srv/data last week")]),
+    CommandSpec(
+        'undo', "Undo last n cp, mv, or rm operations (default 1)",
+        arguments=[positional('n', "Number of recent operations to undo (default 1)", nargs='?', default='1')],
+        description="Undoes the last n cp, mv, or rm operations (the most recent first).\n"
+                    f"Up to {HISTORY_CONFIG['undo_depth']} recent operations are kept for undo, "
+                    f"including ones from previous sessions (no older than {HISTORY_CONFIG['undo_ttl_days']} days).",
+        examples=[("undo", "Undo the last operation"),
+                  ("undo 3", "Undo the last three operations")]),
+    CommandSpec(
+        'trash', "List, restore or permanently delete removed items",
+        subcommands={
+            'list': [positional('pattern', "Original path (the item itself and everything removed from inside it)\n"
+                                           "or glob pattern (*, ?, [...]) matched against original paths",
+                                nargs='?')],
+            'restore': [positional('pattern', "Original path or glob pattern to restore")],
+            'purge': [positional('pattern', "Original path or glob pattern to purge", nargs='?'),
+                      option('--older-than', "Only items removed before ISO date/time or 30m, 12h, 7d, 2w ago",
+                             metavar='when'),
+                      flag('-f', "Purge without confirmation")],
+        },
+        description="Works with removed items through the trash manifest (no trash directory scans).\n"
+                    "Items older than the configured age and the oldest items above the trash size\n"
+                    "quota are purged automatically in the background.",
+        examples=[("trash list", "Show all removed items, newest first"),
+                  ("trash restore notes.txt", "Restore the latest removed notes.txt"),
+                  ("trash restore 'logs/*.log'", "Restore the latest version of every matching path"),
+                  ("trash purge --older-than 30d", "Permanently delete items removed more than 30 days ago")]),
+    CommandSpec(
+        'jobs', "List background jobs with status and elapsed time",
+        description="Lists commands started in the background with '&' (status: Running, Done or\n"
+                    "Exit <code>). Finished jobs are listed once and then removed from the table.",
+        examples=[("zip big big_backup &", "Start a background job"),
+                  ("jobs", "Show background jobs")]),
+    CommandSpec(
+        'wait', "Wait for background jobs to finish",
+        arguments=[positional('job', "Job number (1 or %1); without it - all background jobs", nargs='?')],
+        description="Waits until the background jobs finish and reports their status.\n"
+                    "Fails if any of the jobs failed. Ctrl-C stops waiting, not the jobs.",
+        examples=[("wait", "Wait for all background jobs"),
+                  ("wait %2", "Wait for job 2")]),
+    CommandSpec(
+        'fg', "Wait for a background job in the foreground",
+        arguments=[positional('job', "Job number (1 or %1); without it - the most recent job", nargs='?')],
+        description="Brings a background job to the foreground: shows its command and waits until\n"
+                    "it finishes. Ctrl-C stops waiting, the job keeps running in the background.",
+        examples=[("fg", "Wait for the most recent job"),
+                  ("fg 1", "Wait for job 1")]),
+    CommandSpec(
+        'stats', "Show per-command latency percentiles and the slowest invocations",
+        arguments=[positional('n', "Number of slowest invocations to show (default - all kept)", nargs='?'),
+                   flag('--reset', "Clear the collected metrics"),
+                   flag('--files', "Count file operations from now on (process-wide audit hook)")],
+        description="Shows session metrics for every command (and pipeline): number of calls and\n"
+                    "failures, p50/p95/p99 wall time, p50 CPU time, bytes read and written and\n"
+                    "file operations, followed by the slowest invocations.\n"
+                    "File operations are counted only after stats --files (or count_files in\n"
+                    "METRICS_CONFIG): the audit hook cannot be removed and sees every audit event.",
+        examples=[("stats", "Show session metrics"),
+                  ("stats 3", "Show metrics and the 3 slowest invocations"),
+                  ("stats --reset", "Start collecting from scratch"),
+                  ("stats --files", "Also count file operations of the next commands")]),
+    CommandSpec(
+        'profile', "Run a command under the profiler",
+        arguments=[positional('command', "Command to profile with its arguments", nargs='...'),
+                   option('-n', "Number of functions to show (default 20)", metavar='count'),
+                   option('-o', "Save the profile to a .pstats file for offline analysis", metavar='file'),
+                   flag('--memory', "Also trace memory allocations (tracemalloc): peak usage\n"
+                                    "and the lines holding the most memory at the end")],
+        description="Runs a command under cProfile and shows the functions with the largest\n"
+                    "cumulative time. The command itself runs as usual (and is recorded in history).\n"
+                    "Options go before the command; everything after it belongs to the command.",
+        examples=[("profile grep -r TODO src", "Profile a recursive search"),
+                  ("profile --memory zip big big.zip", "Profile time and memory of zip"),
+                  ("profile -o grep.pstats grep -r x .", "Save the profile for python -m pstats")]),
+    CommandSpec(
+        'help', "Show this help or specific command help",
+        arguments=[positional('command', "Command to get help for", nargs='?')],
+        description="Shows the list of commands or detailed help for one command.",
+        examples=[("help", "List all commands"),
+                  ("help grep", "Show help for grep")]),
+    CommandSpec('exit', "Exit the shell", description="Saves the history and exits the shell."),
+]}
@@ -0,0 +1,22 @@
+import re
+import datetime
+
+_RELATIVE_SINCE = re.compile(r'^(\d+)([mhdw])$')
+_SINCE_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def parse_since(value: str, now: float | None = None) -> float:
+    """
+    Переводит значение момента времени (history --since, trash purge --older-than) в unix-время.
+    Поддерживаются ISO-дата/время (2025-11-14, 2025-11-14T20:55) и относительные
+    значения: 30m, 12h, 7d, 2w.
+    :param value: строка, введенная пользователем
+    :param now: текущее время (для тестов)
+    :return: unix-время начала интервала
+    :raises ValueError: строка не является ни ISO-датой, ни относительным значением
+    """
+    match = _RELATIVE_SINCE.match(value.strip())
+    if match:
+        now = datetime.datetime.now().timestamp() if now is None else now
+        return now - int(match.group(1)) * _SINCE_UNITS[match.group(2)]
+    return datetime.datetime.fromisoformat(value.strip()).timestamp()
@@ -0,0 +1,112 @@
+import sys
+import time
+import cProfile
+import pstats
+import tracemalloc
+from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_profile_args
+from Lab_2_Consoleapp_Python.src.commands.formatting import format_size
+from Lab_2_Consoleapp_Python.src.storage.search import command_line
+
+# Сколько функций показывать по умолчанию
+_TOP_FUNCTIONS = 20
+# Сколько строк с наибольшим объемом памяти показывать с --memory
+_TOP_ALLOCATIONS = 10
+# Глубина стека, запоминаемая tracemalloc для каждого выделения памяти
+_TRACE_FRAMES = 1
+
+
+def execute(self, args: list[str]) -> None:
+    """
+    Функция для выполнения команды под профилировщиком cProfile (и tracemalloc с --memory).
+    :param args: Аргументы: -n - сколько функций показать; -o - файл .pstats для сохранения профиля;
+    --memory - отслеживать выделения памяти; command - команда с ее аргументами
+    :return: Данная функция ничего не возвращает
+    """
+    parsed_args = parse_profile_args(args, self)
+    if parsed_args is None:
+        return None
+
+    if not parsed_args.command:
+        self.handle_error("profile: missing command to profile")
+        return None
+    command, command_args = parsed_args.command[0], parsed_args.command[1:]
+    if command == 'profile':
+        self.handle_error("profile: cannot profile itself")
+        return None
+
+    limit = _TOP_FUNCTIONS
+    if parsed_args.n is not None:
+        try:
+            limit = int(parsed_args.n)
+            if limit <= 0:
+                raise ValueError
+        except ValueError:
+            self.handle_error("profile: -n must be a positive number")
+            return None
+
+    # tracemalloc, запущенный не этой командой, не останавливается
+    trace_memory = parsed_args.memory and not tracemalloc.is_tracing()
+    if trace_memory:
+        tracemalloc.start(_TRACE_FRAMES)
+    elif parsed_args.memory:
+        tracemalloc.reset_peak()
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+: профилировщик может быть только один (например, уже запущенный profile в фоне)
+            self.handle_error("profile: another profile is already running")
+            return None
+        try:
+            status = self.execute_command(command, command_args)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+
+        if parsed_args.memory:
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    print(f"\nprofile: {command_line(command, command_args)} - status {status}, {elapsed * 1000:.2f} ms")
+    stats = pstats.Stats(profiler, stream=sys.stdout)
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+
+    if parsed_args.memory:
+        _print_memory(peak, snapshot)
+
+    if parsed_args.o:
+        path = self.resolve_user_path(parsed_args.o)
+        try:
+            # Профиль сохраняется из profiler: strip_dirs выше изменил только выведенную статистику
+            profiler.dump_stats(path)
+        except OSError as e:
+            self.handle_error(f"profile: cannot write '{parsed_args.o}': {e}")
+            return None
+        print(f"Profile saved to '{parsed_args.o}' (python -m pstats {parsed_args.o})")
+    return None
+
+
+def _print_memory(peak: int, snapshot) -> None:
+    """
+    Вспомогательная функция для вывода результатов tracemalloc.
+    :param peak: пиковый объем отслеживаемой памяти, байт
+    :param snapshot: снимок tracemalloc по окончании команды
+    :return: Данная функция ничего не возвращает
+    """
+    # Выделения памяти самим tracemalloc и профилировщиком в результаты не попадают
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, cProfile.__file__),
+                                       tracemalloc.Filter(False, __file__)])
+    top = snapshot.statistics('lineno')
+    print(f"Memory: peak {format_size(peak)}, still allocated {format_size(sum(stat.size for stat in top))}")
+    if top:
+        print("Lines holding the most memory at the end:")
+        for stat in top[:_TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            print(f"  {format_size(stat.size):>8} {stat.count:>8} blocks  {frame.filename}:{frame.lineno}")
@@ -0,0 +1,86 @@
+import os
+import re
+
+
+class FileInfo:
+    """
+    Объект каталога в результате ls (RuletkaShell.call('ls', ...)).
+    Сведения о размере и времени изменения читаются (os.stat) только при первом обращении.
+    """
+    __slots__ = ('name', 'path', 'is_dir', '_stat')
+
+    def __init__(self, name: str, path: str, is_dir: bool) -> None:
+        """
+        :param name: имя в каталоге
+        :param path: полный путь
+        :param is_dir: является ли каталогом
+        :return: Данная функция ничего не возвращает
+        """
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self._stat: os.stat_result | None = None
+
+    def stat(self) -> os.stat_result:
+        """
+        :return: результат os.stat (запоминается после первого вызова)
+        :raises OSError: объект недоступен
+        """
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    @property
+    def size(self) -> int:
+        return self.stat().st_size
+
+    @property
+    def mtime(self) -> float:
+        """
+        :return: время последнего изменения (unix-время)
+        """
+        return self.stat().st_mtime
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FileInfo):
+            return NotImplemented
+        return (self.name, self.path, self.is_dir) == (other.name, other.path, other.is_dir)
+
+    def __repr__(self) -> str:
+        return f"FileInfo(name={self.name!r}, path={self.path!r}, is_dir={self.is_dir})"
+
+
+class Match:
+    """
+    Найденная строка в результате grep. Для поиска в выводе предыдущей команды конвейера path равен None.
+    Позиции совпадений вычисляются только при обращении к spans.
+    """
+    __slots__ = ('path', 'line_number', 'line', 'pattern')
+
+    def __init__(self, path: str | None, line_number: int, line: str, pattern: re.Pattern) -> None:
+        """
+        :param path: путь до файла в том виде, в каком его ввел пользователь (None - строки stdin)
+        :param line_number: номер строки (с 1)
+        :param line: строка без символов перевода строки
+        :param pattern: скомпилированный шаблон поиска
+        :return: Данная функция ничего не возвращает
+        """
+        self.path = path
+        self.line_number = line_number
+        self.line = line
+        self.pattern = pattern
+
+    @property
+    def spans(self) -> list[tuple[int, int]]:
+        """
+        :return: позиции (начало, конец) всех совпадений в строке
+        """
+        return [match.span() for match in self.pattern.finditer(self.line)]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Match):
+            return NotImplemented
+        return (self.path, self.line_number, self.line) == (other.path, other.line_number, other.line)
+
+    def __repr__(self) -> str:
+        return f"Match(path={self.path!r}, line_number={self.line_number}, line={self.line!r})"
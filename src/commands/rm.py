@@ -1,70 +1,150 @@
 import os
-import shutil
+import glob
+import stat
+import time
 import datetime
 from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_rm_args
+from Lab_2_Consoleapp_Python.src.source.config import TRASH_CONFIG
+from Lab_2_Consoleapp_Python.src.terminal import ask, NoInput
+from Lab_2_Consoleapp_Python.src.trash.devices import move_within_device
+
+# Символы шаблона, при которых аргумент раскрывается через glob
+_GLOB_CHARS = '*?['
 
 
 def execute(self, args: list) -> dict | None:
     """
-    :param args: Аргументы: флаг -r - для удаления каталога;
-    path - путь до объекта, который нужно удалить
-    :return: Данная функция ничего не возвращает
+    :param args: Аргументы: флаг -r - для удаления каталогов; флаг -f - удалить каталоги
+    без подтверждения (сервер, пакетный режим); paths - пути или шаблоны (*, ?, [...]) объектов, которые нужно удалить
+    :return: данные для undo: для одного объекта - его исходный путь и путь в корзине,
+    для нескольких - список таких данных (items); None, если ничего не удалено.
+    Если часть путей удалить не удалось, об этом уже сообщено через handle_error: команда
+    считается неуспешной, но удаленные объекты все равно возвращаются для undo
     """
-    parsed_args = parse_rm_args(args)
+    parsed_args = parse_rm_args(args, self)
     if parsed_args is None:
         return None
 
-    target_path = self.resolve_user_path(parsed_args.path)
-
-    # Ошибка, если путь не существует
-    if not os.path.exists(target_path):
-        self.handle_error("rm: cannot remove '{parsed_args.path}': No such file or directory")
+    targets = _collect_targets(self, parsed_args)
+    if not targets:
         return None
 
-    # Ошибка, если путь защищен от удаления
-    if _is_protected_path(self, target_path):
-        self.handle_error("rm: cannot remove '{parsed_args.path}': Operation not permitted")
+    # Одно подтверждение на все удаляемые каталоги
+    directories = [display for display, target_path in targets
+                   if os.path.isdir(target_path) and not os.path.islink(target_path)]
+    if directories and not parsed_args.f:
+        try:
+            confirmed = _confirm_deletion(directories[0]) if len(directories) == 1 \
+                else _confirm_batch_deletion(directories)
+        except NoInput as e:
+            self.handle_error(f"rm: cannot confirm removal of directories: {e} (use -f)")
+            return None
+        if not confirmed:
+            print("Operation cancelled.")
+            return None
+
+    # Все объекты переносятся за один проход с общей отметкой времени в именах
+    # (по ней проще отменить удаление при выполнении undo)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    used_names: set[str] = set()
+    removed = []
+    for display, target_path in targets:
+        item = _move_to_trash(self, display, target_path, timestamp, used_names, verbose=len(targets) == 1)
+        if item is not None:
+            removed.append(item)
+    if not removed:
         return None
 
-    # Сбор информации (для добавления в конец имени файла, чтобы было проще
-    # отменить удаление при выполнении undo)
-    try:
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        basename = os.path.basename(target_path)
-        trash_path = os.path.join(self.trash_dir, f"{basename}_{timestamp}")
-
-        # Без флага -r каталог удалить не получится
-        if os.path.isdir(target_path):
-            if not parsed_args.r:
-                self.handle_error(f"rm: cannot remove '{parsed_args.path}': Is a directory")
-                return None
-
-            # Прекращение операции, если ее не подтвердили (удаление каталога)
-            if not _confirm_deletion(parsed_args.path):
-                print("Operation cancelled.")
-                return None
-
-            # Перемещение файла во временный каталог .trash, запись в логи,
-            # возврат словаря значений для undo
-            shutil.move(target_path, trash_path)
-            self.logger.debug(f"Moved directory '{target_path}' to trash at '{trash_path}'")
-            print(f"Moved directory '{parsed_args.path}' to trash")
+    _add_to_manifest(self, removed)
+    if len(targets) > 1:
+        print(f"Moved {len(removed)} items to trash")
+    # Одна запись истории на всю пачку: undo восстанавливает все объекты сразу
+    return removed[0] if len(removed) == 1 else {'items': removed}
 
-        else:
-            shutil.move(target_path, trash_path)
-            self.logger.debug(f"Moved file '{target_path}' to trash at '{trash_path}'")
-            print(f"Moved file '{parsed_args.path}' to trash")
 
+def _collect_targets(self, parsed_args) -> list[tuple[str, str]]:
+    """
+    Вспомогательная функция. Раскрывает шаблоны и проверяет пути; о каждом пути, который
+    нельзя удалить, сообщается отдельно, остальные пути удаляются.
+    :param parsed_args: разобранные аргументы команды
+    :return: список пар (путь для сообщений, абсолютный путь)
+    """
+    targets = []
+    seen = set()
+    for path in parsed_args.paths:
+        resolved = self.resolve_user_path(path)
+        # Существующий путь удаляется как есть, даже если в его имени есть символы шаблона (report[1].txt)
+        if any(char in path for char in _GLOB_CHARS) and not os.path.lexists(resolved):
+            matches = sorted(glob.glob(resolved))
+            if not matches:
+                self.handle_error(f"rm: cannot remove '{path}': No such file or directory")
+                continue
+            candidates = [(match, match) for match in matches]
+        else:
+            candidates = [(path, resolved)]
+
+        for display, target_path in candidates:
+            if target_path in seen:
+                continue
+            # Ошибка, если путь не существует
+            if not os.path.exists(target_path):
+                self.handle_error(f"rm: cannot remove '{display}': No such file or directory")
+                continue
+            # Ошибка, если путь защищен от удаления
+            if _is_protected_path(self, target_path):
+                self.handle_error(f"rm: cannot remove '{display}': Operation not permitted")
+                continue
+            # Сами корзины удалять нельзя: в них лежат данные для undo
+            if _is_trash_dir(self, target_path):
+                self.handle_error(f"rm: cannot remove '{display}': Is a trash directory")
+                continue
+            # Без флага -r каталог удалить не получится
+            if os.path.isdir(target_path) and not os.path.islink(target_path) and not parsed_args.r:
+                self.handle_error(f"rm: cannot remove '{display}': Is a directory")
+                continue
+            seen.add(target_path)
+            targets.append((display, target_path))
+    return targets
+
+
+def _move_to_trash(self, display: str, target_path: str, timestamp: str, used_names: set,
+                   verbose: bool = True) -> dict | None:
+    """
+    Вспомогательная функция. Переносит объект в корзину на его устройстве.
+    :param display: путь для сообщений
+    :param target_path: абсолютный путь объекта
+    :param timestamp: отметка времени для имени в корзине
+    :param used_names: пути в корзинах, уже занятые в этой пачке (дополняется)
+    :param verbose: сообщить о переносе объекта пользователю
+    :return: данные для undo или None в случае ошибки
+    """
+    try:
+        # Корзина на том же устройстве, что и удаляемый объект: перемещение - это переименование
+        trash_dir = self.trash_locator.trash_dir_for(target_path)
+        name = f"{os.path.basename(target_path)}_{timestamp}"
+        trash_path = os.path.join(trash_dir, name)
+        suffix = 1
+        while trash_path in used_names:
+            trash_path = os.path.join(trash_dir, f"{name}_{suffix}")
+            suffix += 1
+        used_names.add(trash_path)
+
+        kind = "directory" if os.path.isdir(target_path) and not os.path.islink(target_path) else "file"
+        move_within_device(target_path, trash_path)
+        self.logger.getChild('rm').debug("Moved %s '%s' to trash at '%s'", kind, target_path, trash_path)
+        if verbose:
+            print(f"Moved {kind} '{display}' to trash")
         return {
             'original_path': target_path,
-            'trash_path': trash_path
+            'trash_path': trash_path,
+            'trash_dir': trash_dir
         }
 
-    except PermissionError as e:
-        self.handle_error(f"rm: cannot remove '{parsed_args.path}': Permission denied")
+    except PermissionError:
+        self.handle_error(f"rm: cannot remove '{display}': Permission denied")
         return None
     except OSError as e:
-        self.handle_error(f"rm: cannot remove '{parsed_args.path}': {e}")
+        self.handle_error(f"rm: cannot remove '{display}': {e}")
         return None
     except Exception as e:
         self.handle_error(f"rm: unexpected error: {e}")
@@ -107,6 +187,43 @@ def _is_protected_path(shell, path):
     return False
 
 
+def _add_to_manifest(shell, items):
+    """
+    Вспомогательная функция. Записывает удаленные объекты в опись корзин (одной транзакцией).
+    Размер каталога не считается (обход дерева сделал бы rm снова O(размера)): он записывается
+    как неизвестный и считается в фоне при вытеснении или при trash list.
+    Ошибка описи не отменяет удаление: объекты уже в корзине и восстанавливаются через undo.
+    :param shell: оболочка
+    :param items: данные для undo удаленных объектов (original_path, trash_path, trash_dir)
+    :return: Данная функция ничего не возвращает
+    """
+    try:
+        deleted_at = time.time()
+        rows = []
+        for item in items:
+            info = os.lstat(item['trash_path'])
+            is_dir = stat.S_ISDIR(info.st_mode)
+            rows.append({**item, 'device': info.st_dev, 'size': None if is_dir else info.st_size,
+                         'is_dir': is_dir, 'deleted_at': deleted_at})
+        shell.open_trash_manifest().add_many(rows)
+    except Exception as e:
+        shell.logger.error(f"Failed to add {len(items)} items to trash manifest: {e}")
+
+
+def _is_trash_dir(shell, path):
+    normalized_path = os.path.normpath(path)
+    return (os.path.basename(normalized_path) == TRASH_CONFIG["dir_name"] or
+            normalized_path == os.path.normpath(shell.trash_dir))
+
+
 def _confirm_deletion(path):
-    response = input(f"rm: remove directory '{path}'? (y/n): ").strip().lower()
+    response = ask(f"rm: remove directory '{path}'? (y/n): ").strip().lower()
+    return response in ['y', 'yes']
+
+
+def _confirm_batch_deletion(paths):
+    shown = ", ".join(f"'{path}'" for path in paths[:3])
+    if len(paths) > 3:
+        shown += f" and {len(paths) - 3} more"
+    response = ask(f"rm: remove {len(paths)} directories ({shown})? (y/n): ").strip().lower()
     return response in ['y', 'yes']
\ No newline at end of file
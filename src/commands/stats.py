@@ -0,0 +1,91 @@
+from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_stats_args
+from Lab_2_Consoleapp_Python.src.commands.formatting import format_size
+
+
+def execute(self, args: list[str]) -> None:
+    """
+    Функция для вывода метрик команд за сессию.
+    :param args: Аргументы: n - сколько самых долгих вызовов показать; --reset - очистить метрики;
+    --files - считать файловые операции следующих команд
+    :return: Данная функция ничего не возвращает
+    """
+    lines = stream(self, args)
+    if lines is None:
+        return None
+
+    printed = 0
+    for line in lines:
+        print(line)
+        printed += 1
+    if not printed:
+        print("No commands measured yet")
+
+
+def stream(self, args: list[str], stdin=None, color: bool = False):
+    """
+    Функция для потокового вывода команды (в конвейере stats | grep zip).
+    :param args: Аргументы те же, что у execute
+    :param stdin: не используется
+    :param color: не используется (вывод без подсветки)
+    :return: итератор строк таблицы или None в случае ошибки
+    """
+    parsed_args = parse_stats_args(args, self)
+    if parsed_args is None:
+        return None
+
+    limit = None
+    if parsed_args.n is not None:
+        try:
+            limit = int(parsed_args.n)
+            if limit < 0:
+                raise ValueError
+        except ValueError:
+            self.handle_error("stats: argument must be a non-negative number")
+            return None
+
+    if parsed_args.reset:
+        self.metrics.reset()
+        return iter(["Metrics cleared"])
+    if parsed_args.files:
+        self.metrics.enable_file_counting()
+        return iter(["Counting file operations until the end of the session"])
+    return _format_stats(self.metrics.commands(), self.metrics.slowest()[:limit], self.metrics.count_files)
+
+
+def results(self, args: list[str], stdin=None):
+    """
+    Функция для вызова команды из Python (RuletkaShell.call('stats')).
+    :param args: Аргументы те же, что у execute (n и --reset не влияют на результат)
+    :param stdin: не используется
+    :return: список CommandStats (от самой долгой команды по сумме времени) или None в случае ошибки
+    """
+    if parse_stats_args(args, self) is None:
+        return None
+    return self.metrics.commands()
+
+
+def _format_stats(commands, slowest, count_files: bool = True):
+    """
+    Вспомогательная функция. Форматирование таблицы метрик (время - в миллисекундах).
+    :param commands: сводки по командам (CommandStats)
+    :param slowest: самые долгие вызовы (Invocation)
+    :param count_files: файловые операции считаются (иначе в колонке files выводится '-')
+    :return: генератор строк вывода
+    """
+    if not commands:
+        return
+    yield (f"{'command':<16} {'calls':>6} {'failed':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+           f"{'cpu p50':>9} {'read':>8} {'written':>8} {'files':>7}")
+    for stats in commands:
+        wall, cpu = stats.wall, stats.cpu
+        yield (f"{stats.name:<16} {stats.count:>6} {stats.failures:>6} {wall.percentile(50) * 1000:>9.2f} "
+               f"{wall.percentile(95) * 1000:>9.2f} {wall.percentile(99) * 1000:>9.2f} "
+               f"{cpu.percentile(50) * 1000:>9.2f} {format_size(stats.bytes_read):>8} "
+               f"{format_size(stats.bytes_written):>8} {stats.files if count_files else '-':>7}")
+
+    if slowest:
+        yield ""
+        yield "Slowest invocations:"
+        for invocation in slowest:
+            status = "✓" if invocation.success else "✗"
+            yield f"{invocation.wall * 1000:>10.2f} ms  cpu {invocation.cpu * 1000:>9.2f} ms  {status} {invocation.line}"
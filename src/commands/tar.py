@@ -8,7 +8,7 @@ def execute(self, args):
     name - желаемое имя архива.
     :return: Данная функция ничего не возвращает
     """
-    parsed_args = parse_tar_args(args)
+    parsed_args = parse_tar_args(args, self)
     if parsed_args is None:
         return None
 
@@ -48,7 +48,7 @@ def execute(self, args):
         with tarfile.open(tar_path, compression_mode) as tar:
             tar.add(folder_path, arcname=os.path.basename(folder_path))
 
-        self.logger.debug(f"Created tar archive '{tar_path}' from '{folder_path}'")
+        self.logger.getChild('tar').debug("Created tar archive '%s' from '%s'", tar_path, folder_path)
         print(f"Successfully created archive '{parsed_args.name}' from '{parsed_args.folder}'")
 
     except PermissionError:
@@ -0,0 +1,160 @@
+import os
+import datetime
+from Lab_2_Consoleapp_Python.src.commands.formatting import format_size
+from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_trash_args
+from Lab_2_Consoleapp_Python.src.commands.parsing.values import parse_since
+from Lab_2_Consoleapp_Python.src.source.config import TRASH_CONFIG
+from Lab_2_Consoleapp_Python.src.terminal import ask, NoInput
+from Lab_2_Consoleapp_Python.src.trash.devices import move_within_device
+from Lab_2_Consoleapp_Python.src.trash.eviction import purge_item
+
+
+def execute(self, args: list) -> dict | None:
+    """
+    Функция для работы с корзиной через ее опись (без просмотра каталогов корзин).
+    :param args: Аргументы: list [pattern] - показать удаленные объекты;
+    restore <pattern> - восстановить последние удаленные объекты с такими исходными путями;
+    purge [pattern] [--older-than <when>] [-f] - удалить объекты из корзины окончательно
+    :return: словарь с числом обработанных объектов или None в случае ошибки
+    """
+    parsed_args = parse_trash_args(args, self)
+    if parsed_args is None:
+        return None
+
+    pattern = self.resolve_user_path(parsed_args.pattern) if parsed_args.pattern else None
+    try:
+        manifest = self.open_trash_manifest()
+    except Exception as e:
+        self.handle_error(f"trash: cannot open trash manifest: {e}")
+        return None
+
+    if parsed_args.action == 'list':
+        return _list(self, manifest, pattern)
+    if parsed_args.action == 'restore':
+        # У restore шаблон обязателен (его проверяет парсер)
+        return _restore(self, manifest, self.resolve_user_path(parsed_args.pattern))
+    return _purge(self, manifest, pattern, parsed_args)
+
+
+def _list(self, manifest, pattern: str | None) -> dict:
+    """
+    Вспомогательная функция для вывода содержимого корзины (от недавно удаленных к давним).
+    :param manifest: опись корзин (TrashManifest)
+    :param pattern: исходный путь или шаблон (None - все объекты)
+    :return: словарь с числом найденных объектов
+    """
+    items = manifest.find(pattern)
+    if not items:
+        print("Trash is empty" if pattern is None else "No matching items in trash")
+        return {'count': 0}
+
+    for item in items:
+        deleted_at = datetime.datetime.fromtimestamp(item['deleted_at']).strftime('%Y-%m-%d %H:%M:%S')
+        kind = 'd' if item['is_dir'] else '-'
+        # Размер каталога считает фоновое вытеснение: до этого он неизвестен ('?'), а не считается здесь
+        size = '?' if item['size'] is None else format_size(item['size'])
+        print(f"{kind} {deleted_at} {size:>8} {item['original_path']}")
+    self.logger.getChild('trash').debug("Listed %d trash items", len(items))
+    return {'count': len(items)}
+
+
+def _restore(self, manifest, pattern: str) -> dict | None:
+    """
+    Вспомогательная функция для восстановления объектов: для каждого подходящего исходного пути
+    восстанавливается последний удаленный по нему объект.
+    :param manifest: опись корзин (TrashManifest)
+    :param pattern: исходный путь или шаблон
+    :return: словарь с числом восстановленных объектов или None, если ничего не найдено
+    """
+    exact = manifest.latest(pattern)
+    if exact is not None:
+        items = [exact]
+    else:
+        # Записи отсортированы от новых к старым: для каждого пути берется первая
+        newest: dict[str, dict] = {}
+        for item in manifest.find(pattern):
+            newest.setdefault(item['original_path'], item)
+        items = list(newest.values())
+    if not items:
+        self.handle_error(f"trash: no items in trash match '{pattern}'")
+        return None
+
+    restored, stale = [], []
+    for item in items:
+        original_path, trash_path = item['original_path'], item['trash_path']
+        if not os.path.lexists(trash_path):
+            print(f"trash: '{original_path}' is no longer in trash")
+            stale.append(item['id'])
+            continue
+        if original_path == trash_path:
+            # Объект удален до появления описи (см. TrashManifest.import_untracked)
+            self.handle_error(f"trash: cannot restore '{trash_path}': original path is unknown (use undo)")
+            continue
+        if os.path.lexists(original_path):
+            self.handle_error(f"trash: cannot restore '{original_path}': File exists")
+            continue
+        try:
+            os.makedirs(os.path.dirname(original_path), exist_ok=True)
+            move_within_device(trash_path, original_path)
+        except OSError as e:
+            self.handle_error(f"trash: cannot restore '{original_path}': {e}")
+            continue
+        restored.append(item['id'])
+        print(f"Restored {original_path}")
+        self.logger.getChild('trash').debug("Restored '%s' from trash to '%s'", trash_path, original_path)
+
+    manifest.remove(restored + stale)
+    return {'count': len(restored)}
+
+
+def _purge(self, manifest, pattern: str | None, parsed_args) -> dict | None:
+    """
+    Вспомогательная функция для окончательного удаления объектов из корзины.
+    :param manifest: опись корзин (TrashManifest)
+    :param pattern: исходный путь или шаблон (None - все объекты)
+    :param parsed_args: разобранные аргументы команды (--older-than, -f)
+    :return: словарь с числом удаленных объектов и освобожденным местом или None в случае ошибки
+    """
+    older_than = None
+    if parsed_args.older_than:
+        try:
+            older_than = parse_since(parsed_args.older_than)
+        except ValueError:
+            self.handle_error(f"trash: invalid --older-than value '{parsed_args.older_than}' "
+                              f"(expected ISO date/time or 30m, 12h, 7d, 2w)")
+            return None
+
+    items = manifest.find(pattern, older_than=older_than)
+    if not items:
+        print("Nothing to purge")
+        return {'count': 0, 'size': 0}
+
+    size = sum(item['size'] for item in manifest.measure(items))
+    try:
+        confirmed = parsed_args.f or _confirm_purge(len(items), size)
+    except NoInput as e:
+        self.handle_error(f"trash: cannot confirm purge: {e} (use -f)")
+        return None
+    if not confirmed:
+        print("Operation cancelled.")
+        return None
+
+    purged, freed = [], 0
+    for item in items:
+        try:
+            purge_item(item['trash_path'], item['trash_dir'], workers=TRASH_CONFIG["delete_workers"])
+        except OSError as e:
+            self.handle_error(f"trash: cannot purge '{item['original_path']}': {e}")
+            continue
+        purged.append(item['id'])
+        freed += item['size']
+
+    manifest.remove(purged)
+    print(f"Purged {len(purged)} items ({format_size(freed)})")
+    self.logger.getChild('trash').debug("Purged %d items (%d bytes) from trash", len(purged), freed)
+    return {'count': len(purged), 'size': freed}
+
+
+def _confirm_purge(count: int, size: int) -> bool:
+    response = ask(f"trash: permanently delete {count} items ({format_size(size)})? (y/n): ").strip().lower()
+    return response in ['y', 'yes']
@@ -1,30 +1,85 @@
 import os
 import shutil
+from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_undo_args
+from Lab_2_Consoleapp_Python.src.storage.search import command_line
+from Lab_2_Consoleapp_Python.src.trash.devices import move_within_device
 
-def execute(self, args = None) -> dict:
+def execute(self, args = None) -> dict | None:
     """
-    :param args: None (нет аргументов)
-    :return: Отмененная команда (или None)
+    Функция для отмены последних команд cp, mv, rm. Отменяемые команды берутся
+    с вершины стека отмены (self.undo_stack), а не поиском по всей истории.
+    :param args: n - сколько последних операций отменить (по умолчанию 1)
+    :return: Данные о последней отмененной команде (или None)
     """
-    # Возможно отменить только cp, mv, rm
-    undoable_commands = ['cp', 'mv', 'rm']
+    parsed_args = parse_undo_args(args or [], self)
+    if parsed_args is None:
+        return None
+    try:
+        n = int(parsed_args.n)
+        if n <= 0:
+            self.handle_error("undo: argument must be a positive number")
+            return None
+    except ValueError:
+        self.handle_error("undo: argument must be a number")
+        return None
+
+    result: dict = {}
+    undone = 0
+    # Команды, которые не удалось отменить: они остаются в стеке и пропускаются только в этом вызове
+    failed: list = []
+    for _ in range(n):
+        history_entry = self.undo_stack.peek(skip=failed)
+        if history_entry is None:
+            break
+        batch_size = len((history_entry.undo_data or {}).get('items') or ())
+        attempt = _undo_command(self, history_entry)
+        if attempt is None:
+            _keep_failed(self, history_entry, batch_size)
+            failed.append(history_entry)
+            continue
+        result = attempt
+        self.undo_stack.discard(history_entry)
+        undone += 1
+
+    if failed:
+        if undone:
+            print(f"Undid {undone} of {n} operations, {len(failed)} failed and can be retried")
+            return {**result, 'count': undone}
+        return None
+    if not undone:
+        print("No undoable commands found in history")
+        return None
+    if undone < n:
+        print(f"Only {undone} of {n} operations could be undone: no more undoable commands in history")
+    return {**result, 'count': undone}
 
-    for entry in reversed(self.command_history):
-        if entry['command'] in undoable_commands and entry['success'] and entry.get('undo_data'):
-            return _undo_command(self, entry)
 
-    print("No undoable commands found in history")
-    return None
+def _keep_failed(self, history_entry, batch_size: int) -> None:
+    """
+    Вспомогательная функция. Оставляет в стеке команду, которую не удалось отменить (ошибка может быть
+    временной: нет прав, файл занят, устройство не смонтировано), чтобы ее можно было отменить позже.
+    Если пачка rm восстановлена частично, в стеке сохраняются только оставшиеся объекты.
+    :param history_entry: команда, отмена которой завершилась ошибкой
+    :param batch_size: число объектов пачки rm до попытки отмены (0 - не пачка)
+    :return: Данная функция ничего не возвращает
+    """
+    line = command_line(history_entry.command, history_entry.args)
+    remaining = len((history_entry.undo_data or {}).get('items') or ())
+    if 0 < remaining < batch_size:
+        self.undo_stack.update(history_entry)
+        print(f"undo: {remaining} of {batch_size} items left on the undo stack: {line}")
+    else:
+        print(f"undo: kept on the undo stack, run undo again to retry: {line}")
 
 
-def _undo_command(self, history_entry: dict) -> dict:
+def _undo_command(self, history_entry) -> dict | None:
     """
     Вспомогательная функция. Отменяет последнюю команду из списка в истории.
     :param history_entry: последняя найденная команда и ее данные.
     :return: cловарь с данными об отмене, если она успешна, или None в случае ошибки
     """
-    command = history_entry['command']
-    undo_data = history_entry['undo_data']
+    command = history_entry.command
+    undo_data = history_entry.undo_data
 
     try:
         # Удаление скопированного
@@ -36,7 +91,7 @@ def _undo_command(self, history_entry: dict) -> dict:
                 else:
                     os.remove(destination)
                 print(f"Undo cp: removed {destination}")
-                self.logger.debug(f"Undid cp command: removed {destination}")
+                self.logger.getChild('undo').debug("Undid cp command: removed %s", destination)
             else:
                 print(f"Undo cp: destination {destination} no longer exists")
 
@@ -47,28 +102,74 @@ def _undo_command(self, history_entry: dict) -> dict:
             if os.path.exists(destination):
                 shutil.move(destination, source)
                 print(f"Undo mv: moved {destination} back to {source}")
-                self.logger.debug(f"Undid mv command: moved {destination} back to {source}")
+                self.logger.getChild('undo').debug("Undid mv command: moved %s back to %s", destination, source)
             else:
                 print(f"Undo mv: destination {destination} no longer exists")
 
         # Перемещение файла из каталога корзины и восстановление его нормального имени
+        # (корзина на том же устройстве, что и исходный путь, поэтому это переименование)
         elif command == 'rm':
-            original_path = undo_data.get('original_path')
-            trash_path = undo_data.get('trash_path')
+            _undo_rm(self, undo_data)
+
+        # Очистка данных для отмены команды и отметка об этом в журнале истории
+        self._mark_undone(history_entry)
+
+        return {'undo': True, 'command': command}
+
+    except Exception as e:
+        self.handle_error(f"Failed to undo {command}: {e}")
+        return None
+
+
+def _undo_rm(self, undo_data: dict) -> None:
+    """
+    Вспомогательная функция. Возвращает из корзины объекты, удаленные одной командой rm
+    (один объект или пачка items).
+    :param undo_data: данные для отмены rm; если пачка прервана ошибкой, в items остаются
+    только объекты, которые еще не возвращались
+    :return: Данная функция ничего не возвращает
+    """
+    items = undo_data.get('items') or [undo_data]
+    restored, missing = [], []
+    done = 0
+    try:
+        for item in items:
+            original_path = item.get('original_path')
+            trash_path = item.get('trash_path')
             if os.path.exists(trash_path):
                 os.makedirs(os.path.dirname(original_path), exist_ok=True)
-                shutil.move(trash_path, original_path)
-                print(f"Undo rm: restored {original_path} from trash")
-                self.logger.debug(f"Undid rm command: restored {original_path} from trash")
+                move_within_device(trash_path, original_path)
+                restored.append(trash_path)
+                self.logger.getChild('undo').debug("Undid rm command: restored %s from trash", original_path)
             else:
-                print(f"Undo rm: file not found in trash: {trash_path}")
+                missing.append(trash_path)
+            done += 1
+    finally:
+        # Восстановленные объекты убираются из описи, даже если отмена прервалась на середине
+        if restored:
+            _forget_trash_items(self, restored)
+        if 'items' in undo_data and done < len(items):
+            undo_data['items'] = items[done:]
 
-        # Сохранение истории и очистка данных для отмены команды
-        history_entry['undo_data'] = None
-        self._save_history()
+    if 'items' not in undo_data:
+        if restored:
+            print(f"Undo rm: restored {undo_data.get('original_path')} from trash")
+        else:
+            print(f"Undo rm: file not found in trash: {undo_data.get('trash_path')}")
+        return
+    print(f"Undo rm: restored {len(restored)} items from trash")
+    if missing:
+        print(f"Undo rm: {len(missing)} items not found in trash")
 
-        return {'undo': True, 'command': command}
 
+def _forget_trash_items(self, trash_paths: list[str]) -> None:
+    """
+    Вспомогательная функция. Убирает восстановленные объекты из описи корзин
+    (ошибка описи не считается ошибкой отмены).
+    :param trash_paths: пути до объектов в корзине
+    :return: Данная функция ничего не возвращает
+    """
+    try:
+        self.open_trash_manifest().remove_trash_paths(trash_paths)
     except Exception as e:
-        self.handle_error(f"Failed to undo {command}: {e}")
-        return None
\ No newline at end of file
+        self.logger.getChild('undo').error("Failed to remove %d items from trash manifest: %s", len(trash_paths), e)
@@ -8,7 +8,7 @@ def execute(self, args: list) -> None:
     :param args: Аргументы: archive - что нужно разархивировать.
     :return: Данная функция ничего не возвращает
     """
-    parsed_args = parse_untar_args(args)
+    parsed_args = parse_untar_args(args, self)
     if parsed_args is None:
         return None
 
@@ -39,7 +39,8 @@ def execute(self, args: list) -> None:
             tar.extractall(self.current_dir)
             file_count = len(members)
 
-            self.logger.debug(f"Extracted {file_count} files from '{archive_path}' to '{self.current_dir}'")
+            self.logger.getChild('untar').debug("Extracted %d files from '%s' to '%s'", file_count, archive_path,
+                                                self.current_dir)
             print(f"Successfully extracted {file_count} files from '{parsed_args.archive}'")
 
     # Ошибка, если архив не удалось прочитать или он поврежден
@@ -1,13 +1,14 @@
 import os
 import zipfile
 from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_unzip_args
+from Lab_2_Consoleapp_Python.src.terminal import ask, NoInput
 
 def execute(self, args: list) -> None:
     """
     :param args: Аргументы: archive - что нужно разархивировать.
     :return: Данная функция ничего не возвращает
     """
-    parsed_args = parse_unzip_args(args)
+    parsed_args = parse_unzip_args(args, self)
     if parsed_args is None:
         return None
 
@@ -43,7 +44,11 @@ def execute(self, args: list) -> None:
                 for file_info in zipf.filelist:
                     if file_info.flag_bits & 0x1:
                         # Спросить у пользователя пароль, если ......
-                        password = self._ask_for_password(parsed_args.archive)
+                        try:
+                            password = _ask_for_password(parsed_args.archive)
+                        except NoInput as e:
+                            self.handle_error(f"unzip: cannot ask for the password of '{parsed_args.archive}': {e}")
+                            return None
                         if password is None:
                             print("Operation cancelled.")
                             return None
@@ -57,7 +62,8 @@ def execute(self, args: list) -> None:
                 zipf.extractall(self.current_dir)
                 file_count = len(zipf.filelist)
 
-                self.logger.debug(f"Extracted {file_count} files from '{archive_path}' to '{self.current_dir}'")
+                self.logger.getChild('unzip').debug("Extracted %d files from '%s' to '%s'", file_count, archive_path,
+                                                    self.current_dir)
                 print(f"Successfully extracted {file_count} files from '{parsed_args.archive}'")
 
     # Ошибка, если архив "плохой" (поврежден) или если пароль неверный
@@ -82,9 +88,12 @@ def _ask_for_password(archive_name: str) -> str:
     :param archive_name: Аргумент: archive_name - имя архива.
     :return: password.strip() если пользователь его ввел, или None
     при ошибке ввода/прерывании программы
+    :raises NoInput: спросить пароль некому (фоновое задание)
     """
     try:
-        password = input(f"Enter password for '{archive_name}': ")
+        password = ask(f"Enter password for '{archive_name}': ")
         return password.strip()
+    except NoInput:
+        raise
     except (KeyboardInterrupt, EOFError):
         return None
\ No newline at end of file
@@ -0,0 +1,42 @@
+from Lab_2_Consoleapp_Python.src.commands.parsing.command_parsers import parse_wait_args
+
+
+def execute(self, args: list[str]) -> None:
+    """
+    Функция для ожидания фоновых заданий. Команда неуспешна, если неуспешно хотя бы одно из заданий.
+    :param args: Аргументы: номер задания (1 или %1); без него - все задания
+    :return: Данная функция ничего не возвращает
+    """
+    parsed_args = parse_wait_args(args, self)
+    if parsed_args is None:
+        return None
+
+    if parsed_args.job is None:
+        jobs = self.jobs.all()
+    else:
+        job = self.jobs.find(parsed_args.job)
+        if job is None:
+            self.handle_error(f"wait: {parsed_args.job}: no such job")
+            return None
+        jobs = [job]
+
+    for job in jobs:
+        try:
+            job.wait()
+        except KeyboardInterrupt:
+            print(f"\nwait: interrupted, job [{job.id}] keeps running in the background")
+            return None
+        report_job(self, job)
+
+
+def report_job(self, job) -> None:
+    """
+    Функция для вывода завершенного задания (неуспешное выводится как ошибка) и удаления его из таблицы.
+    :param job: завершенное задание
+    :return: Данная функция ничего не возвращает
+    """
+    self.jobs.forget(job)
+    if job.status:
+        self.handle_error(job.describe())
+    else:
+        print(job.describe())
@@ -8,7 +8,7 @@ def execute(self, args: list) -> None:
     name - желаемое имя архива
     :return: Данная функция НИЧЕГО НИКОГДА не возвращает
     """
-    parsed_args = parse_zip_args(args)
+    parsed_args = parse_zip_args(args, self)
     if parsed_args is None:
         return None
 
@@ -52,7 +52,7 @@ def execute(self, args: list) -> None:
         # Сейчас 5:37 утра. Соседи долбят мне по потолку всю ночь, отплясывая чечетку.
         # МАТУШКА ЗЕМЛЯ, БЕЛАЯ БЕРЕЗОНЬКА, ДЛЯ МЕНЯ СВЯТАЯ РУСЬ, ДЛЯ ДРУГИХ ЗАНОЗОНЬКА
         # А еще я не сделал тесты для cat и grep
-        self.logger.debug(f"Created zip archive '{zip_path}' from '{folder_path}'")
+        self.logger.getChild('zip').debug("Created zip archive '%s' from '%s'", zip_path, folder_path)
         print(f"Successfully created archive '{parsed_args.name}' from '{parsed_args.folder}'")
 
     except PermissionError:
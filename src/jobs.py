@@ -0,0 +1,150 @@
+import time
+import threading
+
+
+class Job:
+    """
+    Фоновое задание оболочки: команда (или конвейер), запущенная с & в отдельном потоке.
+    """
+
+    def __init__(self, job_id: int, command_line: str, target) -> None:
+        """
+        :param job_id: номер задания (как %1 в bash)
+        :param command_line: команда в том виде, в каком ее показывать пользователю
+        :param target: функция без аргументов, выполняющая команду и возвращающая код завершения
+        :return: Данная функция ничего не возвращает
+        """
+        self.id = job_id
+        self.command_line = command_line
+        self.status: int | None = None
+        self.started = time.monotonic()
+        self.finished: float | None = None
+        self._target = target
+        self._thread = threading.Thread(target=self._run, name=f"RuletkaShell-job-{job_id}", daemon=True)
+
+    def _run(self) -> None:
+        status = 1
+        try:
+            status = self._target()
+        finally:
+            # Код завершения записывается раньше времени завершения: running == False означает, что он известен
+            self.status = status
+            self.finished = time.monotonic()
+
+    @property
+    def running(self) -> bool:
+        return self.finished is None
+
+    @property
+    def elapsed(self) -> float:
+        """
+        :return: время выполнения в секундах (для выполняющегося задания - на текущий момент)
+        """
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def state(self) -> str:
+        """
+        :return: состояние задания для вывода: Running, Done или Exit <код>
+        """
+        if self.running:
+            return "Running"
+        return "Done" if not self.status else f"Exit {self.status}"
+
+    def describe(self) -> str:
+        """
+        :return: строка задания для jobs, wait и fg
+        """
+        return f"[{self.id}]  {self.state:<8} {self.elapsed:8.1f}s  {self.command_line}"
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Ждет завершения задания (ожидание прерывается по Ctrl-C, само задание продолжает работу).
+        :param timeout: сколько ждать, секунд (None - до завершения)
+        :return: True, если задание завершилось
+        """
+        self._thread.join(timeout)
+        return not self.running
+
+
+class JobTable:
+    """
+    Таблица фоновых заданий оболочки. Номера заданий растут, пока есть незавершенные
+    или еще не показанные задания, и начинаются с 1, когда таблица опустела.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: dict[int, Job] = {}
+        self._lock = threading.Lock()
+
+    def start(self, command_line: str, target) -> Job:
+        """
+        Запускает команду в фоновом потоке.
+        :param command_line: команда для вывода пользователю
+        :param target: функция без аргументов, возвращающая код завершения
+        :return: запущенное задание
+        """
+        with self._lock:
+            job = Job(max(self._jobs, default=0) + 1, command_line, target)
+            self._jobs[job.id] = job
+        job._thread.start()
+        return job
+
+    def get(self, job_id: int) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, spec: str) -> Job | None:
+        """
+        :param spec: номер задания, как его вводит пользователь (1 или %1)
+        :return: задание или None, если такого нет
+        """
+        try:
+            return self.get(int(spec.removeprefix('%')))
+        except ValueError:
+            return None
+
+    def latest(self) -> Job | None:
+        """
+        :return: последнее запущенное задание (текущее задание для fg)
+        """
+        with self._lock:
+            return self._jobs[max(self._jobs)] if self._jobs else None
+
+    def all(self) -> list[Job]:
+        """
+        :return: все задания в порядке запуска
+        """
+        with self._lock:
+            return [self._jobs[job_id] for job_id in sorted(self._jobs)]
+
+    def running(self) -> list[Job]:
+        return [job for job in self.all() if job.running]
+
+    def forget(self, job: Job) -> None:
+        """
+        Убирает завершенное задание из таблицы: о завершении пользователю сообщается один раз
+        (jobs, wait, fg или перед приглашением).
+        :param job: завершенное задание
+        :return: Данная функция ничего не возвращает
+        """
+        with self._lock:
+            self._jobs.pop(job.id, None)
+
+    def finished(self) -> list[Job]:
+        """
+        Функция для уведомления о заданиях, завершившихся с прошлого вызова: они убираются из таблицы.
+        :return: завершенные и еще не показанные задания
+        """
+        done = [job for job in self.all() if not job.running]
+        for job in done:
+            self.forget(job)
+        return done
+
+    def wait_all(self) -> None:
+        """
+        Ждет завершения всех фоновых заданий.
+        :return: Данная функция ничего не возвращает
+        """
+        for job in self.running():
+            job.wait()
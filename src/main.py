@@ -1,12 +1,96 @@
+import sys
 from Lab_2_Consoleapp_Python.src.ruletka_shell import RuletkaShell
 
-def main() -> None:
+USAGE = """usage: main.py [-e] [-c commands | script.rsh | -]
+       main.py --serve [--socket path]
+
+Without arguments starts the interactive shell.
+  -c commands    run commands separated by ';' or newlines and exit
+  script.rsh     run commands from a script file ('-' - read the script from stdin)
+  -e             stop at the first failed command
+  --serve        keep a warm shell listening on a Unix socket for client.py requests
+  --socket path  socket for --serve (default: $RULETKA_SOCKET or a socket in a private per-user directory)
+The exit status is 0 if every command succeeded, otherwise the status of the last failed command."""
+
+
+def _read_script(path: str) -> str:
     """
-    Стартовая точка для запуска консольной оболочки.
-    :return: Данная функция ничего не возвращает.
+    Вспомогательная функция. Читает сценарий из файла или стандартного ввода.
+    :param path: путь до сценария или '-'
+    :return: текст сценария
+    """
+    if path == '-':
+        return sys.stdin.read()
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def main(argv: list[str] | None = None) -> int:
     """
-    shell = RuletkaShell().create()
-    shell.run()
+    Стартовая точка для запуска консольной оболочки: интерактивный режим или пакетный
+    (-c или файл сценария).
+    :param argv: аргументы командной строки (по умолчанию sys.argv[1:])
+    :return: код завершения
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    stop_on_error = False
+    script = None
+    serve = False
+    socket_path = None
+    args = list(argv)
+    while args:
+        arg = args.pop(0)
+        if arg in ('-h', '--help'):
+            print(USAGE)
+            return 0
+        elif arg == '-e':
+            stop_on_error = True
+        elif arg == '--serve':
+            serve = True
+        elif arg == '--socket':
+            if not args:
+                print("main.py: --socket requires an argument", file=sys.stderr)
+                return 2
+            socket_path = args.pop(0)
+        elif arg == '-c':
+            if not args:
+                print("main.py: -c requires an argument", file=sys.stderr)
+                return 2
+            script = args.pop(0)
+        elif script is None and (arg == '-' or not arg.startswith('-')):
+            try:
+                script = _read_script(arg)
+            except OSError as e:
+                print(f"main.py: cannot read script '{arg}': {e}", file=sys.stderr)
+                return 2
+        else:
+            print(f"main.py: unexpected argument '{arg}'\n{USAGE}", file=sys.stderr)
+            return 2
+
+    if serve:
+        if script is not None:
+            print(f"main.py: --serve does not take commands\n{USAGE}", file=sys.stderr)
+            return 2
+        from Lab_2_Consoleapp_Python.src.server import serve as serve_forever
+        return serve_forever(socket_path)
+
+    if script is None:
+        shell = RuletkaShell().create()
+        shell.run()
+        return 0
+
+    # Вывод сценария буферизуется целиком (а не построчно) и сбрасывается при завершении
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False)
+    shell = RuletkaShell.create(interactive=False)
+    try:
+        return shell.run_script(script, stop_on_error=stop_on_error)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        shell.close()
+        sys.stdout.flush()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Метрики выполнения команд за сессию: время (настенное и процессорное), байты, прочитанные
+и записанные потоком команды, и число файловых операций. Замер не хранит сами значения:
+время раскладывается по логарифмическим корзинам гистограммы (около 9% на корзину),
+поэтому память не растет с числом команд, а перцентили считаются только по запросу (stats).
+"""
+import os
+import sys
+import math
+import time
+import heapq
+import threading
+from Lab_2_Consoleapp_Python.src.storage.search import command_line
+
+# Корзин гистограммы на каждое удвоение значения
+_BUCKETS_PER_OCTAVE = 8
+# Счетчики ввода-вывода текущего потока (Linux): rchar и wchar
+_THREAD_IO = '/proc/thread-self/io'
+# События аудита, которые считаются файловыми операциями команды
+_FILE_EVENTS = frozenset({'open', 'os.rename', 'os.remove', 'os.rmdir', 'os.mkdir', 'os.listdir', 'os.scandir'})
+
+_local = threading.local()
+_audit_installed = False
+_audit_lock = threading.Lock()
+_thread_io_available = True
+
+
+class Histogram:
+    """
+    Гистограмма длительностей с логарифмическими корзинами (значения - в секундах).
+    """
+    __slots__ = ('count', 'total', 'max', '_buckets')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets: dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        """
+        :param value: длительность в секундах
+        :return: Данная функция ничего не возвращает
+        """
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        # Корзины считаются в микросекундах: все, что быстрее 1 мкс, попадает в первую
+        index = int(math.log2(value * 1e6) * _BUCKETS_PER_OCTAVE) if value > 1e-6 else 0
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """
+        :param q: перцентиль от 0 до 100
+        :return: приближенное значение (середина корзины, не больше максимума) или 0.0 для пустой гистограммы
+        """
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(self.count * q / 100), 1)
+        if rank >= self.count:
+            return self.max
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(2 ** ((index + 0.5) / _BUCKETS_PER_OCTAVE) / 1e6, self.max)
+        return self.max
+
+
+class Invocation:
+    """
+    Замер одной команды (или конвейера): создается перед выполнением, stop() вызывается после.
+    Все счетчики относятся к потоку, в котором выполнялась команда (фоновые задания считаются отдельно).
+    """
+    __slots__ = ('started', 'wall', 'cpu', 'bytes_read', 'bytes_written', 'files', 'success', 'line', '_start')
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.wall = self.cpu = 0.0
+        self.bytes_read: int | None = None
+        self.bytes_written: int | None = None
+        self.files = 0
+        self.success = True
+        self.line = ''
+        # Счетчики ввода-вывода читаются раньше счетчика файлов, чтобы чтение /proc не считалось операцией команды
+        io = _thread_io()
+        self._start = (time.perf_counter(), time.thread_time(), io, getattr(_local, 'files', 0))
+
+    def stop(self) -> None:
+        """
+        Фиксирует время и счетчики по окончании команды.
+        :return: Данная функция ничего не возвращает
+        """
+        wall, cpu = time.perf_counter(), time.thread_time()
+        files = getattr(_local, 'files', 0)
+        io = _thread_io()
+        start_wall, start_cpu, start_io, start_files = self._start
+        self.wall = wall - start_wall
+        self.cpu = cpu - start_cpu
+        self.files = files - start_files
+        if io is not None and start_io is not None:
+            self.bytes_read = io[0] - start_io[0]
+            self.bytes_written = io[1] - start_io[1]
+
+
+class CommandStats:
+    """
+    Сводка по одной команде (или по конвейеру из одних и тех же команд) за сессию.
+    """
+    __slots__ = ('name', 'count', 'failures', 'wall', 'cpu', 'bytes_read', 'bytes_written', 'files')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.count = 0
+        self.failures = 0
+        self.wall = Histogram()
+        self.cpu = Histogram()
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.files = 0
+
+    def add(self, invocation: Invocation) -> None:
+        self.count += 1
+        self.failures += not invocation.success
+        self.wall.add(invocation.wall)
+        self.cpu.add(invocation.cpu)
+        self.bytes_read += invocation.bytes_read or 0
+        self.bytes_written += invocation.bytes_written or 0
+        self.files += invocation.files
+
+    def __repr__(self) -> str:
+        return f"CommandStats(name={self.name!r}, count={self.count}, failures={self.failures})"
+
+
+class CommandMetrics:
+    """
+    Метрики команд оболочки за сессию: сводки по командам и самые долгие вызовы.
+    """
+
+    def __init__(self, slowest: int = 10, count_files: bool = False) -> None:
+        """
+        :param slowest: сколько самых долгих вызовов хранить
+        :param count_files: считать файловые операции команд (см. enable_file_counting)
+        :return: Данная функция ничего не возвращает
+        """
+        self.slowest_limit = slowest
+        self.count_files = False
+        self._stats: dict[str, CommandStats] = {}
+        self._slowest: list[tuple[float, int, Invocation]] = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        if count_files:
+            self.enable_file_counting()
+
+    def enable_file_counting(self) -> None:
+        """
+        Включает подсчет файловых операций. Хук аудита остается в процессе до его завершения
+        и вызывается на каждое событие аудита, поэтому подсчет включается только по запросу.
+        :return: Данная функция ничего не возвращает
+        """
+        _install_audit_hook()
+        self.count_files = True
+
+    def record(self, invocation: Invocation, pipeline: list[tuple[str, list[str]]], success: bool) -> None:
+        """
+        Добавляет завершенный замер в сводку.
+        :param invocation: замер (после stop)
+        :param pipeline: выполненные команды - список пар (команда, аргументы)
+        :param success: успешно ли выполнилась команда
+        :return: Данная функция ничего не возвращает
+        """
+        invocation.success = success
+        name = " | ".join(command for command, _ in pipeline)
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = CommandStats(name)
+            stats.add(invocation)
+
+            # Строка команды собирается только для вызовов, попадающих в число самых долгих
+            if len(self._slowest) >= self.slowest_limit and (not self._slowest or
+                                                             invocation.wall <= self._slowest[0][0]):
+                return
+            invocation.line = " | ".join(command_line(command, args) for command, args in pipeline)
+            self._sequence += 1
+            item = (invocation.wall, self._sequence, invocation)
+            if len(self._slowest) < self.slowest_limit:
+                heapq.heappush(self._slowest, item)
+            else:
+                heapq.heapreplace(self._slowest, item)
+
+    def commands(self) -> list[CommandStats]:
+        """
+        :return: сводки по командам, от самой долгой по сумме времени
+        """
+        with self._lock:
+            return sorted(self._stats.values(), key=lambda stats: stats.wall.total, reverse=True)
+
+    def slowest(self) -> list[Invocation]:
+        """
+        :return: самые долгие вызовы, от самого долгого
+        """
+        with self._lock:
+            return [invocation for _, _, invocation in sorted(self._slowest, reverse=True)]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._slowest.clear()
+
+
+def _thread_io() -> tuple[int, int] | None:
+    """
+    Вспомогательная функция. Читает счетчики ввода-вывода текущего потока.
+    :return: (прочитано байт, записано байт) или None, если система их не предоставляет
+    """
+    global _thread_io_available
+    if not _thread_io_available:
+        return None
+    try:
+        fd = os.open(_THREAD_IO, os.O_RDONLY)
+        try:
+            data = os.read(fd, 512)
+        finally:
+            os.close(fd)
+    except OSError:
+        _thread_io_available = False
+        return None
+    values = dict(line.split(b':', 1) for line in data.splitlines() if b':' in line)
+    return int(values[b'rchar']), int(values[b'wchar'])
+
+
+def _count_file_event(event: str, args) -> None:
+    if event in _FILE_EVENTS:
+        _local.files = getattr(_local, 'files', 0) + 1
+
+
+def _install_audit_hook() -> None:
+    """
+    Вспомогательная функция. Подключает подсчет файловых операций через sys.addaudithook
+    (один раз на процесс: хук нельзя убрать, поэтому он только увеличивает счетчик потока).
+    :return: Данная функция ничего не возвращает
+    """
+    global _audit_installed
+    with _audit_lock:
+        if not _audit_installed:
+            sys.addaudithook(_count_file_event)
+            _audit_installed = True
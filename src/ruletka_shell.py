@@ -1,11 +1,42 @@
 import os
-import datetime
+import sys
 import logging, logging.config
 import json
 import shlex
+import threading
+from itertools import islice
 from abc import ABC, abstractmethod
-from Lab_2_Consoleapp_Python.src.source.config import LOGGING_CONFIG
-from Lab_2_Consoleapp_Python.src.commands import cd, ls, cat, mv, rm, cp, zip, unzip, tar, untar, grep, history, undo, help
+from Lab_2_Consoleapp_Python.src.source.config import LOGGING_CONFIG, HISTORY_CONFIG, TRASH_CONFIG, METRICS_CONFIG
+from Lab_2_Consoleapp_Python.src.storage.journal import HistoryJournal
+from Lab_2_Consoleapp_Python.src.storage.entry import HistoryEntry
+from Lab_2_Consoleapp_Python.src.storage.writer import HistoryWriter
+from Lab_2_Consoleapp_Python.src.storage.compaction import HistoryCompactor
+from Lab_2_Consoleapp_Python.src.storage.undo_stack import UndoStack
+from Lab_2_Consoleapp_Python.src.storage.lazy_history import LazyHistory
+from Lab_2_Consoleapp_Python.src.storage.search import HistorySearchIndex, command_line
+from Lab_2_Consoleapp_Python.src.trash.devices import TrashLocator
+from Lab_2_Consoleapp_Python.src.trash.eviction import TrashEvictor
+from Lab_2_Consoleapp_Python.src.jobs import JobTable
+from Lab_2_Consoleapp_Python.src.metrics import CommandMetrics, Invocation
+from Lab_2_Consoleapp_Python.src import terminal
+from Lab_2_Consoleapp_Python.src.commands import COMMAND_MODULES, get_command, get_stream, get_results
+
+# Импорты только для проверки типов (mypy): typing и sqlite3 не загружаются при запуске оболочки
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from Lab_2_Consoleapp_Python.src.storage.index import HistoryIndex
+
+
+class CommandError(Exception):
+    """
+    Ошибка команды, вызванной через RuletkaShell.call. messages - сообщения об ошибках,
+    которые в консоли были бы выведены пользователю.
+    """
+
+    def __init__(self, command: str, messages: list[str]) -> None:
+        self.command = command
+        self.messages = messages
+        super().__init__("\n".join(messages) or f"{command}: failed")
 
 
 class Shell(ABC):
@@ -65,13 +96,16 @@ class Shell(ABC):
 
 class RuletkaShell(Shell):
     @staticmethod
-    def create():
+    def create(interactive: bool = True, long_running: bool | None = None):
         """
         Фабричный метод для создания экземпляра RuletkaShell с отложенной инициализацией.
+        :param interactive: False - пакетный режим (выполнение сценария без приглашений, см. run_script)
+        :param long_running: оболочка работает долго (по умолчанию - только интерактивная);
+        True без interactive - режим serve: без терминала, но с фоновой записью и обслуживанием истории
         :return: Экземпляр класса RuletkaShell
         """
         instance = RuletkaShell()
-        instance._opers_init()
+        instance._opers_init(interactive, long_running)
         return instance
 
     def __init__(self) -> None:
@@ -79,44 +113,105 @@ class RuletkaShell(Shell):
         Функция-инициализатор оболочки.
         :return: Данная функция ничего не возвращает
         """
+        # Состояние потока: фоновое задание работает в своем текущем каталоге и считает свои ошибки
+        self._local = threading.local()
+        # Защищает историю и стек отмены от одновременной записи из фоновых заданий
+        self._history_lock = threading.RLock()
+        self._current_dir_lock = threading.Lock()
+        # Защищает открытие индекса истории и описи корзин (при первом обращении из любого потока)
+        self._stores_lock = threading.Lock()
         # Основные параметры: начальная директория, путь до файла истории и каталога "корзины"
         self.current_dir = os.path.expanduser("~")
-        self.history_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.history.json')
+        self.history_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.history.jsonl')
+        self.legacy_history_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.history.json')
+        self.history_index_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.history.db')
+        self.history_index: HistoryIndex | None = None
+        self.undo_stack_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.history.undo.json')
         self.trash_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.trash')
-        # Словарь с поддерживаемыми командами и привязанными к ним импортированными функциями
-        self.commands = {
-            "cd": lambda args: cd(self, args),
-            "ls": lambda args: ls(self, args),
-            "cat": lambda args: cat(self, args),
-            "cp": lambda args: cp(self, args),
-            "mv": lambda args: mv(self, args),
-            "rm": lambda args: rm(self, args),
-            "zip": lambda args: zip(self, args),
-            "unzip": lambda args: unzip(self, args),
-            "tar": lambda args: tar(self, args),
-            "untar": lambda args: untar(self, args),
-            "grep": lambda args: grep(self, args),
-            "history": lambda args: history(self, args),
-            "undo": lambda args: undo(self, args),
-            "help": lambda args: help(self, args),
-            "exit": self.exit
-        }
+        # Корзины других файловых систем (по одной на устройство) находятся по требованию
+        self.trash_locator = TrashLocator(self.trash_dir, dir_name=TRASH_CONFIG["dir_name"])
+        # Опись всех корзин (исходный путь -> путь в корзине)
+        self.trash_manifest_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.trash.db')
+        self.trash_manifest = None
+        # Словарь с поддерживаемыми командами; модуль команды импортируется при ее первом вызове
+        self.commands = {name: self._lazy_command(name) for name in COMMAND_MODULES}
+        self.commands["exit"] = self.exit
+        self.interactive = True
+        self.long_running = True
+        # Количество ошибок, о которых сообщили команды (по нему определяется успешность команды)
+        self._error_count = 0
+        # Фоновые задания (команды, запущенные с &)
+        self.jobs = JobTable()
+        # Время и ввод-вывод выполненных команд за сессию (команда stats)
+        self.metrics = CommandMetrics(METRICS_CONFIG["slowest"], count_files=METRICS_CONFIG["count_files"])
         self._initialized = False
 
-    def _opers_init(self) -> None:
+    @property
+    def current_dir(self) -> str:
+        """
+        Текущий каталог: в фоновом задании - каталог, в котором задание было запущено
+        (cd в задании и в оболочке не влияют друг на друга).
+        """
+        current_dir = getattr(self._local, 'current_dir', None)
+        if current_dir is not None:
+            return current_dir
+        with self._current_dir_lock:
+            return self._current_dir
+
+    @current_dir.setter
+    def current_dir(self, path: str) -> None:
+        if getattr(self._local, 'current_dir', None) is not None:
+            self._local.current_dir = path
+            return
+        with self._current_dir_lock:
+            self._current_dir = path
+
+    @property
+    def _error_count(self) -> int:
+        # Каждый поток считает свои ошибки, чтобы ошибка фонового задания не делала неуспешной команду оболочки
+        return getattr(self._local, 'error_count', 0)
+
+    @_error_count.setter
+    def _error_count(self, value: int) -> None:
+        self._local.error_count = value
+
+    def _lazy_command(self, name: str):
+        """
+        Функция для привязки команды к оболочке без импорта ее модуля.
+        :param name: имя команды
+        :return: функция, принимающая аргументы команды
+        """
+        return lambda args: get_command(name)(self, args)
+
+    def _opers_init(self, interactive: bool = True, long_running: bool | None = None) -> None:
         """
-        Выполняет дорогостоящие операции инициализации.
+        Выполняет дорогостоящие операции инициализации. В пакетном режиме не запускаются фоновые
+        потоки (уплотнение истории, вытеснение из корзин, загрузка индекса для Ctrl-R),
+        а история дописывается в журнал одной операцией при завершении.
+        :param interactive: False - пакетный режим
+        :param long_running: True - уплотнение, вытеснение и фоновая запись истории работают
+        и без интерактивного режима (serve); по умолчанию совпадает с interactive
         :return: Данная функция ничего не возвращает
         """
         if not self._initialized:
+            self.interactive = interactive
+            self.long_running = interactive if long_running is None else long_running
             self.logging_stat()
+            self.history_journal = HistoryJournal(self.history_file, legacy_path=self.legacy_history_file,
+                                                  segment_bytes=HISTORY_CONFIG["segment_bytes"])
             self.command_history = self._load_history()
+            self.undo_stack = self._load_undo_stack()
             self._ensure_directories()
+            self._start_history_writer()
+            self._start_search_index()
+            if self.long_running:
+                self._start_history_compactor()
+                self._start_trash_evictor()
             self._initialized = True
 
     def _ensure_directories(self) -> None:
         """
-        Создает .history и .trash при их отсутствии.
+        Создает активный сегмент журнала истории и .trash при их отсутствии.
         :return: Данная функция ничего не возвращает
         """
         if not os.path.exists(self.trash_dir):
@@ -131,13 +226,14 @@ class RuletkaShell(Shell):
                 self._log(f"Unexpected error occured while trying to"
                           f" create trash directory: {e}")
 
-        if not os.path.exists(self.history_file):
+        history_segment = self.history_journal.path
+        if not os.path.exists(history_segment):
             try:
-                with open(self.history_file, 'w', encoding='utf-8') as f:
-                    json.dump([], f, ensure_ascii=False, indent=2)
-                self._log(f"Created history file: {self.history_file}")
+                with open(history_segment, 'a', encoding='utf-8'):
+                    pass
+                self._log(f"Created history file: {history_segment}")
             except PermissionError:
-                self._log(f"Failed to create history file at {self.history_file}: Permission denied")
+                self._log(f"Failed to create history file at {history_segment}: Permission denied")
             except OSError as e:
                 self._log(f"Failed to create trash directory: {e}")
             except Exception as e:
@@ -150,39 +246,228 @@ class RuletkaShell(Shell):
         :param message: Текст сообщения
         :return: Данная функция ничего не возвращает
         """
-        print(f"Shell init: {message}")
+        # В пакетном режиме вывод принадлежит сценарию, поэтому сообщения попадают только в лог
+        if self.interactive:
+            print(f"Shell init: {message}")
+        else:
+            self.logger.info(f"Shell init: {message}")
 
-    def _load_history(self) -> list:
+    def _load_history(self) -> LazyHistory | list:
         """
-        Загружает историю команд из файла.
-        :return: Список записей истории команд
+        Загружает историю команд из журнала. Если найден файл истории в старом формате
+        (JSON-массив или несегментированный журнал), он однократно переносится в сегменты журнала.
+        Читаются только последние записи (с конца активного сегмента), более старые подгружаются по запросу.
+        :return: Список записей истории команд (ленивое представление LazyHistory)
         """
-        history_data = []
+        history_data: LazyHistory | list = []
         try:
-            if os.path.exists(self.history_file) and os.path.getsize(self.history_file) > 0:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    history_data = json.load(f)
-                self._log(f"Loaded {len(history_data)} history entries")
+            migrated = self.history_journal.migrate_legacy()
+            if migrated:
+                self._log(f"Migrated {migrated} history entries from {self.legacy_history_file} to {self.history_file}")
+
+            # Даже пустая история загружается как LazyHistory: в нее добавляются записи других оболочек
+            history_data = LazyHistory(self.history_journal,
+                                       page_size=HISTORY_CONFIG["startup_entries"]).load_tail()
+            if history_data:
+                self._log(f"Loaded {history_data.loaded_count} recent history entries")
             else:
                 self._log("History file is empty or doesn't exist")
         except (json.JSONDecodeError, IOError) as e:
-            self._log(f"Error loading history: {e}. Try 'rm {os.path.abspath(self.history_file)}' and then relaunch the shell.")
+            self._log(f"Error loading history: {e}. Old entries are removed automatically according to "
+                      f"the retention policy in source/config.py.")
         return history_data
 
-    def _save_history(self) -> None:
+    def _load_undo_stack(self) -> UndoStack:
+        """
+        Загружает стек отменяемых команд. Если файла стека еще нет, стек строится
+        по последним записям истории.
+        :return: Стек отменяемых команд
+        """
+        try:
+            return UndoStack(self.undo_stack_file, depth=HISTORY_CONFIG["undo_depth"],
+                             ttl_days=HISTORY_CONFIG["undo_ttl_days"]).load(
+                seed=self.command_history, scan_limit=HISTORY_CONFIG["startup_entries"])
+        except (json.JSONDecodeError, IOError) as e:
+            self._log(f"Error loading undo stack: {e}. Undo will start from an empty stack.")
+            return UndoStack(self.undo_stack_file, depth=HISTORY_CONFIG["undo_depth"],
+                             ttl_days=HISTORY_CONFIG["undo_ttl_days"])
+
+    def _start_history_writer(self) -> None:
+        """
+        Запускает фоновый писатель журнала истории с политикой надежности из HISTORY_CONFIG.
+        :return: Данная функция ничего не возвращает
+        """
+        self.history_writer = HistoryWriter(
+            self.history_journal,
+            durability=HISTORY_CONFIG["durability"],
+            flush_interval=HISTORY_CONFIG["flush_interval"],
+            batch_size=HISTORY_CONFIG["batch_size"],
+            on_error=self.handle_error,
+            on_merge=self._merge_history,
+            deferred=not self.long_running
+        ).start()
+
+    def _merge_history(self, records: list[dict]) -> None:
+        """
+        Добавляет в историю в памяти команды, выполненные в других оболочках с тем же журналом.
+        :param records: записи журнала, дописанные другими оболочками
+        :return: Данная функция ничего не возвращает
+        """
+        if isinstance(self.command_history, LazyHistory):
+            with self._history_lock:
+                self.command_history.merge(records)
+        for record in records:
+            if 'undone' not in record:
+                self.search_index.add(command_line(record.get('command'), record.get('args')))
+
+    def _start_search_index(self) -> None:
+        """
+        Создает индекс для поиска по истории (Ctrl-R) и заполняет его всем журналом в фоновом потоке,
+        чтобы не задерживать запуск оболочки.
+        :return: Данная функция ничего не возвращает
+        """
+        self.search_index = HistorySearchIndex()
+        if not self.interactive:
+            # Ctrl-R в пакетном режиме недоступен: индекс только пополняется выполненными командами
+            return
+        threading.Thread(target=self.search_index.load_journal, args=(self.history_journal,),
+                         name="RuletkaShell-search-index", daemon=True).start()
+
+    def reverse_search(self, query: str = '') -> str:
+        """
+        Функция для инкрементального поиска по истории (Ctrl-R). Если терминал не поддерживает
+        посимвольный ввод, выводятся последние подходящие команды.
+        :param query: начальный запрос (текст, введенный до нажатия Ctrl-R)
+        :return: строка для выполнения (пустая строка - ничего не выполнять)
+        """
+        terminal.forget_last_input()
+        if not terminal.interactive_available():
+            for line in islice(self.search_index.matches(query), 10):
+                print(line)
+            return ''
+
+        line, execute_now = terminal.reverse_search(self.search_index, query)
+        if line is None:
+            return ''
+        if execute_now:
+            terminal.remember_input(line)
+            print(self.get_prompt() + line)
+            return line
+        # Найденная команда подставляется в следующий ввод для редактирования
+        terminal.prefill_input(line)
+        return ''
+
+    def _start_history_compactor(self) -> None:
+        """
+        Запускает фоновое уплотнение журнала истории по политике хранения из HISTORY_CONFIG.
+        :return: Данная функция ничего не возвращает
+        """
+        self.history_compactor = HistoryCompactor(
+            self.history_journal,
+            max_entries=HISTORY_CONFIG["max_entries"],
+            max_age_days=HISTORY_CONFIG["max_age_days"],
+            max_bytes=HISTORY_CONFIG["max_bytes"],
+            undo_ttl_days=HISTORY_CONFIG["undo_ttl_days"],
+            interval=HISTORY_CONFIG["compaction_interval"],
+            on_error=self.logger.error
+        ).start()
+
+    def _start_trash_evictor(self) -> None:
         """
-        Функция для сохранения истории в файл .history.
+        Запускает фоновое вытеснение объектов из корзин по политике из TRASH_CONFIG.
+        :return: Данная функция ничего не возвращает
+        """
+        self.trash_evictor = TrashEvictor(
+            self.trash_manifest_file,
+            max_bytes=TRASH_CONFIG["max_bytes"],
+            max_age_days=TRASH_CONFIG["max_age_days"],
+            interval=TRASH_CONFIG["eviction_interval"],
+            workers=TRASH_CONFIG["delete_workers"],
+            extra_trash_dirs=[self.trash_dir],
+            on_error=self.logger.error
+        ).start()
+
+    def _close_trash(self) -> None:
+        """
+        Останавливает фоновое вытеснение и закрывает опись корзин.
+        :return: Данная функция ничего не возвращает
+        """
+        if hasattr(self, 'trash_evictor'):
+            self.trash_evictor.stop(timeout=1)
+        if self.trash_manifest is not None:
+            self.trash_manifest.close()
+            self.trash_manifest = None
+
+    def _close_history(self) -> None:
+        """
+        Дописывает в журнал все накопленные записи истории и останавливает фоновые писатель и уплотнение.
+        :return: Данная функция ничего не возвращает
+        """
+        if hasattr(self, 'history_compactor'):
+            self.history_compactor.stop(timeout=1)
+        if hasattr(self, 'history_writer'):
+            self.history_writer.close()
+        if self.history_index is not None:
+            self.history_index.close()
+            self.history_index = None
+
+    def _append_history(self, record: dict) -> None:
+        """
+        Функция для дозаписи одной записи в конец журнала истории (без перезаписи всего файла).
+        Сама запись на диск выполняется фоновым писателем согласно политике надежности.
+        :param record: запись истории или служебная запись об отмене команды
         :return: Данная функция ничего не возвращает
         """
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.command_history, f, ensure_ascii=False, indent=2)
-            if hasattr(self, 'logger'):
-                self.logger.debug(f"Saved {len(self.command_history)} history entries")
+            self.history_writer.submit(record)
         except IOError as e:
             error_msg = f"Failed to save history: {e}"
             self.handle_error(error_msg)
 
+    def query_history(self, command: str | None = None, since: float | None = None, path: str | None = None,
+                      failed: bool = False, limit: int | None = None) -> list:
+        """
+        Функция для поиска по истории через индекс SQLite (.history.db). Индекс открывается
+        при первом запросе и перед каждым запросом догоняет журнал.
+        :param command: имя команды
+        :param since: unix-время, начиная с которого искать
+        :param path: абсолютный путь - команды, затронувшие его или что-то внутри него
+        :param failed: только неуспешные команды
+        :param limit: только столько последних подходящих записей
+        :return: список пар (порядковый номер в истории, запись)
+        """
+        with self._stores_lock:
+            if self.history_index is None:
+                # sqlite3 подгружается только при первом запросе, чтобы не замедлять запуск оболочки
+                from Lab_2_Consoleapp_Python.src.storage.index import HistoryIndex
+                self.history_index = HistoryIndex(self.history_index_file, self.history_journal)
+        self.history_writer.flush()
+        self.history_index.sync()
+        return self.history_index.query(command=command, since=since, path=path, failed=failed, limit=limit)
+
+    def open_trash_manifest(self):
+        """
+        Функция для получения описи корзин (.trash.db). База открывается при первом обращении.
+        :return: опись корзин (TrashManifest)
+        """
+        with self._stores_lock:
+            if self.trash_manifest is None:
+                # sqlite3 подгружается только при первом обращении, чтобы не замедлять запуск оболочки
+                from Lab_2_Consoleapp_Python.src.trash.manifest import TrashManifest
+                self.trash_manifest = TrashManifest(self.trash_manifest_file)
+            return self.trash_manifest
+
+    def _mark_undone(self, history_entry: HistoryEntry) -> None:
+        """
+        Функция для пометки команды как отмененной: очищает данные для отмены в памяти
+        и дописывает в журнал служебную отметку, чтобы команду нельзя было отменить повторно.
+        :param history_entry: запись истории отмененной команды
+        :return: Данная функция ничего не возвращает
+        """
+        with self._history_lock:
+            history_entry.undo_data = None
+            self._append_history({'undone': history_entry.ts})
+
     def add_to_history(self, command: str, args: list[str], success: bool = True, undo_data = None) -> None:
         """
         Функция для добавления выполненной команды в историю.
@@ -193,16 +478,19 @@ class RuletkaShell(Shell):
         :return: Данная функция ничего не возвращает
         """
         # Данные о команде для добавления в историю
-        history_entry = {
-            'timestamp': datetime.datetime.now().isoformat(),
-            'command': command,
-            'args': args,
-            'success': success,
-            'undo_data': undo_data
-        }
-        # Сохранение команды в историю, затем сохранение самой истории
-        self.command_history.append(history_entry)
-        self._save_history()
+        history_entry = HistoryEntry(command, args, success=success, undo_data=undo_data, cwd=self.current_dir)
+        # Фоновые задания добавляют записи по завершении: порядок в памяти, журнале и стеке отмены один и тот же
+        with self._history_lock:
+            # Сохранение команды в историю, затем дозапись ее в журнал
+            self.command_history.append(history_entry)
+            self._append_history(history_entry.to_record())
+            self.search_index.add(command_line(command, args))
+            # Отменяемая команда кладется на вершину стека для undo (в том числе выполненная частично)
+            if undo_data:
+                try:
+                    self.undo_stack.push(history_entry)
+                except IOError as e:
+                    self.handle_error(f"Failed to save undo stack: {e}")
 
     def logging_stat(self) -> None:
         """
@@ -218,8 +506,14 @@ class RuletkaShell(Shell):
         :param message:
         :return: Данная функция ничего не возвращает
         """
+        self._error_count += 1
         self.logger.error(message)
-        print(message)
+        # Внутри call сообщения не выводятся, а передаются вызывающему коду в CommandError
+        captured = getattr(self._local, 'captured_errors', None)
+        if captured is not None:
+            captured.append(message)
+        else:
+            print(message)
 
     def get_prompt(self) -> str:
         """
@@ -246,6 +540,45 @@ class RuletkaShell(Shell):
         args = parts[1:]
         return command, args
 
+    def parse_pipeline(self, input_string: str) -> list[tuple[str, list[str]]]:
+        """
+        Парсинг пользовательского ввода с оператором | (вне кавычек): cat file | grep pattern.
+        :param input_string: введенная пользователем строка
+        :return: список пар (команда, аргументы) - по одной на каждую команду конвейера
+        :raises ValueError: пустая команда между | (например, 'ls |')
+        """
+        stages = _split_unquoted(input_string, '|', comments=False)
+        if len(stages) == 1:
+            command, args = self.parse_input(input_string)
+            return [(command, args)] if command else []
+
+        pipeline = []
+        for stage in stages:
+            command, args = self.parse_input(stage)
+            if command is None:
+                raise ValueError("syntax error near unexpected token '|'")
+            pipeline.append((command, args))
+        return pipeline
+
+    def parse_statement(self, input_string: str) -> list[tuple[list[tuple[str, list[str]]], bool]]:
+        """
+        Парсинг пользовательского ввода с оператором & (вне кавычек): команда перед & выполняется
+        в фоне (zip big big.zip &), после & может идти следующая команда.
+        :param input_string: введенная пользователем строка
+        :return: список пар (конвейер, выполнять в фоне)
+        :raises ValueError: пустая команда перед & или |
+        """
+        parts = _split_unquoted(input_string, '&', comments=False)
+        statements = []
+        for i, part in enumerate(parts):
+            background = i < len(parts) - 1
+            pipeline = self.parse_pipeline(part)
+            if pipeline:
+                statements.append((pipeline, background))
+            elif background:
+                raise ValueError("syntax error near unexpected token '&'")
+        return statements
+
     def is_windows_drive(self, path: str) -> bool:
         """
         Функция для разрешения проблем с путями (для дисков Windows).
@@ -282,14 +615,268 @@ class RuletkaShell(Shell):
 
         return final_path
 
+    def start_job(self, pipeline: list[tuple[str, list[str]]]):
+        """
+        Функция для запуска команды (конвейера) в фоновом потоке. Задание работает в текущем
+        каталоге на момент запуска и записывается в историю по завершении.
+        :param pipeline: список пар (команда, аргументы)
+        :return: запущенное задание (Job)
+        """
+        current_dir = self.current_dir
+        # Задание, запущенное по запросу к serve, пишет клиенту, отправившему запрос (server.ThreadRedirect)
+        output = sys.stdout.current() if hasattr(sys.stdout, 'current') else None
+        errors = sys.stderr.current() if hasattr(sys.stderr, 'current') else None
+
+        def run() -> int:
+            self._local.current_dir = current_dir
+            terminal.detach_input()
+            if output is not None and hasattr(sys.stdout, 'redirect'):
+                sys.stdout.redirect(output)
+            if errors is not None and hasattr(sys.stderr, 'redirect'):
+                sys.stderr.redirect(errors)
+            try:
+                return self.execute_pipeline(pipeline)
+            except Exception as e:
+                self.handle_error(f"Unexpected error: {e}")
+                return 1
+
+        job = self.jobs.start(_pipeline_line(pipeline), run)
+        self.logger.info(f"Started job [{job.id}]: {job.command_line}")
+        if self.interactive:
+            print(f"[{job.id}] {job.command_line}")
+        return job
+
+    def _report_jobs(self) -> None:
+        """
+        Выводит перед приглашением фоновые задания, завершившиеся с прошлого приглашения.
+        :return: Данная функция ничего не возвращает
+        """
+        for job in self.jobs.finished():
+            self.logger.info(f"Job [{job.id}] finished with status {job.status}: {job.command_line}")
+            print(job.describe())
+
+    def close(self) -> None:
+        """
+        Функция для завершения работы без выхода из процесса: дописывает историю
+        и останавливает фоновые потоки.
+        :return: Данная функция ничего не возвращает
+        """
+        self._close_history()
+        self._close_trash()
+
     def exit(self, args = None) -> None:
         """
         :param args: None (нет аргументов)
         :return: Данная функция ничего не возвращает
         """
+        self.close()
         print("Goodbye!")
         exit(0)
 
+    def execute_command(self, command: str, args: list[str]) -> int:
+        """
+        Функция для выполнения одной команды и записи ее в историю.
+        Команда считается неуспешной, если она сообщила об ошибке через handle_error
+        (для cp, mv и rm - также если не вернула данные для отмены).
+        :param command: имя команды
+        :param args: аргументы команды
+        :return: код завершения: 0 - успех, 1 - ошибка, 127 - команда не найдена
+        """
+        if command not in self.commands:
+            self.handle_error(f"{command}: command not found")
+            self.add_to_history(command, args, success=False)
+            return 127
+
+        errors = self._error_count
+        invocation = Invocation()
+        result = self.commands[command](args)
+        invocation.stop()
+        success = self._record_command(command, args, result, errors)
+        self.metrics.record(invocation, [(command, args)], success)
+        return 0 if success else 1
+
+    def _record_command(self, command: str, args: list[str], result, errors: int) -> bool:
+        """
+        Вспомогательная функция. Определяет успешность выполненной команды и записывает ее в историю.
+        :param command: имя команды
+        :param args: аргументы команды
+        :param result: значение, которое вернула команда (для cp, mv и rm - данные для отмены)
+        :param errors: число ошибок потока до выполнения команды
+        :return: True, если команда выполнилась успешно
+        """
+        success = self._error_count == errors
+        undo_data = None
+        if command in ['cp', 'mv', 'rm']:
+            # Частичная ошибка (rm a missing b) делает команду неуспешной, но то, что уже сделано, можно отменить
+            success = success and result is not None
+            undo_data = result
+
+        self.add_to_history(command, args, success=success, undo_data=undo_data)
+        return success
+
+    def call(self, command: str, *args, stdin=None):
+        """
+        Функция для вызова команды из Python-кода. Команды с результатами (ls, grep, history, jobs, cat)
+        возвращают объекты вместо форматированного вывода: строки не раскрашиваются и не печатаются.
+        Остальные команды выполняются как в консоли. Вызов записывается в историю (cp, mv и rm можно отменить).
+        :param command: имя команды
+        :param args: аргументы команды (приводятся к str, можно передавать pathlib.Path)
+        :param stdin: строки для команд, читающих вывод предыдущей команды (grep без пути, cat без файла)
+        :return: список результатов (FileInfo для ls, Match для grep, пары (номер, HistoryEntry) для history,
+        Job для jobs, строки для cat) или None для команд без результатов
+        :raises CommandError: команда не найдена или сообщила об ошибке
+        """
+        argv = [str(arg) for arg in args]
+        if command not in self.commands:
+            self.logger.error(f"{command}: command not found")
+            self.add_to_history(command, argv, success=False)
+            raise CommandError(command, [f"{command}: command not found"])
+
+        results = get_results(command) if command in COMMAND_MODULES else None
+        errors = self._error_count
+        previous = getattr(self._local, 'captured_errors', None)
+        captured = self._local.captured_errors = []
+        invocation = Invocation()
+        try:
+            if results is None:
+                result = self.commands[command](argv)
+                values = None
+            else:
+                # Результаты собираются здесь, чтобы ошибки при чтении файлов попали в CommandError
+                result = values = results(self, argv, stdin)
+                if values is not None:
+                    values = list(values)
+        finally:
+            self._local.captured_errors = previous
+        invocation.stop()
+
+        success = self._record_command(command, argv, result, errors)
+        self.metrics.record(invocation, [(command, argv)], success)
+        if not success:
+            raise CommandError(command, captured)
+        return values
+
+    def execute_pipeline(self, pipeline: list[tuple[str, list[str]]]) -> int:
+        """
+        Функция для выполнения конвейера: вывод каждой команды лениво передается следующей
+        (генераторы строк, stream в модулях команд), поэтому строки читаются и обрабатываются
+        по одной по мере вывода последней командой, и полный вывод нигде не накапливается.
+        Подсветка (grep, ls) включается только у последней команды: остальные передают дальше
+        исходный текст без escape-последовательностей. Каждая команда конвейера записывается в историю отдельно.
+        :param pipeline: список пар (команда, аргументы)
+        :return: код завершения: 0 - успех, 1 - ошибка, 127 - команда не найдена
+        """
+        if len(pipeline) == 1:
+            return self.execute_command(*pipeline[0])
+
+        errors = self._error_count
+        invocation = Invocation()
+        status = 0
+        output = None
+        last = len(pipeline) - 1
+        for index, (command, args) in enumerate(pipeline):
+            if command not in COMMAND_MODULES:
+                message = "command not found" if command not in self.commands else "cannot be used in a pipeline"
+                self.handle_error(f"{command}: {message}")
+                status = 127 if command not in self.commands else 1
+                break
+            stream = get_stream(command)
+            if stream is None:
+                self.handle_error(f"{command}: cannot be used in a pipeline")
+                status = 1
+                break
+            output = stream(self, args, output, color=index == last)
+            if output is None:
+                status = 1
+                break
+
+        if not status and output is not None:
+            for line in output:
+                print(line)
+            if self._error_count != errors:
+                status = 1
+        invocation.stop()
+
+        for command, args in pipeline:
+            self.add_to_history(command, args, success=not status)
+        # Команды конвейера выполняются вперемешку, поэтому замеряется конвейер целиком
+        if status != 127:
+            self.metrics.record(invocation, pipeline, not status)
+        return status
+
+    def parse_script(self, script: str) -> list[tuple[list[tuple[str, list[str]]], bool]]:
+        """
+        Парсинг сценария: команды разделяются переводами строк и ';' (вне кавычек),
+        пустые строки и комментарии (#) пропускаются. Каждая команда может быть конвейером (|)
+        и может выполняться в фоне (&).
+        :param script: текст сценария или строки -c
+        :return: список пар (конвейер, выполнять в фоне); конвейер - список пар (команда, аргументы)
+        :raises ValueError: незакрытая кавычка или пустая команда конвейера
+        """
+        statements = []
+        for line in script.splitlines():
+            for statement in _split_unquoted(line, ';'):
+                # Незакрытая кавычка - ошибка разбора (а не разбиение по пробелам, как в интерактивном вводе)
+                shlex.split(statement)
+                statements.extend(self.parse_statement(statement))
+        return statements
+
+    def run_script(self, script: str, stop_on_error: bool = False, cwd: str | None = None) -> int:
+        """
+        Функция для выполнения сценария без интерактивного цикла: сценарий разбирается целиком
+        до выполнения, приглашения и приветствие не выводятся.
+        :param script: текст сценария или строки -c
+        :param stop_on_error: прекратить выполнение после первой неуспешной команды (как sh -e)
+        :param cwd: выполнить сценарий в этом каталоге, не меняя текущий каталог оболочки
+        (запросы к serve из разных каталогов выполняются одновременно)
+        :return: код завершения: 0, если все команды успешны, иначе код последней неуспешной
+        команды (2 - ошибка разбора сценария); exit [n] завершает сценарий с кодом n
+        """
+        if cwd is not None:
+            previous_dir = getattr(self._local, 'current_dir', None)
+            self._local.current_dir = cwd
+            try:
+                return self.run_script(script, stop_on_error)
+            finally:
+                self._local.current_dir = previous_dir
+
+        try:
+            statements = self.parse_script(script)
+        except ValueError as e:
+            self.handle_error(f"syntax error: {e}")
+            return 2
+
+        status = 0
+        jobs = []
+        for pipeline, background in statements:
+            command, args = pipeline[0]
+            self.logger.debug(_pipeline_line(pipeline) + (" &" if background else ""))
+            if background:
+                jobs.append(self.start_job(pipeline))
+                continue
+            if command == 'exit' and len(pipeline) == 1:
+                if args:
+                    try:
+                        status = int(args[0])
+                    except ValueError:
+                        self.handle_error(f"exit: {args[0]}: numeric argument required")
+                        status = 2
+                break
+            try:
+                code = self.execute_pipeline(pipeline)
+            except Exception as e:
+                self.handle_error(f"Unexpected error: {e}")
+                code = 1
+            if code:
+                status = code
+                if stop_on_error:
+                    break
+        # Сценарий завершается после своих фоновых заданий, чтобы их вывод и история не потерялись
+        for job in jobs:
+            job.wait()
+            self.jobs.forget(job)
+        return status
+
     def run(self) -> None:
         """
         Функция для вывода приветственного сообщения и запуска работы программы (парсинга команд).
@@ -297,42 +884,94 @@ class RuletkaShell(Shell):
         """
 
         print("Welcome to RuletkaShell. \nType 'help' for available commands.")
+        terminal.setup_readline()
+        warned_jobs = False
 
-        while (user_input := input(self.get_prompt()).strip()) != "exit":
+        while True:
             try:
+                self._report_jobs()
+                # Чтение ввода внутри try, чтобы EOF (Ctrl-D) и Ctrl-C на приглашении
+                # тоже завершали работу корректно (с дозаписью истории)
+                user_input = input(self.get_prompt()).strip()
+                # Ctrl-R: поиск по истории, найденная команда выполняется как введенная вручную
+                if user_input.startswith(terminal.REVERSE_SEARCH_PREFIX):
+                    user_input = self.reverse_search(user_input[len(terminal.REVERSE_SEARCH_PREFIX):].strip())
+                if user_input == "exit":
+                    # Как в bash: о незавершенных заданиях предупреждается один раз, повторный exit завершает работу
+                    if self.jobs.running() and not warned_jobs:
+                        warned_jobs = True
+                        print("There are running jobs (see 'jobs'). Type 'exit' again to quit anyway.")
+                        continue
+                    break
                 if not user_input:
                     continue
+                warned_jobs = False
 
-                command, args = self.parse_input(user_input)
+                try:
+                    statements = self.parse_statement(user_input)
+                except ValueError as e:
+                    self.handle_error(str(e))
+                    continue
                 self.logger.debug(user_input)
 
-                if command in self.commands:
-                    result = self.commands[command](args)
-
-                    success = True
-                    undo_data = None
-
-                    if command in ['cp', 'mv', 'rm']:
-                        success = result is not None
-                        undo_data = result if success else None
+                for pipeline, background in statements:
+                    if background:
+                        self.start_job(pipeline)
                     else:
-                        success = True
-                        undo_data = None
-
-                    self.add_to_history(command, args, success=success, undo_data=undo_data)
-                else:
-                    self.handle_error(f"{command}: command not found")
-                    self.add_to_history(command, args, success=False)
+                        self.execute_pipeline(pipeline)
 
             except KeyboardInterrupt:
                 self.logger.info("KeyboardInterrupt received")
                 print("\nUse 'exit' to quit")
             except EOFError:
                 self.logger.info("EOF received - exiting")
-                print("\nGoodbye!")
+                print()
                 break
             except Exception as e:
                 self.handle_error(f"Unexpected error: {e}")
 
         # Обработка команды "exit"
-        self.exit()
\ No newline at end of file
+        self.exit()
+
+
+def _pipeline_line(pipeline: list[tuple[str, list[str]]]) -> str:
+    """
+    Вспомогательная функция. Собирает конвейер обратно в строку для лога и таблицы заданий.
+    :param pipeline: список пар (команда, аргументы)
+    :return: строка вида cat a.txt | grep x
+    """
+    return " | ".join(shlex.join([command, *args]) for command, args in pipeline)
+
+
+def _split_unquoted(line: str, separator: str, comments: bool = True) -> list[str]:
+    """
+    Вспомогательная функция. Делит строку по разделителю (';' между командами сценария,
+    '|' между командами конвейера) вне кавычек и отбрасывает комментарий (# в начале слова вне кавычек).
+    :param line: строка сценария или пользовательского ввода
+    :param separator: символ-разделитель
+    :param comments: отбрасывать комментарии
+    :return: части строки
+    """
+    statements: list[str] = []
+    current: list[str] = []
+    quote = None
+    escaped = False
+    for char in line:
+        if escaped:
+            escaped = False
+        elif char == '\\' and quote != "'":
+            escaped = True
+        elif quote:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == separator:
+            statements.append(''.join(current))
+            current = []
+            continue
+        elif comments and char == '#' and (not current or current[-1].isspace()):
+            break
+        current.append(char)
+    statements.append(''.join(current))
+    return statements
@@ -0,0 +1,265 @@
+"""
+Режим serve: одна "теплая" оболочка RuletkaShell принимает строки команд на Unix-сокете
+(клиент - client.py) и не тратит время на запуск интерпретатора, настройку логирования
+и загрузку истории для каждой команды. Каждый запрос выполняется в своем потоке,
+в каталоге клиента и со своим выводом, который по мере записи отправляется клиенту.
+"""
+import io
+import os
+import sys
+import stat
+import signal
+import socket
+import socketserver
+import threading
+from Lab_2_Consoleapp_Python.src.ruletka_shell import RuletkaShell
+from Lab_2_Consoleapp_Python.src.client import (FRAME_HEADER, REQUEST, OUTPUT, EXIT, default_socket_path,
+                                                 socket_directory, decode_request, recv_frame)
+
+# Размер буфера вывода запроса: отправляется клиенту при заполнении и по завершении команд
+_OUTPUT_BUFFER = 64 * 1024
+# Наибольший размер запроса (сценарий с каталогом), байт
+_MAX_REQUEST = 1024 * 1024
+
+
+class ThreadRedirect(io.TextIOBase):
+    """
+    Замена sys.stdout (и sys.stderr): запись из потока, для которого задан свой поток вывода (запрос к серверу),
+    идет в него, из остальных потоков - в исходный поток (default).
+    """
+    encoding = 'utf-8'
+
+    def __init__(self, default) -> None:
+        self.default = default
+        self._local = threading.local()
+
+    def redirect(self, stream) -> None:
+        """
+        :param stream: поток вывода текущего потока выполнения (None - исходный sys.stdout)
+        :return: Данная функция ничего не возвращает
+        """
+        self._local.stream = stream
+
+    def current(self):
+        """
+        :return: поток вывода, заданный для текущего потока выполнения, или None
+        """
+        return getattr(self._local, 'stream', None)
+
+    def write(self, data: str) -> int:
+        return (self.current() or self.default).write(data)
+
+    def flush(self) -> None:
+        (self.current() or self.default).flush()
+
+    def writable(self) -> bool:
+        return True
+
+
+class _FrameWriter(io.TextIOBase):
+    """
+    Поток вывода одного запроса: текст копится в буфере и отправляется клиенту кадрами OUTPUT.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._buffer: list[bytes] = []
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def write(self, data: str) -> int:
+        encoded = data.encode('utf-8', errors='replace')
+        with self._lock:
+            self._buffer.append(encoded)
+            self._size += len(encoded)
+            if self._size >= _OUTPUT_BUFFER:
+                self._send_buffer()
+        return len(data)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._send_buffer()
+
+    def writable(self) -> bool:
+        return True
+
+    def _send_buffer(self) -> None:
+        if self._size:
+            data = b''.join(self._buffer)
+            self._buffer, self._size = [], 0
+            self._sock.sendall(FRAME_HEADER.pack(OUTPUT, len(data)) + data)
+
+    def send_exit(self, status: int) -> None:
+        """
+        Отправляет остаток вывода и код завершения.
+        :param status: код завершения команд
+        :return: Данная функция ничего не возвращает
+        """
+        data = str(status).encode()
+        with self._lock:
+            self._send_buffer()
+            self._sock.sendall(FRAME_HEADER.pack(EXIT, len(data)) + data)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    server: 'ShellServer'
+
+    def handle(self) -> None:
+        shell = self.server.shell
+        writer = _FrameWriter(self.request)
+        try:
+            kind, data = recv_frame(self.request, _MAX_REQUEST)
+            if kind != REQUEST:
+                raise ValueError(f"unexpected frame {kind!r}")
+            command, cwd, stop_on_error = decode_request(data)
+        except (ValueError, ConnectionError) as e:
+            shell.logger.error(f"serve: malformed request: {e}")
+            writer.write("serve: malformed request\n")
+            writer.send_exit(2)
+            return
+
+        shell.logger.info(f"serve: {command!r} in {cwd}")
+        self.server.output.redirect(writer)
+        self.server.errors.redirect(writer)
+        try:
+            # Запрос выполняется в каталоге клиента, текущий каталог сервера не меняется
+            status = shell.run_script(command, stop_on_error=stop_on_error,
+                                      cwd=cwd if os.path.isdir(cwd) else shell.current_dir)
+        except Exception as e:
+            shell.handle_error(f"Unexpected error: {e}")
+            status = 1
+        finally:
+            self.server.output.redirect(None)
+            self.server.errors.redirect(None)
+        try:
+            writer.send_exit(status)
+        except OSError:
+            shell.logger.info("serve: client disconnected before the end of output")
+
+
+class ShellServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Сервер оболочки на Unix-сокете. Сокет доступен только владельцу (права 0600),
+    так как через него выполняются произвольные команды от имени пользователя.
+    """
+    daemon_threads = True
+    shell: RuletkaShell
+    output: ThreadRedirect
+    errors: ThreadRedirect
+
+    def __init__(self, shell: RuletkaShell, socket_path: str | None = None) -> None:
+        """
+        :param shell: инициализированная оболочка (RuletkaShell.create(interactive=False, long_running=True))
+        :param socket_path: путь до сокета (по умолчанию client.default_socket_path())
+        :return: Данная функция ничего не возвращает
+        """
+        self.shell = shell
+        # Вывод запросов: sys.stdout и sys.stderr подменяются им на время serve_forever
+        self.output = ThreadRedirect(sys.stdout)
+        self.errors = ThreadRedirect(sys.stderr)
+        self.socket_path = socket_path or default_socket_path()
+        if os.path.dirname(self.socket_path) == socket_directory():
+            _ensure_private_directory(socket_directory())
+        _remove_stale_socket(self.socket_path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(self.socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """
+        Принимает запросы до вызова shutdown (или Ctrl-C).
+        :param poll_interval: как часто проверять запрос на остановку, секунд
+        :return: Данная функция ничего не возвращает
+        """
+        stdout, stderr, stdin = sys.stdout, sys.stderr, sys.stdin
+        self.output.default = stdout
+        self.errors.default = stderr
+        sys.stdout, sys.stderr = self.output, self.errors
+        # У команд нет терминала: подтверждения (rm -r, trash purge) получают EOF, а не ввод сервера
+        sys.stdin = io.StringIO()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            sys.stdout, sys.stderr, sys.stdin = stdout, stderr, stdin
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def _ensure_private_directory(directory: str) -> None:
+    """
+    Вспомогательная функция. Создает каталог сокета с правами 0700 и проверяет, что он принадлежит
+    пользователю и закрыт для остальных: иначе другой пользователь может подменить сокет.
+    :param directory: каталог сокета
+    :raises OSError: каталог не принадлежит пользователю, доступен другим или является ссылкой
+    """
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if stat.S_ISLNK(info.st_mode) or not stat.S_ISDIR(info.st_mode):
+        raise OSError(f"socket directory {directory} is not a directory")
+    if info.st_uid != os.getuid():
+        raise OSError(f"socket directory {directory} is owned by another user")
+    if info.st_mode & 0o077:
+        raise OSError(f"socket directory {directory} is accessible to other users")
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Вспомогательная функция. Удаляет сокет, оставшийся после завершившегося сервера.
+    :param socket_path: путь до сокета
+    :raises OSError: по этому пути уже работает другой сервер или лежит чужой файл
+    """
+    try:
+        info = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise OSError(f"{socket_path} exists and is not a socket of this user")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except FileNotFoundError:
+            return
+        except OSError:
+            os.unlink(socket_path)
+            return
+    raise OSError(f"a shell server is already listening on {socket_path}")
+
+
+def serve(socket_path: str | None = None) -> int:
+    """
+    Функция для запуска оболочки в режиме serve (до Ctrl-C или SIGTERM).
+    :param socket_path: путь до сокета (по умолчанию client.default_socket_path())
+    :return: код завершения
+    """
+    shell = RuletkaShell.create(interactive=False, long_running=True)
+    try:
+        server = ShellServer(shell, socket_path)
+    except OSError as e:
+        print(f"serve: {e}", file=sys.stderr)
+        shell.close()
+        return 1
+
+    # SIGTERM (systemd, kill) завершает сервер так же, как Ctrl-C: с дозаписью истории
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    print(f"Serving RuletkaShell on {server.socket_path} (Ctrl-C to stop)")
+    shell.logger.info(f"serve: listening on {server.socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        shell.jobs.wait_all()
+        shell.close()
+        shell.logger.info("serve: stopped")
+    return 0
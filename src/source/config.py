@@ -11,8 +11,9 @@ LOGGING_CONFIG = {
         }
     },
     "handlers": {
+        # Запись в файл выполняется фоновым потоком: вызов логгера в команде - только запись в очередь
         "file": {
-            "class": "logging.handlers.RotatingFileHandler",
+            "class": "Lab_2_Consoleapp_Python.src.source.log_queue.QueueRotatingFileHandler",
             "formatter": "standard",
             "mode": "a",
             "filename": "shell.log",
@@ -26,6 +27,62 @@ LOGGING_CONFIG = {
             "handlers": ["file"],
             "level": "DEBUG",
             "propagate": True,
-        }
+        },
+        # Уровни отдельных команд: команды пишут в логгеры RuletkaShell.<команда>.
+        # Построчная отладка cat (каждая выведенная строка) включается уровнем DEBUG
+        "RuletkaShell.cat": {
+            "level": "INFO",
+        },
     },
 }
+
+
+# Построчная отладка команд: в лог попадает каждая N-я строка (1 - все строки).
+# Действует, только если у логгера команды включен уровень DEBUG
+LINE_LOG_SAMPLING = {
+    "cat": 1000,
+}
+
+
+HISTORY_CONFIG: dict = {
+    # Политика надежности записи истории:
+    # "none"    - фоновая запись пачками без fsync (самая быстрая, при сбое ОС теряется кэш);
+    # "batched" - фоновая запись пачками с fsync после каждой пачки (group commit);
+    # "fsync"   - синхронная запись с fsync после каждой команды (самая надежная).
+    "durability": "batched",
+    "flush_interval": 1.0,  # секунд ожидания записи в очереди до сброса пачки
+    "batch_size": 64,  # записей в очереди, при котором пачка пишется сразу
+    "startup_entries": 1000,  # сколько последних записей читается при запуске (остальные - по запросу)
+    "segment_bytes": 4 * 1024 * 1024,  # 4 MB - размер сегмента журнала, после которого начинается новый
+    # Политика хранения (None - без ограничения). Лишнее удаляется фоновым уплотнением
+    # целыми сегментами, начиная с самых старых
+    "max_entries": 200_000,
+    "max_age_days": 365,
+    "max_bytes": 64 * 1024 * 1024,  # 64 MB на все сегменты
+    "undo_ttl_days": 30,  # более старые команды не отменяются (их данные для отмены удаляются при уплотнении)
+    "compaction_interval": 3600,  # секунд между проходами фонового уплотнения
+    "undo_depth": 100,  # сколько последних команд cp/mv/rm можно отменить
+}
+
+
+TRASH_CONFIG: dict = {
+    # Имя каталога корзины в точке монтирования каждой файловой системы, с которой что-либо удаляли.
+    # Файлы с того же устройства, что и оболочка, попадают в ее собственную корзину (.trash)
+    "dir_name": ".ruletka-trash",
+    # Политика вытеснения (None - без ограничения): объекты старше max_age_days и самые давно
+    # удаленные объекты сверх max_bytes удаляются окончательно фоновым потоком
+    "max_bytes": 10 * 1024 * 1024 * 1024,  # 10 GB на все корзины
+    "max_age_days": 30,
+    "eviction_interval": 600,  # секунд между проходами фонового вытеснения
+    "delete_workers": 8,  # потоков, параллельно удаляющих большие деревья каталогов
+}
+
+
+METRICS_CONFIG: dict = {
+    "slowest": 10,  # сколько самых долгих вызовов за сессию показывает stats
+    # Подсчет файловых операций команд (колонка files в stats) через sys.addaudithook. Хук нельзя снять:
+    # он вызывается на каждое событие аудита (open, import, compile, id...) во всех потоках процесса,
+    # в том числе в программах, использующих RuletkaShell.call, поэтому по умолчанию выключен
+    # (включается и командой stats --files до конца сессии)
+    "count_files": False,
+}
@@ -0,0 +1,20 @@
+import logging
+from Lab_2_Consoleapp_Python.src.source.config import LINE_LOG_SAMPLING
+
+
+def line_tracer(logger: logging.Logger, command: str):
+    """
+    Функция для построчной отладки команды (например, каждой строки, выведенной cat).
+    Уровень проверяется один раз на команду, поэтому при выключенном DEBUG строки не стоят ничего.
+    :param logger: логгер команды (RuletkaShell.<команда>)
+    :param command: имя команды (ключ LINE_LOG_SAMPLING)
+    :return: функция trace(номер строки, строка) или None, если DEBUG для команды выключен
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return None
+    every = max(LINE_LOG_SAMPLING.get(command, 1), 1)
+
+    def trace(line_number: int, line: str) -> None:
+        if (line_number - 1) % every == 0:
+            logger.debug("line %d: %r", line_number, line)
+    return trace
@@ -0,0 +1,100 @@
+"""
+Асинхронное логирование: вызов logger.debug/info/error в потоке команды только кладет запись
+в очередь, а форматирование, запись в файл и проверки ротации выполняет отдельный поток
+(QueueListener). Записи из рабочих процессов принимаются через очередь multiprocessing
+и пишутся тем же потоком в тот же файл.
+"""
+import queue
+import logging
+import logging.handlers
+import threading
+
+
+class QueueRotatingFileHandler(logging.handlers.QueueHandler):
+    """
+    Обработчик для LOGGING_CONFIG: те же параметры, что у RotatingFileHandler, но запись в файл
+    выполняется в фоновом потоке. Очередь дописывается при закрытии (logging.shutdown при выходе).
+    """
+
+    def __init__(self, filename: str, mode: str = 'a', maxBytes: int = 0, backupCount: int = 0,
+                 encoding: str | None = None, delay: bool = False) -> None:
+        """
+        :param filename: путь до файла лога
+        :param mode: режим открытия файла
+        :param maxBytes: размер файла, после которого он ротируется (0 - без ротации)
+        :param backupCount: сколько старых файлов хранить
+        :param encoding: кодировка файла
+        :param delay: открывать файл только при первой записи
+        :return: Данная функция ничего не возвращает
+        """
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.handlers.RotatingFileHandler(filename, mode, maxBytes, backupCount, encoding, delay)
+        listener = logging.handlers.QueueListener(self.queue, self.target)
+        listener.start()
+        self._listener: logging.handlers.QueueListener | None = listener
+        self._process_queue = None
+        self._process_listener: logging.handlers.QueueListener | None = None
+        self._process_lock = threading.Lock()
+
+    def setFormatter(self, fmt: logging.Formatter | None) -> None:
+        # Сообщение форматируется в потоке записи, а не в потоке, вызвавшем логгер
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Очередь внутри процесса: запись не нужно сериализовать, поэтому сообщение
+        # с аргументами собирается только в потоке записи
+        return record
+
+    def process_queue(self):
+        """
+        Очередь для записей из рабочих процессов (см. configure_worker). Создается при первом
+        обращении, чтобы multiprocessing не загружался при запуске оболочки.
+        :return: очередь multiprocessing.Queue
+        """
+        with self._process_lock:
+            if self._process_queue is None:
+                import multiprocessing
+                self._process_queue = multiprocessing.Queue()
+                self._process_listener = logging.handlers.QueueListener(self._process_queue, self.target)
+                self._process_listener.start()
+            return self._process_queue
+
+    def close(self) -> None:
+        # Остановка слушателей дописывает все записи, оставшиеся в очередях
+        with self._process_lock:
+            listeners = (self._listener, self._process_listener)
+            self._listener = self._process_listener = None
+        for listener in listeners:
+            if listener is not None:
+                listener.stop()
+        self.target.close()
+        super().close()
+
+
+def process_log_queue(logger: logging.Logger):
+    """
+    Функция для передачи логирования в рабочие процессы команды.
+    :param logger: логгер оболочки
+    :return: очередь для configure_worker или None, если логгер пишет не через QueueRotatingFileHandler
+    """
+    for handler in logger.handlers:
+        if isinstance(handler, QueueRotatingFileHandler):
+            return handler.process_queue()
+    return None
+
+
+def configure_worker(log_queue, name: str = "RuletkaShell", level: int = logging.DEBUG) -> None:
+    """
+    Инициализатор рабочего процесса (ProcessPoolExecutor(initializer=configure_worker, initargs=(queue,))):
+    записи логгера процесса отправляются в очередь оболочки. Обработчики, унаследованные при fork,
+    убираются: их поток записи остался в родительском процессе.
+    :param log_queue: очередь из process_log_queue
+    :param name: имя логгера
+    :param level: уровень логирования в процессе
+    :return: Данная функция ничего не возвращает
+    """
+    logger = logging.getLogger(name)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import threading
+from Lab_2_Consoleapp_Python.src.storage.entry import to_epoch
+from Lab_2_Consoleapp_Python.src.storage.journal import encode_record, _count_file_entries, _read_file_tail, \
+    _UNDO_MARKER_PREFIX
+from Lab_2_Consoleapp_Python.src.storage.locking import file_lock
+
+_DAY = 24 * 60 * 60
+
+
+class HistoryCompactor:
+    """
+    Уплотнение журнала истории по политике хранения. Работает только с закрытыми сегментами
+    (активный сегмент дописывается оболочкой и не трогается):
+    - самые старые сегменты удаляются целиком, пока история превышает max_entries / max_bytes
+      или пока все записи сегмента старше max_age_days;
+    - оставшиеся сегменты переписываются без устаревших записей, без отметок об отмене
+      (они применяются к своим командам) и без undo_data у команд старше undo_ttl_days.
+    Благодаря этому объем истории, который оболочка читает при запуске, остается ограниченным.
+    Оболочки дописывают только активный сегмент, поэтому закрытые сегменты переписываются
+    без блокировки записи; одновременно уплотнение выполняет только одна оболочка.
+    """
+    def __init__(self, journal, max_entries: int | None = None, max_age_days: float | None = None,
+                 max_bytes: int | None = None, undo_ttl_days: float | None = None,
+                 interval: float = 3600.0, on_error=None) -> None:
+        """
+        :param journal: журнал истории (HistoryJournal)
+        :param max_entries: сколько записей хранить (None - без ограничения)
+        :param max_age_days: сколько дней хранить записи (None - без ограничения)
+        :param max_bytes: сколько байт могут занимать все сегменты (None - без ограничения)
+        :param undo_ttl_days: сколько дней команду можно отменить; у более старых записей
+                              undo_data удаляется (None - не удалять)
+        :param interval: период фонового уплотнения в секундах
+        :param on_error: функция, которой передается сообщение об ошибке уплотнения
+        :return: Данная функция ничего не возвращает
+        """
+        self.journal = journal
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self.undo_ttl_days = undo_ttl_days
+        self.interval = interval
+        self.on_error = on_error
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "HistoryCompactor":
+        """
+        Запускает фоновый поток, который уплотняет журнал сразу и затем раз в interval секунд.
+        :return: Сам компактор (для удобства цепочки вызовов)
+        """
+        self._thread = threading.Thread(target=self._run, name="history-compactor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Останавливает фоновый поток (текущий проход уплотнения дорабатывает до конца).
+        :param timeout: сколько секунд ждать завершения потока
+        :return: Данная функция ничего не возвращает
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.compact()
+            except OSError as e:
+                if self.on_error is not None:
+                    self.on_error(f"Failed to compact history: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def compact(self, now: float | None = None) -> dict:
+        """
+        Выполняет один проход уплотнения.
+        :param now: текущее unix-время (для тестов)
+        :return: статистика прохода: removed_segments, rewritten_segments, dropped_entries
+        """
+        stats = {'removed_segments': 0, 'rewritten_segments': 0, 'dropped_entries': 0}
+        # Уплотнение выполняет только одна из одновременно работающих оболочек
+        with file_lock(self.journal.lock_path + '.compact', blocking=False) as acquired:
+            if acquired:
+                self._compact(time.time() if now is None else now, stats)
+        return stats
+
+    def _compact(self, now: float, stats: dict) -> None:
+        """
+        Один проход уплотнения (выполняется под блокировкой уплотнения).
+        :param now: текущее unix-время
+        :param stats: статистика прохода, заполняется на месте
+        :return: Данная функция ничего не возвращает
+        """
+        segments = self.journal.segments()
+        if len(segments) < 2:
+            return
+
+        sealed = segments[:-1]
+        age_cutoff = now - self.max_age_days * _DAY if self.max_age_days is not None else None
+        undo_cutoff = now - self.undo_ttl_days * _DAY if self.undo_ttl_days is not None else None
+
+        # 1. Удаление самых старых сегментов целиком
+        sizes = {seq: os.path.getsize(path) for seq, path in segments}
+        counts = {seq: _count_file_entries(path) for seq, path in segments} if self.max_entries is not None else {}
+        total_bytes = sum(sizes.values())
+        total_entries = sum(counts.values())
+        kept = []
+        for position, (seq, path) in enumerate(sealed):
+            over_entries = self.max_entries is not None and total_entries - counts[seq] >= self.max_entries
+            over_bytes = self.max_bytes is not None and total_bytes > self.max_bytes
+            expired = age_cutoff is not None and self._newest_ts(path) < age_cutoff
+            if not (over_entries or over_bytes or expired):
+                kept = sealed[position:]
+                break
+            os.remove(path)
+            stats['removed_segments'] += 1
+            stats['dropped_entries'] += counts.get(seq, 0)
+            total_bytes -= sizes[seq]
+            total_entries -= counts.get(seq, 0)
+
+        # 2. Перезапись оставшихся закрытых сегментов
+        undone = self._collect_undone([path for _, path in kept] + [segments[-1][1]])
+        for seq, path in kept:
+            dropped = self._rewrite(path, undone, age_cutoff, undo_cutoff)
+            if dropped is not None:
+                stats['rewritten_segments'] += 1
+                stats['dropped_entries'] += dropped
+
+    @staticmethod
+    def _newest_ts(path: str) -> float:
+        """
+        :param path: путь до сегмента
+        :return: время самой новой записи сегмента (читается только конец файла)
+        """
+        records, _ = _read_file_tail(path, 1, None, 4096)
+        times = [record['ts'] if 'ts' in record else to_epoch(record.get('timestamp'))
+                 for record in records if 'undone' not in record]
+        return max(times, default=0.0)
+
+    @staticmethod
+    def _collect_undone(paths: list[str]) -> set[float]:
+        """
+        Собирает времена отмененных команд из отметок об отмене (остальные строки не разбираются).
+        :param paths: пути до сегментов
+        :return: множество unix-времен отмененных команд
+        """
+        undone = set()
+        for path in paths:
+            with open(path, 'rb') as f:
+                for line in f:
+                    if line.startswith(_UNDO_MARKER_PREFIX):
+                        try:
+                            undone.add(to_epoch(json.loads(line)['undone']))
+                        except (ValueError, KeyError):
+                            continue
+        return undone
+
+    def _rewrite(self, path: str, undone: set[float], age_cutoff: float | None,
+                 undo_cutoff: float | None) -> int | None:
+        """
+        Переписывает закрытый сегмент через временный файл, если в нем есть что уплотнять.
+        :param path: путь до сегмента
+        :param undone: времена отмененных команд
+        :param age_cutoff: записи старше этого времени удаляются (None - не удалять)
+        :param undo_cutoff: у записей старше этого времени удаляется undo_data (None - не удалять)
+        :return: количество удаленных записей или None, если сегмент не изменился
+        """
+        records, _ = self.journal.read_segment(path)
+        kept = []
+        dropped = 0
+        changed = False
+        for record in records:
+            if 'undone' in record:
+                changed = True
+                continue
+            ts = record['ts'] if 'ts' in record else to_epoch(record.get('timestamp'))
+            if age_cutoff is not None and ts < age_cutoff:
+                changed = True
+                dropped += 1
+                continue
+            if record.get('undo_data') and (ts in undone or (undo_cutoff is not None and ts < undo_cutoff)):
+                record['undo_data'] = None
+                changed = True
+            kept.append(record)
+
+        if not changed:
+            return None
+        if not kept:
+            os.remove(path)
+            return dropped
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(encode_record(record) for record in kept))
+        os.replace(tmp_path, path)
+        return dropped
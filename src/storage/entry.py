@@ -0,0 +1,107 @@
+import sys
+import time
+import datetime
+
+
+def to_epoch(timestamp) -> float:
+    """
+    Переводит временную метку записи истории в unix-время.
+    Новые записи хранят число (поле ts), старые - ISO-строку (поле timestamp).
+    :param timestamp: число или ISO-строка
+    :return: unix-время (0.0, если метку не удалось разобрать)
+    """
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        return datetime.datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _intern_arg(arg: str) -> str:
+    """
+    Интернирует короткие флаги (-r, -l, ...), которые повторяются в тысячах записей.
+    Остальные аргументы (пути, шаблоны) не интернируются, чтобы не держать их в памяти вечно.
+    """
+    return sys.intern(arg) if arg.startswith('-') and len(arg) <= 8 else arg
+
+
+class HistoryEntry:
+    """
+    Компактная запись истории команд в памяти.
+    Вместо словаря с пятью строковыми ключами используется объект со __slots__:
+    имя команды и каталог интернируются (одна строка на все записи), время хранится
+    как число, аргументы - как кортеж, а признак успешности упакован в битовое поле.
+    """
+    __slots__ = ('ts', 'command', 'args', 'cwd', 'undo_data', '_flags')
+
+    # Биты поля _flags
+    SUCCESS = 0x1
+
+    def __init__(self, command: str, args=(), success: bool = True, undo_data=None,
+                 ts: float | None = None, cwd: str | None = None) -> None:
+        """
+        :param command: имя команды
+        :param args: аргументы команды
+        :param success: выполнилась команда или нет (bool)
+        :param undo_data: данные для отмены (по умолчанию None)
+        :param ts: время выполнения (unix-время, по умолчанию - текущее)
+        :param cwd: каталог, в котором была выполнена команда
+        :return: Данная функция ничего не возвращает
+        """
+        self.ts = time.time() if ts is None else ts
+        self.command = sys.intern(command) if command else ''
+        self.args = tuple(_intern_arg(arg) for arg in args)
+        self.cwd = sys.intern(cwd) if cwd else None
+        self.undo_data = undo_data
+        self._flags = self.SUCCESS if success else 0
+
+    @property
+    def success(self) -> bool:
+        return bool(self._flags & self.SUCCESS)
+
+    @success.setter
+    def success(self, value: bool) -> None:
+        self._flags = self._flags | self.SUCCESS if value else self._flags & ~self.SUCCESS
+
+    @property
+    def timestamp(self) -> str:
+        """
+        :return: время выполнения в формате ISO (для вывода пользователю)
+        """
+        return datetime.datetime.fromtimestamp(self.ts).isoformat()
+
+    @classmethod
+    def from_record(cls, record: dict) -> "HistoryEntry":
+        """
+        Создает запись из словаря журнала (поддерживаются и старые записи с ISO-полем timestamp).
+        :param record: запись журнала
+        :return: HistoryEntry
+        """
+        ts = record['ts'] if 'ts' in record else to_epoch(record.get('timestamp'))
+        return cls(record.get('command', ''), record.get('args') or (), success=bool(record.get('success')),
+                   undo_data=record.get('undo_data'), ts=ts, cwd=record.get('cwd'))
+
+    def to_record(self) -> dict:
+        """
+        Преобразует запись в словарь для журнала.
+        :return: словарь с полями ts, command, args, success, undo_data, cwd
+        """
+        return {
+            'ts': self.ts,
+            'command': self.command,
+            'args': list(self.args),
+            'success': self.success,
+            'undo_data': self.undo_data,
+            'cwd': self.cwd
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HistoryEntry):
+            return NotImplemented
+        return (self.ts, self.command, self.args, self.cwd, self.undo_data, self._flags) == \
+            (other.ts, other.command, other.args, other.cwd, other.undo_data, other._flags)
+
+    def __repr__(self) -> str:
+        return (f"HistoryEntry(command={self.command!r}, args={self.args!r}, success={self.success}, "
+                f"ts={self.ts!r}, undo_data={self.undo_data!r})")
@@ -0,0 +1,249 @@
+import os
+import json
+import sqlite3
+import threading
+from Lab_2_Consoleapp_Python.src.storage.entry import HistoryEntry, to_epoch
+
+# Команды, аргументы которых не являются путями (действия и номера объектов корзины, номера заданий)
+_NO_PATH_COMMANDS = {'history', 'help', 'undo', 'exit', 'trash', 'jobs', 'wait', 'fg', 'stats'}
+# Сколько первых позиционных аргументов команды не являются путями (например, шаблон в grep)
+_SKIPPED_POSITIONALS = {'grep': 1}
+# Опции profile со значением; после опций идет профилируемая команда, пути берутся из ее аргументов
+_PROFILE_VALUE_OPTIONS = {'-n', '-o'}
+
+# Версия схемы базы; при ее изменении индекс перестраивается из журнала
+_SCHEMA_VERSION = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    command TEXT NOT NULL,
+    args TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    undo_data TEXT,
+    cwd TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_entries_ts ON entries(ts);
+CREATE INDEX IF NOT EXISTS idx_entries_command ON entries(command, ts);
+CREATE INDEX IF NOT EXISTS idx_entries_failed ON entries(ts) WHERE success = 0;
+CREATE TABLE IF NOT EXISTS entry_paths (
+    path TEXT NOT NULL,
+    entry_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entry_paths ON entry_paths(path, entry_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def entry_paths(entry: dict) -> set[str]:
+    """
+    Собирает абсолютные пути, которых касалась команда: аргументы-пути
+    (относительные разрешаются от каталога, в котором была выполнена команда)
+    и пути из данных для отмены.
+    :param entry: запись истории
+    :return: множество нормализованных абсолютных путей
+    """
+    command = entry.get('command')
+    if command in _NO_PATH_COMMANDS:
+        return set()
+    if command == 'profile':
+        return entry_paths({**entry, **_profiled_command(entry.get('args') or [])})
+
+    paths = set()
+    cwd = entry.get('cwd')
+    skip = _SKIPPED_POSITIONALS.get(command, 0) if command else 0
+    for arg in entry.get('args') or []:
+        if arg.startswith('-'):
+            continue
+        if skip:
+            skip -= 1
+            continue
+        if os.path.isabs(arg):
+            paths.add(os.path.normpath(arg))
+        elif cwd:
+            paths.add(os.path.normpath(os.path.join(cwd, arg)))
+
+    undo_data = entry.get('undo_data')
+    if isinstance(undo_data, dict):
+        # Пачка rm хранит данные для отмены каждого объекта в списке items
+        for data in [undo_data, *(undo_data.get('items') or ())]:
+            for value in data.values():
+                if isinstance(value, str) and os.path.isabs(value):
+                    paths.add(os.path.normpath(value))
+    return paths
+
+
+def _profiled_command(args: list[str]) -> dict:
+    """
+    Вспомогательная функция. Отделяет от аргументов profile его собственные опции.
+    :param args: аргументы profile
+    :return: {'command': профилируемая команда или None, 'args': ее аргументы}
+    """
+    i = 0
+    while i < len(args) and args[i].startswith('-'):
+        i += 2 if args[i] in _PROFILE_VALUE_OPTIONS else 1
+    if i >= len(args):
+        return {'command': None, 'args': []}
+    return {'command': args[i], 'args': args[i + 1:]}
+
+
+class HistoryIndex:
+    """
+    Индекс истории команд в локальной базе SQLite (рядом с журналом).
+    Журнал остается основным хранилищем, индекс догоняет его инкрементально
+    по позиции в сегментах журнала и позволяет выполнять запросы по команде, времени,
+    путям и статусу без линейного прохода по всей истории.
+    Соединение общее для всех потоков оболочки (фоновые задания, запросы сервера), поэтому
+    синхронизация и запросы выполняются под блокировкой индекса.
+    """
+    def __init__(self, db_path: str, journal) -> None:
+        """
+        :param db_path: путь до файла базы (.history.db)
+        :param journal: журнал истории (HistoryJournal)
+        :return: Данная функция ничего не возвращает
+        """
+        self.db_path = db_path
+        self.journal = journal
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.RLock()
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS entry_paths; "
+                                    "DROP TABLE IF EXISTS meta;")
+            self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """
+        Закрывает соединение с базой.
+        :return: Данная функция ничего не возвращает
+        """
+        with self._lock:
+            self.conn.close()
+
+    def _get_meta(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def sync(self) -> int:
+        """
+        Дочитывает из журнала записи, появившиеся после последней синхронизации.
+        Проиндексированные сегменты запоминаются вместе с идентификаторами файлов: если какой-то
+        из них был удален, переписан (уплотнение истории) или стал короче, индекс строится заново.
+        :return: количество добавленных в индекс записей
+        """
+        with self._lock:
+            segments = self.journal.segments()
+            identities = {str(seq): self.journal.segment_identity(seq) for seq, _ in segments}
+
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                indexed = json.loads(self._get_meta('journal_segments') or '{}')
+                position = json.loads(self._get_meta('journal_position') or '[0, 0]')
+                sizes = {seq: os.path.getsize(path) for seq, path in segments}
+                if any(identities.get(seq) != identity for seq, identity in indexed.items()) or \
+                        sizes.get(position[0], 0) < position[1]:
+                    self.conn.execute("DELETE FROM entries")
+                    self.conn.execute("DELETE FROM entry_paths")
+                    indexed = {}
+                    position = [0, 0]
+
+                added = 0
+                for seq, path in segments:
+                    if seq < position[0]:
+                        continue
+                    offset = position[1] if seq == position[0] else 0
+                    try:
+                        records, offset = self.journal.read_segment(path, offset)
+                    except FileNotFoundError:
+                        continue
+                    added += self._index_records(records)
+                    position = [seq, offset]
+                    indexed[str(seq)] = identities[str(seq)]
+
+                self._set_meta('journal_segments', json.dumps(indexed))
+                self._set_meta('journal_position', json.dumps(position))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            return added
+
+    def _index_records(self, records: list[dict]) -> int:
+        """
+        Добавляет записи журнала в индекс и применяет отметки об отмене.
+        :param records: записи журнала
+        :return: количество добавленных записей истории
+        """
+        added = 0
+        for record in records:
+            if 'undone' in record:
+                self.conn.execute("UPDATE entries SET undo_data = NULL WHERE ts = ?", (to_epoch(record['undone']),))
+                continue
+
+            undo_data = record.get('undo_data')
+            ts = record['ts'] if 'ts' in record else to_epoch(record.get('timestamp'))
+            cursor = self.conn.execute(
+                "INSERT INTO entries (ts, command, args, success, undo_data, cwd) VALUES (?, ?, ?, ?, ?, ?)",
+                (ts, record.get('command', ''), json.dumps(record.get('args') or [], ensure_ascii=False),
+                 int(bool(record.get('success'))),
+                 json.dumps(undo_data, ensure_ascii=False) if undo_data else None, record.get('cwd')))
+            self.conn.executemany("INSERT INTO entry_paths (path, entry_id) VALUES (?, ?)",
+                                  [(path, cursor.lastrowid) for path in entry_paths(record)])
+            added += 1
+        return added
+
+    def query(self, command: str | None = None, since: float | None = None, path: str | None = None,
+              failed: bool = False, limit: int | None = None) -> list[tuple[int, HistoryEntry]]:
+        """
+        Выполняет запрос к индексу. Условия объединяются через AND.
+        :param command: имя команды
+        :param since: unix-время, начиная с которого искать
+        :param path: абсолютный путь - команды, затронувшие его или что-то внутри него
+        :param failed: только неуспешные команды
+        :param limit: вернуть только столько последних подходящих записей
+        :return: список пар (порядковый номер в истории, запись) в хронологическом порядке
+        """
+        conditions: list[str] = []
+        params: list[str | float | int] = []
+        source = "entries e"
+
+        if path is not None:
+            path = os.path.normpath(path)
+            prefix = path.rstrip(os.sep) + os.sep
+            # Диапазон [prefix, prefix с заменой разделителя на следующий символ) - все вложенные пути,
+            # такой запрос использует индекс idx_entry_paths
+            source = "entries e JOIN (SELECT DISTINCT entry_id FROM entry_paths " \
+                     "WHERE path = ? OR (path >= ? AND path < ?)) p ON p.entry_id = e.id"
+            params.extend([path, prefix, prefix[:-1] + chr(ord(os.sep) + 1)])
+        if command is not None:
+            conditions.append("e.command = ?")
+            params.append(command)
+        if since is not None:
+            conditions.append("e.ts >= ?")
+            params.append(since)
+        if failed:
+            conditions.append("e.success = 0")
+
+        sql = f"SELECT e.id, e.ts, e.command, e.args, e.success, e.undo_data, e.cwd FROM {source}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY e.id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        results = []
+        for row_id, ts, cmd, args, success, undo_data, cwd in reversed(rows):
+            results.append((row_id, HistoryEntry(cmd, json.loads(args), success=bool(success),
+                                                 undo_data=json.loads(undo_data) if undo_data else None,
+                                                 ts=ts, cwd=cwd)))
+        return results
@@ -0,0 +1,446 @@
+import os
+import json
+from Lab_2_Consoleapp_Python.src.storage.entry import HistoryEntry, to_epoch
+from Lab_2_Consoleapp_Python.src.storage.locking import file_lock
+
+# Служебные отметки об отмене команды всегда начинаются с этого префикса (см. _mark_undone в оболочке)
+_UNDO_MARKER_PREFIX = b'{"undone":'
+
+
+def encode_record(record: dict) -> str:
+    """
+    Сериализует одну запись журнала в компактную JSON-строку (одна запись - одна строка).
+    :param record: запись истории или служебная запись (например, отметка об отмене)
+    :return: строка с завершающим переводом строки
+    """
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def parse_history_text(text: str) -> list[dict]:
+    """
+    Разбирает содержимое файла истории в любом из двух форматов:
+    старый JSON-массив (.history.json) или журнал JSONL (.history.jsonl).
+    Недописанные/поврежденные строки журнала (например, после аварийного завершения) пропускаются.
+    :param text: содержимое файла
+    :return: список записей в порядке их появления в файле
+    """
+    stripped = text.lstrip()
+    if not stripped:
+        return []
+
+    # Старый формат - весь файл является одним JSON-массивом
+    if stripped.startswith('['):
+        return json.loads(stripped)
+
+    records = []
+    for line in stripped.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+def apply_undo_markers(records: list[dict]) -> list[HistoryEntry]:
+    """
+    Применяет служебные отметки {"undone": <время команды>} к записям истории:
+    у отмененной команды очищается undo_data, сами отметки в результат не попадают.
+    :param records: записи журнала в порядке появления
+    :return: список записей истории (только команды)
+    """
+    entries = []
+    undoable: dict[float, HistoryEntry] = {}
+    for record in records:
+        if 'undone' in record:
+            entry = undoable.pop(to_epoch(record['undone']), None)
+            if entry is not None:
+                entry.undo_data = None
+            continue
+        entry = HistoryEntry.from_record(record)
+        entries.append(entry)
+        if entry.undo_data:
+            undoable[entry.ts] = entry
+    return entries
+
+
+def _read_file_tail(path: str, count: int, end: int | None, block_size: int) -> tuple[list[dict], int]:
+    """
+    Читает один файл журнала с конца блоками, пока не наберется хотя бы count записей истории
+    (или пока не будет достигнуто начало файла).
+    :param path: путь до файла
+    :param count: сколько последних записей нужно получить
+    :param end: смещение, до которого читать (None - до конца файла)
+    :param block_size: размер блока чтения в байтах
+    :return: кортеж (записи в порядке появления, смещение начала прочитанного фрагмента)
+    """
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        pos = size if end is None else min(end, size)
+        blocks = []
+        lines = 0
+        while pos > 0 and lines <= count:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            blocks.append(block)
+            lines += block.count(b'\n') - block.count(_UNDO_MARKER_PREFIX)
+
+    data = b''.join(reversed(blocks))
+    # Первая строка фрагмента может быть обрезана - она будет прочитана со следующей порцией
+    if pos > 0:
+        cut = data.find(b'\n') + 1
+        data = data[cut:]
+        pos += cut
+    # Недописанная последняя строка (запись еще идет) пропускается
+    data = data[:data.rfind(b'\n') + 1]
+    return parse_history_text(data.decode('utf-8', errors='replace')), pos
+
+
+def _count_file_entries(path: str, end: int | None = None) -> int:
+    """
+    Считает записи истории (без служебных отметок) в начале файла журнала до указанного смещения.
+    :param path: путь до файла
+    :param end: смещение, до которого считать (None - весь файл)
+    :return: количество записей
+    """
+    # Подсчет переводов строк блоками (без разбора JSON); отметки об отмене вычитаются
+    newlines = 0
+    markers = 0
+    tail = b'\n'
+    remaining = end
+    with open(path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            block = f.read(1024 * 1024 if remaining is None else min(1024 * 1024, remaining))
+            if not block:
+                break
+            if remaining is not None:
+                remaining -= len(block)
+            newlines += block.count(b'\n')
+            window = tail + block
+            markers += window.count(b'\n' + _UNDO_MARKER_PREFIX)
+            tail = window[-len(_UNDO_MARKER_PREFIX):]
+    return newlines - markers
+
+
+class HistoryJournal:
+    """
+    Журнал истории команд: каждая команда дописывается в конец файла одной компактной строкой,
+    поэтому стоимость записи не зависит от размера уже накопленной истории.
+    Журнал разбит на сегменты <имя>.000001.jsonl, <имя>.000002.jsonl, ...: запись идет только
+    в последний (активный) сегмент, а когда он достигает segment_bytes, начинается следующий.
+    Закрытые сегменты больше не дописываются - их удаляет и переписывает уплотнение (см. compaction).
+    С одним журналом могут одновременно работать несколько оболочек: запись идет только дозаписью
+    в конец активного сегмента под рекомендательной блокировкой (.history.lock).
+    Позиция в журнале задается парой (номер сегмента, смещение в сегменте).
+    """
+    def __init__(self, path: str, legacy_path: str | None = None, segment_bytes: int = 4 * 1024 * 1024) -> None:
+        """
+        :param path: базовый путь журнала (.history.jsonl), от которого образуются имена сегментов
+        :param legacy_path: путь до файла истории в старом формате (.history.json), если он есть
+        :param segment_bytes: размер сегмента, после которого начинается новый сегмент
+        :return: Данная функция ничего не возвращает
+        """
+        self.base_path = path
+        self.legacy_path = legacy_path
+        self.segment_bytes = segment_bytes
+        self._stem, self._ext = os.path.splitext(path)
+        self.lock_path = self._stem + '.lock'
+        self._active_seq: int | None = None
+        # Запомненный конец журнала (сегмент, смещение, идентификатор файла), см. mark_tail
+        self._tail: tuple[int, int, str | None] | None = None
+        # Число записей закрытых сегментов: номер сегмента -> (отпечаток файла, число записей)
+        self._sealed_counts: dict[int, tuple[tuple[int, int, int, int], int]] = {}
+
+    def segment_path(self, seq: int) -> str:
+        """
+        :param seq: номер сегмента
+        :return: путь до файла сегмента
+        """
+        return f"{self._stem}.{seq:06d}{self._ext}"
+
+    def segments(self) -> list[tuple[int, str]]:
+        """
+        :return: список пар (номер сегмента, путь) в порядке от старых к новым
+        """
+        directory = os.path.dirname(self.base_path) or '.'
+        prefix = os.path.basename(self._stem) + '.'
+        result: list[tuple[int, str]] = []
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return result
+        for name in names:
+            if name.startswith(prefix) and name.endswith(self._ext):
+                seq = name[len(prefix):len(name) - len(self._ext)]
+                if seq.isdigit():
+                    result.append((int(seq), os.path.join(directory, name)))
+        result.sort()
+        return result
+
+    @property
+    def path(self) -> str:
+        """
+        :return: путь до активного сегмента (в него дописываются новые записи)
+        """
+        if self._active_seq is None:
+            segments = self.segments()
+            self._active_seq = segments[-1][0] if segments else 1
+        return self.segment_path(self._active_seq)
+
+    def segment_identity(self, seq: int) -> str | None:
+        """
+        Идентификатор файла сегмента: меняется, если сегмент был переписан уплотнением.
+        :param seq: номер сегмента
+        :return: строка "устройство:inode" или None, если сегмента нет
+        """
+        try:
+            stat = os.stat(self.segment_path(seq))
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_dev}:{stat.st_ino}"
+
+    def is_beginning(self, position: tuple[int, int]) -> bool:
+        """
+        :param position: позиция в журнале
+        :return: True, если до этой позиции в журнале нет записей
+        """
+        seq, offset = position
+        return offset == 0 and all(other >= seq for other, _ in self.segments())
+
+    def load(self) -> list[HistoryEntry]:
+        """
+        Читает журнал целиком (все сегменты).
+        :return: список записей истории с уже примененными отметками об отмене
+        """
+        records = []
+        for _, path in self.segments():
+            records.extend(self.read_segment(path)[0])
+        return apply_undo_markers(records)
+
+    @staticmethod
+    def read_segment(path: str, offset: int = 0) -> tuple[list[dict], int]:
+        """
+        Читает записи сегмента, дописанные после указанного смещения (только целые строки).
+        :param path: путь до файла сегмента
+        :param offset: смещение в байтах, с которого нужно читать
+        :return: кортеж (записи в порядке появления, смещение конца последней целой строки)
+        """
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        return parse_history_text(data[:end].decode('utf-8', errors='replace')), offset + end
+
+    def read_tail(self, count: int, end: tuple[int, int | None] | None = None,
+                  block_size: int = 64 * 1024) -> tuple[list[dict], tuple[int, int]]:
+        """
+        Читает журнал с конца блоками, пока не наберется хотя бы count записей истории
+        (или пока не будет достигнуто начало журнала). Весь журнал при этом не читается:
+        более старые сегменты открываются, только если последних не хватило.
+        :param count: сколько последних записей нужно получить
+        :param end: позиция, до которой читать (None - до конца журнала; смещение None - до конца сегмента)
+        :param block_size: размер блока чтения в байтах
+        :return: кортеж (записи в порядке появления, позиция начала прочитанного фрагмента)
+        """
+        segments = self.segments()
+        if end is None:
+            end = (segments[-1][0] if segments else 1, None)
+        parts = []
+        found = 0
+        position = (end[0], 0)
+        for seq, path in reversed(segments):
+            if seq > end[0]:
+                continue
+            try:
+                records, start = _read_file_tail(path, count - found, end[1] if seq == end[0] else None, block_size)
+            except FileNotFoundError:
+                # Сегмент удален уплотнением - более старых записей тоже нет
+                break
+            parts.append(records)
+            found += sum(1 for record in records if 'undone' not in record)
+            position = (seq, start)
+            if start > 0 or found >= count:
+                break
+        return [record for part in reversed(parts) for record in part], position
+
+    def count_entries(self, end: tuple[int, int] | None = None) -> int:
+        """
+        Считает записи истории (без служебных отметок) в начале журнала до указанной позиции.
+        :param end: позиция, до которой считать (None - весь журнал)
+        :return: количество записей
+        """
+        segments = self.segments()
+        active = segments[-1][0] if segments else None
+        total = 0
+        for seq, path in segments:
+            if end is not None and seq > end[0]:
+                break
+            try:
+                if end is not None and seq == end[0]:
+                    total += _count_file_entries(path, end[1])
+                elif seq == active:
+                    total += _count_file_entries(path)
+                else:
+                    total += self._sealed_count(seq, path)
+            except FileNotFoundError:
+                continue
+        # Сегменты, удаленные уплотнением, из кэша убираются
+        for seq in [seq for seq in self._sealed_counts if not segments or seq < segments[0][0]]:
+            del self._sealed_counts[seq]
+        return total
+
+    def _sealed_count(self, seq: int, path: str) -> int:
+        """
+        Число записей закрытого сегмента. Закрытые сегменты не дописываются, поэтому оно считается
+        один раз и пересчитывается, только если уплотнение переписало файл.
+        :param seq: номер сегмента
+        :param path: путь до сегмента
+        :return: количество записей
+        """
+        stat = os.stat(path)
+        stamp = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        cached = self._sealed_counts.get(seq)
+        if cached is None or cached[0] != stamp:
+            cached = self._sealed_counts[seq] = (stamp, _count_file_entries(path))
+        return cached[1]
+
+    def append(self, record: dict) -> None:
+        """
+        Дописывает одну запись в конец журнала.
+        :param record: запись истории или служебная запись
+        :return: Данная функция ничего не возвращает
+        """
+        self.append_many([record])
+
+    def append_many(self, records: list[dict], fsync: bool = False) -> None:
+        """
+        Дописывает несколько записей одной операцией записи.
+        :param records: список записей
+        :param fsync: сбросить ли данные на диск (os.fsync) после записи
+        :return: Данная функция ничего не возвращает
+        """
+        self.write_encoded([encode_record(record) for record in records], fsync=fsync)
+
+    def locked(self, shared: bool = False):
+        """
+        Блокировка журнала для нескольких оболочек, работающих с ним одновременно:
+        запись идет под исключительной блокировкой, согласованное чтение хвоста - под разделяемой.
+        :param shared: разделяемая блокировка
+        :return: контекстный менеджер блокировки
+        """
+        return file_lock(self.lock_path, shared=shared)
+
+    def mark_tail(self) -> None:
+        """
+        Запоминает текущий конец журнала. Начиная с него, записи других оболочек
+        возвращаются из write_encoded, чтобы их можно было добавить в историю в памяти.
+        :return: Данная функция ничего не возвращает
+        """
+        segments = self.segments()
+        seq, path = segments[-1] if segments else (1, self.segment_path(1))
+        try:
+            stat = os.stat(path)
+            self._tail = (seq, stat.st_size, f"{stat.st_dev}:{stat.st_ino}")
+        except FileNotFoundError:
+            self._tail = (seq, 0, None)
+
+    def _read_since_tail(self, segments: list[tuple[int, str]]) -> list[dict]:
+        """
+        Читает записи, дописанные другими оболочками после запомненного конца журнала.
+        :param segments: текущий список сегментов
+        :return: записи в порядке появления
+        """
+        if self._tail is None:
+            return []
+        seq, offset, identity = self._tail
+        records = []
+        for other, path in segments:
+            if other < seq:
+                continue
+            if other == seq:
+                # Сегмент переписан уплотнением - смещение в нем больше не имеет смысла
+                # (если при mark_tail сегмента еще не было, он читается с начала)
+                rewritten = identity is not None and self.segment_identity(other) != identity
+                if rewritten or os.path.getsize(path) <= offset:
+                    continue
+                records.extend(self.read_segment(path, offset)[0])
+            else:
+                records.extend(self.read_segment(path)[0])
+        return records
+
+    def write_encoded(self, lines: list[str], fsync: bool = False) -> list[dict]:
+        """
+        Дописывает уже сериализованные строки журнала (см. encode_record) одной операцией записи
+        в активный сегмент. Запись идет под исключительной блокировкой журнала, а активный сегмент
+        определяется заново, так как его могла сменить другая оболочка. Если сегмент достиг
+        segment_bytes, сразу создается следующий, и все оболочки начинают писать в него.
+        :param lines: список строк журнала
+        :param fsync: сбросить ли данные на диск (os.fsync) после записи
+        :return: записи, дописанные другими оболочками с момента предыдущей записи (см. mark_tail)
+        """
+        if not lines:
+            return []
+        with self.locked():
+            segments = self.segments()
+            self._active_seq = segments[-1][0] if segments else 1
+            foreign = self._read_since_tail(segments)
+            with open(self.segment_path(self._active_seq), 'a', encoding='utf-8') as f:
+                f.write(''.join(lines))
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+                stat = os.fstat(f.fileno())
+            if stat.st_size >= self.segment_bytes:
+                self._active_seq += 1
+                with open(self.segment_path(self._active_seq), 'a', encoding='utf-8') as f:
+                    stat = os.fstat(f.fileno())
+            if self._tail is not None:
+                self._tail = (self._active_seq, stat.st_size, f"{stat.st_dev}:{stat.st_ino}")
+        return foreign
+
+    def needs_migration(self) -> bool:
+        """
+        Проверяет, нужно ли перенести историю из старого формата в сегменты журнала:
+        из JSON-массива (.history.json) или из несегментированного журнала (.history.jsonl).
+        :return: True, если старый файл есть, а сегментов журнала еще нет
+        """
+        if any(os.path.getsize(path) > 0 for _, path in self.segments()):
+            return False
+        if os.path.isfile(self.base_path):
+            return True
+        return self.legacy_path is not None and os.path.isfile(self.legacy_path)
+
+    def migrate_legacy(self) -> int:
+        """
+        Однократная миграция в первый сегмент журнала. Несегментированный журнал просто
+        переименовывается, старый .history.json переписывается построчно и переименовывается
+        в <имя>.bak, чтобы миграция не повторялась при следующем запуске.
+        :return: количество перенесенных записей (0, если миграция не требовалась)
+        """
+        # Под блокировкой, чтобы одновременно запущенные оболочки не выполнили миграцию дважды
+        with self.locked():
+            if not self.needs_migration():
+                return 0
+
+            target = self.segment_path(1)
+            self._active_seq = None
+            if os.path.isfile(self.base_path):
+                os.replace(self.base_path, target)
+                return _count_file_entries(target)
+            if not self.legacy_path:
+                return 0
+
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                records = parse_history_text(f.read())
+
+            # Запись через временный файл, чтобы при сбое не остаться с полупустым журналом
+            tmp_path = target + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(encode_record(record) for record in records))
+            os.replace(tmp_path, target)
+            os.replace(self.legacy_path, self.legacy_path + '.bak')
+            return len(records)
@@ -0,0 +1,211 @@
+import sys
+import threading
+from Lab_2_Consoleapp_Python.src.storage.entry import HistoryEntry, to_epoch
+
+
+class LazyHistory:
+    """
+    Ленивое представление истории команд, ведущее себя как список.
+    При запуске из журнала читаются только последние записи (чтение с конца файла),
+    более старые подгружаются порциями, только когда к ним обращаются
+    (например, history без аргументов или history n с большим n).
+    """
+    def __init__(self, journal, page_size: int = 1000) -> None:
+        """
+        :param journal: журнал истории (HistoryJournal)
+        :param page_size: сколько записей читать при запуске и при каждой догрузке
+        :return: Данная функция ничего не возвращает
+        """
+        self.journal = journal
+        self.page_size = max(1, page_size)
+        self._entries: list[HistoryEntry] = []
+        # Позиция в журнале (сегмент, смещение), с которой начинаются загруженные записи
+        self._start = (1, 0)
+        # Идентификатор сегмента _start: если уплотнение переписало сегмент, смещение в нем устарело
+        self._start_identity: str | None = None
+        # Количество записей в журнале до _start (считается только при необходимости)
+        self._older_count: int | None = None
+        # Временные метки команд, отмененных отметками из уже прочитанной части журнала
+        self._undone: set[float] = set()
+        self._lock = threading.RLock()
+
+    def load_tail(self) -> "LazyHistory":
+        """
+        Загружает последние page_size записей журнала.
+        :return: Само представление (для удобства цепочки вызовов)
+        """
+        # Хвост читается и запоминается под блокировкой: все, что другие оболочки допишут позже,
+        # будет добавлено через merge
+        with self.journal.locked(shared=True):
+            records, self._start = self.journal.read_tail(self.page_size)
+            self.journal.mark_tail()
+        self._start_identity = self.journal.segment_identity(self._start[0])
+        self._entries = self._apply_markers(records)
+        self._older_count = 0 if self.fully_loaded else None
+        return self
+
+    @property
+    def fully_loaded(self) -> bool:
+        """
+        :return: True, если в памяти находится вся история
+        """
+        return self.journal.is_beginning(self._start)
+
+    @property
+    def loaded_count(self) -> int:
+        """
+        :return: количество записей, уже находящихся в памяти
+        """
+        return len(self._entries)
+
+    def _apply_markers(self, records: list[dict]) -> list[HistoryEntry]:
+        """
+        Отделяет записи истории от служебных отметок об отмене и применяет отметки.
+        Отметка всегда идет в журнале после своей команды, поэтому отметки из новой части журнала
+        запоминаются и применяются к более старым записям при их догрузке.
+        :param records: записи журнала в порядке появления
+        :return: записи истории
+        """
+        entries = []
+        for record in records:
+            if 'undone' in record:
+                self._undone.add(to_epoch(record['undone']))
+            else:
+                entries.append(HistoryEntry.from_record(record))
+        if self._undone:
+            for entry in entries:
+                if entry.undo_data and entry.ts in self._undone:
+                    entry.undo_data = None
+        return entries
+
+    def _page_in(self, count: int) -> None:
+        """
+        Догружает из журнала как минимум count более старых записей (или все оставшиеся).
+        :param count: сколько записей догрузить
+        :return: Данная функция ничего не возвращает
+        """
+        with self._lock:
+            while count > 0 and not self.fully_loaded:
+                end: tuple[int, int | None] = self._start
+                rewritten = self._start[1] > 0 and self.journal.segment_identity(end[0]) != self._start_identity
+                if rewritten:
+                    # Сегмент переписан уплотнением: он перечитывается целиком,
+                    # а уже загруженные записи отбрасываются по времени
+                    end = (end[0], None)
+                    self._older_count = None
+                records, self._start = self.journal.read_tail(max(count, self.page_size), end=end)
+                self._start_identity = self.journal.segment_identity(self._start[0])
+                older = self._apply_markers(records)
+                if rewritten and self._entries:
+                    older = [entry for entry in older if entry.ts < self._entries[0].ts]
+                self._entries[:0] = older
+                count -= len(older)
+                if self._older_count is not None:
+                    self._older_count -= len(older)
+                if not records:
+                    break
+            if self.fully_loaded:
+                self._older_count = 0
+
+    def _ensure_loaded(self, index: int) -> None:
+        """
+        Гарантирует, что запись с данным индексом (от начала всей истории) находится в памяти.
+        :param index: неотрицательный индекс записи
+        :return: Данная функция ничего не возвращает
+        """
+        older = self._get_older_count()
+        if index < older:
+            self._page_in(older - index)
+
+    def _get_older_count(self) -> int:
+        """
+        :return: количество записей журнала, еще не загруженных в память
+        """
+        if self._older_count is None:
+            self._older_count = self.journal.count_entries(end=self._start)
+        return self._older_count
+
+    def load_all(self) -> list[HistoryEntry]:
+        """
+        Загружает всю историю в память.
+        :return: список всех записей истории
+        """
+        self._page_in(sys.maxsize)
+        return self._entries
+
+    def append(self, entry: HistoryEntry) -> None:
+        """
+        Добавляет новую запись в конец истории (в памяти).
+        :param entry: запись истории
+        :return: Данная функция ничего не возвращает
+        """
+        with self._lock:
+            self._entries.append(entry)
+
+    def merge(self, records: list[dict]) -> None:
+        """
+        Добавляет в историю записи, дописанные в журнал другими оболочками.
+        Записи вставляются по времени выполнения, отметки об отмене применяются к уже загруженным командам.
+        :param records: записи журнала в порядке появления
+        :return: Данная функция ничего не возвращает
+        """
+        with self._lock:
+            markers = {to_epoch(record['undone']) for record in records if 'undone' in record}
+            if markers:
+                self._undone |= markers
+                for entry in self._entries:
+                    if entry.undo_data and entry.ts in markers:
+                        entry.undo_data = None
+            for entry in self._apply_markers([record for record in records if 'undone' not in record]):
+                # Чужие записи обычно новее почти всех загруженных, поэтому поиск места идет с конца
+                position = len(self._entries)
+                while position > 0 and self._entries[position - 1].ts > entry.ts:
+                    position -= 1
+                self._entries.insert(position, entry)
+
+    def __len__(self) -> int:
+        return self._get_older_count() + len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries) or not self.fully_loaded
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step < 0:
+                return self.load_all()[item]
+            if start < stop:
+                self._ensure_loaded(start)
+            older = self._get_older_count()
+            return self._entries[max(0, start - older):max(0, stop - older):step]
+
+        if item < 0:
+            if -item > len(self._entries):
+                self._page_in(-item - len(self._entries))
+            return self._entries[item]
+        self._ensure_loaded(item)
+        return self._entries[item - self._get_older_count()]
+
+    def __iter__(self):
+        return iter(self.load_all())
+
+    def __reversed__(self):
+        # Сначала уже загруженные записи, затем старые - порциями, по мере необходимости
+        index = len(self._entries) - 1
+        while True:
+            while index >= 0:
+                yield self._entries[index]
+                index -= 1
+            if self.fully_loaded:
+                return
+            before = len(self._entries)
+            self._page_in(self.page_size)
+            index = len(self._entries) - before - 1
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyHistory):
+            other = other.load_all()
+        return self.load_all() == other
+
+    def __repr__(self) -> str:
+        return f"LazyHistory(loaded={len(self._entries)}, fully_loaded={self.fully_loaded})"
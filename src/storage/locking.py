@@ -0,0 +1,41 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: рекомендательные блокировки fcntl недоступны, остается только дозапись в конец файла
+    fcntl = None  # type: ignore[assignment]
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False, blocking: bool = True):
+    """
+    Рекомендательная блокировка (flock) на отдельном файле блокировки.
+    Файл открывается заново при каждом захвате, поэтому блокировка разделяет
+    не только процессы, но и потоки одного процесса.
+    :param path: путь до файла блокировки (создается при необходимости)
+    :param shared: разделяемая блокировка (для чтения) вместо исключительной
+    :param blocking: ждать освобождения блокировки; иначе сразу вернуть False
+    :return: контекстный менеджер, возвращающий True, если блокировка захвачена
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(fd, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
@@ -0,0 +1,142 @@
+import shlex
+import threading
+from array import array
+
+# Длина n-грамм индекса; более короткие запросы проверяются проходом от новых строк к старым
+_GRAM = 3
+
+
+def command_line(command: str | None, args) -> str:
+    """
+    Восстанавливает строку команды в том виде, в каком ее можно ввести повторно.
+    :param command: имя команды
+    :param args: аргументы команды
+    :return: строка команды (аргументы с пробелами берутся в кавычки)
+    """
+    return shlex.join([command, *(args or ())]) if command else ''
+
+
+class HistorySearchIndex:
+    """
+    Индекс строк истории для инкрементального поиска (Ctrl-R).
+    Выполнения команд нумеруются по порядку (журнал _log). Для каждой триграммы хранится
+    возрастающий список номеров выполнений, в строках которых она встречается, поэтому
+    такой список сразу упорядочен от старых команд к новым. Запрос проходит с конца
+    самый короткий из списков своих триграмм и останавливается на первом совпадении:
+    время ответа на нажатие клавиши зависит от того, насколько давно была нужная команда,
+    а не от размера истории. Короткие (до трех символов) запросы проходят журнал выполнений с конца.
+    Повторно выполненная строка учитывается только по последнему выполнению.
+    """
+    def __init__(self) -> None:
+        """
+        :return: Данная функция ничего не возвращает
+        """
+        self._texts: list[str] = []
+        self._ids: dict[str, int] = {}
+        # Журнал выполнений: номера строк в порядке выполнения команд
+        self._log = array('I')
+        # Для каждой строки - номер ее последнего выполнения в _log
+        self._last = array('I')
+        self._grams: dict[str, array] = {}
+        self._lock = threading.Lock()
+        # Строки, добавленные во время загрузки журнала (см. load_journal)
+        self._replay: list[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, text: str) -> None:
+        """
+        Добавляет выполненную команду (уже известная строка становится самой новой).
+        :param text: строка команды
+        :return: Данная функция ничего не возвращает
+        """
+        if not text:
+            return
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(text)
+            self._add(text)
+
+    def _add(self, text: str) -> None:
+        """
+        Добавляет строку без блокировки (вызывается под self._lock).
+        :param text: строка команды
+        :return: Данная функция ничего не возвращает
+        """
+        uid = self._ids.get(text)
+        if uid is None:
+            uid = len(self._texts)
+            self._ids[text] = uid
+            self._texts.append(text)
+            self._last.append(0)
+        position = len(self._log)
+        self._last[uid] = position
+        self._log.append(uid)
+        grams = self._grams
+        for gram in {text[i:i + _GRAM] for i in range(len(text) - _GRAM + 1)}:
+            postings = grams.get(gram)
+            if postings is None:
+                grams[gram] = array('I', (position,))
+            else:
+                postings.append(position)
+
+    def load_journal(self, journal, chunk: int = 2000) -> None:
+        """
+        Заполняет индекс всеми записями журнала (от старых к новым). Может выполняться в фоновом
+        потоке: команды, добавленные через add во время загрузки, в конце повторяются,
+        чтобы остаться самыми новыми.
+        :param journal: журнал истории (HistoryJournal)
+        :param chunk: сколько записей добавлять за один захват блокировки
+        :return: Данная функция ничего не возвращает
+        """
+        with self._lock:
+            self._replay = []
+        try:
+            for _, path in journal.segments():
+                try:
+                    records, _ = journal.read_segment(path)
+                except FileNotFoundError:
+                    continue
+                texts = [command_line(record.get('command'), record.get('args'))
+                         for record in records if 'undone' not in record]
+                for start in range(0, len(texts), chunk):
+                    with self._lock:
+                        for text in texts[start:start + chunk]:
+                            if text:
+                                self._add(text)
+        finally:
+            with self._lock:
+                replay, self._replay = self._replay or [], None
+                for text in replay:
+                    self._add(text)
+
+    def matches(self, query: str):
+        """
+        Ищет строки, содержащие query, от недавно выполненных к давним.
+        :param query: подстрока для поиска
+        :return: генератор строк команд (каждая строка - один раз)
+        """
+        if not query:
+            return
+        if len(query) < _GRAM:
+            positions = self._log
+        else:
+            postings = []
+            with self._lock:
+                for i in range(len(query) - _GRAM + 1):
+                    posting = self._grams.get(query[i:i + _GRAM])
+                    if posting is None:
+                        return
+                    postings.append(posting)
+            positions = min(postings, key=len)
+
+        # Списки только растут, поэтому проход по ним с конца безопасен и без блокировки
+        texts, log, last = self._texts, self._log, self._last
+        index = len(positions)
+        while index > 0:
+            index -= 1
+            position = positions[index] if positions is not log else index
+            uid = log[position]
+            if last[uid] == position and query in texts[uid]:
+                yield texts[uid]
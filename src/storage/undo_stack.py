@@ -0,0 +1,201 @@
+import os
+import json
+import time
+from collections import deque
+from itertools import islice
+from contextlib import nullcontext
+from Lab_2_Consoleapp_Python.src.storage.entry import HistoryEntry
+from Lab_2_Consoleapp_Python.src.storage.locking import file_lock
+
+_DAY = 24 * 60 * 60
+
+
+class UndoStack:
+    """
+    Стек отменяемых команд (cp, mv, rm), который ведется рядом с историей.
+    Команда undo берет запись с вершины стека, а не ищет ее проходом по всей истории,
+    поэтому ее стоимость не зависит от размера истории. Глубина стека ограничена,
+    сам стек сохраняется в небольшой файл (.history.undo.json) и переживает перезапуск оболочки.
+    Файл общий для всех оболочек: изменения выполняются под блокировкой, а чужие изменения
+    перечитываются перед каждой операцией.
+    Команды старше ttl_days не отменяются: они убираются из стека при чтении, не дожидаясь
+    уплотнения журнала (оно лишь стирает их undo_data в истории).
+    """
+    def __init__(self, path: str | None, depth: int = 100, ttl_days: float | None = None) -> None:
+        """
+        :param path: путь до файла стека (None - стек только в памяти)
+        :param depth: сколько последних отменяемых команд хранить
+        :param ttl_days: сколько дней команду можно отменить (None - без ограничения)
+        :return: Данная функция ничего не возвращает
+        """
+        self.path = path
+        self.depth = depth
+        self.ttl_days = ttl_days
+        self._entries: deque[HistoryEntry] = deque(maxlen=depth)
+        # Отпечаток файла на момент последнего чтения/записи (см. _reload)
+        self._stamp: tuple | None = None
+
+    def load(self, seed=None, scan_limit: int = 1000) -> "UndoStack":
+        """
+        Загружает стек из файла. Если файла еще нет (первый запуск после обновления),
+        стек однократно заполняется отменяемыми командами из последних scan_limit записей истории.
+        :param seed: история команд, из которой можно построить стек
+        :param scan_limit: сколько последних записей истории просмотреть при построении
+        :return: Сам стек (для удобства цепочки вызовов)
+        """
+        if self.path and os.path.isfile(self.path):
+            with self._locked(shared=True):
+                self._reload()
+        elif seed:
+            recent = [entry for entry in islice(reversed(seed), scan_limit) if entry.undo_data]
+            self._entries.extend(reversed(recent))
+        self._expire()
+        return self
+
+    def push(self, entry: HistoryEntry) -> None:
+        """
+        Кладет отменяемую команду на вершину стека (самая старая команда вытесняется при переполнении).
+        :param entry: запись истории
+        :return: Данная функция ничего не возвращает
+        """
+        with self._locked():
+            self._reload()
+            self._expire()
+            self._entries.append(entry)
+            self._save()
+
+    def peek(self, skip=()) -> HistoryEntry | None:
+        """
+        :param skip: команды, которые нужно пропустить (например, не отмененные в текущем вызове undo)
+        :return: последняя отменяемая команда, кроме skip, или None, если таких нет
+        """
+        with self._locked(shared=True):
+            self._reload()
+            self._expire()
+        for entry in reversed(self._entries):
+            if not any(_same_entry(entry, skipped) for skipped in skip):
+                return entry
+        return None
+
+    def pop(self) -> HistoryEntry | None:
+        """
+        Снимает команду с вершины стека.
+        :return: последняя отменяемая команда или None, если стек пуст
+        """
+        with self._locked():
+            self._reload()
+            if self._expire():
+                self._save()
+            if not self._entries:
+                return None
+            entry = self._entries.pop()
+            self._save()
+        return entry
+
+    def discard(self, entry: HistoryEntry) -> None:
+        """
+        Убирает из стека отмененную команду. В отличие от pop, команда ищется по времени выполнения,
+        поэтому другая оболочка может успеть положить на вершину свою команду.
+        :param entry: запись истории
+        :return: Данная функция ничего не возвращает
+        """
+        with self._locked():
+            self._reload()
+            for position in range(len(self._entries) - 1, -1, -1):
+                if _same_entry(self._entries[position], entry):
+                    del self._entries[position]
+                    self._save()
+                    break
+
+    def update(self, entry: HistoryEntry) -> None:
+        """
+        Сохраняет измененные данные для отмены команды, не меняя ее места в стеке
+        (например, оставшиеся объекты частично восстановленной пачки rm).
+        :param entry: запись истории
+        :return: Данная функция ничего не возвращает
+        """
+        with self._locked():
+            self._reload()
+            for position in range(len(self._entries) - 1, -1, -1):
+                if _same_entry(self._entries[position], entry):
+                    self._entries[position] = entry
+                    self._save()
+                    break
+
+    def _expire(self) -> bool:
+        """
+        Убирает из стека (в памяти) команды старше ttl_days; в файле они пропадут при следующей записи.
+        :return: True, если какие-то команды убраны
+        """
+        if self.ttl_days is None:
+            return False
+        cutoff = time.time() - self.ttl_days * _DAY
+        kept = [entry for entry in self._entries if entry.ts >= cutoff]
+        if len(kept) == len(self._entries):
+            return False
+        self._entries.clear()
+        self._entries.extend(kept)
+        return True
+
+    def _locked(self, shared: bool = False):
+        """
+        Блокировка файла стека: со стеком могут одновременно работать несколько оболочек.
+        :param shared: разделяемая блокировка (для чтения)
+        :return: контекстный менеджер блокировки
+        """
+        return file_lock(self.path + '.lock', shared=shared) if self.path else nullcontext()
+
+    def _file_stamp(self) -> tuple | None:
+        """
+        :return: отпечаток файла стека (inode, размер, время изменения) или None, если файла нет
+        """
+        if not self.path:
+            return None
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _reload(self) -> None:
+        """
+        Перечитывает стек, если файл изменила другая оболочка.
+        :return: Данная функция ничего не возвращает
+        """
+        if not self.path:
+            return
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        self._entries.clear()
+        self._entries.extend(HistoryEntry.from_record(record) for record in records)
+        self._stamp = stamp
+
+    def _save(self) -> None:
+        """
+        Сохраняет стек в файл через временный файл (размер файла ограничен глубиной стека).
+        :return: Данная функция ничего не возвращает
+        """
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump([entry.to_record() for entry in self._entries], f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        self._stamp = self._file_stamp()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+
+def _same_entry(first: HistoryEntry, second: HistoryEntry) -> bool:
+    """
+    Вспомогательная функция. Записи стека сравниваются по времени выполнения и команде,
+    так как после перечитывания файла это уже другие объекты.
+    """
+    return first.ts == second.ts and first.command == second.command
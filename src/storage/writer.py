@@ -0,0 +1,183 @@
+import time
+import queue
+import atexit
+import threading
+from Lab_2_Consoleapp_Python.src.storage.journal import encode_record
+
+# Поддерживаемые политики надежности записи истории:
+# none    - запись пачками в фоновом потоке без fsync (данные могут остаться в кэше ОС);
+# batched - запись пачками в фоновом потоке, после каждой пачки выполняется fsync (group commit);
+# fsync   - синхронная запись и fsync после каждой команды в потоке оболочки.
+DURABILITY_MODES = ('none', 'batched', 'fsync')
+
+# Сколько по умолчанию flush ждет фоновый поток, секунд: запрос истории или выход не должны зависнуть
+FLUSH_TIMEOUT = 10.0
+
+_STOP = object()
+_TICK = object()
+
+
+class HistoryWriter:
+    """
+    Фоновый писатель истории: команды оболочки кладут сериализованные записи в очередь,
+    а отдельный поток дописывает их в журнал пачками - по таймеру, при накоплении
+    batch_size записей или при завершении работы оболочки.
+    """
+    def __init__(self, journal, durability: str = 'batched', flush_interval: float = 1.0,
+                 batch_size: int = 64, on_error=None, on_merge=None, deferred: bool = False) -> None:
+        """
+        :param journal: журнал истории (HistoryJournal), в который дописываются записи
+        :param durability: политика надежности: 'none', 'batched' или 'fsync'
+        :param flush_interval: максимальное время (в секундах), которое запись ждет в очереди
+        :param batch_size: количество накопленных записей, при котором пачка пишется сразу
+        :param on_error: функция для сообщения об ошибках записи (например, shell.handle_error)
+        :param on_merge: функция, которой передаются записи других оболочек, обнаруженные при записи
+        :param deferred: копить все записи в памяти и дописывать их одной операцией при flush/close
+                         (пакетный режим: без фонового потока и без записи после каждой команды)
+        :return: Данная функция ничего не возвращает
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown history durability mode: '{durability}'. "
+                             f"Expected one of: {', '.join(DURABILITY_MODES)}")
+        self.journal = journal
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.on_error = on_error
+        self.on_merge = on_merge
+        self.deferred = deferred
+        self._deferred_lines: list[str] = []
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def start(self) -> "HistoryWriter":
+        """
+        Запускает фоновый поток (для политики 'fsync' поток не нужен).
+        :return: Сам писатель (для удобства цепочки вызовов)
+        """
+        if self.durability != 'fsync' and not self.deferred and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="RuletkaShell-history-writer", daemon=True)
+            self._thread.start()
+            # Страховка на случай завершения интерпретатора без вызова exit оболочки
+            atexit.register(self.close)
+        return self
+
+    def submit(self, record: dict) -> None:
+        """
+        Ставит запись в очередь на запись. Сериализация выполняется сразу, чтобы
+        последующие изменения словаря в памяти не влияли на то, что попадет в журнал.
+        :param record: запись истории или служебная запись
+        :return: Данная функция ничего не возвращает
+        """
+        line = encode_record(record)
+        if self.deferred and not self._closed:
+            self._deferred_lines.append(line)
+        elif self.durability == 'fsync' or self._thread is None or self._closed:
+            self._merge(self.journal.write_encoded([line], fsync=self.durability == 'fsync'))
+        else:
+            self._queue.put(line)
+
+    def flush(self, timeout: float | None = FLUSH_TIMEOUT) -> None:
+        """
+        Дожидается, пока все поставленные в очередь записи окажутся в журнале.
+        :param timeout: максимальное время ожидания в секундах (None - без ограничения)
+        :return: Данная функция ничего не возвращает
+        """
+        if self.deferred:
+            lines, self._deferred_lines = self._deferred_lines, []
+            self._write(lines, fsync=self.durability != 'none')
+            return
+        if self._thread is None or self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        if not done.wait(timeout):
+            self._report(f"History writer did not respond in {timeout} s, recent history may be unsaved")
+
+    def close(self) -> None:
+        """
+        Записывает все оставшиеся записи и останавливает фоновый поток.
+        :return: Данная функция ничего не возвращает
+        """
+        if self._closed:
+            return
+        if self.deferred:
+            self.flush()
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            atexit.unregister(self.close)
+
+    def _run(self) -> None:
+        """
+        Основной цикл фонового потока: накопление пачки и ее запись в журнал.
+        :return: Данная функция ничего не возвращает
+        """
+        pending: list[str] = []
+        deadline = 0.0
+        while True:
+            timeout = None if not pending else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = _TICK
+
+            if isinstance(item, str):
+                if not pending:
+                    deadline = time.monotonic() + self.flush_interval
+                pending.append(item)
+                if len(pending) < self.batch_size:
+                    continue
+
+            # Таймер, заполненная пачка, явный flush или остановка - пишем накопленное.
+            # Любая ошибка не должна останавливать поток: иначе flush ждал бы его вечно
+            try:
+                self._write(pending)
+            except Exception as e:
+                self._report(f"Failed to save history: {e}")
+            finally:
+                pending = []
+                if isinstance(item, threading.Event):
+                    item.set()
+            if item is _STOP:
+                break
+
+    def _write(self, lines: list[str], fsync: bool | None = None) -> None:
+        """
+        Дописывает пачку строк в журнал одной операцией записи.
+        :param lines: сериализованные записи
+        :param fsync: выполнить fsync после записи (None - по политике 'batched')
+        :return: Данная функция ничего не возвращает
+        """
+        if not lines:
+            return
+        try:
+            foreign = self.journal.write_encoded(lines, fsync=self.durability == 'batched' if fsync is None else fsync)
+        except OSError as e:
+            self._report(f"Failed to save history: {e}")
+            return
+        self._merge(foreign)
+
+    def _report(self, message: str) -> None:
+        """
+        Сообщает об ошибке через on_error. Ошибка самого on_error не должна останавливать фоновый поток.
+        :param message: сообщение об ошибке
+        :return: Данная функция ничего не возвращает
+        """
+        if self.on_error is None:
+            return
+        try:
+            self.on_error(message)
+        except Exception:
+            pass
+
+    def _merge(self, foreign: list[dict]) -> None:
+        """
+        Передает записи других оболочек, дописанные в журнал с момента предыдущей записи.
+        :param foreign: записи журнала
+        :return: Данная функция ничего не возвращает
+        """
+        if foreign and self.on_merge is not None:
+            self.on_merge(foreign)
@@ -0,0 +1,186 @@
+import os
+import sys
+import threading
+
+try:
+    import readline
+except ImportError:
+    # Windows без pyreadline: ввод работает через обычный input, Ctrl-R недоступен
+    readline = None  # type: ignore[assignment]
+
+try:
+    import tty
+    import termios
+except ImportError:
+    tty = termios = None  # type: ignore[assignment]
+
+# Строка, которую привязка Ctrl-R вставляет в начало ввода и сразу отправляет оболочке.
+# Начинается с '#', поэтому пользователь не наберет ее как обычную команду случайно
+REVERSE_SEARCH_PREFIX = '#rsearch'
+
+_CTRL_R = '\x12'
+_CTRL_G = '\x07'
+_CTRL_C = '\x03'
+_BACKSPACE = ('\x7f', '\x08')
+_ENTER = ('\r', '\n')
+
+# Потоки без терминала (фоновые задания): запросы ввода в них не читают stdin
+_input_state = threading.local()
+
+
+class NoInput(EOFError):
+    """
+    Команда запросила ввод (подтверждение, пароль), но ответить на запрос некому.
+    """
+
+
+def detach_input() -> None:
+    """
+    Отключает ввод для текущего потока: фоновое задание не должно читать stdin
+    одновременно с приглашением оболочки и перехватывать ответы пользователя.
+    :return: Данная функция ничего не возвращает
+    """
+    _input_state.detached = True
+
+
+def ask(prompt: str) -> str:
+    """
+    Запрашивает у пользователя ответ для команды (подтверждение, пароль).
+    :param prompt: текст запроса
+    :return: введенная строка
+    :raises NoInput: команда выполняется в фоновом задании или ввод закрыт (сервер, пакетный режим)
+    """
+    if getattr(_input_state, 'detached', False):
+        raise NoInput("no terminal in a background job")
+    try:
+        return input(prompt)
+    except NoInput:
+        raise
+    except EOFError:
+        # Ответа не будет: запрос считается отклоненным, приглашение завершается переводом строки
+        print()
+        raise NoInput("no input available")
+
+
+def setup_readline() -> bool:
+    """
+    Привязывает Ctrl-R к инкрементальному поиску по истории оболочки: текущая строка ввода
+    отправляется оболочке с префиксом REVERSE_SEARCH_PREFIX и становится начальным запросом.
+    :return: True, если привязка установлена
+    """
+    if readline is None or 'libedit' in (readline.__doc__ or ''):
+        return False
+    readline.parse_and_bind(rf'"\C-r": "\C-a{REVERSE_SEARCH_PREFIX} \C-m"')
+    return True
+
+
+def forget_last_input() -> None:
+    """
+    Убирает из истории readline последнюю введенную строку (служебный запрос поиска).
+    :return: Данная функция ничего не возвращает
+    """
+    if readline is not None and readline.get_current_history_length() > 0:
+        readline.remove_history_item(readline.get_current_history_length() - 1)
+
+
+def remember_input(line: str) -> None:
+    """
+    Добавляет строку в историю readline (стрелки вверх/вниз в текущей сессии).
+    :param line: строка команды
+    :return: Данная функция ничего не возвращает
+    """
+    if readline is not None:
+        readline.add_history(line)
+
+
+def prefill_input(line: str) -> None:
+    """
+    Подставляет строку в следующий запрос ввода, чтобы ее можно было отредактировать перед выполнением.
+    :param line: строка команды
+    :return: Данная функция ничего не возвращает
+    """
+    if readline is None:
+        return
+
+    def hook():
+        readline.insert_text(line)
+        readline.set_startup_hook(None)
+    readline.set_startup_hook(hook)
+
+
+def interactive_available() -> bool:
+    """
+    :return: True, если терминал можно перевести в посимвольный режим для поиска
+    """
+    return termios is not None and sys.stdin.isatty()
+
+
+def read_key() -> str:
+    """
+    Читает одно нажатие клавиши в посимвольном режиме терминала.
+    Escape-последовательности (стрелки и т.п.) возвращаются целиком одной строкой.
+    :return: прочитанные символы
+    """
+    fd = sys.stdin.fileno()
+    old_settings = termios.tcgetattr(fd)
+    try:
+        tty.setraw(fd)
+        key = os.read(fd, 1).decode('utf-8', errors='replace')
+        if key == '\x1b':
+            key += os.read(fd, 8).decode('utf-8', errors='replace')
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+    return key
+
+
+def _write_terminal(text: str) -> None:
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def reverse_search(index, query: str = '', read=read_key, write=None) -> tuple[str | None, bool]:
+    """
+    Инкрементальный поиск по истории в стиле Ctrl-R: каждый введенный символ уточняет запрос,
+    повторное Ctrl-R переходит к более давнему совпадению.
+    Enter - выполнить найденную команду, Esc/стрелки/Tab и прочие управляющие клавиши - взять ее
+    для редактирования, Ctrl-G/Ctrl-C - отменить поиск.
+    :param index: индекс строк истории (HistorySearchIndex)
+    :param query: начальный запрос
+    :param read: функция чтения одного нажатия клавиши
+    :param write: функция вывода на терминал
+    :return: кортеж (выбранная строка или None, выполнить ли ее сразу)
+    """
+    write = write or _write_terminal
+    matches = index.matches(query)
+    current = next(matches, None) if query else None
+    failed = bool(query) and current is None
+
+    while True:
+        prefix = "failed reverse-i-search" if failed else "reverse-i-search"
+        write(f"\r\x1b[K({prefix})`{query}': {current or ''}")
+
+        key = read()
+        if key == _CTRL_R:
+            following = next(matches, None)
+            failed = following is None
+            current = following or current
+        elif key in _BACKSPACE:
+            query = query[:-1]
+            matches = index.matches(query)
+            current = next(matches, None)
+            failed = bool(query) and current is None
+        elif key in _ENTER:
+            write("\r\x1b[K")
+            return current, current is not None
+        elif key in (_CTRL_G, _CTRL_C):
+            write("\r\x1b[K")
+            return None, False
+        elif len(key) == 1 and key.isprintable():
+            query += key
+            matches = index.matches(query)
+            found = next(matches, None)
+            failed = found is None
+            current = found or current
+        else:
+            write("\r\x1b[K")
+            return current, False
@@ -0,0 +1,129 @@
+import os
+import stat
+import errno
+import threading
+
+
+def mount_point(path: str) -> str:
+    """
+    Находит точку монтирования файловой системы, на которой находится путь:
+    поднимается по родительским каталогам, пока устройство (st_dev) не сменится.
+    :param path: существующий путь
+    :return: путь до точки монтирования
+    """
+    path = os.path.realpath(path)
+    device = os.stat(path).st_dev
+    while True:
+        parent = os.path.dirname(path)
+        if parent == path or os.stat(parent).st_dev != device:
+            return path
+        path = parent
+
+
+def move_within_device(source: str, destination: str) -> None:
+    """
+    Перемещает файл или каталог переименованием (O(1) в пределах одной файловой системы).
+    Если переименование невозможно (EXDEV, например, разные bind-точки монтирования одного устройства),
+    выполняется обычное перемещение с копированием.
+    :param source: что переместить
+    :param destination: куда переместить
+    :return: Данная функция ничего не возвращает
+    """
+    try:
+        os.rename(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # shutil (вместе с bz2 и lzma) подгружается только здесь, чтобы не замедлять запуск оболочки
+        import shutil
+        shutil.move(source, destination)
+
+
+class TrashLocator:
+    """
+    Выбор корзины для удаляемого пути: у каждого устройства (st_dev) своя корзина
+    (каталог .ruletka-trash в точке монтирования), поэтому rm всегда выполняется
+    переименованием, а не копированием между файловыми системами.
+    Корзины кэшируются по номеру устройства.
+    """
+    def __init__(self, default_trash_dir: str, dir_name: str = '.ruletka-trash') -> None:
+        """
+        :param default_trash_dir: корзина оболочки (.trash рядом с исходным кодом) - используется
+                                  для файлов на том же устройстве
+        :param dir_name: имя каталога корзины в точке монтирования
+        :return: Данная функция ничего не возвращает
+        """
+        self.default_trash_dir = default_trash_dir
+        self.dir_name = dir_name
+        self._by_device: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def trash_dir_for(self, path: str) -> str:
+        """
+        Возвращает (и при необходимости создает) корзину на том же устройстве, что и путь.
+        :param path: удаляемый путь (должен существовать)
+        :return: путь до каталога корзины
+        """
+        device = os.lstat(path).st_dev
+        with self._lock:
+            trash_dir = self._by_device.get(device)
+            if trash_dir is None or not os.path.isdir(trash_dir):
+                trash_dir = self._by_device[device] = self._find_trash_dir(path, device)
+        return trash_dir
+
+    def known_trash_dirs(self) -> list[str]:
+        """
+        :return: корзины, которые уже использовались в этой сессии (включая корзину оболочки)
+        """
+        with self._lock:
+            return sorted({self.default_trash_dir, *self._by_device.values()})
+
+    def _find_trash_dir(self, path: str, device: int) -> str:
+        """
+        Ищет место для корзины: корзина оболочки, если она на том же устройстве, иначе каталог
+        в точке монтирования; если там нет прав на запись - в ближайшем к ней доступном каталоге
+        на пути к удаляемому объекту (родительский каталог доступен всегда, раз объект можно удалить).
+        :param path: удаляемый путь
+        :param device: номер устройства пути
+        :return: путь до каталога корзины
+        """
+        try:
+            if os.stat(self.default_trash_dir).st_dev == device:
+                return self.default_trash_dir
+        except FileNotFoundError:
+            pass
+
+        parent = os.path.realpath(os.path.dirname(os.path.abspath(path)))
+        mount = mount_point(parent)
+        candidates = [mount]
+        relative = os.path.relpath(parent, mount)
+        if relative != os.curdir:
+            current = mount
+            for part in relative.split(os.sep):
+                current = os.path.join(current, part)
+                candidates.append(current)
+
+        for directory in candidates:
+            trash_dir = os.path.join(directory, self.dir_name)
+            try:
+                os.makedirs(trash_dir, mode=0o700, exist_ok=True)
+            except OSError:
+                continue
+            if _is_private_dir(trash_dir) and os.access(trash_dir, os.W_OK):
+                return trash_dir
+        raise PermissionError(f"no writable location for trash on the device of '{path}'")
+
+
+def _is_private_dir(path: str) -> bool:
+    """
+    Вспомогательная функция. Проверяет, что каталог корзины принадлежит пользователю и закрыт для остальных.
+    makedirs не меняет права уже существующего каталога, а в общем каталоге (например, /tmp) его
+    (или ссылку на свой каталог) мог заранее создать другой пользователь, чтобы читать удаленные файлы.
+    :param path: путь до каталога корзины
+    :return: True, если это не ссылка, а каталог пользователя без прав для группы и остальных
+    """
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o077
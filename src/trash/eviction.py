@@ -0,0 +1,255 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from Lab_2_Consoleapp_Python.src.storage.locking import file_lock
+
+_DAY = 24 * 60 * 60
+# Каталог внутри корзины, куда объект переносится перед окончательным удалением
+PURGING_DIR_NAME = '.purging'
+# Сколько файлов удаляет одна задача пула
+_UNLINK_BATCH = 256
+
+
+def _scan(directory: str) -> tuple[list[str], list[str]]:
+    """
+    :param directory: каталог
+    :return: (пути файлов и ссылок, пути подкаталогов) непосредственно в каталоге
+    """
+    files: list[str] = []
+    subdirs: list[str] = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            (subdirs if entry.is_dir(follow_symlinks=False) else files).append(entry.path)
+    return files, subdirs
+
+
+def _unlink_all(paths: list[str]) -> None:
+    """
+    Удаляет файлы (уже удаленные кем-то другим пропускаются).
+    :param paths: пути файлов
+    :return: Данная функция ничего не возвращает
+    """
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def delete_tree(path: str, workers: int = 8) -> None:
+    """
+    Удаляет файл или дерево каталогов пулом потоков: каталоги просматриваются параллельно,
+    файлы удаляются пачками по _UNLINK_BATCH (системный вызов unlink отпускает GIL),
+    затем пустые каталоги удаляются от самых глубоких к корню.
+    :param path: путь до файла или каталога
+    :param workers: число потоков удаления
+    :return: Данная функция ничего не возвращает
+    """
+    if os.path.islink(path) or not os.path.isdir(path):
+        if os.path.lexists(path):
+            os.remove(path)
+        return
+
+    # Каталоги в порядке обнаружения: любой подкаталог идет после своего родителя
+    directories = [path]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='trash-delete') as pool:
+        scans = {pool.submit(_scan, path)}
+        unlinks = []
+        while scans:
+            done, scans = wait(scans, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                for start in range(0, len(files), _UNLINK_BATCH):
+                    unlinks.append(pool.submit(_unlink_all, files[start:start + _UNLINK_BATCH]))
+                for subdir in subdirs:
+                    directories.append(subdir)
+                    scans.add(pool.submit(_scan, subdir))
+        for unlink in unlinks:
+            unlink.result()
+
+    for directory in reversed(directories):
+        os.rmdir(directory)
+
+
+def purge_item(trash_path: str, trash_dir: str, workers: int = 8) -> None:
+    """
+    Окончательно удаляет объект из корзины. Сначала объект переименовывается в каталог .purging
+    той же корзины (мгновенно), поэтому недоудаленное дерево не останется среди восстанавливаемых
+    объектов и будет дочищено при следующем проходе вытеснения.
+    :param trash_path: путь до объекта в корзине
+    :param trash_dir: корзина объекта
+    :param workers: число потоков удаления
+    :return: Данная функция ничего не возвращает
+    """
+    if not os.path.lexists(trash_path):
+        return
+    purging_dir = os.path.join(trash_dir, PURGING_DIR_NAME)
+    os.makedirs(purging_dir, exist_ok=True)
+    purging_path = os.path.join(purging_dir, os.path.basename(trash_path))
+    os.rename(trash_path, purging_path)
+    delete_tree(purging_path, workers)
+
+
+class TrashEvictor:
+    """
+    Фоновое вытеснение объектов из корзин по квоте: объекты старше max_age_days удаляются
+    окончательно, а если все корзины вместе занимают больше max_bytes - удаляются самые давно
+    удаленные объекты, пока объем не уложится в квоту. Объекты выбираются по описи корзин;
+    объекты, удаленные в корзину оболочки до появления описи, добавляются в нее при первом проходе.
+    деревья каталогов удаляются пулом потоков (delete_tree), приглашение оболочки при этом не ждет.
+    Одновременно вытеснение выполняет только одна оболочка.
+    """
+    def __init__(self, manifest_path: str, max_bytes: int | None = None, max_age_days: float | None = None,
+                 interval: float = 600.0, workers: int = 8, extra_trash_dirs=(), on_error=None) -> None:
+        """
+        :param manifest_path: путь до описи корзин (.trash.db); у потока вытеснения свое соединение
+        :param max_bytes: сколько байт могут занимать все корзины (None - без ограничения)
+        :param max_age_days: сколько дней хранить удаленные объекты (None - без ограничения)
+        :param interval: период фонового вытеснения в секундах
+        :param workers: число потоков удаления
+        :param extra_trash_dirs: корзины, каталог .purging которых дочищается, даже если в описи
+                                 нет их объектов, а объекты вне описи однократно в нее добавляются
+                                 (корзина оболочки)
+        :param on_error: функция, которой передается сообщение об ошибке вытеснения
+        :return: Данная функция ничего не возвращает
+        """
+        self.manifest_path = manifest_path
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.interval = interval
+        self.workers = workers
+        self.extra_trash_dirs = list(extra_trash_dirs)
+        self.on_error = on_error
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "TrashEvictor":
+        """
+        Запускает фоновый поток, который вытесняет объекты сразу и затем раз в interval секунд.
+        :return: Сам объект (для удобства цепочки вызовов)
+        """
+        self._thread = threading.Thread(target=self._run, name="trash-evictor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Останавливает фоновый поток (начатое удаление объекта дорабатывает до конца).
+        :param timeout: сколько секунд ждать завершения потока
+        :return: Данная функция ничего не возвращает
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        # sqlite3 подгружается в фоновом потоке, а не при запуске оболочки
+        from Lab_2_Consoleapp_Python.src.trash.manifest import TrashManifest
+        try:
+            manifest = TrashManifest(self.manifest_path)
+        except Exception as e:
+            self._report(f"Failed to open trash manifest: {e}")
+            return
+        try:
+            while True:
+                try:
+                    self.evict(manifest)
+                except Exception as e:
+                    self._report(f"Failed to evict trash: {e}")
+                if self._stop.wait(self.interval):
+                    return
+        finally:
+            manifest.close()
+
+    def evict(self, manifest, now: float | None = None) -> dict:
+        """
+        Выполняет один проход вытеснения.
+        :param manifest: опись корзин (TrashManifest)
+        :param now: текущее unix-время (для тестов)
+        :return: статистика прохода: evicted (объектов), freed (байт)
+        """
+        stats = {'evicted': 0, 'freed': 0}
+        with file_lock(self.manifest_path + '.evict', blocking=False) as acquired:
+            if acquired:
+                self._evict(manifest, time.time() if now is None else now, stats)
+        return stats
+
+    def _evict(self, manifest, now: float, stats: dict) -> None:
+        """
+        Один проход вытеснения (выполняется под блокировкой вытеснения).
+        :param manifest: опись корзин
+        :param now: текущее unix-время
+        :param stats: статистика прохода, заполняется на месте
+        :return: Данная функция ничего не возвращает
+        """
+        # Дочистка объектов, удаление которых прервалось (например, при выходе из оболочки)
+        for trash_dir in {*manifest.trash_dirs(), *self.extra_trash_dirs}:
+            purging_dir = os.path.join(trash_dir, PURGING_DIR_NAME)
+            if os.path.isdir(purging_dir):
+                for name in os.listdir(purging_dir):
+                    try:
+                        delete_tree(os.path.join(purging_dir, name), self.workers)
+                    except OSError as e:
+                        self._report(f"Failed to delete '{os.path.join(purging_dir, name)}': {e}")
+
+        # Объекты, удаленные до появления описи (один раз для каждой корзины)
+        for trash_dir in self.extra_trash_dirs:
+            if os.path.isdir(trash_dir):
+                try:
+                    manifest.import_untracked(trash_dir, exclude=(PURGING_DIR_NAME,))
+                except OSError as e:
+                    self._report(f"Failed to import '{trash_dir}' into trash manifest: {e}")
+
+        # Размеры каталогов, удаленных через rm, считаются здесь, а не во время rm
+        while not self._stop.is_set():
+            items = manifest.unsized(limit=64)
+            if not items:
+                break
+            manifest.measure(items)
+
+        if self.max_age_days is not None:
+            for item in manifest.find(older_than=now - self.max_age_days * _DAY, oldest_first=True):
+                if self._stop.is_set():
+                    return
+                self._purge(manifest, item, stats)
+
+        if self.max_bytes is not None:
+            excess = manifest.total_size() - self.max_bytes
+            # Объекты, которые не удалось удалить, остаются в начале описи: они пропускаются
+            failed = 0
+            while excess > 0 and not self._stop.is_set():
+                items = manifest.find(limit=64, oldest_first=True, offset=failed)
+                if not items:
+                    break
+                for item in items:
+                    if excess <= 0 or self._stop.is_set():
+                        break
+                    if self._purge(manifest, item, stats):
+                        excess -= item['size'] or 0
+                    else:
+                        failed += 1
+
+    def _purge(self, manifest, item: dict, stats: dict) -> bool:
+        """
+        Удаляет объект с диска, затем из описи. Если объект удалить не удалось (EACCES, EBUSY),
+        запись остается в описи, и объект будет вытеснен при следующем проходе.
+        :param manifest: опись корзин
+        :param item: запись описи
+        :param stats: статистика прохода
+        :return: True, если объект удален
+        """
+        try:
+            purge_item(item['trash_path'], item['trash_dir'], self.workers)
+        except OSError as e:
+            self._report(f"Failed to evict '{item['trash_path']}': {e}")
+            return False
+        manifest.remove([item['id']])
+        stats['evicted'] += 1
+        stats['freed'] += item['size'] or 0
+        return True
+
+    def _report(self, message: str) -> None:
+        if self.on_error is not None:
+            self.on_error(message)
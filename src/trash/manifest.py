@@ -0,0 +1,328 @@
+import os
+import re
+import stat
+import sqlite3
+import datetime
+import threading
+
+# Версия 2: размер каталога может быть неизвестен (NULL) - он считается в фоне, а не во время rm
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    original_path TEXT NOT NULL,
+    trash_path TEXT NOT NULL UNIQUE,
+    trash_dir TEXT NOT NULL,
+    device INTEGER NOT NULL,
+    size INTEGER,
+    is_dir INTEGER NOT NULL,
+    deleted_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_original ON items(original_path, deleted_at);
+CREATE INDEX IF NOT EXISTS idx_items_deleted ON items(deleted_at);
+CREATE INDEX IF NOT EXISTS idx_items_unsized ON items(id) WHERE size IS NULL;
+CREATE TABLE IF NOT EXISTS imported_dirs (trash_dir TEXT PRIMARY KEY);
+"""
+
+_COLUMNS = "id, original_path, trash_path, trash_dir, device, size, is_dir, deleted_at"
+
+# Символы шаблона (как в glob/fnmatch)
+_GLOB_CHARS = '*?['
+# Отметка времени в конце имени объекта в корзине (<имя>_%Y%m%d_%H%M%S_%f[_n])
+_NAME_TIMESTAMP = re.compile(r'_(\d{8}_\d{6}_\d{6})(?:_\d+)?$')
+
+
+def disk_usage(path: str) -> int:
+    """
+    Считает размер файла или каталога (сумма размеров файлов, ссылки не разыменовываются).
+    Читаются только метаданные, содержимое файлов не читается.
+    :param path: путь до файла или каталога
+    :return: размер в байтах
+    """
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        return info.st_size
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+    return total
+
+
+def _deleted_at(name: str, default: float) -> float:
+    """
+    :param name: имя объекта в корзине
+    :param default: время, если в имени нет отметки времени
+    :return: unix-время удаления по отметке в имени (как ее пишет rm)
+    """
+    match = _NAME_TIMESTAMP.search(name)
+    if match:
+        try:
+            return datetime.datetime.strptime(match.group(1), "%Y%m%d_%H%M%S_%f").timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+def _prefix_bounds(prefix: str) -> tuple[str, str]:
+    """
+    Границы диапазона строк, начинающихся с prefix (для поиска по индексу).
+    :param prefix: непустой префикс
+    :return: (нижняя граница включительно, верхняя граница не включительно)
+    """
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class TrashManifest:
+    """
+    Опись корзин в локальной базе SQLite (.trash.db рядом с исходным кодом): для каждого
+    удаленного объекта хранятся исходный путь, путь в корзине, устройство, размер и время удаления.
+    Индекс по исходному пути позволяет находить, восстанавливать и удалять объекты
+    за O(log n), не просматривая каталоги корзин.
+    Одно соединение используется из нескольких потоков (фоновые задания, запросы сервера),
+    поэтому каждая транзакция и каждый запрос выполняются под блокировкой описи.
+    """
+    def __init__(self, db_path: str) -> None:
+        """
+        :param db_path: путь до файла базы (.trash.db)
+        :return: Данная функция ничего не возвращает
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False, timeout=10)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 1:
+            # Записи версии 1 переносятся как есть (размеры в ней известны всегда) одной транзакцией
+            self.conn.executescript(
+                "BEGIN IMMEDIATE; DROP INDEX IF EXISTS idx_items_original; DROP INDEX IF EXISTS idx_items_deleted; "
+                f"ALTER TABLE items RENAME TO items_v1; {_SCHEMA} "
+                f"INSERT INTO items ({_COLUMNS}) SELECT {_COLUMNS} FROM items_v1; DROP TABLE items_v1; "
+                f"PRAGMA user_version = {_SCHEMA_VERSION}; COMMIT;")
+        elif version != _SCHEMA_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS items")
+            self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """
+        Закрывает соединение с базой.
+        :return: Данная функция ничего не возвращает
+        """
+        with self._lock:
+            self.conn.close()
+
+    def add(self, original_path: str, trash_path: str, trash_dir: str, device: int, size: int,
+            is_dir: bool, deleted_at: float) -> int:
+        """
+        Добавляет удаленный объект в опись.
+        :param original_path: абсолютный путь, по которому объект находился до удаления
+        :param trash_path: путь до объекта в корзине
+        :param trash_dir: корзина, в которую он перемещен
+        :param device: номер устройства (st_dev) корзины
+        :param size: размер в байтах (None - неизвестен, см. measure)
+        :param is_dir: объект - каталог
+        :param deleted_at: unix-время удаления
+        :return: идентификатор записи
+        """
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT OR REPLACE INTO items (original_path, trash_path, trash_dir, device, size, is_dir, deleted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (original_path, trash_path, trash_dir, device, size, int(is_dir), deleted_at))
+            return cursor.lastrowid or 0
+
+    def add_many(self, items: list[dict]) -> None:
+        """
+        Добавляет в опись пачку удаленных объектов одной транзакцией.
+        :param items: словари с ключами original_path, trash_path, trash_dir, device, size, is_dir, deleted_at
+        :return: Данная функция ничего не возвращает
+        """
+        rows = [{**item, 'is_dir': int(item['is_dir'])} for item in items]
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO items (original_path, trash_path, trash_dir, device, size, is_dir, "
+                    "deleted_at) VALUES (:original_path, :trash_path, :trash_dir, :device, :size, :is_dir, :deleted_at)",
+                    rows)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def find(self, pattern: str | None = None, older_than: float | None = None,
+             limit: int | None = None, oldest_first: bool = False, offset: int = 0) -> list[dict]:
+        """
+        Ищет объекты в описи (от недавно удаленных к давним).
+        :param pattern: абсолютный путь (сам объект и все, что было внутри него)
+                        или шаблон с *, ?, [...]; None - все объекты
+        :param older_than: только удаленные раньше этого unix-времени
+        :param limit: не больше стольких записей
+        :param oldest_first: от давно удаленных к недавним (для вытеснения)
+        :param offset: пропустить столько первых записей (вместе с limit)
+        :return: список записей описи
+        """
+        conditions: list[str] = []
+        params: list[str | float | int] = []
+        if pattern:
+            literal = pattern
+            for char in _GLOB_CHARS:
+                if char in literal:
+                    literal = literal[:literal.index(char)]
+            if literal == pattern:
+                # Точный путь: сам объект или что-то внутри него (диапазон по индексу)
+                low, high = _prefix_bounds(pattern.rstrip(os.sep) + os.sep)
+                conditions.append("(original_path = ? OR (original_path >= ? AND original_path < ?))")
+                params += [pattern.rstrip(os.sep) or os.sep, low, high]
+            else:
+                # Шаблон: диапазон по неизменному префиксу, затем проверка GLOB только внутри него
+                if literal:
+                    low, high = _prefix_bounds(literal)
+                    conditions.append("original_path >= ? AND original_path < ?")
+                    params += [low, high]
+                conditions.append("original_path GLOB ?")
+                params.append(pattern)
+        if older_than is not None:
+            conditions.append("deleted_at < ?")
+            params.append(older_than)
+
+        query = f"SELECT {_COLUMNS} FROM items"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY deleted_at, id" if oldest_first else " ORDER BY deleted_at DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(query, params)]
+
+    def latest(self, original_path: str) -> dict | None:
+        """
+        :param original_path: абсолютный исходный путь
+        :return: последняя удаленная по этому пути запись или None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {_COLUMNS} FROM items WHERE original_path = ? ORDER BY deleted_at DESC, id DESC LIMIT 1",
+                (original_path,)).fetchone()
+        return dict(row) if row else None
+
+    def remove(self, item_ids) -> None:
+        """
+        Убирает записи из описи (объект восстановлен или удален окончательно).
+        :param item_ids: идентификаторы записей
+        :return: Данная функция ничего не возвращает
+        """
+        with self._lock:
+            self.conn.executemany("DELETE FROM items WHERE id = ?", [(item_id,) for item_id in item_ids])
+
+    def remove_trash_paths(self, trash_paths) -> None:
+        """
+        Убирает записи по путям в корзине (используется при отмене rm).
+        :param trash_paths: пути до объектов в корзине
+        :return: Данная функция ничего не возвращает
+        """
+        with self._lock:
+            self.conn.executemany("DELETE FROM items WHERE trash_path = ?", [(path,) for path in trash_paths])
+
+    def trash_dirs(self) -> list[str]:
+        """
+        :return: корзины, в которых есть объекты из описи
+        """
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT trash_dir FROM items")]
+
+    def unsized(self, limit: int | None = None) -> list[dict]:
+        """
+        :param limit: не больше стольких записей
+        :return: записи, размер которых еще не посчитан (от давно удаленных к недавним)
+        """
+        query = f"SELECT {_COLUMNS} FROM items WHERE size IS NULL ORDER BY id"
+        params = []
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(query, params)]
+
+    def measure(self, items: list[dict]) -> list[dict]:
+        """
+        Считает неизвестные размеры объектов (обход дерева каталога в корзине) и сохраняет их в описи.
+        Объект, которого уже нет в корзине, считается пустым.
+        :param items: записи описи; размер заполняется на месте
+        :return: те же записи
+        """
+        measured = []
+        for item in items:
+            if item['size'] is None:
+                try:
+                    item['size'] = disk_usage(item['trash_path'])
+                except OSError:
+                    item['size'] = 0
+                measured.append((item['size'], item['id']))
+        if measured:
+            with self._lock:
+                self.conn.executemany("UPDATE items SET size = ? WHERE id = ?", measured)
+        return items
+
+    def import_untracked(self, trash_dir: str, exclude=()) -> int:
+        """
+        Однократно добавляет в опись объекты корзины, которых в ней нет (удаленные до появления описи),
+        чтобы их тоже вытесняло TrashEvictor. Исходный путь таких объектов неизвестен, поэтому
+        в опись записывается путь в корзине: trash restore их не восстанавливает, а undo - восстанавливает.
+        Время удаления берется из отметки в имени объекта (иначе - время изменения), размер считается в фоне.
+        :param trash_dir: корзина
+        :param exclude: имена служебных каталогов корзины, которые не добавляются (.purging)
+        :return: число добавленных объектов (0, если корзина уже была просмотрена)
+        """
+        with self._lock:
+            if self.conn.execute("SELECT 1 FROM imported_dirs WHERE trash_dir = ?", (trash_dir,)).fetchone():
+                return 0
+            known = {row[0] for row in self.conn.execute("SELECT trash_path FROM items WHERE trash_dir = ?",
+                                                         (trash_dir,))}
+        rows = []
+        with os.scandir(trash_dir) as it:
+            for entry in it:
+                if entry.name in exclude or entry.path in known:
+                    continue
+                try:
+                    info = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                is_dir = stat.S_ISDIR(info.st_mode)
+                rows.append((entry.path, entry.path, trash_dir, info.st_dev, None if is_dir else info.st_size,
+                             int(is_dir), _deleted_at(entry.name, info.st_mtime)))
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # INSERT OR IGNORE: объект, который rm успел записать в опись сам, не перезаписывается
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO items (original_path, trash_path, trash_dir, device, size, is_dir, "
+                    "deleted_at) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self.conn.execute("INSERT OR IGNORE INTO imported_dirs (trash_dir) VALUES (?)", (trash_dir,))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def total_size(self) -> int:
+        """
+        :return: суммарный размер объектов в описи (объекты с неизвестным размером не учитываются)
+        """
+        with self._lock:
+            return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM items").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
@@ -4,6 +4,8 @@ import os
 from unittest.mock import Mock
 
 from Lab_2_Consoleapp_Python.src.ruletka_shell import RuletkaShell
+from Lab_2_Consoleapp_Python.src.storage.undo_stack import UndoStack
+from Lab_2_Consoleapp_Python.src.storage.search import HistorySearchIndex
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
 
@@ -11,7 +13,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
 @pytest.fixture
 def mock_commands():
     mock_commands = {}
-    command_names = ['cd', 'ls', 'cat', 'cp', 'mv', 'rm', 'zip', 'unzip', 'tar', 'untar', 'grep', 'history', 'undo']
+    command_names = ['cd', 'ls', 'cat', 'cp', 'mv', 'rm', 'zip', 'unzip', 'tar', 'untar', 'grep', 'history', 'undo', 'trash']
 
     for cmd in command_names:
         mock_commands[cmd] = Mock(return_value=None)
@@ -41,8 +43,7 @@ def mock_logging_config():
 
 @pytest.fixture
 def shell_instance(mocker, mock_commands):
-    for cmd_name, mock_cmd in mock_commands.items():
-        mocker.patch(f'ruletka_shell.{cmd_name}', mock_cmd)
+    mocker.patch('ruletka_shell.get_command', side_effect=lambda name: mock_commands[name])
 
     mocker.patch('ruletka_shell.logging.config.dictConfig')
     mocker.patch('ruletka_shell.logging.getLogger')
@@ -56,5 +57,7 @@ def shell_instance(mocker, mock_commands):
     shell.commands = mock_commands
     shell.logger = Mock()
     shell.command_history = []
+    shell.undo_stack = UndoStack(None)
+    shell.search_index = HistorySearchIndex()
 
     return shell
\ No newline at end of file
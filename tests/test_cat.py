@@ -1,5 +1,5 @@
-from unittest.mock import Mock, MagicMock
-from commands.cat import execute
+from unittest.mock import Mock, MagicMock, mock_open
+from commands.cat import execute, stream
 
 class TestCatCommand:
     def test_cat_successful_file_read(self, mocker):
@@ -259,4 +259,45 @@ class TestCatCommand:
         execute(shell, ['/etc/config.txt'])
 
         mock_stdout_write.assert_called_once_with("absolute path content\n")
-        shell.handle_error.assert_not_called()
\ No newline at end of file
+        shell.handle_error.assert_not_called()
+
+    def test_cat_stream_strips_line_endings(self, mocker):
+        shell = Mock()
+        shell.resolve_user_path = Mock(return_value='/home/user/file.txt')
+        shell.handle_error = Mock()
+
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.path.isdir', return_value=False)
+        mocker.patch('os.path.isfile', return_value=True)
+        mocker.patch('builtins.open', mock_open(read_data="first\r\nsecond\nthird"))
+
+        assert list(stream(shell, ['file.txt'])) == ["first", "second", "third"]
+        assert list(stream(shell, [], iter(["from", "stdin"]))) == ["from", "stdin"]
+        shell.handle_error.assert_not_called()
+
+    def test_cat_line_debug_is_sampled_and_level_gated(self, mocker):
+        shell = Mock()
+        shell.resolve_user_path = Mock(return_value='/home/user/big.txt')
+        shell.handle_error = Mock()
+        command_logger = shell.logger.getChild.return_value
+
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.path.isdir', return_value=False)
+        mocker.patch('os.path.isfile', return_value=True)
+        mocker.patch('builtins.open', mock_open(read_data="".join(f"line{i}\n" for i in range(2500))))
+        mocker.patch('Lab_2_Consoleapp_Python.src.source.line_logging.LINE_LOG_SAMPLING', {'cat': 1000})
+        mock_write = mocker.patch('sys.stdout.write')
+        mock_writelines = mocker.patch('sys.stdout.writelines')
+
+        command_logger.isEnabledFor.return_value = True
+        execute(shell, ['big.txt'])
+        shell.logger.getChild.assert_called_with('cat')
+        assert [c.args[1] for c in command_logger.debug.call_args_list] == [1, 1001, 2001]
+        assert mock_write.call_count == 2500
+
+        # DEBUG выключен: строки выводятся без проверок и форматирования на каждой строке
+        command_logger.reset_mock()
+        command_logger.isEnabledFor.return_value = False
+        execute(shell, ['big.txt'])
+        command_logger.debug.assert_not_called()
+        assert len(list(mock_writelines.call_args.args[0])) == 2500
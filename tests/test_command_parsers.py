@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+from commands.parsing import command_parsers
+from commands.parsing.command_parsers import parse_command_args, parse_mv_args, parse_undo_args, \
+    parse_history_args, parse_trash_args, parse_rm_args, parse_profile_args
+from commands.parsing.specs import COMMAND_SPECS, HISTORY_CONFIG
+from commands.help import execute as help_execute
+
+
+class TestCommandParsers:
+    def test_positional_fast_path_skips_argparse(self, mocker):
+        build = mocker.patch('commands.parsing.command_parsers._build_parser')
+
+        assert parse_mv_args(['a.txt', 'b.txt']) == SimpleNamespace(source='a.txt', destination='b.txt')
+        assert parse_undo_args([]) == SimpleNamespace(n='1')
+        assert parse_undo_args(['3']) == SimpleNamespace(n='3')
+        assert parse_command_args('help', []) == SimpleNamespace(command=None)
+        build.assert_not_called()
+
+    def test_fast_path_falls_back_to_argparse_on_errors(self, mocker):
+        mocker.patch('sys.stderr')
+        assert parse_mv_args(['only-one']) is None
+        assert parse_mv_args(['a', 'b', 'c']) is None
+        assert parse_undo_args(['-x']) is None
+
+    def test_usage_error_is_reported_through_shell(self):
+        shell = Mock()
+
+        assert parse_rm_args([], shell) is None
+        assert parse_trash_args(['bogus'], shell) is None
+        assert parse_mv_args(['only-one'], shell) is None
+        messages = [call.args[0] for call in shell.handle_error.call_args_list]
+        assert messages[0] == "rm: the following arguments are required: paths"
+        assert messages[1].startswith("trash: argument action: invalid choice: 'bogus'")
+        assert messages[2] == "mv: the following arguments are required: destination"
+
+    def test_parser_built_once(self, mocker):
+        command_parsers._parsers.pop('grep', None)
+        build = mocker.spy(command_parsers, '_build_parser')
+
+        first = parse_command_args('grep', ['-r', '-i', 'TODO', 'src'])
+        second = parse_command_args('grep', ['x', 'file.txt'])
+
+        assert (first.r, first.i, first.pattern, first.path) == (True, True, 'TODO', 'src')
+        assert (second.r, second.i, second.pattern) == (False, False, 'x')
+        assert build.call_count == 1
+
+    def test_options_and_subcommands(self):
+        parsed = parse_history_args(['5', '--cmd', 'rm', '--failed'])
+        assert (parsed.n, parsed.cmd, parsed.since, parsed.failed) == ('5', 'rm', None, True)
+        parsed = parse_trash_args(['purge', '--older-than', '7d', '-f'])
+        assert (parsed.action, parsed.pattern, parsed.older_than, parsed.f) == ('purge', None, '7d', True)
+        assert parse_rm_args(['-r', 'a', 'b']).paths == ['a', 'b']
+
+    def test_remainder_keeps_command_flags(self):
+        parsed = parse_profile_args(['-n', '5', 'grep', '-r', '-n', 'x'])
+        assert (parsed.n, parsed.memory, parsed.command) == ('5', False, ['grep', '-r', '-n', 'x'])
+        assert COMMAND_SPECS['profile'].usages() == ["profile [-n <count>] [-o <file>] [--memory] <command> [args...]"]
+
+    def test_help_is_built_from_specs(self, mocker):
+        mock_print = mocker.patch('builtins.print')
+
+        help_execute(None, [])
+        general = mock_print.call_args.args[0]
+        for spec in COMMAND_SPECS.values():
+            assert spec.summary_line() in general
+        assert "  rm <path>... [-r] [-f]\n                     - Remove files/directories" in general
+
+        help_execute(None, ['history'])
+        text = mock_print.call_args.args[0]
+        assert "Usage: history [n] [--cmd <name>] [--since <when>] [--path <path>] [--failed]" in text
+        assert "  --failed        - Only failed commands" in text
+
+        help_execute(None, ['undo'])
+        assert f"Up to {HISTORY_CONFIG['undo_depth']} recent operations are kept for undo" in \
+            mock_print.call_args.args[0]
+
+        help_execute(None, ['nope'])
+        mock_print.assert_called_with("help: no help topics found for 'nope'")
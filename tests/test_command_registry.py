@@ -0,0 +1,43 @@
+import os
+import sys
+import subprocess
+import pytest
+from unittest.mock import Mock
+import commands
+from commands.ls import execute as ls_execute
+from ruletka_shell import RuletkaShell
+
+
+class TestCommandRegistry:
+    def test_get_command_returns_execute(self):
+        assert commands.get_command('ls') is ls_execute
+        assert 'ls' in commands.loaded_commands()
+        # Атрибут пакета после импорта подмодуля - снова функция, а не модуль
+        assert commands.ls is ls_execute
+
+    def test_unknown_command(self):
+        with pytest.raises(KeyError):
+            commands.get_command('nope')
+        with pytest.raises(AttributeError):
+            commands.nope
+
+    def test_shell_imports_command_on_first_call(self, mocker):
+        execute = Mock(return_value=None)
+        mock_get = mocker.patch('ruletka_shell.get_command', return_value=execute)
+        shell = RuletkaShell()
+
+        assert set(commands.COMMAND_MODULES) <= set(shell.commands)
+        mock_get.assert_not_called()
+
+        shell.commands['tar'](['src', 'out.tar'])
+        mock_get.assert_called_once_with('tar')
+        execute.assert_called_once_with(shell, ['src', 'out.tar'])
+
+    def test_startup_does_not_import_heavy_modules(self):
+        code = ("import sys\n"
+                "import Lab_2_Consoleapp_Python.src.ruletka_shell\n"
+                "print(','.join(m for m in ('argparse', 'shutil', 'tarfile', 'zipfile', 'sqlite3') "
+                "if m in sys.modules))")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+        assert result.stdout.strip().splitlines()[-1:] in ([], [''])
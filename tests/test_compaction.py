@@ -0,0 +1,91 @@
+from storage.journal import HistoryJournal
+from storage.compaction import HistoryCompactor
+from storage.lazy_history import LazyHistory
+
+DAY = 24 * 60 * 60
+
+
+def _make_journal(tmp_path, count, segment_bytes=400, start=0.0, step=DAY):
+    journal = HistoryJournal(str(tmp_path / '.history.jsonl'), segment_bytes=segment_bytes)
+    for i in range(count):
+        journal.append({'ts': start + i * step, 'command': 'rm', 'args': [str(i)], 'success': True,
+                        'undo_data': {'original_path': f'/a/{i}', 'trash_path': f'/t/{i}'}})
+    return journal
+
+
+class TestHistoryCompactor:
+    def test_single_segment_is_left_alone(self, tmp_path):
+        journal = _make_journal(tmp_path, 3, segment_bytes=10 ** 6)
+        stats = HistoryCompactor(journal, max_entries=1, max_age_days=0).compact(now=10 * DAY)
+        assert stats['removed_segments'] == 0
+        assert len(journal.load()) == 3
+
+    def test_max_entries_removes_oldest_segments(self, tmp_path):
+        journal = _make_journal(tmp_path, 40)
+        stats = HistoryCompactor(journal, max_entries=10).compact(now=40 * DAY)
+
+        entries = journal.load()
+        assert stats['removed_segments'] > 0
+        assert len(entries) >= 10
+        assert entries[-1].args == ('39',)
+        assert [seq for seq, _ in journal.segments()][0] > 1
+
+    def test_max_bytes_limits_total_size(self, tmp_path):
+        journal = _make_journal(tmp_path, 40)
+        HistoryCompactor(journal, max_bytes=1000).compact(now=40 * DAY)
+        sealed = journal.segments()[:-1]
+        total = sum((tmp_path / path).stat().st_size for _, path in journal.segments())
+        assert total <= 1000 or not sealed
+
+    def test_expired_entries_are_dropped(self, tmp_path):
+        journal = _make_journal(tmp_path, 40)
+        active_before = journal.segments()[-1]
+        HistoryCompactor(journal, max_age_days=5).compact(now=40 * DAY)
+
+        # Активный сегмент не трогается, в закрытых не осталось записей старше 5 дней
+        assert journal.segments()[-1] == active_before
+        sealed_entries = []
+        for _, path in journal.segments()[:-1]:
+            sealed_entries.extend(journal.read_segment(path)[0])
+        assert all(record['ts'] >= 35 * DAY for record in sealed_entries)
+        assert journal.load()[-1].args == ('39',)
+
+    def test_stale_undo_data_and_markers_are_stripped(self, tmp_path):
+        journal = _make_journal(tmp_path, 40)
+        journal.append({'undone': 38 * DAY})
+        stats = HistoryCompactor(journal, undo_ttl_days=10).compact(now=40 * DAY)
+
+        entries = journal.load()
+        assert stats['rewritten_segments'] > 0
+        assert len(entries) == 40
+        assert all(entry.undo_data is None for entry in entries if entry.ts < 30 * DAY)
+        assert entries[-1].undo_data is not None
+        assert entries[38].undo_data is None
+
+    def test_second_pass_changes_nothing(self, tmp_path):
+        journal = _make_journal(tmp_path, 40)
+        compactor = HistoryCompactor(journal, max_entries=20, undo_ttl_days=10)
+        compactor.compact(now=40 * DAY)
+        assert compactor.compact(now=40 * DAY) == {'removed_segments': 0, 'rewritten_segments': 0,
+                                                   'dropped_entries': 0}
+
+    def test_lazy_history_survives_compaction(self, tmp_path):
+        journal = _make_journal(tmp_path, 3000, segment_bytes=150_000, step=60)
+        history = LazyHistory(journal, page_size=3).load_tail()
+        start_segment, start_offset = history._start
+        assert start_offset > 0
+        # Сегмент, из которого загружен хвост, закрывается и переписывается уплотнением
+        open(journal.segment_path(start_segment + 1), 'a').close()
+        journal.append({'ts': 3000 * 60.0, 'command': 'ls', 'args': [], 'success': True})
+        HistoryCompactor(journal, undo_ttl_days=1).compact(now=3000 * 60 + 2 * DAY)
+        assert journal.segment_identity(start_segment) != history._start_identity
+
+        assert [entry.args[0] for entry in history] == [str(i) for i in range(3000)]
+        assert history[-1].undo_data is not None
+        assert history[0].undo_data is None
+
+    def test_background_thread_runs_and_stops(self, tmp_path):
+        journal = _make_journal(tmp_path, 40)
+        compactor = HistoryCompactor(journal, max_entries=10, interval=60).start()
+        compactor.stop(timeout=5)
+        assert len(journal.load()) < 40
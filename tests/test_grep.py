@@ -1,5 +1,5 @@
 from unittest.mock import Mock, mock_open
-from commands.grep import execute
+from commands.grep import execute, stream, results
 
 class TestGrepCommand:
     def test_grep_file_found_matches(self, mocker):
@@ -127,4 +127,38 @@ class TestGrepCommand:
 
         result = execute(shell, ['pattern', 'protected.txt'])
         mock_print.assert_called_once_with("No matches found for pattern 'pattern' in 'protected.txt'")
-        shell.handle_error.assert_not_called()
\ No newline at end of file
+        shell.handle_error.assert_not_called()
+
+    def test_grep_stream_from_stdin(self, mocker):
+        shell = Mock()
+        shell.handle_error = Mock()
+
+        result = stream(shell, ['-i', 'world'], iter(["hello World", "test", "bye world"]))
+
+        # Следующая команда конвейера получает строки без подсветки
+        assert list(result) == ["hello World", "bye world"]
+        colored = stream(shell, ['-i', 'world'], iter(["hello World"]), color=True)
+        assert list(colored) == ["hello \033[91mWorld\033[0m"]
+        shell.handle_error.assert_not_called()
+
+    def test_grep_without_path_and_stdin(self, mocker):
+        shell = Mock()
+        shell.handle_error = Mock()
+
+        assert stream(shell, ['world']) is None
+        shell.handle_error.assert_called_once_with("grep: no file or directory to search in")
+
+    def test_grep_results(self, mocker):
+        shell = Mock()
+        shell.resolve_user_path = Mock(side_effect=lambda x: x)
+        shell.handle_error = Mock()
+
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.path.isfile', return_value=True)
+        mocker.patch('builtins.open', mock_open(read_data="hello world\nthis is a test\ngoodbye world\n"))
+
+        matches = list(results(shell, ['world', 'file.txt']))
+
+        assert [(m.path, m.line_number, m.line) for m in matches] == [
+            ('file.txt', 1, 'hello world'), ('file.txt', 3, 'goodbye world')]
+        assert matches[1].spans == [(8, 13)]
@@ -1,14 +1,20 @@
 from unittest.mock import Mock
 from commands.history import execute
+from storage.entry import HistoryEntry
+
+
+def _entries(records):
+    return [HistoryEntry.from_record(record) for record in records]
+
 
 class TestHistoryCommand:
     def test_history_show_all(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.command_history = _entries([
             {'command': 'ls', 'args': ['-l'], 'success': True, 'timestamp': '2024-01-01T10:00:00'},
             {'command': 'cd', 'args': ['..'], 'success': True, 'timestamp': '2024-01-01T10:01:00'},
             {'command': 'invalid', 'args': [], 'success': False, 'timestamp': '2024-01-01T10:02:00'}
-        ]
+        ])
         mock_print = mocker.patch('builtins.print')
 
         result = execute(shell, [])
@@ -17,11 +23,11 @@ class TestHistoryCommand:
 
     def test_history_show_last_n(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.command_history = _entries([
             {'command': 'ls', 'args': ['-l'], 'success': True, 'timestamp': '2024-01-01T10:00:00'},
             {'command': 'cd', 'args': ['..'], 'success': True, 'timestamp': '2024-01-01T10:01:00'},
             {'command': 'pwd', 'args': [], 'success': True, 'timestamp': '2024-01-01T10:02:00'}
-        ]
+        ])
         mock_print = mocker.patch('builtins.print')
 
         result = execute(shell, ['2'])
@@ -30,7 +36,7 @@ class TestHistoryCommand:
 
     def test_history_empty(self, mocker):
         shell = Mock()
-        shell.command_history = []
+        shell.command_history = _entries([])
         mock_print = mocker.patch('builtins.print')
 
         result = execute(shell, [])
@@ -39,10 +45,10 @@ class TestHistoryCommand:
 
     def test_history_more_than_available(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.command_history = _entries([
             {'command': 'ls', 'args': [], 'success': True, 'timestamp': '2024-01-01T10:00:00'},
             {'command': 'cd', 'args': ['~'], 'success': True, 'timestamp': '2024-01-01T10:01:00'}
-        ]
+        ])
         mock_print = mocker.patch('builtins.print')
 
         result = execute(shell, ['5'])
@@ -51,11 +57,34 @@ class TestHistoryCommand:
 
     def test_history_single_command(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.command_history = _entries([
             {'command': 'ls', 'args': ['-la'], 'success': True, 'timestamp': '2024-01-01T10:00:00'}
-        ]
+        ])
         mock_print = mocker.patch('builtins.print')
 
         result = execute(shell, ['1'])
         assert mock_print.call_count == 1
-        assert result is None
\ No newline at end of file
+        assert result is None
+
+    def test_history_filters_use_index(self, mocker):
+        shell = Mock()
+        shell.resolve_user_path = Mock(return_value='/srv/data')
+        shell.query_history = Mock(return_value=[
+            (7, HistoryEntry.from_record({'command': 'rm', 'args': ['old.log'], 'success': True,
+                                          'timestamp': '2024-01-01T10:00:00'}))
+        ])
+        mock_print = mocker.patch('builtins.print')
+
+        result = execute(shell, ['--cmd', 'rm', '--path', 'data', '--failed', '3'])
+        shell.query_history.assert_called_once_with(command='rm', since=None, path='/srv/data', failed=True, limit=3)
+        mock_print.assert_called_once_with("   7 ✓ 2024-01-01T10:00:00 rm old.log")
+        assert result is None
+
+    def test_history_invalid_since(self, mocker):
+        shell = Mock()
+        mocker.patch('builtins.print')
+
+        result = execute(shell, ['--since', 'yesterday'])
+        shell.query_history.assert_not_called()
+        shell.handle_error.assert_called_once()
+        assert result is None
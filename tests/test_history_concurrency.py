@@ -0,0 +1,89 @@
+import multiprocessing
+import pytest
+from storage.journal import HistoryJournal
+from storage.writer import HistoryWriter
+from storage.lazy_history import LazyHistory
+from storage.undo_stack import UndoStack
+from storage.entry import HistoryEntry
+from storage import locking
+
+PROCESSES = 6
+RECORDS_PER_PROCESS = 300
+
+
+def _write_history(path, worker, durability):
+    journal = HistoryJournal(path, segment_bytes=16 * 1024)
+    writer = HistoryWriter(journal, durability=durability, flush_interval=0.005, batch_size=7).start()
+    for i in range(RECORDS_PER_PROCESS):
+        writer.submit({'ts': worker * 10000 + i, 'command': 'ls', 'args': [f'{worker}-{i}'], 'success': True,
+                       'undo_data': None, 'cwd': '/home/user/' + 'x' * (i % 50)})
+    writer.close()
+
+
+@pytest.mark.skipif(locking.fcntl is None or 'fork' not in multiprocessing.get_all_start_methods(),
+                    reason="requires fcntl and fork")
+class TestConcurrentSessions:
+    @pytest.mark.parametrize('durability', ['none', 'fsync'])
+    def test_processes_do_not_lose_entries(self, tmp_path, durability):
+        path = str(tmp_path / '.history.jsonl')
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=_write_history, args=(path, worker, durability))
+                     for worker in range(PROCESSES)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            assert process.exitcode == 0
+
+        journal = HistoryJournal(path, segment_bytes=16 * 1024)
+        args = [entry.args[0] for entry in journal.load()]
+        assert len(args) == PROCESSES * RECORDS_PER_PROCESS
+        assert set(args) == {f'{w}-{i}' for w in range(PROCESSES) for i in range(RECORDS_PER_PROCESS)}
+        # Записи каждой оболочки идут в журнале в порядке их выполнения
+        for worker in range(PROCESSES):
+            own = [arg for arg in args if arg.startswith(f'{worker}-')]
+            assert own == [f'{worker}-{i}' for i in range(RECORDS_PER_PROCESS)]
+        assert len(journal.segments()) > 1
+        assert journal.count_entries() == PROCESSES * RECORDS_PER_PROCESS
+
+
+class TestMergeOnAppend:
+    def test_foreign_records_are_merged(self, tmp_path):
+        path = str(tmp_path / '.history.jsonl')
+        first, second = HistoryJournal(path), HistoryJournal(path)
+        first.append({'ts': 1.0, 'command': 'ls', 'args': [], 'success': True})
+        history = LazyHistory(first).load_tail()
+
+        second.append({'ts': 2.0, 'command': 'rm', 'args': ['a'], 'success': True,
+                       'undo_data': {'original_path': '/a', 'trash_path': '/t/a'}})
+        second.append({'undone': 2.0})
+        foreign = first.write_encoded(['{"ts":3.0,"command":"cd","args":[],"success":true}\n'])
+        history.append(HistoryEntry('cd', [], ts=3.0))
+        history.merge(foreign)
+
+        assert [entry.command for entry in history] == ['ls', 'rm', 'cd']
+        assert history[1].undo_data is None
+        assert first.write_encoded(['{"ts":4.0,"command":"ls","args":[],"success":true}\n']) == []
+
+    def test_writer_reports_foreign_records(self, tmp_path):
+        path = str(tmp_path / '.history.jsonl')
+        journal = HistoryJournal(path)
+        journal.mark_tail()
+        merged = []
+        writer = HistoryWriter(journal, durability='fsync', on_merge=merged.extend).start()
+
+        HistoryJournal(path).append({'ts': 1.0, 'command': 'ls', 'args': [], 'success': True})
+        writer.submit({'ts': 2.0, 'command': 'cd', 'args': [], 'success': True})
+
+        assert [record['command'] for record in merged] == ['ls']
+
+    def test_undo_stack_shared_between_sessions(self, tmp_path):
+        path = str(tmp_path / '.history.undo.json')
+        first, second = UndoStack(path).load(), UndoStack(path).load()
+        first.push(HistoryEntry('rm', ['a'], undo_data={'original_path': '/a'}, ts=1.0))
+        second.push(HistoryEntry('rm', ['b'], undo_data={'original_path': '/b'}, ts=2.0))
+
+        assert [entry.ts for entry in first] == [1.0]
+        assert first.peek().ts == 2.0
+        first.discard(HistoryEntry('rm', ['a'], ts=1.0))
+        assert [entry.ts for entry in UndoStack(path).load()] == [2.0]
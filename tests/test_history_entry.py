@@ -0,0 +1,30 @@
+from storage.entry import HistoryEntry, to_epoch
+
+class TestHistoryEntry:
+    def test_command_and_flags_are_interned(self):
+        first = HistoryEntry(''.join(['l', 's']), [''.join(['-', 'l'])])
+        second = HistoryEntry(''.join(['l', 's']), [''.join(['-', 'l'])])
+        assert first.command is second.command
+        assert first.args[0] is second.args[0]
+
+    def test_success_flag(self):
+        entry = HistoryEntry('rm', ['a.txt'], success=False)
+        assert entry.success is False
+        entry.success = True
+        assert entry.success is True
+
+    def test_has_no_instance_dict(self):
+        entry = HistoryEntry('ls', [])
+        assert not hasattr(entry, '__dict__')
+
+    def test_record_roundtrip(self):
+        entry = HistoryEntry('cp', ['a', 'b'], undo_data={'source': '/a', 'destination': '/b'}, ts=1700000000.5,
+                             cwd='/home/user')
+        assert HistoryEntry.from_record(entry.to_record()) == entry
+
+    def test_legacy_record_with_iso_timestamp(self):
+        entry = HistoryEntry.from_record({'timestamp': '2024-01-01T10:00:00', 'command': 'ls', 'args': ['-l'],
+                                          'success': True, 'undo_data': None})
+        assert entry.ts == to_epoch('2024-01-01T10:00:00')
+        assert entry.timestamp == '2024-01-01T10:00:00'
+        assert entry.args == ('-l',)
@@ -0,0 +1,115 @@
+import threading
+from storage.journal import HistoryJournal
+from storage.index import HistoryIndex, entry_paths
+
+
+def _make_index(tmp_path, records):
+    journal = HistoryJournal(str(tmp_path / '.history.jsonl'))
+    journal.append_many(records)
+    index = HistoryIndex(str(tmp_path / '.history.db'), journal)
+    index.sync()
+    return journal, index
+
+
+class TestHistoryIndex:
+    records = [
+        {'timestamp': '2024-01-01T10:00:00', 'command': 'ls', 'args': ['-l'], 'success': True,
+         'undo_data': None, 'cwd': '/srv'},
+        {'timestamp': '2024-01-02T10:00:00', 'command': 'rm', 'args': ['data/old.log'], 'success': True,
+         'undo_data': {'original_path': '/srv/data/old.log', 'trash_path': '/srv/.trash/old.log_1'}, 'cwd': '/srv'},
+        {'timestamp': '2024-01-03T10:00:00', 'command': 'rm', 'args': ['/home/user/a.txt'], 'success': False,
+         'undo_data': None, 'cwd': '/srv'},
+        {'timestamp': '2024-01-04T10:00:00', 'command': 'grep', 'args': ['data', 'notes.txt'], 'success': True,
+         'undo_data': None, 'cwd': '/home/user'},
+    ]
+
+    def test_entry_paths(self):
+        assert entry_paths(self.records[1]) == {'/srv/data/old.log', '/srv/.trash/old.log_1'}
+        assert entry_paths(self.records[3]) == {'/home/user/notes.txt'}
+        assert entry_paths({'command': 'history', 'args': ['5']}) == set()
+        profiled = {'command': 'profile', 'args': ['-n', '5', '--memory', 'grep', '-r', 'TODO', 'src'], 'cwd': '/srv'}
+        assert entry_paths(profiled) == {'/srv/src'}
+        assert entry_paths({'command': 'profile', 'args': ['--memory'], 'cwd': '/srv'}) == set()
+        batch = {'command': 'rm', 'args': ['*.log'], 'cwd': '/srv', 'undo_data': {'items': [
+            {'original_path': '/srv/a.log', 'trash_path': '/t/a.log_1'},
+            {'original_path': '/srv/b.log', 'trash_path': '/t/b.log_1'}]}}
+        assert entry_paths(batch) == {'/srv/*.log', '/srv/a.log', '/t/a.log_1', '/srv/b.log', '/t/b.log_1'}
+
+    def test_entry_paths_skips_non_path_commands(self):
+        for command, args in [('trash', ['list']), ('trash', ['restore', '3']), ('jobs', []), ('wait', ['1']),
+                              ('fg', ['2']), ('stats', ['3'])]:
+            entry = {'command': command, 'args': args, 'success': True, 'undo_data': None, 'cwd': '/tmp/work/d'}
+            assert entry_paths(entry) == set()
+
+    def test_query_by_command(self, tmp_path):
+        _, index = _make_index(tmp_path, self.records)
+        result = index.query(command='rm')
+        assert [i for i, _ in result] == [2, 3]
+        assert result[0][1].args == ('data/old.log',)
+
+    def test_query_by_path_prefix(self, tmp_path):
+        _, index = _make_index(tmp_path, self.records)
+        assert [i for i, _ in index.query(command='rm', path='/srv/data')] == [2]
+        assert [i for i, _ in index.query(path='/srv/dat')] == []
+
+    def test_query_failed_and_since(self, tmp_path):
+        _, index = _make_index(tmp_path, self.records)
+        assert [i for i, _ in index.query(failed=True)] == [3]
+        since = index.query()[2][1].ts
+        assert len(index.query(since=since)) == 2
+
+    def test_query_limit_returns_latest(self, tmp_path):
+        _, index = _make_index(tmp_path, self.records)
+        assert [i for i, _ in index.query(limit=2)] == [3, 4]
+
+    def test_sync_is_incremental_and_applies_undo(self, tmp_path):
+        journal, index = _make_index(tmp_path, self.records)
+        journal.append({'undone': '2024-01-02T10:00:00'})
+        journal.append({'timestamp': '2024-01-05T10:00:00', 'command': 'cd', 'args': [], 'success': True,
+                        'undo_data': None})
+
+        assert index.sync() == 1
+        assert index.sync() == 0
+        assert index.query(command='rm')[0][1].undo_data is None
+        assert len(index.query()) == 5
+
+    def test_sync_rebuilds_after_rewrite(self, tmp_path):
+        journal, index = _make_index(tmp_path, self.records)
+        (tmp_path / '.history.000001.jsonl').unlink()
+        journal.append_many(self.records[:1])
+
+        index.sync()
+        assert len(index.query()) == 1
+
+    def test_sync_follows_rotation(self, tmp_path):
+        journal = HistoryJournal(str(tmp_path / '.history.jsonl'), segment_bytes=200)
+        index = HistoryIndex(str(tmp_path / '.history.db'), journal)
+        for record in self.records:
+            journal.append(record)
+            index.sync()
+
+        assert len(journal.segments()) > 1
+        assert [entry.command for _, entry in index.query()] == ['ls', 'rm', 'rm', 'grep']
+
+    def test_sync_and_query_from_threads(self, tmp_path):
+        journal, index = _make_index(tmp_path, [])
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(25):
+                    journal.append({'ts': float(n * 100 + i), 'command': 'ls', 'args': [str(n)], 'success': True})
+                    index.sync()
+                    index.query(command='ls', limit=5)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        index.sync()
+        assert len(index.query()) == 100
@@ -0,0 +1,90 @@
+import threading
+from unittest.mock import Mock
+from jobs import JobTable
+from commands.jobs import execute as jobs_execute
+from commands.wait import execute as wait_execute
+from commands.fg import execute as fg_execute
+
+
+def _shell_with_jobs():
+    shell = Mock()
+    shell.jobs = JobTable()
+    shell.handle_error = Mock()
+    return shell
+
+
+class TestJobTable:
+    def test_start_and_wait(self):
+        table = JobTable()
+        release = threading.Event()
+        job = table.start('zip big big.zip', lambda: 0 if release.wait(5) else 1)
+
+        assert job.id == 1 and job.running and job.state == "Running"
+        assert table.running() == [job]
+        assert not job.wait(timeout=0.01)
+
+        release.set()
+        assert job.wait(timeout=5)
+        assert job.state == "Done"
+        assert table.find('%1') is job and table.find('1') is job and table.find('x') is None
+
+    def test_finished_jobs_reported_once(self):
+        table = JobTable()
+        first = table.start('cat a', lambda: 1)
+        second = table.start('cat b', lambda: 0)
+        table.wait_all()
+
+        assert first.state == "Exit 1"
+        assert table.finished() == [first, second]
+        assert table.finished() == []
+        # После того как таблица опустела, номера начинаются с 1
+        assert table.start('ls', lambda: 0).id == 1
+
+
+class TestJobCommands:
+    def test_jobs_lists_and_forgets_finished(self, mocker):
+        shell = _shell_with_jobs()
+        mock_print = mocker.patch('builtins.print')
+        job = shell.jobs.start('grep -r TODO src', lambda: 0)
+        job.wait(timeout=5)
+
+        jobs_execute(shell, [])
+        line = mock_print.call_args_list[0].args[0]
+        assert line.startswith("[1]  Done") and line.endswith("grep -r TODO src")
+
+        jobs_execute(shell, [])
+        mock_print.assert_called_with("No background jobs")
+
+    def test_wait_reports_failed_job_as_error(self, mocker):
+        shell = _shell_with_jobs()
+        mock_print = mocker.patch('builtins.print')
+        shell.jobs.start('ls', lambda: 0)
+        shell.jobs.start('cat missing.txt', lambda: 1)
+
+        wait_execute(shell, [])
+
+        assert mock_print.call_args.args[0].startswith("[1]  Done")
+        assert shell.handle_error.call_args.args[0].startswith("[2]  Exit 1")
+        assert shell.jobs.all() == []
+
+    def test_wait_unknown_job(self, mocker):
+        shell = _shell_with_jobs()
+        wait_execute(shell, ['%3'])
+        shell.handle_error.assert_called_once_with("wait: %3: no such job")
+
+    def test_fg_waits_for_latest_job(self, mocker):
+        shell = _shell_with_jobs()
+        mock_print = mocker.patch('builtins.print')
+        shell.jobs.start('tar src src.tar', lambda: 0)
+        shell.jobs.start('zip src src.zip', lambda: 0)
+
+        fg_execute(shell, [])
+
+        assert mock_print.call_args_list[0].args[0] == 'zip src src.zip'
+        assert mock_print.call_args_list[1].args[0].startswith("[2]  Done")
+        shell.handle_error.assert_not_called()
+
+    def test_fg_without_jobs(self):
+        shell = _shell_with_jobs()
+        fg_execute(shell, [])
+        shell.handle_error.assert_called_once_with("fg: no current job")
@@ -0,0 +1,106 @@
+import json
+import storage.journal as journal_module
+from storage.journal import HistoryJournal, parse_history_text, apply_undo_markers, encode_record
+
+class TestHistoryJournal:
+    def test_encode_record_is_single_compact_line(self):
+        line = encode_record({'command': 'ls', 'args': ['-l'], 'success': True})
+        assert line == '{"command":"ls","args":["-l"],"success":true}\n'
+
+    def test_parse_legacy_array(self):
+        data = [{'command': 'ls', 'args': [], 'success': True, 'timestamp': '2024-01-01T10:00:00'}]
+        assert parse_history_text(json.dumps(data, indent=2)) == data
+
+    def test_parse_journal_skips_truncated_line(self):
+        text = '{"command":"ls","args":[]}\n{"command":"cd","ar'
+        assert parse_history_text(text) == [{'command': 'ls', 'args': []}]
+
+    def test_parse_empty(self):
+        assert parse_history_text('') == []
+        assert parse_history_text('  \n') == []
+
+    def test_apply_undo_markers(self):
+        records = [
+            {'command': 'rm', 'timestamp': 't1', 'undo_data': {'original_path': '/a', 'trash_path': '/t/a'}},
+            {'command': 'ls', 'timestamp': 't2', 'undo_data': None},
+            {'undone': 't1'}
+        ]
+        entries = apply_undo_markers(records)
+        assert len(entries) == 2
+        assert entries[0].undo_data is None
+        assert entries[1].command == 'ls'
+
+    def test_append_does_not_rewrite_existing_records(self, tmp_path):
+        journal = HistoryJournal(str(tmp_path / '.history.jsonl'))
+        journal.append({'command': 'ls', 'timestamp': 't1', 'undo_data': None})
+        journal.append_many([{'command': 'cd', 'timestamp': 't2', 'undo_data': None},
+                             {'command': 'cat', 'timestamp': 't3', 'undo_data': None}])
+
+        lines = (tmp_path / '.history.000001.jsonl').read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 3
+        assert [entry.command for entry in journal.load()] == ['ls', 'cd', 'cat']
+
+    def test_migrate_legacy_once(self, tmp_path):
+        legacy = tmp_path / '.history.json'
+        legacy.write_text(json.dumps([{'command': 'ls', 'timestamp': 't1'}]), encoding='utf-8')
+        journal = HistoryJournal(str(tmp_path / '.history.jsonl'), legacy_path=str(legacy))
+
+        assert journal.migrate_legacy() == 1
+        assert journal.migrate_legacy() == 0
+        assert [entry.command for entry in journal.load()] == ['ls']
+        assert (tmp_path / '.history.json.bak').exists()
+
+    def test_migrate_not_needed_without_legacy(self, tmp_path):
+        journal = HistoryJournal(str(tmp_path / '.history.jsonl'), legacy_path=str(tmp_path / '.history.json'))
+        assert journal.migrate_legacy() == 0
+
+    def test_rotation_starts_new_segment(self, tmp_path):
+        journal = HistoryJournal(str(tmp_path / '.history.jsonl'), segment_bytes=100)
+        for i in range(10):
+            journal.append({'ts': float(i), 'command': 'ls', 'args': ['-l'], 'success': True})
+
+        segments = journal.segments()
+        assert len(segments) > 1
+        assert [seq for seq, _ in segments] == list(range(1, len(segments) + 1))
+        assert [entry.ts for entry in journal.load()] == [float(i) for i in range(10)]
+        assert journal.count_entries() == 10
+
+    def test_count_entries_rescans_only_active_segment(self, tmp_path, mocker):
+        journal = HistoryJournal(str(tmp_path / '.history.jsonl'), segment_bytes=100)
+        for i in range(10):
+            journal.append({'ts': float(i), 'command': 'ls', 'args': ['-l'], 'success': True})
+        assert journal.count_entries() == 10
+
+        count_file = mocker.patch('storage.journal._count_file_entries', wraps=journal_module._count_file_entries)
+        journal.append({'ts': 10.0, 'command': 'ls', 'args': ['-l'], 'success': True})
+        assert journal.count_entries() == 11
+        assert [c.args[0] for c in count_file.call_args_list] == [journal.path]
+
+        # Переписанный уплотнением сегмент пересчитывается
+        first = journal.segment_path(1)
+        with open(first, 'w', encoding='utf-8') as f:
+            f.write(encode_record({'ts': 0.0, 'command': 'ls', 'args': [], 'success': True}))
+        count_file.reset_mock()
+        assert journal.count_entries() < 11
+        assert first in [c.args[0] for c in count_file.call_args_list]
+
+    def test_read_tail_spans_segments(self, tmp_path):
+        journal = HistoryJournal(str(tmp_path / '.history.jsonl'), segment_bytes=100)
+        for i in range(10):
+            journal.append({'ts': float(i), 'command': 'ls', 'args': [], 'success': True})
+
+        records, position = journal.read_tail(4)
+        assert [record['ts'] for record in records][-4:] == [6.0, 7.0, 8.0, 9.0]
+        assert not journal.is_beginning(position)
+        older, position = journal.read_tail(100, end=position)
+        assert [record['ts'] for record in older + records] == [float(i) for i in range(10)]
+        assert journal.is_beginning(position)
+
+    def test_unsegmented_journal_is_migrated(self, tmp_path):
+        (tmp_path / '.history.jsonl').write_text('{"command":"ls","ts":1.0}\n', encoding='utf-8')
+        journal = HistoryJournal(str(tmp_path / '.history.jsonl'))
+
+        assert journal.migrate_legacy() == 1
+        assert journal.migrate_legacy() == 0
+        assert journal.path == str(tmp_path / '.history.000001.jsonl')
+        assert [entry.command for entry in journal.load()] == ['ls']
@@ -0,0 +1,75 @@
+from storage.journal import HistoryJournal
+from storage.lazy_history import LazyHistory
+from storage.entry import HistoryEntry
+
+
+def _make_journal(tmp_path, count, undone=()):
+    journal = HistoryJournal(str(tmp_path / '.history.jsonl'))
+    records = []
+    for i in range(count):
+        records.append({'ts': float(i), 'command': 'rm', 'args': [str(i)], 'success': True,
+                        'undo_data': {'original_path': f'/a/{i}', 'trash_path': f'/t/{i}'}})
+    records.extend({'undone': float(i)} for i in undone)
+    journal.append_many(records)
+    return journal
+
+
+class TestLazyHistory:
+    def test_only_tail_is_loaded_at_startup(self, tmp_path):
+        journal = _make_journal(tmp_path, 5000)
+        history = LazyHistory(journal, page_size=10).load_tail()
+
+        assert not history.fully_loaded
+        assert 10 <= history.loaded_count < 5000
+        assert history[-1].args == ("4999",)
+
+    def test_read_tail_does_not_read_whole_file(self, tmp_path):
+        journal = _make_journal(tmp_path, 2000)
+        records, (seq, start) = journal.read_tail(5, block_size=512)
+        assert seq == 1 and start > 0
+        assert records[-1]['args'] == ['1999']
+
+    def test_len_and_slice_page_in_on_demand(self, tmp_path):
+        journal = _make_journal(tmp_path, 300)
+        history = LazyHistory(journal, page_size=10).load_tail()
+
+        assert len(history) == 300
+        assert [entry.args[0] for entry in history[-3:]] == ['297', '298', '299']
+        assert history[0].args == ('0',)
+        assert history.fully_loaded
+        assert [entry.args[0] for entry in history[100:103]] == ['100', '101', '102']
+
+    def test_iteration_loads_everything(self, tmp_path):
+        journal = _make_journal(tmp_path, 50)
+        history = LazyHistory(journal, page_size=5).load_tail()
+        assert [entry.args[0] for entry in history] == [str(i) for i in range(50)]
+
+    def test_reversed_pages_in_gradually(self, tmp_path):
+        journal = _make_journal(tmp_path, 5000)
+        history = LazyHistory(journal, page_size=10).load_tail()
+
+        iterator = reversed(history)
+        first = [next(iterator).args[0] for _ in range(15)]
+        assert first == [str(i) for i in range(4999, 4984, -1)]
+        assert not history.fully_loaded
+
+    def test_undo_markers_apply_to_paged_entries(self, tmp_path):
+        journal = _make_journal(tmp_path, 100, undone=[3, 98])
+        history = LazyHistory(journal, page_size=5).load_tail()
+
+        assert history[-2].undo_data is None
+        assert history[3].undo_data is None
+        assert history[4].undo_data is not None
+        assert len(history) == 100
+
+    def test_append_and_equality(self, tmp_path):
+        journal = _make_journal(tmp_path, 3)
+        history = LazyHistory(journal, page_size=1).load_tail()
+        history.append(HistoryEntry('ls', [], ts=3.0))
+
+        assert len(history) == 4
+        assert history == journal.load() + [history[-1]]
+
+    def test_count_entries_skips_markers(self, tmp_path):
+        journal = _make_journal(tmp_path, 10, undone=[1, 2])
+        assert journal.count_entries() == 10
@@ -0,0 +1,45 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from source.log_queue import QueueRotatingFileHandler, process_log_queue, configure_worker
+
+
+def _log_from_worker(message):
+    logging.getLogger("RuletkaShell.test_worker").info("worker: %s", message)
+    return message
+
+
+def _logger(handler):
+    logger = logging.getLogger("RuletkaShell.test_worker")
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+class TestQueueRotatingFileHandler:
+    def test_records_are_written_by_listener(self, tmp_path):
+        log_file = tmp_path / 'shell.log'
+        handler = QueueRotatingFileHandler(str(log_file), maxBytes=1024 * 1024, backupCount=1)
+        handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+        logger = _logger(handler)
+
+        logger.debug("line %d", 1)
+        logger.error("failed: %s", "cat")
+        handler.close()
+        handler.close()
+
+        assert log_file.read_text().splitlines() == ["[DEBUG] line 1", "[ERROR] failed: cat"]
+
+    def test_records_from_worker_processes(self, tmp_path):
+        log_file = tmp_path / 'shell.log'
+        handler = QueueRotatingFileHandler(str(log_file))
+        logger = _logger(handler)
+
+        log_queue = process_log_queue(logger)
+        with ProcessPoolExecutor(2, initializer=configure_worker,
+                                 initargs=(log_queue, "RuletkaShell.test_worker")) as pool:
+            assert sorted(pool.map(_log_from_worker, ['a', 'b'])) == ['a', 'b']
+        handler.close()
+
+        assert sorted(log_file.read_text().splitlines()) == ["worker: a", "worker: b"]
+        assert process_log_queue(logging.getLogger("RuletkaShell.without_queue")) is None
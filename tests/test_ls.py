@@ -1,5 +1,5 @@
 from unittest.mock import Mock
-from commands.ls import execute
+from commands.ls import execute, stream, results
 
 class TestLsCommand:
     def test_ls_current_directory_simple(self, mocker):
@@ -133,4 +133,33 @@ class TestLsCommand:
         shell.logger = Mock()
 
         execute(shell, ['test'])
-        shell.handle_error.assert_called_once()
\ No newline at end of file
+        shell.handle_error.assert_called_once()
+
+    def test_ls_results(self, mocker):
+        shell = Mock()
+        shell.current_dir = '/home/user'
+        shell.handle_error = Mock()
+
+        mocker.patch('os.listdir', return_value=['b.txt', 'Docs', 'a.txt'])
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.path.isdir', side_effect=lambda path: path in ('/home/user', '/home/user/Docs'))
+        mocker.patch('os.path.join', side_effect=lambda *args: '/'.join(args))
+
+        infos = results(shell, ['-l'])
+
+        assert [(info.name, info.path, info.is_dir) for info in infos] == [
+            ('Docs', '/home/user/Docs', True), ('a.txt', '/home/user/a.txt', False), ('b.txt', '/home/user/b.txt', False)]
+        shell.handle_error.assert_not_called()
+
+    def test_ls_stream_colors_only_for_console(self, mocker):
+        shell = Mock()
+        shell.current_dir = '/home/user'
+        shell.handle_error = Mock()
+
+        mocker.patch('os.listdir', return_value=['a.txt', 'Docs'])
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.path.isdir', side_effect=lambda path: path in ('/home/user', '/home/user/Docs'))
+        mocker.patch('os.path.join', side_effect=lambda *args: '/'.join(args))
+
+        assert list(stream(shell, [])) == ['Docs', 'a.txt']
+        assert list(stream(shell, [], color=True)) == ['\033[94mDocs\033[0m', 'a.txt']
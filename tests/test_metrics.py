@@ -0,0 +1,63 @@
+import os
+from metrics import Histogram, Invocation, CommandMetrics
+
+
+class TestHistogram:
+    def test_percentiles_within_bucket_precision(self):
+        histogram = Histogram()
+        for ms in range(1, 101):
+            histogram.add(ms / 1000)
+
+        assert histogram.count == 100
+        assert abs(histogram.percentile(50) - 0.050) / 0.050 < 0.05
+        assert abs(histogram.percentile(95) - 0.095) / 0.095 < 0.05
+        assert histogram.percentile(100) == histogram.max == 0.1
+        assert Histogram().percentile(50) == 0.0
+
+
+class TestCommandMetrics:
+    def _invocation(self, wall):
+        invocation = Invocation()
+        invocation.stop()
+        invocation.wall = wall
+        return invocation
+
+    def test_audit_hook_is_opt_in(self, mocker):
+        mocker.patch('metrics._audit_installed', False)
+        mock_hook = mocker.patch('sys.addaudithook')
+
+        assert not CommandMetrics().count_files
+        mock_hook.assert_not_called()
+        metrics = CommandMetrics(count_files=True)
+        CommandMetrics().enable_file_counting()
+        assert metrics.count_files
+        mock_hook.assert_called_once()
+
+    def test_invocation_counts_file_operations(self, tmp_path):
+        CommandMetrics(count_files=True)
+        invocation = Invocation()
+        for name in ('a', 'b'):
+            with open(tmp_path / name, 'w') as file:
+                file.write('x' * 1000)
+        os.listdir(tmp_path)
+        invocation.stop()
+
+        assert invocation.files == 3
+        assert invocation.wall >= invocation.cpu >= 0
+        if invocation.bytes_written is not None:
+            assert invocation.bytes_written >= 2000
+
+    def test_summary_and_slowest(self):
+        metrics = CommandMetrics(slowest=2)
+        metrics.record(self._invocation(0.5), [('grep', ['-r', 'x', 'my dir'])], True)
+        metrics.record(self._invocation(0.1), [('ls', [])], True)
+        metrics.record(self._invocation(0.3), [('cat', ['a']), ('grep', ['x'])], False)
+        metrics.record(self._invocation(0.2), [('ls', ['-l'])], True)
+
+        assert [(s.name, s.count, s.failures) for s in metrics.commands()] == [
+            ('grep', 1, 0), ('ls', 2, 0), ('cat | grep', 1, 1)]
+        assert [(i.wall, i.line, i.success) for i in metrics.slowest()] == [
+            (0.5, "grep -r x 'my dir'", True), (0.3, "cat a | grep x", False)]
+
+        metrics.reset()
+        assert metrics.commands() == [] and metrics.slowest() == []
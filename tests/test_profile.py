@@ -0,0 +1,61 @@
+import pstats
+import tracemalloc
+from unittest.mock import Mock
+from commands.profile import execute
+
+
+def _busy_command(command, args):
+    # Работа, которая должна попасть в профиль
+    return 0 if sorted(str(i) for i in range(20000)) else 1
+
+
+class TestProfileCommand:
+    def _shell(self, tmp_path):
+        shell = Mock()
+        shell.execute_command = Mock(side_effect=_busy_command)
+        shell.resolve_user_path = Mock(side_effect=lambda path: str(tmp_path / path))
+        return shell
+
+    def test_profile_runs_command_and_saves_stats(self, tmp_path, capsys):
+        shell = self._shell(tmp_path)
+
+        execute(shell, ['-n', '5', '-o', 'out.pstats', 'grep', '-r', 'x', 'my dir'])
+
+        shell.execute_command.assert_called_once_with('grep', ['-r', 'x', 'my dir'])
+        output = capsys.readouterr().out
+        assert "profile: grep -r x 'my dir' - status 0" in output
+        assert "_busy_command" in output
+        assert "Profile saved to 'out.pstats'" in output
+        functions = {name for _, _, name in pstats.Stats(str(tmp_path / 'out.pstats')).stats}
+        assert '_busy_command' in functions
+        shell.handle_error.assert_not_called()
+
+    def test_profile_memory(self, tmp_path, capsys):
+        shell = self._shell(tmp_path)
+
+        execute(shell, ['--memory', 'ls'])
+
+        assert "Memory: peak " in capsys.readouterr().out
+
+    def test_profile_errors(self, tmp_path):
+        shell = self._shell(tmp_path)
+
+        execute(shell, [])
+        execute(shell, ['profile', 'ls'])
+        execute(shell, ['-n', '0', 'ls'])
+
+        assert [c.args[0] for c in shell.handle_error.call_args_list] == [
+            "profile: missing command to profile", "profile: cannot profile itself",
+            "profile: -n must be a positive number"]
+        shell.execute_command.assert_not_called()
+
+    def test_profile_while_another_profile_is_running(self, tmp_path, mocker):
+        shell = self._shell(tmp_path)
+        profiler = mocker.patch('cProfile.Profile').return_value
+        profiler.enable.side_effect = ValueError("Another profiling tool is already active")
+
+        execute(shell, ['--memory', 'ls'])
+
+        shell.handle_error.assert_called_once_with("profile: another profile is already running")
+        shell.execute_command.assert_not_called()
+        assert not tracemalloc.is_tracing()
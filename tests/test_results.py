@@ -0,0 +1,28 @@
+import re
+from unittest.mock import Mock
+from commands.results import FileInfo, Match
+
+
+class TestFileInfo:
+    def test_stat_is_read_once(self, mocker):
+        mock_stat = mocker.patch('os.stat', return_value=Mock(st_size=42, st_mtime=1700000000.0))
+        info = FileInfo('a.txt', '/home/user/a.txt', False)
+
+        assert (info.size, info.mtime) == (42, 1700000000.0)
+        mock_stat.assert_called_once_with('/home/user/a.txt')
+
+    def test_equality_and_repr(self):
+        info = FileInfo('docs', '/home/user/docs', True)
+
+        assert info == FileInfo('docs', '/home/user/docs', True)
+        assert info != FileInfo('docs', '/home/user/docs', False)
+        assert repr(info) == "FileInfo(name='docs', path='/home/user/docs', is_dir=True)"
+
+
+class TestMatch:
+    def test_spans(self):
+        match = Match('a.txt', 3, 'one two one', re.compile('one'))
+
+        assert match.spans == [(0, 3), (8, 11)]
+        assert match == Match('a.txt', 3, 'one two one', re.compile('o'))
+        assert repr(match) == "Match(path='a.txt', line_number=3, line='one two one')"
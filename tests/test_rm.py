@@ -1,3 +1,5 @@
+import os
+import stat
 from unittest.mock import Mock
 from commands.rm import execute, _is_protected_path, _confirm_deletion
 
@@ -9,11 +11,12 @@ class TestRmCommand:
         shell.is_windows_drive = Mock(return_value=False)
         shell.handle_error = Mock()
         shell.trash_dir = '/home/user/.trash'
+        shell.trash_locator.trash_dir_for.return_value = '/home/user/.trash'
 
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('os.path.isdir', return_value=False)
         mocker.patch('commands.rm._is_protected_path', return_value=False)
-        mocker.patch('shutil.move')
+        mocker.patch('os.rename')
 
         result = execute(shell, ['file.txt'])
         assert result is not None
@@ -26,12 +29,13 @@ class TestRmCommand:
         shell.is_windows_drive = Mock(return_value=False)
         shell.handle_error = Mock()
         shell.trash_dir = '/home/user/.trash'
+        shell.trash_locator.trash_dir_for.return_value = '/home/user/.trash'
 
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('os.path.isdir', return_value=True)
         mocker.patch('commands.rm._is_protected_path', return_value=False)
         mocker.patch('commands.rm._confirm_deletion', return_value=True)
-        mocker.patch('shutil.move')
+        mocker.patch('os.rename')
 
         result = execute(shell, ['-r', 'directory'])
         assert result is not None
@@ -40,9 +44,10 @@ class TestRmCommand:
     def test_rm_directory_without_r_flag(self, mocker):
         shell = Mock()
         shell.current_dir = '/home/user'
-        shell.resolve_path = Mock(return_value='/home/user/directory')
+        shell.resolve_user_path = Mock(return_value='/home/user/directory')
         shell.is_windows_drive = Mock(return_value=False)
         shell.handle_error = Mock()
+        shell.trash_dir = '/home/user/.trash'
 
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('os.path.isdir', return_value=True)
@@ -55,9 +60,10 @@ class TestRmCommand:
     def test_rm_directory_confirmation_cancelled(self, mocker):
         shell = Mock()
         shell.current_dir = '/home/user'
-        shell.resolve_path = Mock(side_effect=lambda x: x)
+        shell.resolve_user_path = Mock(side_effect=lambda x: x)
         shell.is_windows_drive = Mock(return_value=False)
         shell.handle_error = Mock()
+        shell.trash_dir = '/home/user/.trash'
 
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('os.path.isdir', return_value=True)
@@ -125,11 +131,12 @@ class TestRmCommand:
         shell.is_windows_drive = Mock(return_value=False)
         shell.handle_error = Mock()
         shell.trash_dir = '/home/user/.trash'
+        shell.trash_locator.trash_dir_for.return_value = '/home/user/.trash'
 
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('os.path.isdir', return_value=False)
         mocker.patch('commands.rm._is_protected_path', return_value=False)
-        mocker.patch('shutil.move', side_effect=PermissionError("Permission denied"))
+        mocker.patch('os.rename', side_effect=PermissionError("Permission denied"))
 
         result = execute(shell, ['protected.txt'])
         assert result is None
@@ -145,11 +152,12 @@ class TestRmCommand:
         shell.is_windows_drive = Mock(return_value=False)
         shell.handle_error = Mock()
         shell.trash_dir = '/home/user/.trash'
+        shell.trash_locator.trash_dir_for.return_value = '/home/user/.trash'
 
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('os.path.isdir', return_value=False)
         mocker.patch('commands.rm._is_protected_path', return_value=False)
-        mocker.patch('shutil.move', side_effect=OSError("Disk error"))
+        mocker.patch('os.rename', side_effect=OSError("Disk error"))
 
         result = execute(shell, ['file.txt'])
         assert result is None
@@ -165,11 +173,12 @@ class TestRmCommand:
         shell.is_windows_drive = Mock(return_value=False)
         shell.handle_error = Mock()
         shell.trash_dir = '/home/user/.trash'
+        shell.trash_locator.trash_dir_for.return_value = '/home/user/.trash'
 
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('os.path.isdir', return_value=False)
         mocker.patch('commands.rm._is_protected_path', return_value=False)
-        mocker.patch('shutil.move')
+        mocker.patch('os.rename')
 
         result = execute(shell, ['docs/file.txt'])
 
@@ -183,17 +192,166 @@ class TestRmCommand:
         shell.is_windows_drive = Mock(return_value=False)
         shell.handle_error = Mock()
         shell.trash_dir = '/home/user/.trash'
+        shell.trash_locator.trash_dir_for.return_value = '/home/user/.trash'
 
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('os.path.isdir', return_value=False)
         mocker.patch('commands.rm._is_protected_path', return_value=False)
-        mocker.patch('shutil.move')
+        mocker.patch('os.rename')
 
         result = execute(shell, ['/etc/config.txt'])
 
         assert result is not None
         shell.handle_error.assert_not_called()
 
+    def test_rm_records_trash_dir(self, mocker):
+        shell = Mock()
+        shell.current_dir = '/mnt/data'
+        shell.resolve_user_path = Mock(return_value='/mnt/data/big.bin')
+        shell.is_windows_drive = Mock(return_value=False)
+        shell.handle_error = Mock()
+        shell.trash_dir = '/home/user/.trash'
+        shell.trash_locator.trash_dir_for.return_value = '/mnt/data/.ruletka-trash'
+
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.path.isdir', return_value=False)
+        mocker.patch('commands.rm._is_protected_path', return_value=False)
+        mock_rename = mocker.patch('os.rename')
+        mocker.patch('os.lstat', return_value=Mock(st_dev=7, st_size=1024, st_mode=stat.S_IFREG))
+        mocker.patch('builtins.print')
+
+        result = execute(shell, ['big.bin'])
+
+        assert result['trash_dir'] == '/mnt/data/.ruletka-trash'
+        assert result['trash_path'].startswith('/mnt/data/.ruletka-trash/big.bin_')
+        mock_rename.assert_called_once_with('/mnt/data/big.bin', result['trash_path'])
+        [row] = shell.open_trash_manifest.return_value.add_many.call_args.args[0]
+        assert (row['original_path'], row['trash_path'], row['trash_dir']) == \
+            ('/mnt/data/big.bin', result['trash_path'], '/mnt/data/.ruletka-trash')
+        assert row['device'] == 7 and row['size'] == 1024
+
+    def test_rm_trash_dir_refused(self, mocker):
+        shell = Mock()
+        shell.current_dir = '/mnt/data'
+        shell.resolve_user_path = Mock(return_value='/mnt/data/.ruletka-trash')
+        shell.is_windows_drive = Mock(return_value=False)
+        shell.handle_error = Mock()
+        shell.trash_dir = '/home/user/.trash'
+
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('commands.rm._is_protected_path', return_value=False)
+        mock_rename = mocker.patch('os.rename')
+
+        result = execute(shell, ['-r', '.ruletka-trash'])
+
+        assert result is None
+        assert "Is a trash directory" in shell.handle_error.call_args[0][0]
+        mock_rename.assert_not_called()
+
+    def test_rm_many_paths_and_globs_in_one_batch(self, tmp_path, mocker):
+        for name in ['a.log', 'b.log', 'c.txt', 'keep.dat']:
+            (tmp_path / name).write_text(name)
+        (tmp_path / 'logs').mkdir()
+        trash_dir = tmp_path / '.trash'
+        trash_dir.mkdir()
+        shell = Mock()
+        shell.current_dir = str(tmp_path)
+        shell.resolve_user_path = Mock(side_effect=lambda p: os.path.join(str(tmp_path), p))
+        shell.is_windows_drive = Mock(return_value=False)
+        shell.trash_dir = str(trash_dir)
+        shell.trash_locator.trash_dir_for.return_value = str(trash_dir)
+        mock_confirm = mocker.patch('commands.rm._confirm_deletion', return_value=True)
+        mock_print = mocker.patch('builtins.print')
+
+        result = execute(shell, ['-r', '*.log', 'c.txt', 'logs', 'missing.txt'])
+
+        assert [os.path.basename(item['original_path']) for item in result['items']] == \
+            ['a.log', 'b.log', 'c.txt', 'logs']
+        assert sorted(os.listdir(tmp_path)) == ['.trash', 'keep.dat']
+        assert len(os.listdir(trash_dir)) == 4
+        mock_confirm.assert_called_once_with('logs')
+        mock_print.assert_called_once_with("Moved 4 items to trash")
+        shell.handle_error.assert_called_once_with("rm: cannot remove 'missing.txt': No such file or directory")
+        assert len(shell.open_trash_manifest.return_value.add_many.call_args.args[0]) == 4
+
+    def test_rm_batch_same_basename_gets_unique_trash_names(self, tmp_path, mocker):
+        for sub in ['x', 'y']:
+            (tmp_path / sub).mkdir()
+            (tmp_path / sub / 'app.log').write_text(sub)
+        trash_dir = tmp_path / '.trash'
+        trash_dir.mkdir()
+        shell = Mock()
+        shell.current_dir = str(tmp_path)
+        shell.resolve_user_path = Mock(side_effect=lambda p: os.path.join(str(tmp_path), p))
+        shell.is_windows_drive = Mock(return_value=False)
+        shell.trash_dir = str(trash_dir)
+        shell.trash_locator.trash_dir_for.return_value = str(trash_dir)
+        mocker.patch('builtins.print')
+
+        result = execute(shell, ['*/app.log'])
+
+        trash_paths = [item['trash_path'] for item in result['items']]
+        assert len(set(trash_paths)) == 2
+        assert sorted(open(path).read() for path in trash_paths) == ['x', 'y']
+
+    def test_rm_existing_path_with_glob_characters_is_literal(self, tmp_path, mocker):
+        (tmp_path / 'report[1].txt').write_text('x')
+        (tmp_path / 'report1.txt').write_text('y')
+        trash_dir = tmp_path / '.trash'
+        trash_dir.mkdir()
+        shell = Mock()
+        shell.current_dir = str(tmp_path)
+        shell.resolve_user_path = Mock(side_effect=lambda p: os.path.join(str(tmp_path), p))
+        shell.is_windows_drive = Mock(return_value=False)
+        shell.trash_dir = str(trash_dir)
+        shell.trash_locator.trash_dir_for.return_value = str(trash_dir)
+        mocker.patch('builtins.print')
+
+        result = execute(shell, ['report[1].txt'])
+
+        assert result['original_path'] == str(tmp_path / 'report[1].txt')
+        assert sorted(os.listdir(tmp_path)) == ['.trash', 'report1.txt']
+        shell.handle_error.assert_not_called()
+
+    def test_rm_batch_directories_confirmed_once(self, mocker):
+        shell = Mock()
+        shell.current_dir = '/home/user'
+        shell.resolve_user_path = Mock(side_effect=lambda p: f'/home/user/{p}')
+        shell.is_windows_drive = Mock(return_value=False)
+        shell.trash_dir = '/home/user/.trash'
+
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.path.isdir', return_value=True)
+        mock_input = mocker.patch('builtins.input', return_value='n')
+        mock_rename = mocker.patch('os.rename')
+        mocker.patch('builtins.print')
+
+        result = execute(shell, ['-r', 'a', 'b', 'c', 'd'])
+
+        assert result is None
+        mock_input.assert_called_once_with("rm: remove 4 directories ('a', 'b', 'c' and 1 more)? (y/n): ")
+        mock_rename.assert_not_called()
+
+    def test_rm_directory_with_f_flag_skips_confirmation(self, mocker):
+        shell = Mock()
+        shell.current_dir = '/home/user'
+        shell.resolve_user_path = Mock(return_value='/home/user/directory')
+        shell.is_windows_drive = Mock(return_value=False)
+        shell.handle_error = Mock()
+        shell.trash_dir = '/home/user/.trash'
+        shell.trash_locator.trash_dir_for.return_value = '/home/user/.trash'
+
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.path.isdir', return_value=True)
+        mocker.patch('commands.rm._is_protected_path', return_value=False)
+        mock_input = mocker.patch('builtins.input')
+        mocker.patch('os.rename')
+
+        result = execute(shell, ['-r', '-f', 'directory'])
+        assert result is not None
+        mock_input.assert_not_called()
+        shell.handle_error.assert_not_called()
+
     def test_is_protected_path_parent(self):
         shell = Mock()
         shell.current_dir = '/home/user'
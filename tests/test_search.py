@@ -0,0 +1,98 @@
+from unittest.mock import Mock
+from storage.journal import HistoryJournal
+from storage.search import HistorySearchIndex, command_line
+import terminal
+
+
+def _index(*lines):
+    index = HistorySearchIndex()
+    for line in lines:
+        index.add(line)
+    return index
+
+
+def _keys(*keys):
+    iterator = iter(keys)
+    return lambda: next(iterator)
+
+
+class TestHistorySearchIndex:
+    def test_command_line_quotes_arguments(self):
+        assert command_line('zip', ['My Files', 'backup']) == "zip 'My Files' backup"
+        assert command_line('', []) == ''
+
+    def test_matches_newest_first_without_duplicates(self):
+        index = _index('zip docs a.zip', 'ls -l', 'tar docs b.tar', 'zip docs a.zip')
+        assert list(index.matches('docs')) == ['zip docs a.zip', 'tar docs b.tar']
+        assert len(index) == 3
+
+    def test_short_queries(self):
+        index = _index('ls -l', 'cd ..', 'cat notes.txt')
+        assert list(index.matches('c')) == ['cat notes.txt', 'cd ..']
+        assert list(index.matches('-l')) == ['ls -l']
+        assert list(index.matches('')) == []
+
+    def test_no_match(self):
+        index = _index('ls -l', 'grep -r TODO src')
+        assert list(index.matches('TODOS')) == []
+        assert list(index.matches('xyz')) == []
+
+    def test_load_journal_keeps_live_commands_newest(self, tmp_path):
+        journal = HistoryJournal(str(tmp_path / '.history.jsonl'))
+        journal.append_many([{'command': 'grep', 'args': ['-r', 'TODO', 'src'], 'ts': 1.0},
+                             {'undone': 1.0},
+                             {'command': 'ls', 'args': ['-l'], 'ts': 2.0}])
+        index = _index('grep -r TODO src')
+
+        index.load_journal(journal)
+
+        assert list(index.matches('r')) == ['grep -r TODO src']
+        assert list(index.matches('l')) == ['ls -l']
+        assert len(index) == 2
+
+
+class TestReverseSearch:
+    def test_type_and_execute(self):
+        index = _index('zip docs a.zip', 'tar logs b.tar')
+        write = Mock()
+        assert terminal.reverse_search(index, read=_keys('z', 'i', '\r'), write=write) == ('zip docs a.zip', True)
+        write.assert_any_call("\r\x1b[K(reverse-i-search)`zi': zip docs a.zip")
+
+    def test_ctrl_r_goes_to_older_match(self):
+        index = _index('tar docs a.tar', 'tar logs b.tar')
+        keys = _keys('\x12', '\x12', '\r')
+        write = Mock()
+        assert terminal.reverse_search(index, 'tar', read=keys, write=write) == ('tar docs a.tar', True)
+        write.assert_any_call("\r\x1b[K(failed reverse-i-search)`tar': tar docs a.tar")
+
+    def test_escape_takes_match_for_editing(self):
+        index = _index('cat notes.txt')
+        assert terminal.reverse_search(index, 'cat', read=_keys('\x1b[D'), write=Mock()) == ('cat notes.txt', False)
+
+    def test_cancel_and_backspace(self):
+        index = _index('ls -l', 'cd ..')
+        assert terminal.reverse_search(index, read=_keys('x', '\x7f', 'l', '\x07'), write=Mock()) == (None, False)
+        assert terminal.reverse_search(index, read=_keys('x', '\x7f', 'l', '\r'), write=Mock()) == ('ls -l', True)
+
+
+class TestShellReverseSearch:
+    def test_search_prefix_runs_found_command(self, shell_instance, mocker):
+        shell_instance.search_index = _index('cat notes.txt')
+        mocker.patch('ruletka_shell.terminal.interactive_available', return_value=True)
+        mocker.patch('ruletka_shell.terminal.reverse_search', return_value=('cat notes.txt', True))
+        mocker.patch('builtins.input', side_effect=[terminal.REVERSE_SEARCH_PREFIX + ' cat', 'exit'])
+        mocker.patch('builtins.print')
+        mocker.patch.object(shell_instance, 'exit')
+        mocker.patch.object(shell_instance, 'add_to_history')
+
+        shell_instance.run()
+
+        shell_instance.commands['cat'].assert_called_once_with(['notes.txt'])
+
+    def test_search_without_terminal_prints_matches(self, shell_instance, mocker):
+        shell_instance.search_index = _index('ls -l', 'ls -la', 'cd ..')
+        mocker.patch('ruletka_shell.terminal.interactive_available', return_value=False)
+        mock_print = mocker.patch('builtins.print')
+
+        assert shell_instance.reverse_search('ls') == ''
+        assert [call.args[0] for call in mock_print.call_args_list] == ['ls -la', 'ls -l']
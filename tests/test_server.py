@@ -0,0 +1,126 @@
+import io
+import os
+import sys
+import threading
+import socket
+import contextlib
+import pytest
+from unittest.mock import Mock
+from client import request, command_string, default_socket_path
+from server import ShellServer
+
+
+@pytest.fixture
+def server(shell_instance, tmp_path):
+    shell_instance.history_writer = Mock()
+    shell_instance.current_dir = str(tmp_path)
+    server = ShellServer(shell_instance, str(tmp_path / 'shell.sock'))
+    yield server
+    server.server_close()
+
+
+@contextlib.contextmanager
+def serving(server):
+    # Сервер запускается в самом тесте: он подменяет sys.stdout, который pytest перехватывает на время теста
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05})
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+class TestShellServer:
+    def test_request_streams_output_and_status(self, server, shell_instance, tmp_path):
+        shell_instance.commands['ls'] = Mock(side_effect=lambda args: print("a.txt\nb.txt"))
+        shell_instance.commands['cat'] = Mock(side_effect=lambda args: shell_instance.handle_error("cat: no file"))
+        output = io.BytesIO()
+
+        with serving(server):
+            assert request('ls', server.socket_path, output=output) == 0
+            assert output.getvalue() == b"a.txt\nb.txt\n"
+
+            output = io.BytesIO()
+            assert request('cat x; ls', server.socket_path, output=output) == 1
+            assert output.getvalue() == b"cat: no file\na.txt\nb.txt\n"
+        assert oct(os.stat(server.socket_path).st_mode & 0o777) == '0o600'
+
+    def test_request_runs_in_client_directory(self, server, shell_instance, tmp_path):
+        seen = []
+        shell_instance.commands['ls'] = Mock(side_effect=lambda args: seen.append(shell_instance.current_dir))
+        client_dir = tmp_path / 'client'
+        client_dir.mkdir()
+
+        with serving(server):
+            assert request('ls', server.socket_path, cwd=str(client_dir), output=io.BytesIO()) == 0
+        assert seen == [str(client_dir)]
+        assert shell_instance.current_dir == str(tmp_path)
+
+    def test_client_keeps_argument_quoting(self, server, shell_instance):
+        seen = []
+        shell_instance.commands['grep'] = Mock(side_effect=lambda args: seen.append(args))
+
+        with serving(server):
+            for args in (['grep', 'two words', 'notes.txt'], ['grep "a b" x.txt; grep c y.txt']):
+                assert request(command_string(args), server.socket_path, output=io.BytesIO()) == 0
+        assert seen == [['two words', 'notes.txt'], ['a b', 'x.txt'], ['c', 'y.txt']]
+
+    def test_usage_and_stderr_reach_client(self, server, shell_instance):
+        from commands import get_command
+        shell_instance.commands['grep'] = lambda args: get_command('grep')(shell_instance, args)
+        shell_instance.commands['ls'] = Mock(side_effect=lambda args: print("ls: warning", file=sys.stderr))
+        output = io.BytesIO()
+
+        with serving(server):
+            assert request('grep', server.socket_path, output=output) == 1
+            assert request('ls', server.socket_path, output=output) == 0
+        assert output.getvalue() == b"grep: the following arguments are required: pattern\nls: warning\n"
+
+    def test_malformed_request(self, server):
+        with serving(server), socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(server.socket_path)
+            sock.sendall(b"not a frame\n")
+            assert b"malformed request" in sock.recv(1024)
+
+    def test_second_server_on_same_socket_fails(self, server, shell_instance):
+        with pytest.raises(OSError):
+            ShellServer(shell_instance, server.socket_path)
+
+    def test_default_socket_in_private_directory(self, shell_instance, tmp_path, monkeypatch):
+        monkeypatch.delenv('RULETKA_SOCKET', raising=False)
+        monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+        server = ShellServer(shell_instance)
+        try:
+            assert server.socket_path == default_socket_path()
+            directory = os.path.dirname(server.socket_path)
+            assert directory == str(tmp_path / f"ruletka-shell-{os.getuid()}")
+            assert oct(os.stat(directory).st_mode & 0o777) == '0o700'
+        finally:
+            server.server_close()
+
+        os.chmod(directory, 0o755)
+        with pytest.raises(OSError, match='accessible to other users'):
+            ShellServer(shell_instance)
+        os.rmdir(directory)
+        os.symlink(tmp_path, directory)
+        with pytest.raises(OSError, match='is not a directory'):
+            ShellServer(shell_instance)
+
+    def test_server_does_not_remove_foreign_files(self, shell_instance, tmp_path):
+        path = tmp_path / 'shell.sock'
+        path.write_text("not a socket")
+        with pytest.raises(OSError, match='is not a socket of this user'):
+            ShellServer(shell_instance, str(path))
+        assert path.exists()
+
+    def test_client_refuses_server_of_another_user(self, server, mocker):
+        mocker.patch('client.os.getuid', return_value=os.getuid() + 1)
+        output = io.BytesIO()
+        with serving(server), pytest.raises(OSError, match='owned by another user'):
+            request('ls', server.socket_path, output=output)
+        assert output.getvalue() == b''
+
+    def test_output_is_ready_before_serving(self, server):
+        assert server.output.current() is None
+        assert server.output.encoding == 'utf-8'
@@ -1,6 +1,11 @@
+import pytest
 from unittest.mock import Mock
+import os
 import json
 from ruletka_shell import RuletkaShell
+from commands.rm import execute as rm_execute
+from trash.devices import TrashLocator
+from storage.entry import HistoryEntry
 
 class TestRuletkaShellInitialization:
     def test_shell_initialization(self, mocker, mock_commands):
@@ -93,39 +98,85 @@ class TestRuletkaShellHistory:
 
     def test_add_to_history(self, shell_instance, mocker):
 
-        mocker.patch.object(shell_instance, '_save_history')
+        mocker.patch.object(shell_instance, '_append_history')
 
         shell_instance.add_to_history('ls', ['-l'], success=True, undo_data={'test': 'data'})
 
         assert len(shell_instance.command_history) == 1
         history_entry = shell_instance.command_history[0]
-        assert history_entry['command'] == 'ls'
-        assert history_entry['args'] == ['-l']
-        assert history_entry['success'] == True
-        assert history_entry['undo_data'] == {'test': 'data'}
+        assert history_entry.command == 'ls'
+        assert history_entry.args == ('-l',)
+        assert history_entry.success == True
+        assert history_entry.undo_data == {'test': 'data'}
+        assert shell_instance.undo_stack.peek() is history_entry
 
-        shell_instance._save_history.assert_called_once()
+        shell_instance._append_history.assert_called_once()
+        record = shell_instance._append_history.call_args[0][0]
+        assert record['command'] == 'ls'
+        assert record['args'] == ['-l']
+        assert isinstance(record['ts'], float)
 
-    def test_load_history_file_exists(self, mocker):
+    def test_load_history_file_exists(self, mocker, tmp_path):
 
         mock_history_data = [
             {'command': 'ls', 'args': ['-l'], 'success': True, 'timestamp': '2024-01-01T10:00:00'}
         ]
-        mocker.patch('ruletka_shell.os.path.exists', return_value=True)
-        mocker.patch('builtins.open', mocker.mock_open(read_data=json.dumps(mock_history_data)))
+        history_file = tmp_path / '.history.jsonl'
+        history_file.write_text(''.join(json.dumps(entry) + '\n' for entry in mock_history_data), encoding='utf-8')
         mocker.patch('ruletka_shell.logging.config.dictConfig')
         mocker.patch('ruletka_shell.logging.getLogger')
 
-        shell = RuletkaShell().create()
-        assert shell.command_history == mock_history_data
+        shell = RuletkaShell()
+        shell.history_file = str(history_file)
+        shell.legacy_history_file = str(tmp_path / '.history.json')
+        shell.trash_dir = str(tmp_path / '.trash')
+        shell.undo_stack_file = str(tmp_path / '.history.undo.json')
+        shell.trash_manifest_file = str(tmp_path / '.trash.db')
+        shell._opers_init()
+        assert [entry.to_record() for entry in shell.command_history] == \
+            [HistoryEntry.from_record(entry).to_record() for entry in mock_history_data]
+        # Несегментированный журнал переименован в первый сегмент
+        assert not history_file.exists()
+        assert (tmp_path / '.history.000001.jsonl').exists()
+
+    def test_load_history_migrates_legacy_file(self, mocker, tmp_path):
 
-    def test_load_history_file_not_exists(self, mocker):
-        mocker.patch('ruletka_shell.os.path.exists', return_value=False)
+        mock_history_data = [
+            {'command': 'ls', 'args': ['-l'], 'success': True, 'timestamp': '2024-01-01T10:00:00'},
+            {'command': 'cd', 'args': ['..'], 'success': True, 'timestamp': '2024-01-01T10:01:00'}
+        ]
+        legacy_file = tmp_path / '.history.json'
+        legacy_file.write_text(json.dumps(mock_history_data, indent=2), encoding='utf-8')
         mocker.patch('ruletka_shell.logging.config.dictConfig')
         mocker.patch('ruletka_shell.logging.getLogger')
 
-        shell = RuletkaShell().create()
+        shell = RuletkaShell()
+        shell.history_file = str(tmp_path / '.history.jsonl')
+        shell.legacy_history_file = str(legacy_file)
+        shell.trash_dir = str(tmp_path / '.trash')
+        shell.undo_stack_file = str(tmp_path / '.history.undo.json')
+        shell.trash_manifest_file = str(tmp_path / '.trash.db')
+        shell._opers_init()
+
+        assert [entry.to_record() for entry in shell.command_history] == \
+            [HistoryEntry.from_record(entry).to_record() for entry in mock_history_data]
+        assert not legacy_file.exists()
+        assert (tmp_path / '.history.json.bak').exists()
+        assert len((tmp_path / '.history.000001.jsonl').read_text(encoding='utf-8').splitlines()) == 2
+
+    def test_load_history_file_not_exists(self, mocker, tmp_path):
+        mocker.patch('ruletka_shell.logging.config.dictConfig')
+        mocker.patch('ruletka_shell.logging.getLogger')
+
+        shell = RuletkaShell()
+        shell.history_file = str(tmp_path / '.history.jsonl')
+        shell.legacy_history_file = str(tmp_path / '.history.json')
+        shell.trash_dir = str(tmp_path / '.trash')
+        shell.undo_stack_file = str(tmp_path / '.history.undo.json')
+        shell.trash_manifest_file = str(tmp_path / '.trash.db')
+        shell._opers_init()
         assert shell.command_history == []
+        assert (tmp_path / '.history.000001.jsonl').exists()
 
 
 class TestRuletkaShellIntegration:
@@ -165,6 +216,303 @@ class TestRuletkaShellIntegration:
         shell_instance.add_to_history.assert_called_once_with('failing_cmd', ['arg'], success=False)
 
 
+class TestRuletkaShellBatchMode:
+
+    def test_parse_script(self, shell_instance):
+        script = 'cd /tmp; ls -l\n# comment\n\ngrep "a;b" f.txt  # trailing\ncat \'x #y\''
+        assert shell_instance.parse_script(script) == [
+            ([('cd', ['/tmp'])], False), ([('ls', ['-l'])], False), ([('grep', ['a;b', 'f.txt'])], False),
+            ([('cat', ['x #y'])], False)]
+        assert shell_instance.parse_script('cat f.txt | grep "a|b"') == [
+            ([('cat', ['f.txt']), ('grep', ['a|b'])], False)]
+
+    def test_execute_command_status(self, shell_instance, mocker):
+        mocker.patch.object(shell_instance, 'add_to_history')
+        mocker.patch('builtins.print')
+        shell_instance.commands['ls'] = Mock(return_value=None)
+        shell_instance.commands['cat'] = Mock(side_effect=lambda args: shell_instance.handle_error("cat: no file"))
+        shell_instance.commands['rm'] = Mock(return_value={'original_path': '/a', 'trash_path': '/t/a'})
+
+        assert shell_instance.execute_command('ls', []) == 0
+        assert shell_instance.execute_command('cat', ['x']) == 1
+        assert shell_instance.execute_command('rm', ['a']) == 0
+        assert shell_instance.execute_command('nope', []) == 127
+        assert [c.kwargs['success'] for c in shell_instance.add_to_history.call_args_list] == [True, False, True, False]
+        assert shell_instance.add_to_history.call_args_list[2].kwargs['undo_data'] == {
+            'original_path': '/a', 'trash_path': '/t/a'}
+
+    def test_run_script_exit_status(self, shell_instance, mocker):
+        mocker.patch.object(shell_instance, 'add_to_history')
+        mocker.patch('builtins.print')
+        shell_instance.commands['ls'] = Mock(return_value=None)
+        shell_instance.commands['cat'] = Mock(side_effect=lambda args: shell_instance.handle_error("cat: no file"))
+
+        assert shell_instance.run_script('ls; ls') == 0
+        assert shell_instance.run_script('cat x; ls') == 1
+        assert shell_instance.run_script('ls; exit 3; cat x') == 3
+        assert shell_instance.run_script('ls "unterminated') == 2
+
+        shell_instance.commands['ls'].reset_mock()
+        assert shell_instance.run_script('cat x; ls', stop_on_error=True) == 1
+        shell_instance.commands['ls'].assert_not_called()
+
+    def test_run_script_fails_on_usage_error(self, shell_instance, mocker):
+        from commands import get_command
+        mocker.patch.object(shell_instance, 'add_to_history')
+        mock_print = mocker.patch('builtins.print')
+        for name in ['grep', 'ls', 'zip', 'trash']:
+            shell_instance.commands[name] = lambda args, name=name: get_command(name)(shell_instance, args)
+        shell_instance.commands['cat'] = Mock(return_value=None)
+
+        for script in ['grep', 'ls -z', 'zip', 'trash bogus']:
+            assert shell_instance.run_script(script) == 1
+        assert mock_print.call_args_list[0].args[0] == "grep: the following arguments are required: pattern"
+        assert [c.kwargs['success'] for c in shell_instance.add_to_history.call_args_list] == [False] * 4
+
+        assert shell_instance.run_script('grep; cat x', stop_on_error=True) == 1
+        shell_instance.commands['cat'].assert_not_called()
+
+
+class TestRuletkaShellPipelines:
+
+    def test_parse_pipeline(self, shell_instance):
+        assert shell_instance.parse_pipeline('ls -l') == [('ls', ['-l'])]
+        assert shell_instance.parse_pipeline("cat a.txt | grep -i 'x | y' | grep z") == [
+            ('cat', ['a.txt']), ('grep', ['-i', 'x | y']), ('grep', ['z'])]
+        assert shell_instance.parse_pipeline('') == []
+        with pytest.raises(ValueError):
+            shell_instance.parse_pipeline('ls |')
+
+    def test_execute_pipeline_chains_streams(self, shell_instance, mocker):
+        mocker.patch.object(shell_instance, 'add_to_history')
+        mock_print = mocker.patch('builtins.print')
+        streams = {
+            'cat': lambda shell, args, stdin=None, color=False: iter(['alpha', 'beta', 'gamma']),
+            'grep': lambda shell, args, stdin=None, color=False: (line for line in stdin if args[0] in line),
+        }
+        mocker.patch(f'{type(shell_instance).__module__}.get_stream', side_effect=lambda name: streams.get(name))
+
+        assert shell_instance.execute_pipeline([('cat', ['f.txt']), ('grep', ['a'])]) == 0
+        assert [c.args[0] for c in mock_print.call_args_list] == ['alpha', 'beta', 'gamma']
+        assert [c.kwargs['success'] for c in shell_instance.add_to_history.call_args_list] == [True, True]
+
+    def test_three_stage_pipeline_passes_plain_text(self, shell_instance, mocker, tmp_path):
+        mocker.patch.object(shell_instance, 'add_to_history')
+        mock_print = mocker.patch('builtins.print')
+        (tmp_path / 'f.txt').write_text("alpha1\nbeta2\nalpha2\n")
+        shell_instance.current_dir = str(tmp_path)
+
+        assert shell_instance.execute_pipeline([('cat', ['f.txt']), ('grep', ['alpha']), ('grep', ['a2'])]) == 0
+        # Подсвечивается только вывод последней команды
+        assert [c.args[0] for c in mock_print.call_args_list] == ["alph\033[91ma2\033[0m"]
+
+    def test_execute_pipeline_errors(self, shell_instance, mocker):
+        mocker.patch.object(shell_instance, 'add_to_history')
+        mocker.patch('builtins.print')
+        shell_instance.handle_error = Mock()
+        mocker.patch(f'{type(shell_instance).__module__}.get_stream', side_effect=lambda name: None)
+
+        assert shell_instance.execute_pipeline([('ls', []), ('cd', ['/'])]) == 1
+        shell_instance.handle_error.assert_called_once_with("ls: cannot be used in a pipeline")
+        assert shell_instance.execute_pipeline([('nope', []), ('ls', [])]) == 127
+        assert not any(c.kwargs['success'] for c in shell_instance.add_to_history.call_args_list)
+
+
+class TestRuletkaShellJobs:
+
+    def test_parse_statement(self, shell_instance):
+        assert shell_instance.parse_statement('zip big big.zip &') == [([('zip', ['big', 'big.zip'])], True)]
+        assert shell_instance.parse_statement("tar a a.tar & grep -r 'x & y' src") == [
+            ([('tar', ['a', 'a.tar'])], True), ([('grep', ['-r', 'x & y', 'src'])], False)]
+        with pytest.raises(ValueError):
+            shell_instance.parse_statement('& ls')
+
+    def test_job_keeps_its_own_directory_and_records_history(self, shell_instance, mocker):
+        mocker.patch('builtins.print')
+        shell_instance.history_writer = Mock()
+        shell_instance.current_dir = '/home/user'
+
+        def job_cd(args):
+            shell_instance.current_dir = '/srv'
+        shell_instance.commands['cd'] = Mock(side_effect=job_cd)
+        shell_instance.commands['cat'] = Mock(side_effect=lambda args: shell_instance.handle_error("cat: no file"))
+
+        cd_job = shell_instance.start_job([('cd', ['/srv'])])
+        cat_job = shell_instance.start_job([('cat', ['x'])])
+        shell_instance.jobs.wait_all()
+
+        assert shell_instance.current_dir == '/home/user'
+        assert (cd_job.status, cat_job.status) == (0, 1)
+        # Ошибка фонового задания не учитывается в командах оболочки
+        assert shell_instance._error_count == 0
+        entries = {entry.command: entry for entry in shell_instance.command_history}
+        assert entries['cd'].cwd == '/srv' and entries['cd'].success
+        assert entries['cat'].cwd == '/home/user' and not entries['cat'].success
+
+    def test_concurrent_rm_jobs_record_every_item_in_manifest(self, shell_instance, mocker, tmp_path):
+        mocker.patch('builtins.print')
+        shell_instance.history_writer = Mock()
+        shell_instance.current_dir = str(tmp_path)
+        shell_instance.trash_dir = str(tmp_path / '.trash')
+        shell_instance.trash_locator = TrashLocator(shell_instance.trash_dir)
+        shell_instance.trash_manifest_file = str(tmp_path / '.trash.db')
+        (tmp_path / '.trash').mkdir()
+        shell_instance.commands['rm'] = lambda args: rm_execute(shell_instance, args)
+        names = [f'f{job}_{i}.txt' for job in range(4) for i in range(25)]
+        for name in names:
+            (tmp_path / name).write_text(name)
+
+        jobs = [shell_instance.start_job([('rm', [name])]) for name in names]
+        shell_instance.jobs.wait_all()
+
+        assert [job.status for job in jobs] == [0] * len(names)
+        manifest = shell_instance.open_trash_manifest()
+        assert sorted(os.path.basename(item['original_path']) for item in manifest.find()) == sorted(names)
+        manifest.close()
+
+    def test_partial_rm_fails_but_stays_undoable(self, shell_instance, mocker, tmp_path):
+        mocker.patch('builtins.print')
+        mock_history = mocker.patch.object(shell_instance, 'add_to_history')
+        shell_instance.current_dir = str(tmp_path)
+        shell_instance.trash_dir = str(tmp_path / '.trash')
+        shell_instance.trash_locator = TrashLocator(shell_instance.trash_dir)
+        shell_instance.trash_manifest_file = str(tmp_path / '.trash.db')
+        shell_instance.commands['rm'] = lambda args: rm_execute(shell_instance, args)
+        (tmp_path / '.trash').mkdir()
+        for name in ['a', 'b']:
+            (tmp_path / name).write_text(name)
+
+        assert shell_instance.run_script('rm a missing b') == 1
+        assert sorted(os.listdir(tmp_path)) == ['.trash', '.trash.db']
+        args, kwargs = mock_history.call_args
+        assert args == ('rm', ['a', 'missing', 'b']) and not kwargs['success']
+        assert len(kwargs['undo_data']['items']) == 2
+        shell_instance.open_trash_manifest().close()
+
+    def test_background_job_does_not_read_stdin(self, shell_instance, mocker, tmp_path):
+        mock_print = mocker.patch('builtins.print')
+        mock_input = mocker.patch('builtins.input', return_value='y')
+        shell_instance.history_writer = Mock()
+        shell_instance.current_dir = str(tmp_path)
+        shell_instance.commands['rm'] = lambda args: rm_execute(shell_instance, args)
+        (tmp_path / 'd').mkdir()
+
+        job = shell_instance.start_job([('rm', ['-r', 'd'])])
+        shell_instance.jobs.wait_all()
+
+        # Ответ на запрос подтверждения не перехватывается у приглашения оболочки
+        mock_input.assert_not_called()
+        assert job.status == 1
+        assert (tmp_path / 'd').is_dir()
+        assert "rm: cannot confirm removal of directories: no terminal in a background job (use -f)" in \
+            [c.args[0] for c in mock_print.call_args_list if c.args]
+
+    def test_confirmation_without_input_fails_cleanly(self, shell_instance, mocker, tmp_path):
+        mock_print = mocker.patch('builtins.print')
+        # Как в --serve и в пакетном режиме: stdin закрыт, input поднимает EOFError
+        mocker.patch('builtins.input', side_effect=EOFError)
+        mock_history = mocker.patch.object(shell_instance, 'add_to_history')
+        shell_instance.current_dir = str(tmp_path)
+        shell_instance.trash_dir = str(tmp_path / '.trash')
+        shell_instance.trash_locator = TrashLocator(shell_instance.trash_dir)
+        shell_instance.trash_manifest_file = str(tmp_path / '.trash.db')
+        shell_instance.commands['rm'] = lambda args: rm_execute(shell_instance, args)
+        (tmp_path / '.trash').mkdir()
+        (tmp_path / 'd').mkdir()
+
+        assert shell_instance.run_script('rm -r d') == 1
+        assert (tmp_path / 'd').is_dir()
+        assert "rm: cannot confirm removal of directories: no input available (use -f)" in \
+            [c.args[0] for c in mock_print.call_args_list if c.args]
+        mock_history.assert_called_once_with('rm', ['-r', 'd'], success=False, undo_data=None)
+
+        # -f удаляет каталог без запроса
+        assert shell_instance.run_script('rm -r -f d') == 0
+        assert not (tmp_path / 'd').exists()
+        shell_instance.open_trash_manifest().close()
+
+    def test_run_script_waits_for_background_jobs(self, shell_instance, mocker):
+        mocker.patch.object(shell_instance, 'add_to_history')
+        mocker.patch('builtins.print')
+        finished = []
+        shell_instance.commands['zip'] = Mock(side_effect=lambda args: finished.append(args))
+
+        assert shell_instance.run_script('zip a a.zip &\nls') == 0
+        assert finished == [['a', 'a.zip']]
+
+
+class TestRuletkaShellCall:
+
+    def test_call_returns_results_without_printing(self, shell_instance, mocker):
+        mock_print = mocker.patch('builtins.print')
+        shell_instance.history_writer = Mock()
+        results = {'ls': lambda shell, args, stdin=None: iter(['a', 'b'] + args)}
+        mocker.patch(f'{type(shell_instance).__module__}.get_results', side_effect=lambda name: results.get(name))
+
+        assert shell_instance.call('ls', 'docs') == ['a', 'b', 'docs']
+        assert shell_instance.call('cd', '/tmp') is None
+        shell_instance.commands['cd'].assert_called_once_with(['/tmp'])
+        mock_print.assert_not_called()
+        assert [(e.command, e.args, e.success) for e in shell_instance.command_history] == [
+            ('ls', ('docs',), True), ('cd', ('/tmp',), True)]
+
+    def test_call_raises_command_error(self, shell_instance, mocker):
+        mock_print = mocker.patch('builtins.print')
+        shell_instance.history_writer = Mock()
+
+        def failing(shell, args, stdin=None):
+            shell.handle_error("grep: cannot access 'x': No such file or directory")
+            return None
+        mocker.patch(f'{type(shell_instance).__module__}.get_results', side_effect=lambda name: failing)
+
+        with pytest.raises(Exception) as error:
+            shell_instance.call('grep', 'a', 'x')
+        assert type(error.value).__name__ == 'CommandError'
+        assert error.value.messages == ["grep: cannot access 'x': No such file or directory"]
+        with pytest.raises(Exception, match='nope: command not found'):
+            shell_instance.call('nope')
+        mock_print.assert_not_called()
+        assert not any(entry.success for entry in shell_instance.command_history)
+        # Вне call ошибки снова выводятся пользователю
+        shell_instance.handle_error("ls: error")
+        mock_print.assert_called_once_with("ls: error")
+
+    def test_call_raises_on_argument_error(self, shell_instance, capsys):
+        from commands import get_command
+        shell_instance.history_writer = Mock()
+        shell_instance.commands['zip'] = lambda args: get_command('zip')(shell_instance, args)
+
+        for command, args, message in [('grep', (), "grep: the following arguments are required: pattern"),
+                                       ('ls', ('-z',), "ls: unrecognized arguments: -z"),
+                                       ('zip', (), "zip: the following arguments are required: folder, name")]:
+            with pytest.raises(Exception) as error:
+                shell_instance.call(command, *args)
+            assert type(error.value).__name__ == 'CommandError'
+            assert error.value.messages == [message]
+        assert capsys.readouterr() == ('', '')
+        assert not any(entry.success for entry in shell_instance.command_history)
+
+
+class TestRuletkaShellMetrics:
+
+    def test_commands_and_pipelines_are_measured(self, shell_instance, mocker):
+        mocker.patch.object(shell_instance, 'add_to_history')
+        mocker.patch('builtins.print')
+        shell_instance.commands['cat'] = Mock(side_effect=lambda args: shell_instance.handle_error("cat: x"))
+        mocker.patch(f'{type(shell_instance).__module__}.get_stream',
+                     side_effect=lambda name: lambda shell, args, stdin=None, color=False: iter(['line']))
+
+        shell_instance.execute_command('ls', ['-l'])
+        shell_instance.execute_command('cat', ['x'])
+        shell_instance.execute_pipeline([('history', []), ('grep', ['ls'])])
+        shell_instance.execute_command('nope', [])
+
+        stats = {s.name: s for s in shell_instance.metrics.commands()}
+        assert {name: (s.count, s.failures) for name, s in stats.items()} == {
+            'ls': (1, 0), 'cat': (1, 1), 'history | grep': (1, 0)}
+        assert {i.line for i in shell_instance.metrics.slowest()} == {'ls -l', 'cat x', 'history | grep ls'}
+
+
 class TestRuletkaShellEdgeCases:
 
     def test_multiple_spaces_in_input(self, shell_instance):
@@ -0,0 +1,51 @@
+from unittest.mock import Mock
+from commands.stats import execute, stream
+from metrics import Invocation, CommandMetrics
+
+
+class TestStatsCommand:
+    def _shell(self):
+        shell = Mock()
+        shell.metrics = CommandMetrics(slowest=5)
+        for wall, pipeline in ((0.004, [('ls', [])]), (0.25, [('grep', ['-r', 'error', 'logs'])])):
+            invocation = Invocation()
+            invocation.stop()
+            invocation.wall = wall
+            shell.metrics.record(invocation, pipeline, True)
+        return shell
+
+    def test_stats_table_and_slowest(self, mocker):
+        shell = self._shell()
+
+        lines = list(stream(shell, ['1']))
+
+        assert lines[0].split() == ['command', 'calls', 'failed', 'p50', 'ms', 'p95', 'ms', 'p99', 'ms',
+                                    'cpu', 'p50', 'read', 'written', 'files']
+        assert [line.split()[0] for line in lines[1:3]] == ['grep', 'ls']
+        assert lines[4] == "Slowest invocations:"
+        assert len(lines) == 6 and lines[5].endswith("grep -r error logs")
+        shell.handle_error.assert_not_called()
+
+    def test_stats_reset_and_empty(self, mocker):
+        shell = self._shell()
+        mock_print = mocker.patch('builtins.print')
+
+        execute(shell, ['--reset'])
+        execute(shell, [])
+
+        assert [c.args[0] for c in mock_print.call_args_list] == ["Metrics cleared", "No commands measured yet"]
+
+    def test_stats_invalid_argument(self):
+        shell = self._shell()
+
+        assert stream(shell, ['-1']) is None
+        shell.handle_error.assert_called_once_with("stats: argument must be a non-negative number")
+
+    def test_stats_files_enables_counting(self, mocker):
+        shell = self._shell()
+        mocker.patch('metrics._audit_installed', True)
+
+        assert list(stream(shell, []))[1].split()[-1] == '-'
+        assert list(stream(shell, ['--files'])) == ["Counting file operations until the end of the session"]
+        assert shell.metrics.count_files
+        assert list(stream(shell, []))[1].split()[-1] == '0'
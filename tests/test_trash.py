@@ -0,0 +1,109 @@
+import os
+import errno
+import pytest
+from trash.devices import TrashLocator, mount_point, move_within_device
+
+
+def _fake_devices(mocker, volume):
+    """
+    Делает каталог volume (и все внутри него) отдельным устройством для os.stat/os.lstat.
+    """
+    real_stat, real_lstat = os.stat, os.lstat
+
+    def with_device(real):
+        def fake(path, *args, **kwargs):
+            result = real(path, *args, **kwargs)
+            fields = list(result)
+            fields[2] = 2 if os.path.abspath(path).startswith(str(volume)) else 1
+            return os.stat_result(fields)
+        return fake
+    mocker.patch('os.stat', side_effect=with_device(real_stat))
+    mocker.patch('os.lstat', side_effect=with_device(real_lstat))
+    return real_stat, real_lstat
+
+
+class TestTrashLocator:
+    def test_same_device_uses_shell_trash(self, tmp_path):
+        shell_trash = tmp_path / '.trash'
+        shell_trash.mkdir()
+        target = tmp_path / 'file.txt'
+        target.write_text('data')
+
+        locator = TrashLocator(str(shell_trash))
+        assert locator.trash_dir_for(str(target)) == str(shell_trash)
+
+    def test_other_device_uses_mount_point_trash(self, tmp_path, mocker):
+        shell_trash = tmp_path / 'home' / '.trash'
+        shell_trash.mkdir(parents=True)
+        volume = tmp_path / 'volume'
+        (volume / 'data').mkdir(parents=True)
+        target = volume / 'data' / 'big.bin'
+        target.write_text('data')
+
+        real_stat, real_lstat = _fake_devices(mocker, volume)
+
+        locator = TrashLocator(str(shell_trash), dir_name='.ruletka-trash')
+        assert mount_point(str(target)) == str(volume)
+        trash_dir = locator.trash_dir_for(str(target))
+
+        assert trash_dir == str(volume / '.ruletka-trash')
+        assert os.path.isdir(trash_dir)
+        assert locator.known_trash_dirs() == sorted([str(shell_trash), trash_dir])
+        mocker.stopall()
+        assert real_stat(trash_dir).st_dev == real_lstat(str(target)).st_dev
+
+    def test_unwritable_mount_point_falls_back_to_parent(self, tmp_path, mocker):
+        volume = tmp_path / 'volume'
+        (volume / 'data').mkdir(parents=True)
+        target = volume / 'data' / 'file.txt'
+        target.write_text('data')
+        mocker.patch('trash.devices.mount_point', return_value=str(volume))
+        real_makedirs = os.makedirs
+
+        def makedirs(path, *args, **kwargs):
+            if os.path.dirname(path) == str(volume):
+                raise PermissionError(errno.EACCES, 'Permission denied')
+            return real_makedirs(path, *args, **kwargs)
+        mocker.patch('os.makedirs', side_effect=makedirs)
+
+        locator = TrashLocator(str(tmp_path / 'missing' / '.trash'))
+        assert locator.trash_dir_for(str(target)) == str(volume / 'data' / '.ruletka-trash')
+
+    def test_foreign_or_shared_trash_dir_is_skipped(self, tmp_path, mocker):
+        volume = tmp_path / 'volume'
+        (volume / 'data' / 'sub').mkdir(parents=True)
+        target = volume / 'data' / 'sub' / 'file.txt'
+        target.write_text('data')
+        mocker.patch('trash.devices.mount_point', return_value=str(volume))
+        # Открытый для всех каталог в точке монтирования и ссылка на чужой каталог уровнем ниже
+        (volume / '.ruletka-trash').mkdir(mode=0o777)
+        os.chmod(volume / '.ruletka-trash', 0o777)
+        elsewhere = tmp_path / 'elsewhere'
+        elsewhere.mkdir(mode=0o700)
+        os.symlink(elsewhere, volume / 'data' / '.ruletka-trash')
+
+        locator = TrashLocator(str(tmp_path / 'missing' / '.trash'))
+        assert locator.trash_dir_for(str(target)) == str(volume / 'data' / 'sub' / '.ruletka-trash')
+
+        mocker.patch('trash.devices.os.getuid', return_value=os.getuid() + 1)
+        locator = TrashLocator(str(tmp_path / 'missing' / '.trash'))
+        with pytest.raises(PermissionError):
+            locator.trash_dir_for(str(target))
+
+
+class TestMoveWithinDevice:
+    def test_rename(self, tmp_path):
+        source = tmp_path / 'a.txt'
+        source.write_text('data')
+        move_within_device(str(source), str(tmp_path / 'b.txt'))
+        assert not source.exists()
+        assert (tmp_path / 'b.txt').read_text() == 'data'
+
+    def test_cross_device_falls_back_to_move(self, tmp_path, mocker):
+        source = tmp_path / 'a.txt'
+        source.write_text('data')
+        mocker.patch('os.rename', side_effect=OSError(errno.EXDEV, 'Invalid cross-device link'))
+        mock_move = mocker.patch('shutil.move')
+
+        move_within_device(str(source), str(tmp_path / 'b.txt'))
+        mock_move.assert_called_once_with(str(source), str(tmp_path / 'b.txt'))
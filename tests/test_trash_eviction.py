@@ -0,0 +1,154 @@
+import os
+from trash.manifest import TrashManifest
+from trash.eviction import TrashEvictor, delete_tree, purge_item, PURGING_DIR_NAME
+
+DAY = 24 * 60 * 60
+
+
+def _make_tree(root, dirs=5, files=300):
+    for d in range(dirs):
+        sub = root / f'd{d}' / 'nested'
+        sub.mkdir(parents=True)
+        for f in range(files):
+            (sub / f'{f}.txt').write_text('x')
+        os.symlink(str(sub), str(root / f'd{d}' / 'link'))
+    (root / 'top.txt').write_text('top')
+
+
+def _trash(tmp_path, count, size=100):
+    trash_dir = tmp_path / '.trash'
+    trash_dir.mkdir(exist_ok=True)
+    manifest = TrashManifest(str(tmp_path / '.trash.db'))
+    for i in range(count):
+        path = trash_dir / f'{i}.bin_1'
+        path.write_bytes(b'x' * size)
+        manifest.add(f'/data/{i}.bin', str(path), str(trash_dir), device=1, size=size, is_dir=False,
+                     deleted_at=float(i * DAY))
+    return trash_dir, manifest
+
+
+class TestDeleteTree:
+    def test_deletes_tree_in_parallel(self, tmp_path):
+        root = tmp_path / 'tree'
+        _make_tree(root)
+        outside = tmp_path / 'outside.txt'
+        outside.write_text('keep')
+        os.symlink(str(outside), str(root / 'outside-link'))
+
+        delete_tree(str(root), workers=4)
+
+        assert not root.exists()
+        # Ссылки удаляются сами, а не то, на что они указывают
+        assert outside.read_text() == 'keep'
+
+    def test_deletes_single_file(self, tmp_path):
+        path = tmp_path / 'a.txt'
+        path.write_text('x')
+        delete_tree(str(path))
+        assert not path.exists()
+
+    def test_purge_item_goes_through_purging_dir(self, tmp_path):
+        trash_dir = tmp_path / '.trash'
+        item = trash_dir / 'dir_1'
+        _make_tree(item, dirs=1, files=3)
+
+        purge_item(str(item), str(trash_dir))
+
+        assert not item.exists()
+        assert os.listdir(trash_dir / PURGING_DIR_NAME) == []
+
+
+class TestTrashEvictor:
+    def test_max_age_evicts_old_items(self, tmp_path):
+        trash_dir, manifest = _trash(tmp_path, 10)
+        evictor = TrashEvictor(manifest.db_path, max_age_days=3)
+
+        stats = evictor.evict(manifest, now=10 * DAY)
+
+        assert stats == {'evicted': 7, 'freed': 700}
+        assert sorted(item['original_path'] for item in manifest.find()) == ['/data/7.bin', '/data/8.bin',
+                                                                             '/data/9.bin']
+        assert sorted(os.listdir(trash_dir)) == [PURGING_DIR_NAME, '7.bin_1', '8.bin_1', '9.bin_1']
+
+    def test_max_bytes_evicts_oldest_first(self, tmp_path):
+        _, manifest = _trash(tmp_path, 10)
+        stats = TrashEvictor(manifest.db_path, max_bytes=250).evict(manifest, now=10 * DAY)
+
+        assert stats['evicted'] == 8
+        assert manifest.total_size() <= 250
+        assert [item['original_path'] for item in manifest.find()] == ['/data/9.bin', '/data/8.bin']
+
+    def test_unknown_sizes_are_measured_before_quota(self, tmp_path):
+        trash_dir, manifest = _trash(tmp_path, 2)
+        tree = trash_dir / 'dir_1'
+        tree.mkdir()
+        for i in range(3):
+            (tree / f'{i}.bin').write_bytes(b'x' * 100)
+        manifest.add('/data/dir', str(tree), str(trash_dir), device=1, size=None, is_dir=True, deleted_at=0.5 * DAY)
+
+        stats = TrashEvictor(manifest.db_path, max_bytes=250).evict(manifest, now=10 * DAY)
+
+        # Размер каталога (300 байт) посчитан при вытеснении: без него корзина укладывалась бы в квоту
+        assert stats == {'evicted': 2, 'freed': 400}
+        assert [item['original_path'] for item in manifest.find()] == ['/data/1.bin']
+
+    def test_failed_purge_keeps_item_and_continues(self, tmp_path, mocker):
+        trash_dir, manifest = _trash(tmp_path, 4)
+        stuck = str(trash_dir / '0.bin_1')
+        real_purge = purge_item
+
+        def purge(trash_path, *args):
+            if trash_path == stuck:
+                raise PermissionError(13, 'Permission denied')
+            real_purge(trash_path, *args)
+        mocker.patch('trash.eviction.purge_item', side_effect=purge)
+        errors = []
+
+        stats = TrashEvictor(manifest.db_path, max_bytes=150, on_error=errors.append).evict(manifest, now=10 * DAY)
+
+        # Объект, который не удалось удалить, остается в описи и на диске, остальные вытесняются дальше
+        assert stats == {'evicted': 3, 'freed': 300}
+        assert [item['trash_path'] for item in manifest.find()] == [stuck]
+        assert os.path.exists(stuck)
+        assert len(errors) == 1 and 'Permission denied' in errors[0]
+
+    def test_interrupted_purge_is_finished(self, tmp_path):
+        trash_dir, manifest = _trash(tmp_path, 1)
+        leftover = trash_dir / PURGING_DIR_NAME / 'old_dir_1'
+        _make_tree(leftover, dirs=1, files=3)
+
+        TrashEvictor(manifest.db_path).evict(manifest)
+
+        assert not leftover.exists()
+        assert len(manifest) == 1
+
+    def test_legacy_items_are_imported_once_and_evicted(self, tmp_path):
+        trash_dir, manifest = _trash(tmp_path, 1)
+        # Объекты, удаленные rm до появления описи: в описи их нет, время удаления - в имени
+        (trash_dir / 'old.txt_20000101_120000_000000').write_bytes(b'x' * 100)
+        (trash_dir / 'old_dir_20000102_120000_000000').mkdir()
+        (trash_dir / 'old_dir_20000102_120000_000000' / 'a.bin').write_bytes(b'x' * 50)
+        evictor = TrashEvictor(manifest.db_path, max_age_days=3, extra_trash_dirs=[str(trash_dir)])
+
+        stats = evictor.evict(manifest)
+
+        assert stats == {'evicted': 3, 'freed': 250}
+        assert sorted(os.listdir(trash_dir)) == [PURGING_DIR_NAME]
+        # Корзина просматривается один раз: новые объекты вне описи уже не добавляются
+        (trash_dir / 'late.txt').write_bytes(b'x')
+        assert manifest.import_untracked(str(trash_dir)) == 0
+        assert len(manifest) == 0
+
+    def test_background_thread(self, tmp_path):
+        _, manifest = _trash(tmp_path, 5)
+        errors = []
+        evictor = TrashEvictor(manifest.db_path, max_bytes=0, interval=60, on_error=errors.append).start()
+        evictor._stop.wait(0.05)
+        for _ in range(100):
+            if len(manifest) == 0:
+                break
+            evictor._stop.wait(0.05)
+        evictor.stop(timeout=5)
+
+        assert errors == []
+        assert len(manifest) == 0
@@ -0,0 +1,240 @@
+import os
+import sqlite3
+import threading
+from unittest.mock import Mock
+from trash.manifest import TrashManifest, disk_usage
+from commands.trash import execute
+
+
+def _shell(tmp_path, manifest):
+    shell = Mock()
+    shell.current_dir = str(tmp_path)
+    shell.resolve_user_path = Mock(side_effect=lambda p: os.path.normpath(os.path.join(str(tmp_path), p)))
+    shell.open_trash_manifest = Mock(return_value=manifest)
+    return shell
+
+
+def _trashed(tmp_path, manifest, name, deleted_at, content='data'):
+    """
+    Кладет файл в корзину tmp_path/.trash и записывает его в опись.
+    """
+    trash_dir = tmp_path / '.trash'
+    trash_dir.mkdir(exist_ok=True)
+    trash_path = trash_dir / f"{os.path.basename(name)}_{deleted_at}"
+    trash_path.write_text(content)
+    manifest.add(str(tmp_path / name), str(trash_path), str(trash_dir), device=1, size=len(content),
+                 is_dir=False, deleted_at=deleted_at)
+    return trash_path
+
+
+class TestTrashManifest:
+    def test_find_by_path_and_pattern(self, tmp_path):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        for i, path in enumerate(['/srv/data/a.log', '/srv/data/b.txt', '/srv/database', '/home/x.log']):
+            manifest.add(path, f'/t/{i}', '/t', device=1, size=10 * i, is_dir=False, deleted_at=float(i))
+
+        assert [item['original_path'] for item in manifest.find('/srv/data')] == ['/srv/data/b.txt',
+                                                                                 '/srv/data/a.log']
+        assert [item['original_path'] for item in manifest.find('/srv/*.log')] == ['/srv/data/a.log']
+        assert [item['original_path'] for item in manifest.find('*.log')] == ['/home/x.log', '/srv/data/a.log']
+        assert [item['original_path'] for item in manifest.find(older_than=2.0)] == ['/srv/data/b.txt',
+                                                                                    '/srv/data/a.log']
+        assert manifest.total_size() == 60
+        assert len(manifest) == 4
+
+    def test_latest_and_remove(self, tmp_path):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        manifest.add('/srv/a', '/t/a_1', '/t', device=1, size=1, is_dir=False, deleted_at=1.0)
+        manifest.add('/srv/a', '/t/a_2', '/t', device=1, size=1, is_dir=False, deleted_at=2.0)
+
+        latest = manifest.latest('/srv/a')
+        assert latest['trash_path'] == '/t/a_2'
+        manifest.remove([latest['id']])
+        manifest.remove_trash_paths(['/t/a_1'])
+        assert manifest.latest('/srv/a') is None
+
+    def test_add_many(self, tmp_path):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        manifest.add_many([
+            {'original_path': f'/srv/{name}', 'trash_path': f'/t/{name}_1', 'trash_dir': '/t',
+             'device': 1, 'size': 10, 'is_dir': False, 'deleted_at': 1.0}
+            for name in ['a.log', 'b.log']
+        ])
+        assert [item['original_path'] for item in manifest.find('*.log')] == ['/srv/b.log', '/srv/a.log']
+        assert manifest.total_size() == 20
+        manifest.remove_trash_paths(['/t/a.log_1', '/t/b.log_1'])
+        assert len(manifest) == 0
+
+    def test_add_many_from_threads(self, tmp_path):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(50):
+                    manifest.add_many([{'original_path': f'/srv/{n}/{i}', 'trash_path': f'/t/{n}_{i}',
+                                        'trash_dir': '/t', 'device': 1, 'size': 1, 'is_dir': False,
+                                        'deleted_at': float(i)}])
+                    manifest.find(f'/srv/{n}')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(manifest) == 200
+
+    def test_measure_fills_unknown_sizes(self, tmp_path):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        (tmp_path / 'd_1').mkdir()
+        (tmp_path / 'd_1' / 'a').write_bytes(b'x' * 100)
+        manifest.add('/srv/d', str(tmp_path / 'd_1'), str(tmp_path), device=1, size=None, is_dir=True,
+                     deleted_at=1.0)
+        manifest.add('/srv/gone', str(tmp_path / 'gone_1'), str(tmp_path), device=1, size=None, is_dir=True,
+                     deleted_at=2.0)
+        assert manifest.total_size() == 0
+
+        items = manifest.measure(manifest.unsized())
+
+        assert [item['size'] for item in items] == [100, 0]
+        assert manifest.unsized() == []
+        assert manifest.total_size() == 100
+
+    def test_migrates_version_1(self, tmp_path):
+        db_path = str(tmp_path / '.trash.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE items (id INTEGER PRIMARY KEY, original_path TEXT NOT NULL, trash_path TEXT NOT NULL UNIQUE,
+                                trash_dir TEXT NOT NULL, device INTEGER NOT NULL, size INTEGER NOT NULL,
+                                is_dir INTEGER NOT NULL, deleted_at REAL NOT NULL);
+            CREATE INDEX idx_items_original ON items(original_path, deleted_at);
+            CREATE INDEX idx_items_deleted ON items(deleted_at);
+            INSERT INTO items VALUES (1, '/srv/a', '/t/a_1', '/t', 1, 10, 0, 1.0);
+            PRAGMA user_version = 1;
+        """)
+        conn.close()
+
+        manifest = TrashManifest(db_path)
+        manifest.add('/srv/d', '/t/d_1', '/t', device=1, size=None, is_dir=True, deleted_at=2.0)
+
+        assert [(item['original_path'], item['size']) for item in manifest.find()] == [('/srv/d', None),
+                                                                                      ('/srv/a', 10)]
+        indexes = {row[0] for row in manifest.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {'idx_items_original', 'idx_items_deleted', 'idx_items_unsized'} <= indexes
+
+    def test_disk_usage(self, tmp_path):
+        (tmp_path / 'dir' / 'sub').mkdir(parents=True)
+        (tmp_path / 'dir' / 'a').write_bytes(b'x' * 100)
+        (tmp_path / 'dir' / 'sub' / 'b').write_bytes(b'x' * 50)
+        assert disk_usage(str(tmp_path / 'dir')) == 150
+        assert disk_usage(str(tmp_path / 'dir' / 'a')) == 100
+
+
+class TestTrashCommand:
+    def test_list(self, tmp_path, mocker):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        _trashed(tmp_path, manifest, 'a.txt', 1.0)
+        _trashed(tmp_path, manifest, 'b.txt', 2.0)
+        mock_print = mocker.patch('builtins.print')
+
+        result = execute(_shell(tmp_path, manifest), ['list'])
+
+        assert result == {'count': 2}
+        lines = [call.args[0] for call in mock_print.call_args_list]
+        assert lines[0].endswith(str(tmp_path / 'b.txt'))
+        assert lines[1].endswith(str(tmp_path / 'a.txt'))
+
+    def test_list_does_not_measure_directories(self, tmp_path, mocker):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        (tmp_path / '.trash' / 'd_1').mkdir(parents=True)
+        manifest.add(str(tmp_path / 'd'), str(tmp_path / '.trash' / 'd_1'), str(tmp_path / '.trash'),
+                     device=1, size=None, is_dir=True, deleted_at=1.0)
+        mock_print = mocker.patch('builtins.print')
+        mock_usage = mocker.patch('trash.manifest.disk_usage')
+
+        execute(_shell(tmp_path, manifest), ['list'])
+
+        assert mock_print.call_args.args[0].split()[3] == '?'
+        mock_usage.assert_not_called()
+        assert manifest.find()[0]['size'] is None
+
+    def test_restore_latest_by_path(self, tmp_path, mocker):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        _trashed(tmp_path, manifest, 'a.txt', 1.0, content='old')
+        _trashed(tmp_path, manifest, 'a.txt', 2.0, content='new')
+        mocker.patch('builtins.print')
+
+        result = execute(_shell(tmp_path, manifest), ['restore', 'a.txt'])
+
+        assert result == {'count': 1}
+        assert (tmp_path / 'a.txt').read_text() == 'new'
+        assert [item['deleted_at'] for item in manifest.find()] == [1.0]
+
+    def test_restore_pattern_skips_existing(self, tmp_path, mocker):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        _trashed(tmp_path, manifest, 'logs/a.log', 1.0)
+        _trashed(tmp_path, manifest, 'logs/b.log', 2.0)
+        (tmp_path / 'logs').mkdir()
+        (tmp_path / 'logs' / 'b.log').write_text('kept')
+        mocker.patch('builtins.print')
+        shell = _shell(tmp_path, manifest)
+
+        result = execute(shell, ['restore', 'logs/*.log'])
+
+        assert result == {'count': 1}
+        assert (tmp_path / 'logs' / 'a.log').exists()
+        assert (tmp_path / 'logs' / 'b.log').read_text() == 'kept'
+        assert "File exists" in shell.handle_error.call_args[0][0]
+        assert [item['original_path'] for item in manifest.find()] == [str(tmp_path / 'logs' / 'b.log')]
+
+    def test_restore_imported_legacy_item(self, tmp_path, mocker):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        trash_dir = tmp_path / '.trash'
+        trash_dir.mkdir()
+        (trash_dir / 'old.txt_20240101_120000_000000').write_text('old')
+        assert manifest.import_untracked(str(trash_dir)) == 1
+        mocker.patch('builtins.print')
+        shell = _shell(tmp_path, manifest)
+
+        # Исходный путь объекта неизвестен: он остается в корзине и в описи
+        assert execute(shell, ['restore', '.trash/old.txt*']) == {'count': 0}
+        assert "original path is unknown" in shell.handle_error.call_args[0][0]
+        assert (trash_dir / 'old.txt_20240101_120000_000000').exists()
+        assert len(manifest) == 1
+
+    def test_restore_no_match(self, tmp_path):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        shell = _shell(tmp_path, manifest)
+        assert execute(shell, ['restore', 'missing.txt']) is None
+        shell.handle_error.assert_called_once()
+
+    def test_purge_older_than(self, tmp_path, mocker):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        old_path = _trashed(tmp_path, manifest, 'old.txt', 1.0)
+        new_path = _trashed(tmp_path, manifest, 'new.txt', 4_000_000_000.0)
+        mocker.patch('builtins.print')
+
+        result = execute(_shell(tmp_path, manifest), ['purge', '--older-than', '1d', '-f'])
+
+        assert result == {'count': 1, 'size': 4}
+        assert not old_path.exists()
+        assert new_path.exists()
+        assert len(manifest) == 1
+
+    def test_purge_cancelled(self, tmp_path, mocker):
+        manifest = TrashManifest(str(tmp_path / '.trash.db'))
+        trash_path = _trashed(tmp_path, manifest, 'a.txt', 1.0)
+        mocker.patch('builtins.input', return_value='n')
+        mocker.patch('builtins.print')
+
+        assert execute(_shell(tmp_path, manifest), ['purge']) is None
+        assert trash_path.exists()
+        assert len(manifest) == 1
+
+    def test_invalid_subcommand(self, tmp_path, mocker):
+        mocker.patch('sys.stderr')
+        assert execute(_shell(tmp_path, Mock()), ['shred']) is None
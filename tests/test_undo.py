@@ -1,17 +1,28 @@
 from unittest.mock import Mock
 from commands.undo import execute
+from storage.entry import HistoryEntry
+from storage.undo_stack import UndoStack
+
+
+def _entries(records):
+    return [HistoryEntry.from_record(record) for record in records]
+
+
+def _stack(records):
+    return UndoStack(None).load(seed=_entries(records))
+
 
 class TestUndoCommand:
     def test_undo_cp_command(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.undo_stack = _stack([
             {'command': 'ls', 'args': ['-l'], 'success': True, 'timestamp': '2024-01-01T10:00:00'},
             {'command': 'cp', 'args': ['src.txt', 'dest.txt'], 'success': True, 'undo_data': {
                 'source': '/home/user/src.txt',
                 'destination': '/home/user/dest.txt'
             }, 'timestamp': '2024-01-01T10:01:00'}
-        ]
-        shell._save_history = Mock()
+        ])
+        shell._mark_undone = Mock()
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('os.path.isdir', return_value=False)
         mocker.patch('os.remove')
@@ -20,17 +31,17 @@ class TestUndoCommand:
         result = execute(shell, [])
         assert result is not None
         mock_print.assert_called_once_with("Undo cp: removed /home/user/dest.txt")
-        shell._save_history.assert_called_once()
+        shell._mark_undone.assert_called_once()
 
     def test_undo_mv_command(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.undo_stack = _stack([
             {'command': 'mv', 'args': ['old.txt', 'new.txt'], 'success': True, 'undo_data': {
                 'source': '/home/user/old.txt',
                 'destination': '/home/user/new.txt'
             }, 'timestamp': '2024-01-01T10:01:00'}
-        ]
-        shell._save_history = Mock()
+        ])
+        shell._mark_undone = Mock()
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('shutil.move')
         mock_print = mocker.patch('builtins.print')
@@ -38,33 +49,83 @@ class TestUndoCommand:
         result = execute(shell, [])
         assert result is not None
         mock_print.assert_called_once_with("Undo mv: moved /home/user/new.txt back to /home/user/old.txt")
-        shell._save_history.assert_called_once()
+        shell._mark_undone.assert_called_once()
 
     def test_undo_rm_command(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.undo_stack = _stack([
             {'command': 'rm', 'args': ['file.txt'], 'success': True, 'undo_data': {
                 'original_path': '/home/user/file.txt',
                 'trash_path': '/home/user/.trash/file.txt_20240101_100000_123456'
             }, 'timestamp': '2024-01-01T10:01:00'}
-        ]
-        shell._save_history = Mock()
+        ])
+        shell._mark_undone = Mock()
         mocker.patch('os.path.exists', return_value=True)
         mocker.patch('os.makedirs')
-        mocker.patch('shutil.move')
+        mocker.patch('os.rename')
         mock_print = mocker.patch('builtins.print')
 
         result = execute(shell, [])
         assert result is not None
         mock_print.assert_called_once_with("Undo rm: restored /home/user/file.txt from trash")
-        shell._save_history.assert_called_once()
+        shell._mark_undone.assert_called_once()
+        shell.open_trash_manifest.return_value.remove_trash_paths.assert_called_once_with(
+            ['/home/user/.trash/file.txt_20240101_100000_123456'])
+
+    def test_undo_rm_batch(self, mocker):
+        shell = Mock()
+        shell.undo_stack = _stack([
+            {'command': 'rm', 'args': ['*.log'], 'success': True, 'undo_data': {'items': [
+                {'original_path': f'/home/user/{i}.log', 'trash_path': f'/home/user/.trash/{i}.log_1',
+                 'trash_dir': '/home/user/.trash'} for i in range(3)
+            ]}, 'timestamp': '2024-01-01T10:01:00'}
+        ])
+        mocker.patch('os.path.exists', side_effect=lambda p: not p.endswith('2.log_1'))
+        mocker.patch('os.makedirs')
+        mock_rename = mocker.patch('os.rename')
+        mock_print = mocker.patch('builtins.print')
+
+        result = execute(shell, [])
+
+        assert result == {'undo': True, 'command': 'rm', 'count': 1}
+        assert [call.args[1] for call in mock_rename.call_args_list] == ['/home/user/0.log', '/home/user/1.log']
+        assert [call.args[0] for call in mock_print.call_args_list] == [
+            "Undo rm: restored 2 items from trash", "Undo rm: 1 items not found in trash"]
+        shell.open_trash_manifest.return_value.remove_trash_paths.assert_called_once_with(
+            ['/home/user/.trash/0.log_1', '/home/user/.trash/1.log_1'])
+        shell._mark_undone.assert_called_once()
+
+    def test_undo_n_keeps_rest_of_interrupted_batch(self, mocker):
+        shell = Mock()
+        shell.undo_stack = _stack([
+            {'command': 'rm', 'args': ['*.log'], 'success': True, 'ts': 1.0, 'undo_data': {'items': [
+                {'original_path': f'/home/user/{i}.log', 'trash_path': f'/home/user/.trash/{i}.log_1'}
+                for i in range(3)]}},
+            {'command': 'rm', 'args': ['a.txt'], 'success': True, 'ts': 2.0, 'undo_data': {
+                'original_path': '/home/user/a.txt', 'trash_path': '/home/user/.trash/a.txt_1'}},
+        ])
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.makedirs')
+        mocker.patch('os.rename', side_effect=[None, None, OSError("Device busy")])
+        mock_print = mocker.patch('builtins.print')
+
+        result = execute(shell, ['2'])
+
+        # Первая команда отменена, вторая прервана на втором объекте пачки
+        assert result == {'undo': True, 'command': 'rm', 'count': 1}
+        shell.handle_error.assert_called_once_with("Failed to undo rm: Device busy")
+        printed = [c.args[0] for c in mock_print.call_args_list]
+        assert "undo: 2 of 3 items left on the undo stack: rm '*.log'" in printed
+        assert printed[-1] == "Undid 1 of 2 operations, 1 failed and can be retried"
+        assert [[item['original_path'] for item in entry.undo_data['items']] for entry in shell.undo_stack] == [
+            ['/home/user/1.log', '/home/user/2.log']]
 
     def test_undo_no_undoable_commands(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.undo_stack = _stack([
             {'command': 'ls', 'args': ['-l'], 'success': True, 'timestamp': '2024-01-01T10:00:00'},
             {'command': 'cd', 'args': ['..'], 'success': True, 'timestamp': '2024-01-01T10:01:00'}
-        ]
+        ])
         mock_print = mocker.patch('builtins.print')
 
         result = execute(shell, [])
@@ -74,10 +135,10 @@ class TestUndoCommand:
 
     def test_undo_only_failed_commands(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.undo_stack = _stack([
             {'command': 'cp', 'args': ['src.txt', 'dest.txt'], 'success': False, 'timestamp': '2024-01-01T10:00:00'},
             {'command': 'rm', 'args': ['file.txt'], 'success': False, 'timestamp': '2024-01-01T10:01:00'}
-        ]
+        ])
         mock_print = mocker.patch('builtins.print')
 
         result = execute(shell, [])
@@ -86,13 +147,13 @@ class TestUndoCommand:
 
     def test_undo_cp_destination_not_exists(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.undo_stack = _stack([
             {'command': 'cp', 'args': ['src.txt', 'dest.txt'], 'success': True, 'undo_data': {
                 'source': '/home/user/src.txt',
                 'destination': '/home/user/dest.txt'
             }, 'timestamp': '2024-01-01T10:01:00'}
-        ]
-        shell._save_history = Mock()
+        ])
+        shell._mark_undone = Mock()
         mocker.patch('os.path.exists', return_value=False)
         mock_print = mocker.patch('builtins.print')
 
@@ -100,17 +161,17 @@ class TestUndoCommand:
 
         assert result is not None
         mock_print.assert_called_once_with("Undo cp: destination /home/user/dest.txt no longer exists")
-        shell._save_history.assert_called_once()
+        shell._mark_undone.assert_called_once()
 
     def test_undo_rm_trash_not_exists(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.undo_stack = _stack([
             {'command': 'rm', 'args': ['file.txt'], 'success': True, 'undo_data': {
                 'original_path': '/home/user/file.txt',
                 'trash_path': '/home/user/.trash/file.txt_20240101_100000_123456'
             }, 'timestamp': '2024-01-01T10:01:00'}
-        ]
-        shell._save_history = Mock()
+        ])
+        shell._mark_undone = Mock()
         mocker.patch('os.path.exists', return_value=False)
         mock_print = mocker.patch('builtins.print')
 
@@ -119,19 +180,91 @@ class TestUndoCommand:
         assert result is not None
         mock_print.assert_called_once_with(
             "Undo rm: file not found in trash: /home/user/.trash/file.txt_20240101_100000_123456")
-        shell._save_history.assert_called_once()
+        shell._mark_undone.assert_called_once()
 
     def test_undo_exception_handling(self, mocker):
         shell = Mock()
-        shell.command_history = [
+        shell.undo_stack = _stack([
             {'command': 'cp', 'args': ['src.txt', 'dest.txt'], 'success': True, 'undo_data': {
                 'source': '/home/user/src.txt',
                 'destination': '/home/user/dest.txt'
             }, 'timestamp': '2024-01-01T10:01:00'}
-        ]
-        shell._save_history = Mock()
+        ])
+        shell._mark_undone = Mock()
         mocker.patch('os.path.exists', side_effect=Exception("Test error"))
+        mock_print = mocker.patch('builtins.print')
 
         result = execute(shell, [])
         assert result is None
-        shell.handle_error.assert_called_once_with("Failed to undo cp: Test error")
\ No newline at end of file
+        shell.handle_error.assert_called_once_with("Failed to undo cp: Test error")
+        # Ошибка может быть временной: команда остается в стеке, и ее отмену можно повторить
+        mock_print.assert_called_once_with("undo: kept on the undo stack, run undo again to retry: cp src.txt dest.txt")
+        assert len(shell.undo_stack) == 1
+
+    def test_undo_n_skips_failed_command_and_retries_later(self, mocker):
+        shell = Mock()
+        shell.undo_stack = _stack([
+            {'command': 'rm', 'args': [f'{name}.txt'], 'success': True, 'undo_data': {
+                'original_path': f'/home/user/{name}.txt',
+                'trash_path': f'/home/user/.trash/{name}.txt_1'
+            }, 'ts': float(i)} for i, name in enumerate(['a', 'b'])
+        ])
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.makedirs')
+        mock_move = mocker.patch('os.rename', side_effect=[PermissionError("Permission denied"), None, None])
+        mock_print = mocker.patch('builtins.print')
+
+        # Отмена b не удалась: она пропускается только в этом вызове, а a отменяется
+        result = execute(shell, ['2'])
+        assert result == {'undo': True, 'command': 'rm', 'count': 1}
+        assert mock_print.call_args.args[0] == "Undid 1 of 2 operations, 1 failed and can be retried"
+        assert [entry.args for entry in shell.undo_stack] == [('b.txt',)]
+
+        # Повторная отмена проходит
+        assert execute(shell, []) == {'undo': True, 'command': 'rm', 'count': 1}
+        assert [call.args[1] for call in mock_move.call_args_list] == [
+            '/home/user/b.txt', '/home/user/a.txt', '/home/user/b.txt']
+        assert len(shell.undo_stack) == 0
+
+    def test_undo_n_operations(self, mocker):
+        shell = Mock()
+        shell.undo_stack = _stack([
+            {'command': 'rm', 'args': [f'{name}.txt'], 'success': True, 'undo_data': {
+                'original_path': f'/home/user/{name}.txt',
+                'trash_path': f'/home/user/.trash/{name}.txt_1'
+            }, 'ts': float(i)} for i, name in enumerate(['a', 'b', 'c'])
+        ])
+        mocker.patch('os.path.exists', return_value=True)
+        mocker.patch('os.makedirs')
+        mock_move = mocker.patch('os.rename')
+        mocker.patch('builtins.print')
+
+        result = execute(shell, ['2'])
+
+        assert result == {'undo': True, 'command': 'rm', 'count': 2}
+        assert [call.args[1] for call in mock_move.call_args_list] == ['/home/user/c.txt', '/home/user/b.txt']
+        assert shell._mark_undone.call_count == 2
+        assert [entry.args for entry in shell.undo_stack] == [('a.txt',)]
+
+    def test_undo_n_more_than_available(self, mocker):
+        shell = Mock()
+        shell.undo_stack = _stack([
+            {'command': 'cp', 'args': ['a', 'b'], 'success': True, 'undo_data': {
+                'source': '/home/user/a', 'destination': '/home/user/b'
+            }, 'ts': 1.0}
+        ])
+        mocker.patch('os.path.exists', return_value=False)
+        mock_print = mocker.patch('builtins.print')
+
+        result = execute(shell, ['5'])
+
+        assert result['count'] == 1
+        mock_print.assert_called_with(
+            "Only 1 of 5 operations could be undone: no more undoable commands in history")
+
+    def test_undo_invalid_argument(self, mocker):
+        shell = Mock()
+        assert execute(shell, ['0']) is None
+        shell.handle_error.assert_called_once_with("undo: argument must be a positive number")
+        assert execute(shell, ['x']) is None
+        shell.handle_error.assert_called_with("undo: argument must be a number")
\ No newline at end of file
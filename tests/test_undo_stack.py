@@ -0,0 +1,76 @@
+import time
+from storage.entry import HistoryEntry
+from storage.undo_stack import UndoStack
+
+
+def _rm_entry(i):
+    return HistoryEntry('rm', [f'{i}.txt'], undo_data={'original_path': f'/a/{i}.txt', 'trash_path': f'/t/{i}'},
+                        ts=float(i))
+
+
+class TestUndoStack:
+    def test_push_pop_order(self):
+        stack = UndoStack(None)
+        for i in range(3):
+            stack.push(_rm_entry(i))
+
+        assert stack.peek().ts == 2.0
+        assert [stack.pop().ts for _ in range(3)] == [2.0, 1.0, 0.0]
+        assert stack.pop() is None
+        assert stack.peek() is None
+
+    def test_peek_skip_and_update_in_place(self, tmp_path):
+        path = str(tmp_path / '.history.undo.json')
+        stack = UndoStack(path)
+        for i in range(3):
+            stack.push(_rm_entry(i))
+
+        top = stack.peek()
+        assert stack.peek(skip=[top]).ts == 1.0
+        assert stack.peek(skip=list(stack)) is None
+
+        top.undo_data['trash_path'] = '/t/moved'
+        stack.update(top)
+        reloaded = UndoStack(path).load()
+        assert [entry.ts for entry in reloaded] == [0.0, 1.0, 2.0]
+        assert reloaded.peek().undo_data['trash_path'] == '/t/moved'
+
+    def test_depth_is_bounded(self):
+        stack = UndoStack(None, depth=5)
+        for i in range(20):
+            stack.push(_rm_entry(i))
+        assert len(stack) == 5
+        assert [entry.ts for entry in stack] == [15.0, 16.0, 17.0, 18.0, 19.0]
+
+    def test_persisted_between_sessions(self, tmp_path):
+        path = str(tmp_path / '.history.undo.json')
+        stack = UndoStack(path).load()
+        stack.push(_rm_entry(1))
+        stack.push(_rm_entry(2))
+        stack.pop()
+
+        restored = UndoStack(path).load(seed=[_rm_entry(99)])
+        assert [entry.to_record() for entry in restored] == [_rm_entry(1).to_record()]
+
+    def test_seeded_from_recent_history_once(self, tmp_path):
+        history = [_rm_entry(1), HistoryEntry('ls', [], ts=2.0), _rm_entry(3),
+                   HistoryEntry('rm', ['x'], success=False, ts=4.0)]
+        stack = UndoStack(str(tmp_path / '.history.undo.json')).load(seed=history)
+        assert [entry.ts for entry in stack] == [1.0, 3.0]
+
+        stack = UndoStack(None).load(seed=history, scan_limit=2)
+        assert [entry.ts for entry in stack] == [3.0]
+
+    def test_expired_entries_are_not_undoable(self, tmp_path):
+        path = str(tmp_path / '.history.undo.json')
+        now = time.time()
+        stack = UndoStack(path)
+        stack.push(_rm_entry(1))
+        stack.push(HistoryEntry('rm', ['new.txt'], undo_data={'trash_path': '/t/new'}, ts=now))
+
+        # Файл стека хранит обе команды, но старше 30 дней отменять уже нельзя
+        stack = UndoStack(path, ttl_days=30).load()
+        assert [entry.ts for entry in stack] == [now]
+        assert stack.pop().ts == now
+        assert stack.peek() is None
+        assert UndoStack(path).load().peek() is None
@@ -23,7 +23,7 @@ class TestUnzipCommand:
         mock_zipfile_class = mocker.patch('zipfile.ZipFile')
         mock_zipfile_class.return_value.__enter__.return_value = mock_zip
         mocker.patch('zipfile.is_zipfile', return_value=True)
-        mocker.patch.object(shell, '_ask_for_password', return_value='mypassword')
+        mocker.patch('commands.unzip._ask_for_password', return_value='mypassword')
 
         mock_print = mocker.patch('builtins.print')
 
@@ -53,7 +53,7 @@ class TestUnzipCommand:
         mock_zipfile_class.return_value.__enter__.return_value = mock_zip
         mocker.patch('zipfile.is_zipfile', return_value=True)
 
-        mocker.patch.object(shell, '_ask_for_password', return_value=None)
+        mocker.patch('commands.unzip._ask_for_password', return_value=None)
 
         mock_print = mocker.patch('builtins.print')
 
@@ -83,7 +83,7 @@ class TestUnzipCommand:
         mock_zipfile_class.return_value.__enter__.return_value = mock_zip
         mocker.patch('zipfile.is_zipfile', return_value=True)
 
-        mocker.patch.object(shell, '_ask_for_password', return_value='wrongpass')
+        mocker.patch('commands.unzip._ask_for_password', return_value='wrongpass')
 
         result = execute(shell, ['encrypted.zip'])
         assert result is None
@@ -0,0 +1,108 @@
+import pytest
+from unittest.mock import Mock
+from storage.writer import HistoryWriter
+
+class TestHistoryWriter:
+    def test_unknown_durability_mode(self):
+        with pytest.raises(ValueError):
+            HistoryWriter(Mock(), durability='sometimes')
+
+    def test_fsync_mode_writes_synchronously(self):
+        journal = Mock()
+        writer = HistoryWriter(journal, durability='fsync').start()
+
+        writer.submit({'command': 'ls'})
+
+        journal.write_encoded.assert_called_once_with(['{"command":"ls"}\n'], fsync=True)
+
+    def test_batched_mode_flushes_on_batch_size(self):
+        journal = Mock()
+        writer = HistoryWriter(journal, durability='batched', flush_interval=60, batch_size=2).start()
+
+        writer.submit({'command': 'ls'})
+        writer.submit({'command': 'cd'})
+        writer.flush(timeout=5)
+        writer.close()
+
+        journal.write_encoded.assert_called_once_with(['{"command":"ls"}\n', '{"command":"cd"}\n'], fsync=True)
+
+    def test_flushes_on_timer(self):
+        journal = Mock()
+        writer = HistoryWriter(journal, durability='none', flush_interval=0.01, batch_size=100).start()
+
+        writer.submit({'command': 'ls'})
+        writer._thread.join(0.2)
+
+        journal.write_encoded.assert_called_once_with(['{"command":"ls"}\n'], fsync=False)
+        writer.close()
+
+    def test_close_writes_pending_records(self, tmp_path):
+        from storage.journal import HistoryJournal
+        journal = HistoryJournal(str(tmp_path / '.history.jsonl'))
+        writer = HistoryWriter(journal, durability='batched', flush_interval=60, batch_size=100).start()
+
+        for i in range(10):
+            writer.submit({'command': 'ls', 'timestamp': str(i)})
+        writer.close()
+
+        assert len(journal.load()) == 10
+
+    def test_submit_after_close_writes_directly(self):
+        journal = Mock()
+        writer = HistoryWriter(journal, durability='none').start()
+        writer.close()
+
+        writer.submit({'command': 'ls'})
+
+        journal.write_encoded.assert_called_once_with(['{"command":"ls"}\n'], fsync=False)
+
+    def test_write_error_is_reported(self):
+        journal = Mock()
+        journal.write_encoded.side_effect = OSError("Disk full")
+        on_error = Mock()
+        writer = HistoryWriter(journal, durability='batched', batch_size=1, on_error=on_error).start()
+
+        writer.submit({'command': 'ls'})
+        writer.close()
+
+        on_error.assert_called_once_with("Failed to save history: Disk full")
+
+    def test_writer_survives_unexpected_errors(self):
+        journal = Mock()
+        journal.write_encoded.side_effect = [[{'command': 'cd'}], []]
+        on_error = Mock()
+        on_merge = Mock(side_effect=RuntimeError("merge failed"))
+        writer = HistoryWriter(journal, durability='batched', flush_interval=60, batch_size=100,
+                               on_error=on_error, on_merge=on_merge).start()
+
+        writer.submit({'command': 'ls'})
+        writer.flush(timeout=5)
+        writer.submit({'command': 'pwd'})
+        writer.flush(timeout=5)
+        writer.close()
+
+        on_error.assert_called_once_with("Failed to save history: merge failed")
+        assert journal.write_encoded.call_count == 2
+
+    def test_flush_does_not_wait_forever(self):
+        on_error = Mock()
+        writer = HistoryWriter(Mock(), durability='batched', on_error=on_error)
+        # Поток писателя не запущен, но считается работающим: запрос на flush никто не обработает
+        writer._thread = Mock()
+
+        writer.flush(timeout=0.01)
+
+        on_error.assert_called_once()
+        assert "did not respond" in on_error.call_args.args[0]
+
+    def test_deferred_mode_writes_once_on_close(self):
+        journal = Mock()
+        writer = HistoryWriter(journal, durability='batched', batch_size=1, deferred=True).start()
+
+        writer.submit({'command': 'ls'})
+        writer.submit({'command': 'cd'})
+        assert writer._thread is None
+        journal.write_encoded.assert_not_called()
+        writer.close()
+
+        journal.write_encoded.assert_called_once_with(['{"command":"ls"}\n', '{"command":"cd"}\n'], fsync=True)